@@ -0,0 +1,83 @@
+"""bench_dtypes.py
+
+Memory of the scenario rasters (composite landuse, C-factor and ktc) with the data
+types of :data:`pywatemsedem.defaults.RASTER_DTYPES`, compared with float64 rasters.
+The rasters are created in memory on synthetic catchments (see :mod:`synthetic`), so
+these benchmarks do not require SAGA or WaTEM/SEDEM.
+"""
+
+import numpy as np
+
+from .synthetic import EPSG, NODATA, RESOLUTION, SIZES, XMIN, YMIN, get_shape
+
+
+class DtypeSuite:
+    """Benchmark the memory of the scenario rasters for a data type policy."""
+
+    params = (SIZES, ["policy", "float64"])
+    param_names = ["n_cells", "dtypes"]
+    number = 1
+    repeat = (1, 3, 60.0)
+    timeout = 1800
+
+    def setup(self, n_cells, dtypes):
+        """Create the synthetic input rasters of the composite landuse."""
+        from pywatemsedem.defaults import RASTER_DTYPES
+        from pywatemsedem.geo.rasterproperties import RasterProperties
+
+        nrows, ncols = get_shape(n_cells)
+        self.rp = RasterProperties(
+            [XMIN, YMIN, XMIN + ncols * RESOLUTION, YMIN + nrows * RESOLUTION],
+            RESOLUTION,
+            NODATA,
+            EPSG,
+        )
+        if dtypes == "policy":
+            self.dtypes = RASTER_DTYPES
+        else:
+            self.dtypes = {layer: "float64" for layer in RASTER_DTYPES}
+
+        shape = (nrows, ncols)
+        self.mask = np.ones(shape, dtype=np.int16)
+        self.river = np.full(shape, NODATA, dtype=np.int16)
+        self.river[:, ncols // 2] = -1
+        self.infrastructure = np.full(shape, NODATA, dtype=np.int16)
+        self.infrastructure[:: max(nrows // 10, 2), :] = -2
+        self.water = np.full(shape, NODATA, dtype=np.int16)
+        self.water[-max(nrows // 20, 1) :, -max(ncols // 20, 1) :] = -5
+        self.landuse = np.full(shape, -4, dtype=np.int16)
+        self.landuse[: nrows // 4, : ncols // 4] = -3
+        rows, cols = np.indices(shape, dtype=np.int32)
+        self.parcels = 1 + (rows // 10) * (ncols // 10 + 1) + cols // 10
+        self.cfactor = np.random.default_rng(0).uniform(0, 0.5, shape)
+
+    def _create_rasters(self):
+        """Create composite landuse, C-factor and ktc raster in memory."""
+        from pywatemsedem.geo.rasters import RasterMemory
+        from pywatemsedem.parcelslanduse import create_parcels_landuse_degerick2015
+
+        arr = create_parcels_landuse_degerick2015(
+            self.landuse,
+            self.river,
+            self.water,
+            self.infrastructure,
+            self.mask,
+            NODATA,
+            parcels=self.parcels,
+        )
+        composite_landuse = RasterMemory(
+            arr, self.rp, dtype=self.dtypes["composite_landuse"]
+        )
+        cfactor = RasterMemory(self.cfactor, self.rp, dtype=self.dtypes["cfactor"])
+        arr_ktc = np.where(cfactor.arr <= 0.1, 9, 18)
+        arr_ktc[np.isin(composite_landuse.arr, [-2, -1, -5])] = 9999
+        ktc = RasterMemory(arr_ktc, self.rp, dtype=self.dtypes["ktc"])
+        return composite_landuse, cfactor, ktc
+
+    def peakmem_scenario_rasters(self, n_cells, dtypes):
+        self._create_rasters()
+
+    def track_nbytes_scenario_rasters(self, n_cells, dtypes):
+        return sum(raster.arr.nbytes for raster in self._create_rasters())
+
+    track_nbytes_scenario_rasters.unit = "bytes"
@@ -0,0 +1,32 @@
+"""bench_import.py
+
+Import time of pywatemsedem and its main modules, measured in a fresh interpreter
+for every sample (asv ``timeraw_*`` benchmarks). Importing pywatemsedem does not
+resolve the external tools (see :mod:`pywatemsedem.registry`), so these benchmarks
+do not require SAGA, GDAL or WaTEM/SEDEM.
+"""
+
+
+class ImportSuite:
+    """Benchmark the import time of pywatemsedem."""
+
+    number = 1
+    repeat = (5, 10, 30.0)
+
+    def timeraw_import_pywatemsedem(self):
+        return "import pywatemsedem"
+
+    def timeraw_import_catchment(self):
+        return "import pywatemsedem.catchment"
+
+    def timeraw_import_scenario(self):
+        return "import pywatemsedem.scenario"
+
+    def timeraw_import_postprocess(self):
+        return "import pywatemsedem.postprocess"
+
+    def timeraw_check_environment(self):
+        return """
+        from pywatemsedem.registry import check_environment
+        check_environment(raise_error=False)
+        """
@@ -0,0 +1,177 @@
+"""bench_pipeline.py
+
+End-to-end benchmarks of the Catchment -> Scenario -> PostProcess pipeline on
+synthetic catchments (see :mod:`synthetic`). Every stage is tracked for wall time
+(``time_*``) and peak memory (``peakmem_*``).
+
+The model run uses the WaTEM/SEDEM stub in ``benchmarks/bin``, so the postprocess
+benchmarks do not require a WaTEM/SEDEM installation. SAGA GIS is required to build
+the catchments and scenarios.
+"""
+
+import shutil
+import tempfile
+from pathlib import Path
+
+from .synthetic import (
+    SIZES,
+    STUB_BINARY,
+    create_synthetic_catchment,
+    create_synthetic_data,
+    create_synthetic_scenario,
+)
+
+
+class _PipelineBenchmark:
+    """Shared asv settings of the pipeline benchmarks."""
+
+    params = SIZES
+    param_names = ["n_cells"]
+    number = 1
+    repeat = (1, 3, 60.0)
+    warmup_time = 0
+    timeout = 7200
+
+    def setup_cache(self):
+        """Generate the synthetic input data for all catchment sizes."""
+        folder = Path.cwd() / "synthetic"
+        return {n_cells: create_synthetic_data(folder, n_cells) for n_cells in SIZES}
+
+    def setup(self, data, n_cells):
+        """Create a results folder."""
+        self.files = data[n_cells]
+        self.results_folder = Path(tempfile.mkdtemp())
+
+    def teardown(self, data, n_cells):
+        """Remove results folder."""
+        shutil.rmtree(self.results_folder, ignore_errors=True)
+
+
+class CatchmentSuite(_PipelineBenchmark):
+    """Benchmark the creation of a catchment (mask, DTM, K-factor, landuse, river)."""
+
+    def time_catchment(self, data, n_cells):
+        create_synthetic_catchment(self.files, self.results_folder, n_cells)
+
+    def peakmem_catchment(self, data, n_cells):
+        create_synthetic_catchment(self.files, self.results_folder, n_cells)
+
+
+class ScenarioSuite(_PipelineBenchmark):
+    """Benchmark the scenario stages creating and writing the model input."""
+
+    def setup(self, data, n_cells):
+        """Create a scenario holding all input needed for the benchmarked stages."""
+        super().setup(data, n_cells)
+        catchment = create_synthetic_catchment(self.files, self.results_folder, n_cells)
+        self.scenario = create_synthetic_scenario(catchment, self.files)
+        self.scenario.composite_landuse = self.scenario.create_composite_landuse()
+        self.scenario.cfactor = self.scenario.create_cfactor()
+        self.scenario.ktc = self._create_ktc()
+
+    def _create_ktc(self):
+        """Create ktc raster with the ktc values of the scenario user choices."""
+        extensionparameters = self.scenario.choices.extensionparameters
+        return self.scenario.create_ktc(
+            extensionparameters.ktc_low.value,
+            extensionparameters.ktc_high.value,
+            extensionparameters.ktc_limit.value,
+            not self.scenario.choices.extensions.create_ktc_map.value,
+        )
+
+    def time_create_composite_landuse(self, data, n_cells):
+        self.scenario.create_composite_landuse()
+
+    def peakmem_create_composite_landuse(self, data, n_cells):
+        self.scenario.create_composite_landuse()
+
+    def time_create_cfactor(self, data, n_cells):
+        self.scenario.create_cfactor()
+
+    def peakmem_create_cfactor(self, data, n_cells):
+        self.scenario.create_cfactor()
+
+    def time_create_ktc(self, data, n_cells):
+        self._create_ktc()
+
+    def peakmem_create_ktc(self, data, n_cells):
+        self._create_ktc()
+
+    def time_prepare_input_files(self, data, n_cells):
+        self.scenario.prepare_input_files()
+
+    def peakmem_prepare_input_files(self, data, n_cells):
+        self.scenario.prepare_input_files()
+
+
+class PostProcessSuite(_PipelineBenchmark):
+    """Benchmark postprocessing of (stub) WaTEM/SEDEM model output."""
+
+    def setup_cache(self):
+        """Run the pipeline and the WaTEM/SEDEM stub for all catchment sizes.
+
+        Returns
+        -------
+        dict
+            File path of the ini-file per catchment size.
+        """
+        data = super().setup_cache()
+        inis = {}
+        for n_cells in SIZES:
+            catchment = create_synthetic_catchment(
+                data[n_cells], Path.cwd() / "results", n_cells
+            )
+            scenario = create_synthetic_scenario(catchment, data[n_cells])
+            scenario.composite_landuse = scenario.create_composite_landuse()
+            scenario.cfactor = scenario.create_cfactor()
+            scenario.prepare_input_files()
+            scenario.create_ini_file()
+            scenario.run_model(str(STUB_BINARY))
+            inis[n_cells] = scenario.ini
+        return inis
+
+    def setup(self, inis, n_cells):
+        """Create a PostProcess instance for the (stub) model output."""
+        from pywatemsedem.postprocess import PostProcess
+
+        self.results_folder = Path(tempfile.mkdtemp())
+        self.ini = inis[n_cells]
+        self.postprocess = PostProcess(self.ini, self.results_folder, 31370)
+
+    def time_postprocess(self, inis, n_cells):
+        from pywatemsedem.postprocess import PostProcess
+
+        PostProcess(self.ini, self.results_folder, 31370)
+
+    def peakmem_postprocess(self, inis, n_cells):
+        from pywatemsedem.postprocess import PostProcess
+
+        PostProcess(self.ini, self.results_folder, 31370)
+
+    def time_load_routing(self, inis, n_cells):
+        self.postprocess.modeloutput.routing = (
+            self.postprocess.modeloutput.modeloutputfolder / "routing.txt"
+        )
+
+    def peakmem_load_routing(self, inis, n_cells):
+        self.postprocess.modeloutput.routing = (
+            self.postprocess.modeloutput.modeloutputfolder / "routing.txt"
+        )
+
+    def time_load_sediment_rasters(self, inis, n_cells):
+        modeloutput = self.postprocess.modeloutput
+        modeloutput.sedi_in = modeloutput.modeloutputfolder / "SediIn_kg.rst"
+        modeloutput.sedi_out = modeloutput.modeloutputfolder / "SediOut_kg.rst"
+        modeloutput.sedi_export = modeloutput.modeloutputfolder / "SediExport_kg.rst"
+
+    def peakmem_load_sediment_rasters(self, inis, n_cells):
+        modeloutput = self.postprocess.modeloutput
+        modeloutput.sedi_in = modeloutput.modeloutputfolder / "SediIn_kg.rst"
+        modeloutput.sedi_out = modeloutput.modeloutputfolder / "SediOut_kg.rst"
+        modeloutput.sedi_export = modeloutput.modeloutputfolder / "SediExport_kg.rst"
+
+    def time_remove_river_routing(self, inis, n_cells):
+        self.postprocess.remove_river_routing()
+
+    def peakmem_remove_river_routing(self, inis, n_cells):
+        self.postprocess.remove_river_routing()
@@ -0,0 +1,96 @@
+"""bench_rasteroutput.py
+
+Write and (windowed) read throughput of the intermediate rasters (e.g. the id, target
+and rank rasters of the postprocessing) for the raster output policies of
+:data:`pywatemsedem.geo.utils.RASTER_OUTPUT_POLICIES`: the IDRISI format, the former
+DEFLATE compressed GeoTIFF (strips) and tiled cloud-optimized GeoTIFF's with a fast
+(ZSTD) and strong (DEFLATE) compressor.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .synthetic import EPSG, NODATA, RESOLUTION, SIZES, XMIN, YMIN, get_shape
+
+#: Output policy and options per benchmarked layout
+LAYOUTS = {
+    "idrisi": {"policy": "model_input"},
+    "gtiff_deflate": {"policy": None},
+    "cog_zstd": {"policy": "intermediate"},
+    "cog_deflate": {"policy": "intermediate", "compress": "DEFLATE"},
+}
+
+
+class RasterOutputSuite:
+    """Benchmark writing and reading a raster per output layout."""
+
+    params = (SIZES, list(LAYOUTS))
+    param_names = ["n_cells", "layout"]
+    number = 1
+    repeat = (1, 3, 60.0)
+    timeout = 1800
+
+    def setup(self, n_cells, layout):
+        """Create a synthetic sediment load raster and write it once."""
+        import rasterio
+
+        nrows, ncols = get_shape(n_cells)
+        self.profile = {
+            "driver": "GTiff",
+            "height": nrows,
+            "width": ncols,
+            "count": 1,
+            "nodata": NODATA,
+            "crs": f"EPSG:{EPSG}",
+            "transform": rasterio.transform.from_origin(
+                XMIN, YMIN + nrows * RESOLUTION, RESOLUTION, RESOLUTION
+            ),
+        }
+        rng = np.random.default_rng(0)
+        self.arr = rng.gamma(0.5, 100, (nrows, ncols)).astype("float32")
+        self.arr[rng.uniform(0, 1, (nrows, ncols)) < 0.3] = NODATA
+        # window of a subcatchment: 5 % of the rows and columns
+        self.bounds = [
+            XMIN + 0.40 * ncols * RESOLUTION,
+            YMIN + 0.40 * nrows * RESOLUTION,
+            XMIN + 0.45 * ncols * RESOLUTION,
+            YMIN + 0.45 * nrows * RESOLUTION,
+        ]
+        self.tmp = tempfile.TemporaryDirectory()
+        suffix = ".rst" if layout == "idrisi" else ".tif"
+        self.rst = Path(self.tmp.name) / f"raster{suffix}"
+        self._write(layout)
+
+    def teardown(self, n_cells, layout):
+        self.tmp.cleanup()
+
+    def _write(self, layout):
+        from pywatemsedem.geo.utils import write_arr_as_rst
+
+        write_arr_as_rst(
+            self.arr, self.rst, "float32", dict(self.profile), **LAYOUTS[layout]
+        )
+
+    def time_write(self, n_cells, layout):
+        self._write(layout)
+
+    def time_read(self, n_cells, layout):
+        from pywatemsedem.geo.utils import load_raster
+
+        load_raster(self.rst)
+
+    def time_read_window(self, n_cells, layout):
+        from pywatemsedem.geo.utils import load_raster_window
+
+        load_raster_window(self.rst, self.bounds)
+
+    def track_file_size(self, n_cells, layout):
+        return sum(
+            file.stat().st_size
+            for file in self.rst.parent.iterdir()
+            if file.stem == self.rst.stem
+        )
+
+    track_file_size.unit = "bytes"
@@ -0,0 +1,76 @@
+"""bench_tempstorage.py
+
+Writing the model input rasters of a scenario (IDRISI format) with the temporary
+files on disk, compared with the temporary files in GDAL virtual memory (see
+:class:`pywatemsedem.geo.utils.TempStorage`). Every IDRISI raster is written via a
+temporary GeoTIFF, on disk this requires the gdal_translate CLI.
+"""
+
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from .synthetic import EPSG, NODATA, RESOLUTION, SIZES, XMIN, YMIN, get_shape
+
+#: Number of input rasters written per scenario
+N_INPUT_RASTERS = 12
+
+
+class TempStorageSuite:
+    """Benchmark the temporary files of writing the input rasters of a scenario."""
+
+    params = (SIZES[:3], ["disk", "memory"])
+    param_names = ["n_cells", "storage"]
+    number = 1
+    repeat = (1, 3, 60.0)
+    timeout = 1800
+
+    def setup(self, n_cells, storage):
+        """Create the input rasters of a synthetic scenario."""
+        from pywatemsedem.geo.rasterproperties import RasterProperties
+        from pywatemsedem.geo.rasters import RasterMemory
+
+        nrows, ncols = get_shape(n_cells)
+        rp = RasterProperties(
+            [XMIN, YMIN, XMIN + ncols * RESOLUTION, YMIN + nrows * RESOLUTION],
+            RESOLUTION,
+            NODATA,
+            EPSG,
+        )
+        rng = np.random.default_rng(0)
+        self.rasters = [
+            RasterMemory(rng.uniform(0, 1, (nrows, ncols)).astype("float32"), rp)
+            for _ in range(N_INPUT_RASTERS)
+        ]
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = Path(self.tmp.name)
+
+    def teardown(self, n_cells, storage):
+        self.tmp.cleanup()
+
+    def _write_inputs(self, storage):
+        """Write the input rasters, return the temporary files created on disk."""
+        from pywatemsedem.geo.utils import is_vsimem, temp_storage
+
+        created = []
+        with temp_storage(self.folder / "tmp", memory=storage == "memory") as tmp:
+            create_filename = tmp.create_filename
+
+            def create_and_record(suffix, consumer="tool"):
+                fname = create_filename(suffix, consumer)
+                created.append(fname)
+                return fname
+
+            tmp.create_filename = create_and_record
+            for i, raster in enumerate(self.rasters):
+                raster.write(self.folder / f"input_{i}.rst")
+        return [fname for fname in created if not is_vsimem(fname)]
+
+    def time_write_inputs(self, n_cells, storage):
+        self._write_inputs(storage)
+
+    def track_tempfiles_on_disk(self, n_cells, storage):
+        return len(self._write_inputs(storage))
+
+    track_tempfiles_on_disk.unit = "files"
@@ -0,0 +1,446 @@
+"""synthetic.py
+
+This module generates synthetic catchments of a given number of cells for the
+benchmark suite, and holds a stub of the WaTEM/SEDEM model (see
+``benchmarks/bin/watem_sedem``) that writes realistic model output files, so the
+postprocessing can be benchmarked without a WaTEM/SEDEM installation.
+"""
+
+import configparser
+import math
+from pathlib import Path
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import rasterio
+from affine import Affine
+from shapely.geometry import LineString, box
+
+#: Number of cells of the synthetic catchments
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+RESOLUTION = 20
+EPSG = 31370
+NODATA = -9999
+XMIN = 150000
+YMIN = 160000
+
+#: Maximum number of parcels, parcel ids are limited to 32767 in WaTEM/SEDEM
+MAX_PARCELS = 30000
+
+STUB_BINARY = Path(__file__).parent / "bin" / "watem_sedem"
+
+
+def get_shape(n_cells):
+    """Get the (square) shape of a synthetic catchment with n_cells cells.
+
+    Parameters
+    ----------
+    n_cells: int
+        Number of cells.
+
+    Returns
+    -------
+    tuple
+        Number of rows and columns.
+    """
+    n = int(round(math.sqrt(n_cells)))
+    return n, n
+
+
+def _write_tif(arr, rst_out, nodata=NODATA):
+    """Write a synthetic array to a GeoTIFF aligned with the synthetic grid.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray
+        Raster array.
+    rst_out: pathlib.Path
+        File path output raster.
+    nodata: float, default -9999
+        Nodata value.
+    """
+    nrows, ncols = arr.shape
+    transform = Affine(RESOLUTION, 0, XMIN, 0, -RESOLUTION, YMIN + nrows * RESOLUTION)
+    profile = {
+        "driver": "GTiff",
+        "height": nrows,
+        "width": ncols,
+        "count": 1,
+        "dtype": arr.dtype,
+        "crs": f"EPSG:{EPSG}",
+        "transform": transform,
+        "nodata": nodata,
+        "compress": "deflate",
+    }
+    with rasterio.open(rst_out, "w", **profile) as dst:
+        dst.write(arr, 1)
+
+
+def create_synthetic_data(folder, n_cells, seed=0):
+    """Generate the input data of a synthetic catchment.
+
+    The catchment is a square with a DTM sloping to the south, with a valley in the
+    middle column holding the river. The base landuse is mostly agricultural, with
+    a forest block, grass land, roads and a pond. The agricultural land is divided
+    in rectangular parcels.
+
+    Parameters
+    ----------
+    folder: pathlib.Path
+        Folder to write synthetic data to.
+    n_cells: int
+        Number of cells of the catchment.
+    seed: int, default 0
+        Seed of the random number generator.
+
+    Returns
+    -------
+    dict
+        File paths of the synthetic data, with keys *vct_catchment*, *rst_dtm*,
+        *rst_kfactor*, *rst_landuse*, *vct_parcels* and *vct_river*.
+    """
+    folder = Path(folder) / f"synthetic_{n_cells}"
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    nrows, ncols = get_shape(n_cells)
+    xmax = XMIN + ncols * RESOLUTION
+    ymax = YMIN + nrows * RESOLUTION
+
+    files = {
+        "vct_catchment": folder / "catchment.shp",
+        "rst_dtm": folder / "dtm.tif",
+        "rst_kfactor": folder / "kfactor.tif",
+        "rst_landuse": folder / "landuse.tif",
+        "vct_parcels": folder / "parcels.shp",
+        "vct_river": folder / "river.shp",
+    }
+    if all(file.exists() for file in files.values()):
+        return files
+
+    # catchment outline
+    gdf = gpd.GeoDataFrame(
+        {"id": [1]}, geometry=[box(XMIN, YMIN, xmax, ymax)], crs=EPSG
+    )
+    gdf.to_file(files["vct_catchment"])
+
+    # dtm: slope to the south and a valley in the middle column
+    rows, cols = np.indices((nrows, ncols), dtype=np.float32)
+    arr_dtm = (
+        50.0
+        + 0.02 * (nrows - rows) * RESOLUTION
+        + 0.01 * np.abs(cols - ncols // 2) * RESOLUTION
+        + rng.normal(0, 0.05, (nrows, ncols)).astype(np.float32)
+    )
+    _write_tif(arr_dtm.astype(np.float32), files["rst_dtm"])
+    del rows, cols, arr_dtm
+
+    # k-factor
+    arr_kfactor = rng.uniform(20, 40, (nrows, ncols)).astype(np.float32)
+    _write_tif(arr_kfactor, files["rst_kfactor"])
+    del arr_kfactor
+
+    # landuse
+    arr_landuse = np.full((nrows, ncols), 10, dtype=np.int16)
+    arr_landuse[: nrows // 4, : ncols // 4] = -3
+    arr_landuse[nrows // 2 : nrows // 2 + max(nrows // 20, 1), :] = -4
+    arr_landuse[:: max(nrows // 10, 2), :] = -2
+    arr_landuse[-max(nrows // 20, 1) :, -max(ncols // 20, 1) :] = -5
+    _write_tif(arr_landuse, files["rst_landuse"])
+
+    # parcels
+    size = max(5, math.ceil(math.sqrt(n_cells / MAX_PARCELS)))
+    geoms = [
+        box(
+            XMIN + col * RESOLUTION,
+            ymax - min(row + size, nrows) * RESOLUTION,
+            XMIN + min(col + size, ncols) * RESOLUTION,
+            ymax - row * RESOLUTION,
+        )
+        for row in range(0, nrows, size)
+        for col in range(0, ncols, size)
+        if arr_landuse[row, col] == 10
+    ]
+    n_parcels = len(geoms)
+    gdf = gpd.GeoDataFrame(
+        {
+            "NR": np.arange(1, n_parcels + 1, dtype=np.int64),
+            "LANDUSE": rng.choice([-9999, -9999, -9999, -4], n_parcels),
+            "C_crop": rng.uniform(0.05, 0.5, n_parcels),
+            "C_reduct": rng.uniform(0.0, 0.5, n_parcels),
+        },
+        geometry=geoms,
+        crs=EPSG,
+    )
+    gdf.to_file(files["vct_parcels"])
+
+    # river in the valley
+    xriver = XMIN + (ncols // 2 + 0.5) * RESOLUTION
+    gdf = gpd.GeoDataFrame(
+        {"id": [1]},
+        geometry=[LineString([(xriver, ymax), (xriver, YMIN)])],
+        crs=EPSG,
+    )
+    gdf.to_file(files["vct_river"])
+
+    return files
+
+
+def create_synthetic_choices():
+    """Create a user choices instance for the synthetic catchments.
+
+    Returns
+    -------
+    pywatemsedem.choices.Choices
+    """
+    from pywatemsedem import choices
+
+    options = choices.Options()
+    options.apply_defaults()
+    parameters = choices.Parameters()
+    parameters.apply_defaults()
+    parameters.r_factor = 1250.0
+    parameters.parcel_connectivity_cropland = 90
+    parameters.parcel_connectivity_grasstrips = 100
+    parameters.parcel_connectivity_forest = 30
+    parameters.parcel_trapping_eff_cropland = 0
+    parameters.parcel_trapping_eff_pasture = 75
+    parameters.parcel_trapping_eff_forest = 75
+    parameters.bulk_density = 1350
+    extensions = choices.Extensions()
+    extensions.apply_defaults()
+    extensionparameters = choices.ExtensionsParameters(extensions)
+    extensionparameters.apply_defaults()
+    extensionparameters.ktc_low = 1.0
+    extensionparameters.ktc_high = 9.0
+    extensionparameters.ktc_limit = 0.1
+    output = choices.Output()
+    output.apply_defaults()
+    output.write_routing_table = True
+    output.write_sediment_export = True
+    output.write_water_erosion = True
+
+    return choices.Choices(options, parameters, extensions, extensionparameters, output)
+
+
+def create_synthetic_catchment(files, results_folder, n_cells):
+    """Create a Catchment instance for a synthetic catchment.
+
+    Parameters
+    ----------
+    files: dict
+        See :func:`create_synthetic_data`.
+    results_folder: pathlib.Path
+        Folder to write catchment results to.
+    n_cells: int
+        Number of cells of the catchment.
+
+    Returns
+    -------
+    pywatemsedem.catchment.Catchment
+    """
+    from pywatemsedem.catchment import Catchment
+
+    catchment = Catchment(
+        f"synthetic_{n_cells}",
+        files["vct_catchment"],
+        files["rst_dtm"],
+        RESOLUTION,
+        EPSG,
+        NODATA,
+        Path(results_folder),
+    )
+    catchment.kfactor = files["rst_kfactor"]
+    catchment.landuse = files["rst_landuse"]
+    catchment.vct_river = files["vct_river"]
+
+    return catchment
+
+
+def create_synthetic_scenario(catchment, files, scenario_nr=1):
+    """Create a Scenario instance with parcels for a synthetic catchment.
+
+    Parameters
+    ----------
+    catchment: pywatemsedem.catchment.Catchment
+        See :func:`create_synthetic_catchment`.
+    files: dict
+        See :func:`create_synthetic_data`.
+    scenario_nr: int, default 1
+        Scenario number.
+
+    Returns
+    -------
+    pywatemsedem.scenario.Scenario
+    """
+    from pywatemsedem.scenario import Scenario
+
+    scenario = Scenario(catchment, 2019, scenario_nr, create_synthetic_choices())
+    scenario.vct_parcels = files["vct_parcels"]
+
+    return scenario
+
+
+def compute_routing(arr_dtm, arr_mask, resolution):
+    """Compute a two-target steepest descent routing table.
+
+    Every cell routes to its two lowest lower neighbours, with parts proportional to
+    the slope towards these neighbours. Cells without lower neighbour route outside
+    the domain (-99).
+
+    Parameters
+    ----------
+    arr_dtm: numpy.ndarray
+        Elevation array.
+    arr_mask: numpy.ndarray
+        Binary array of the model domain.
+    resolution: float
+        Spatial resolution (m).
+
+    Returns
+    -------
+    pandas.DataFrame
+        Routing table, see
+        :func:`pywatemsedem.io.modeloutput.open_txt_routing_file`.
+    """
+    nrows, ncols = arr_dtm.shape
+    offsets = [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)]
+    distances = np.array(
+        [resolution * math.hypot(drow, dcol) for drow, dcol in offsets],
+        dtype=np.float32,
+    )
+
+    arr_pad = np.pad(arr_dtm.astype(np.float32), 1, constant_values=np.inf)
+    arr_mask_pad = np.pad(arr_mask == 1, 1, constant_values=False)
+    slopes = np.empty((len(offsets), nrows, ncols), dtype=np.float32)
+    for i, (drow, dcol) in enumerate(offsets):
+        neighbour = arr_pad[1 + drow : 1 + drow + nrows, 1 + dcol : 1 + dcol + ncols]
+        in_domain = arr_mask_pad[
+            1 + drow : 1 + drow + nrows, 1 + dcol : 1 + dcol + ncols
+        ]
+        slopes[i] = np.where(in_domain, (arr_dtm - neighbour) / distances[i], 0)
+    slopes[slopes < 0] = 0
+
+    # two steepest lower neighbours
+    order = np.argsort(-slopes, axis=0)[:2]
+    slope1 = np.take_along_axis(slopes, order[:1], axis=0)[0]
+    slope2 = np.take_along_axis(slopes, order[1:], axis=0)[0]
+    del slopes
+
+    rows, cols = np.nonzero(arr_mask == 1)
+    idx1 = order[0][rows, cols]
+    idx2 = order[1][rows, cols]
+    slope1 = slope1[rows, cols]
+    slope2 = slope2[rows, cols]
+    total = slope1 + slope2
+    part1 = np.divide(slope1, total, out=np.zeros_like(total), where=total > 0)
+    part2 = np.divide(slope2, total, out=np.zeros_like(total), where=total > 0)
+
+    arr_offsets = np.array(offsets)
+    has1 = slope1 > 0
+    has2 = slope2 > 0
+    df = pd.DataFrame(
+        {
+            "col": cols + 1,
+            "row": rows + 1,
+            "target1col": np.where(has1, cols + 1 + arr_offsets[idx1, 1], -99),
+            "target1row": np.where(has1, rows + 1 + arr_offsets[idx1, 0], -99),
+            "part1": np.where(has1, part1, 0).round(4),
+            "distance1": np.where(has1, distances[idx1], 0).round(2),
+            "target2col": np.where(has2, cols + 1 + arr_offsets[idx2, 1], -99),
+            "target2row": np.where(has2, rows + 1 + arr_offsets[idx2, 0], -99),
+            "part2": np.where(has2, part2, 0).round(4),
+            "distance2": np.where(has2, distances[idx2], 0).round(2),
+        }
+    )
+    return df
+
+
+def run_stub_model(ini):
+    """Run a stub of WaTEM/SEDEM and write realistic model output files.
+
+    The output rasters are not the result of the WaTEM/SEDEM model, but have the
+    format, dtype, extent and plausible value ranges of the WaTEM/SEDEM output.
+
+    Parameters
+    ----------
+    ini: pathlib.Path
+        File path to the WaTEM/SEDEM ini-file.
+    """
+    cfg = configparser.ConfigParser()
+    cfg.read(ini)
+    inputfolder = Path(cfg["Working directories"]["input directory"])
+    outputfolder = Path(cfg["Working directories"]["output directory"])
+    outputfolder.mkdir(parents=True, exist_ok=True)
+
+    with rasterio.open(inputfolder / cfg["Files"]["p factor map filename"]) as src:
+        arr_mask = src.read(1)
+        profile = src.profile
+    with rasterio.open(inputfolder / cfg["Files"]["dtm filename"]) as src:
+        arr_dtm = src.read(1).astype(np.float32)
+    with rasterio.open(inputfolder / cfg["Files"]["c factor map filename"]) as src:
+        arr_cfactor = src.read(1).astype(np.float32)
+    with rasterio.open(inputfolder / cfg["Files"]["k factor filename"]) as src:
+        arr_kfactor = src.read(1).astype(np.float32)
+    with rasterio.open(inputfolder / cfg["Files"]["parcel filename"]) as src:
+        arr_landuse = src.read(1)
+
+    resolution = abs(profile["transform"][0])
+    r_factor = float(cfg["Parameters"].get("r factor", 1250))
+    domain = arr_mask == 1
+    profile.update(driver="RST", dtype="float32", nodata=0)
+
+    def write(arr, name):
+        """Write a model output raster."""
+        arr = np.where(domain, arr, 0).astype(np.float32)
+        with rasterio.open(outputfolder / name, "w", **profile) as dst:
+            dst.write(arr, 1)
+
+    # topography
+    dy, dx = np.gradient(arr_dtm, resolution)
+    slope = np.arctan(np.hypot(dx, dy)).astype(np.float32)
+    aspect = np.mod(np.arctan2(dx, -dy), 2 * np.pi).astype(np.float32)
+    del dx, dy
+    uparea = np.cumsum(domain, axis=0, dtype=np.float32) * resolution**2
+    ls = (np.sqrt(uparea) / 22.13) ** 0.4 * (np.sin(slope) / 0.0896) ** 1.3
+    write(slope, "SLOPE.rst")
+    write(aspect, "AspectMap.rst")
+    write(uparea, "UPAREA.rst")
+    write(ls, "LS.rst")
+    del aspect, uparea, slope
+
+    # erosion and sediment
+    rusle = r_factor * np.clip(arr_kfactor, 0, None) * ls * np.clip(arr_cfactor, 0, 1)
+    rusle = rusle / 10000
+    watereros = -rusle * resolution**2
+    capacity = rusle * resolution**2 * 1.5
+    sedi_out = np.clip(-watereros * 0.6, 0, None)
+    sedi_in = np.clip(-watereros * 0.4, 0, None)
+    sedi_export = np.where(arr_landuse == -1, sedi_in, 0)
+    write(rusle, "RUSLE.rst")
+    write(capacity, "Capacity.rst")
+    write(watereros, "WATEREROS (kg per gridcel).rst")
+    write(watereros / (resolution**2) / 1.35, "WATEREROS (mm per gridcel).rst")
+    write(sedi_in, "SediIn_kg.rst")
+    write(sedi_out, "SediOut_kg.rst")
+    write(sedi_export, "SediExport_kg.rst")
+
+    total_erosion = float(watereros[domain].sum())
+    total_export = float(sedi_export[domain].sum())
+    with open(outputfolder / "Total sediment.txt", "w") as f:
+        f.write(f"Total erosion: {total_erosion:.2f} (kg)\n")
+        f.write(f"Total deposition: {-total_erosion * 0.3:.2f} (kg)\n")
+        f.write(
+            f"Sediment leaving the catchment, via the river: {total_export:.2f} (kg)\n"
+        )
+        f.write(
+            "Sediment leaving the catchment, not via the river: "
+            f"{-total_erosion * 0.7 - total_export:.2f} (kg)\n"
+        )
+        f.write("Sediment trapped in buffers: 0.00 (kg)\n")
+        f.write("Sediment entering sewer system: 0.00 (kg)\n")
+
+    if cfg["Output"].get("write routing table", "0") == "1":
+        df_routing = compute_routing(arr_dtm, arr_mask, resolution)
+        df_routing.to_csv(outputfolder / "routing.txt", sep="\t", index=False)
@@ -9,40 +9,27 @@ except PackageNotFoundError:  # pragma: no cover
 finally:
     del version, PackageNotFoundError
 
-# check if SAGA/WaTEM topology is installed properly
-import os
-import shutil
-import subprocess
-from pathlib import Path
+# submodules and functions are only imported on first access (PEP 562), importing
+# pywatemsedem does not import the (heavy) dependencies of its submodules
+_SUBMODULES = [
+    "calibrate",
+    "catchment",
+    "choices",
+    "postprocess",
+    "profiling",
+    "registry",
+    "scenario",
+    "tools",
+]
+_LAZY_ATTRIBUTES = {"check_environment": "registry"}
 
-# Check if saga_cmd executable can be found
-if shutil.which("saga_cmd") is None:  # saga_cmd cannot be found in the PATH variable
-    # Check if there is an environment variable "SAGA"
-    if os.environ.get("SAGA") is not None and Path(os.environ.get("SAGA")).exists():
-        os.environ["SAGA_TLB"] = os.environ.get("SAGA")
-        os.environ["PATH"] = (
-            os.environ.get("SAGA") + os.pathsep + os.environ["PATH"]
-        )  # Add saga location to PATH
-        if shutil.which("saga_cmd") is None:
-            msg = (
-                "SAGA is not properly installed, pywatemsedem cannot"
-                " access saga_cmd via PATH or SAGA"
-            )
-            raise OSError(msg)
-    else:
-        msg = (
-            "SAGA is not available in the environment variable PATH "
-            "and there is no environment variable SAGA"
-        )
-        raise OSError(msg)
 
-# Check if the topology module is installed
-try:
-    subprocess.check_output(["saga_cmd", "topology"], stderr=subprocess.STDOUT)
-except subprocess.CalledProcessError as e:
-    if "Error: select a library" in e.output.decode():
-        msg = (
-            "SAGA/WaTEM is not properly installed, check the installation instruction "
-            "in the documentation."
-        )
-        raise OSError(msg)
+def __getattr__(name):
+    """Import submodules and functions of pywatemsedem on first access."""
+    from importlib import import_module
+
+    if name in _SUBMODULES:
+        return import_module(f"{__name__}.{name}")
+    if name in _LAZY_ATTRIBUTES:
+        return getattr(import_module(f"{__name__}.{_LAZY_ATTRIBUTES[name]}"), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
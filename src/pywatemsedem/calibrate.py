@@ -1,12 +1,8 @@
 import logging
 from dataclasses import dataclass
 
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from matplotlib import cm, colors
-from sklearn import linear_model
-from sklearn.metrics import r2_score
 
 logger = logging.getLogger(__name__)
 
@@ -339,6 +335,9 @@ def linear_regression_evaluation_calibration(arr_observed, arr_predicted):
         First order regression coefficient. See also
         :class:`sklearn.linear_model.LinearRegression`
     """
+    from sklearn import linear_model
+    from sklearn.metrics import r2_score
+
     regr = linear_model.LinearRegression(fit_intercept=False)
     arr_observed = arr_observed.values.reshape(-1, 1)
     arr_predicted = arr_predicted.values.reshape(-1, 1)
@@ -531,6 +530,8 @@ def plot_model_efficiency(
     fig:  matplotlib.pyplot.figure
     ax:  matplotlib.pyplot.axes
     """
+    import matplotlib.pyplot as plt
+    from matplotlib import cm, colors
 
     field = "ME sy" if sy else "ME ssy"
 
@@ -690,6 +691,9 @@ def plot_regression(
     fig: matplotlib.pyplot.figure
     ax1: matplotlib.pyplot.figure
     """
+    import matplotlib.pyplot as plt
+    from sklearn.metrics import r2_score
+
     selection = df.loc[(df["ktc_low"] == ktc_low) & (df["ktc_high"] == ktc_high)]
     if kind not in ["sy", "ssy"]:
         msg = f"kind `{kind}` is not a known pywatemsedem calibration plot type."
@@ -7,7 +7,6 @@ import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pyogrio
-from matplotlib import pyplot as plt
 
 from pywatemsedem.defaults import SAGA_FLAGS
 from pywatemsedem.errors import (
@@ -1262,6 +1261,8 @@ class Catchment(Factory):
 
         def plot(nodata=None, *args, **kwargs):
             """Plotting fun"""
+            from matplotlib import pyplot as plt
+
             fig, ax = plt.subplots(figsize=[10, 10])
             """Plot infrastructure"""
             arr_plot = self._infrastructure.arr.copy().astype(np.float32)
@@ -1,12 +1,24 @@
+import hashlib
 import warnings
+from collections import OrderedDict
 
 import numpy as np
+import shapely
 
+from pywatemsedem.defaults import RASTER_DTYPES
 from pywatemsedem.geo.utils import clean_up_tempfiles, create_filename
+from pywatemsedem.geo.vectors import VectorMemory
 from pywatemsedem.grasstrips import (
     scale_cfactor_linear,
     scale_cfactor_with_grass_strips_width,
 )
+from pywatemsedem.parcelslanduse import merge_arrays_on_priority
+
+#: Maximum number of index rasters cached by a C-factor engine
+MAX_CACHED_INDICES = 8
+
+#: Maximum range of integer values reclassed with a lookup table
+MAX_LOOKUP_TABLE_SIZE = 2**16
 
 
 def create_cfactor_degerick2015(
@@ -18,6 +30,7 @@ def create_cfactor_degerick2015(
     vct_grass_strips=None,
     cfactor_aggriculture=0.37,
     use_source_oriented_measures=False,
+    engine=None,
 ):
     """Creates the C-factor raster based on river, infrastructure and composite landuse.
 
@@ -54,6 +67,9 @@ def create_cfactor_degerick2015(
         Default C-factor value for left-over pixels
     use_source_oriented_measures: bool
         True / False. In case True, vct_parcels should contain the column 'C_reduct'.
+    engine: pywatemsedem.cfactor.CfactorEngine, default None
+        Engine holding the (cached) index rasters of the parcels and grass strips.
+        If None, the vectors are rasterized with a new engine.
 
     Returns
     -------
@@ -68,31 +84,29 @@ def create_cfactor_degerick2015(
     2. C-reduction based on source-oriented measures ('C_reduc') are only applied at
        the level of parcel polygons (see
        :func:`pywatemsedem.cfactor.reduce_cfactor_with_source_oriented_measures`).
+    3. Pass the same engine for C-factor rasters of the same parcels and grass strips
+       with different C-factor values (e.g. seasonal C-factors), so the vectors are
+       only rasterized once (see :class:`pywatemsedem.cfactor.CfactorEngine`).
     """
-    # use to rasterize
-    tiff_temp = create_filename(".tif")
-    mask.write(tiff_temp, format="tiff")
-
-    arr_cfactor = np.full(
-        composite_landuse.arr.shape, composite_landuse.rp.nodata
-    ).astype("float32")
+    if engine is None:
+        engine = CfactorEngine(mask)
     nodata = composite_landuse.rp.nodata
+    layers = []
 
     # waterlopen
     if rivers is not None:
-        temp = np.where(rivers.arr != rivers.rp.nodata, 0, rivers.rp.nodata)
-        arr_cfactor = np.where(arr_cfactor == nodata, temp, arr_cfactor)
+        layers.append(np.where(rivers.arr != rivers.rp.nodata, 0, nodata))
 
     # infrastructuur
     if infrastructure is not None:
-        temp = np.where(
-            np.isin(infrastructure.arr, np.array([-2, -7])), 0, infrastructure.arr
+        layers.append(
+            np.where(
+                np.isin(infrastructure.arr, np.array([-2, -7])), 0, infrastructure.arr
+            )
         )
-        arr_cfactor = np.where(arr_cfactor == nodata, temp, arr_cfactor)
 
     # grass strips
-    # TODO: optimize workflow
-    if not vct_grass_strips.is_empty():
+    if vct_grass_strips is not None and not vct_grass_strips.is_empty():
         res = composite_landuse.rp.resolution
 
         if use_source_oriented_measures:
@@ -106,16 +120,14 @@ def create_cfactor_degerick2015(
             resolution=res,
             upper_cfactor=upper_cfactor,
         )
-        # write calculated C-factor to shapefile -> needed for efficiency plots
-        # vct_grass = grass.write()
-        arr_grass_cfactor = vct_grass_strips.rasterize(
-            tiff_temp, epsg=composite_landuse.rp.epsg, col="C_factor", gdal=False
+        layers.append(
+            engine.map_values(
+                vct_grass_strips, vct_grass_strips.geodata["C_factor"], nodata
+            )
         )
-        arr_cfactor = np.where(arr_cfactor == nodata, arr_grass_cfactor, arr_cfactor)
 
     # parcels
-    # TODO: optimize workflow
-    if not vct_parcels.is_empty():
+    if vct_parcels is not None and not vct_parcels.is_empty():
         if "C_crop" in vct_parcels.geodata.columns:
             vct_parcels.geodata["C_factor"] = vct_parcels.geodata["C_crop"]
         if "default_cfactor" in vct_parcels.geodata:
@@ -137,13 +149,8 @@ def create_cfactor_degerick2015(
                     use_source_oriented_measures,
                 )
             )
-            arr = vct_parcels.rasterize(
-                tiff_temp, composite_landuse.rp.epsg, col="C_factor", gdal=False
-            )
-            arr_cfactor = np.where(
-                arr_cfactor == nodata,
-                arr,
-                arr_cfactor,
+            layers.append(
+                engine.map_values(vct_parcels, vct_parcels.geodata["C_factor"], nodata)
             )
         else:
             msg = (
@@ -155,25 +162,168 @@ def create_cfactor_degerick2015(
     # other landuse
     if not composite_landuse.is_empty():
         # reclass landarr to C-factors
-        temp = composite_landuse.arr.copy()
-        temp = np.where(temp == -1, 0, temp)
-        temp = np.where(temp == -2, 0, temp)
-        temp = np.where(temp == -3, 0.001, temp)
-        temp = np.where(temp == -4, 0.01, temp)
-        temp = np.where(temp == -5, 0, temp)
-        temp = np.where(temp == -6, 0.01, temp)
-        temp = np.where(np.isin(temp, np.arange(1, 11, 1)), cfactor_aggriculture, temp)
-        arr_cfactor = np.where(arr_cfactor == nodata, temp, arr_cfactor)
+        reclass = {-1: 0, -2: 0, -3: 0.001, -4: 0.01, -5: 0, -6: 0.01}
+        reclass.update({value: cfactor_aggriculture for value in range(1, 11)})
+        layers.append(reclass_with_lookup_table(composite_landuse.arr, reclass))
 
     # last possible pixels
-    arr_mask = np.where(mask.arr, cfactor_aggriculture, 0)
-    arr_cfactor = np.where(arr_cfactor == nodata, arr_mask, arr_cfactor)
-    arr_cfactor = arr_cfactor.astype("float32")
-    clean_up_tempfiles(tiff_temp, "tiff")
+    layers.append(np.where(mask.arr, cfactor_aggriculture, 0))
+    arr_cfactor = merge_arrays_on_priority(
+        layers, nodata, dtype=RASTER_DTYPES["cfactor"]
+    )
 
     return vct_grass_strips, arr_cfactor
 
 
+class CfactorEngine:
+    """Map C-factor values of parcels and grass strips on cached index rasters.
+
+    The polygons of a vector are rasterized once to an index raster holding for every
+    pixel the (row) index of the polygon in the vector (-1 if no polygon). The
+    C-factor values of the polygons are mapped on the pixels with a lookup table, so
+    creating C-factor rasters for new C-factor values (e.g. for every season) of the
+    same polygons does not need to rasterize the vector again.
+
+    The index rasters are cached per geometry of the vector, i.e. the index raster is
+    reused as long as the geometries of the vector are unchanged.
+
+    Parameters
+    ----------
+    mask: pywatemsedem.geo.rasters.AbstractRaster
+        Mask, defines the grid of the index rasters.
+    """
+
+    def __init__(self, mask):
+        self.mask = mask
+        self._indices = OrderedDict()
+
+    def get_index(self, vct):
+        """Get the index raster of a polygon vector.
+
+        Parameters
+        ----------
+        vct: pywatemsedem.geo.vectors.AbstractVector
+            Polygon vector.
+
+        Returns
+        -------
+        numpy.ndarray
+            Index (int32) of the polygon in the vector for every pixel, -1 if no
+            polygon covers the pixel.
+        """
+        key = get_geometry_key(vct.geodata)
+        if key in self._indices:
+            self._indices.move_to_end(key)
+            return self._indices[key]
+
+        index = self._rasterize_index(vct)
+        self._indices[key] = index
+        if len(self._indices) > MAX_CACHED_INDICES:
+            self._indices.popitem(last=False)
+        return index
+
+    def map_values(self, vct, values, nodata):
+        """Map values of the polygons of a vector on the grid.
+
+        Parameters
+        ----------
+        vct: pywatemsedem.geo.vectors.AbstractVector
+            Polygon vector.
+        values: numpy.ndarray or pandas.Series
+            Value for every polygon (same order as the vector).
+        nodata: float
+            Value of pixels not covered by a polygon.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        index = self.get_index(vct)
+        if len(values) != len(vct.geodata):
+            msg = (
+                f"Number of values ({len(values)}) should be equal to the number of "
+                f"polygons ({len(vct.geodata)})."
+            )
+            raise ValueError(msg)
+        # the last item of the lookup table holds the nodata value (index -1)
+        lut = np.append(np.asarray(values, dtype=RASTER_DTYPES["cfactor"]), nodata)
+        return lut[index]
+
+    def clear(self):
+        """Remove all cached index rasters."""
+        self._indices.clear()
+
+    def _rasterize_index(self, vct):
+        """Rasterize the (row) index of the polygons of a vector."""
+        tiff_temp = create_filename(".tif")
+        self.mask.write(tiff_temp, format="tiff")
+        vct_index = VectorMemory(
+            vct.geodata[["geometry"]].assign(
+                CF_INDEX=np.arange(len(vct.geodata), dtype=np.float64)
+            ),
+            vct._geometry_type,
+        )
+        arr = vct_index.rasterize(tiff_temp, self.mask.rp.epsg, col="CF_INDEX")
+        clean_up_tempfiles(tiff_temp, "tiff")
+
+        index = np.full(arr.shape, -1, dtype=np.int32)
+        cond = arr != self.mask.rp.nodata
+        index[cond] = arr[cond]
+        return index
+
+
+def get_geometry_key(gdf):
+    """Get a hash key of the geometries of a geodataframe.
+
+    Parameters
+    ----------
+    gdf: geopandas.GeoDataFrame
+
+    Returns
+    -------
+    str
+    """
+    sha1 = hashlib.sha1()
+    for wkb in shapely.to_wkb(np.asarray(gdf.geometry.values)):
+        sha1.update(wkb)
+    return f"{len(gdf)}_{sha1.hexdigest()}"
+
+
+def reclass_with_lookup_table(arr, reclass, dtype=RASTER_DTYPES["cfactor"]):
+    """Reclass values of an array, values not in the reclass table are kept.
+
+    For integer arrays the values are reclassed with a lookup table gather over the
+    range of the array values, otherwise value per value.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray
+        Array to reclass.
+    reclass: dict
+        Reclass table, keys are the old values, values the new values.
+    dtype: numpy.dtype, default float32
+        Data type of the reclassed array.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    if np.issubdtype(arr.dtype, np.integer) and arr.size > 0:
+        vmin = int(arr.min())
+        vmax = int(arr.max())
+        if vmax - vmin < MAX_LOOKUP_TABLE_SIZE:
+            lut = np.arange(vmin, vmax + 1, dtype=dtype)
+            for old, new in reclass.items():
+                if vmin <= old <= vmax:
+                    lut[old - vmin] = new
+            return lut[arr - vmin]
+
+    arr_out = arr.astype(dtype)
+    for old, new in reclass.items():
+        arr_out[arr == old] = new
+    return arr_out
+
+
 def reduce_cfactor_with_source_oriented_measures(
     c_factor, c_reduction, use_source_oriented_measures
 ):
@@ -1,5 +1,14 @@
 ALLOWED_RASTER_FORMATS = ["idrisi", "tiff"]
 
+#: Data type of the scenario rasters held in memory (landuse classes and parcel ids
+#: fit integer 16, C-factor and ktc are single precision coefficients), see
+#: :func:`pywatemsedem.geo.rasters.AbstractRaster.initialize`
+RASTER_DTYPES = {
+    "composite_landuse": "int16",
+    "cfactor": "float32",
+    "ktc": "float32",
+}
+
 PREFIX_TEMP = "pywatemsedem_"
 
 # fix this
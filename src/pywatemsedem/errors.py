@@ -8,6 +8,10 @@ import numpy as np
 from pywatemsedem.io.valid import valid_boundaries
 
 
+class WSException(Exception):
+    """Exception from WaTEM/SEDEM pre- and postprocessing scripts"""
+
+
 class PywatemsedemVectorAttributeError(Exception):
     """Raise error when input data don't conform the required pywatemsedem
     attributes."""
@@ -23,6 +27,11 @@ class PywatemsedemRasterValueError(Exception):
     values"""
 
 
+class PywatemsedemRoutingIndexError(Exception):
+    """Raise error when the routing graph index of a routing table can not be
+    built."""
+
+
 def raster_discrete_value_error(raster_array, tag, allowed_values, classes=None):
     """Value error for discrete attributes in input raster
 
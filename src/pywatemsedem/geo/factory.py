@@ -1,4 +1,7 @@
+import hashlib
 import inspect
+import threading
+from collections import OrderedDict
 from functools import wraps
 from pathlib import Path
 
@@ -11,6 +14,7 @@ from rasterio import RasterioIOError
 from pywatemsedem.geo.rasterproperties import RasterProperties
 from pywatemsedem.geo.rasters import RasterFile, RasterMemory, TemporalRaster
 from pywatemsedem.geo.utils import (
+    compute_file_hash,
     define_extent_from_vct,
     generate_vct_mask_from_raster_mask,
     load_raster,
@@ -18,7 +22,18 @@ from pywatemsedem.geo.utils import (
     write_arr_as_rst,
 )
 from pywatemsedem.geo.valid import PywatemsedemInputError, valid_exists
-from pywatemsedem.geo.vectors import VectorFile, VectorMemory
+from pywatemsedem.geo.vectors import (
+    ClipMask,
+    VectorFile,
+    VectorMemory,
+    is_geoparquet,
+)
+
+#: Maximum number of mask arrays shared between factories
+MAX_SHARED_MASKS = 16
+
+_mask_arrays = OrderedDict()
+_lock = threading.Lock()
 
 
 def valid_mask_factory(func):
@@ -53,6 +68,57 @@ def valid_mask_factory(func):
     return wrapper
 
 
+def get_mask_fingerprint(mask, rp):
+    """Get the fingerprint of a mask created from a template and RasterProperties.
+
+    Parameters
+    ----------
+    mask: pathlib.Path | str
+        File path to mask vector or raster file.
+    rp: pywatemsedem.geo.rasterproperties.RasterProperties
+        See :class:`pywatemsedem.geo.rasterproperties.RasterProperties`.
+
+    Returns
+    -------
+    str
+        Hash of the content of the template and the RasterProperties.
+    """
+    properties = (rp.bounds, rp.resolution, rp.nodata, rp.epsg)
+    sha1 = hashlib.sha1(compute_file_hash(mask).encode())
+    sha1.update(repr(properties).encode())
+    return sha1.hexdigest()
+
+
+def _get_mask_arrays(fingerprint):
+    """Get the shared mask array and binary mask array of a fingerprint.
+
+    Parameters
+    ----------
+    fingerprint: str
+        See :func:`pywatemsedem.geo.factory.get_mask_fingerprint`.
+
+    Returns
+    -------
+    arr: numpy.ndarray
+        Mask array, None if not shared.
+    arr_bin: numpy.ndarray
+        Binary mask array, None if not shared.
+    """
+    with _lock:
+        if fingerprint not in _mask_arrays:
+            return None, None
+        _mask_arrays.move_to_end(fingerprint)
+        return _mask_arrays[fingerprint]
+
+
+def _set_mask_arrays(fingerprint, arr, arr_bin):
+    """Share the mask array and binary mask array of a fingerprint."""
+    with _lock:
+        _mask_arrays[fingerprint] = (arr, arr_bin)
+        if len(_mask_arrays) > MAX_SHARED_MASKS:
+            _mask_arrays.popitem(last=False)
+
+
 class Factory:
     """Factory class for generating vectors and rasters.
 
@@ -97,12 +163,15 @@ class Factory:
         self._bounds = bounds
         self._rp = None
         self._mask = None
+        self._vct_mask = None
+        self._clip_mask = None
         self._bounds = None
         self.resmap = Path(resmap) / "factory"
         if not self.resmap.exists():
             self.resmap.mkdir(exist_ok=True)
         self.vectorfile_mask = self.resmap / "mask.shp"
         self.rasterfile_mask = self.resmap / "mask.tif"
+        self.fingerprintfile_mask = self.resmap / "mask.fingerprint"
         self.create_rasterproperties = True
 
     @property
@@ -127,6 +196,15 @@ class Factory:
         """AbstractVector mask, See :class:`pywatemsedem.geo.vectors.AbstractVector`"""
         return self._vct_mask
 
+    @property
+    def clip_mask(self):
+        """Dissolved and prepared mask geometry used to clip vectors, see
+        :class:`pywatemsedem.geo.vectors.ClipMask`. The clip mask is created once
+        per mask vector."""
+        if self._clip_mask is None or self._clip_mask[0] is not self._vct_mask:
+            self._clip_mask = (self._vct_mask, ClipMask(self._vct_mask.geodata))
+        return self._clip_mask[1]
+
     @mask.setter
     def mask(self, mask):
         """Set mask with an numpy array
@@ -141,6 +219,12 @@ class Factory:
     def create_mask(self, mask):
         """Create mask based on a mask template (raster or vector)
 
+        The mask raster (vector template) or mask vector (raster template) written
+        to the factory folder are reused if they were created from the same
+        template and RasterProperties (see
+        :func:`pywatemsedem.geo.factory.get_mask_fingerprint`). The mask arrays are
+        shared between all factories with the same template and RasterProperties.
+
         Parameters
         ----
         mask: pathlib.Path | str
@@ -177,21 +261,58 @@ class Factory:
                 create_mask_raster = True
 
         if create_mask_raster:
-            if self.create_rasterproperties:
-                self.rp = define_extent_from_vct(
-                    mask,
-                    self._resolution,
-                    self._nodata,
-                    self._epsg_code,
-                    self._bounds,
-                )
+            arr, arr_bin, fingerprint = self._create_mask_from_vector(mask)
 
-            self._vct_mask = VectorFile(mask)
-            if mask != self.vectorfile_mask:
-                self._vct_mask._geodata.to_file(
-                    self.vectorfile_mask, spatial_index="YES"
-                )
+        if create_mask_vector:
+            arr, arr_bin, fingerprint = self._create_mask_from_raster(mask)
+
+        self._mask = RasterMemory(arr, self.rp)
+        if arr_bin is None:
+            arr_bin = np.where(self._mask.arr == self.rp.nodata, 0, self._mask.arr)
+            _set_mask_arrays(fingerprint, arr, arr_bin)
+        self._mask.arr_bin = arr_bin
+
+        return True
+
+    def _create_mask_from_vector(self, mask):
+        """Create the mask raster from a vector mask template.
+
+        Parameters
+        ----------
+        mask: pathlib.Path | str
+            File path to mask vector file
+
+        Returns
+        -------
+        arr: numpy.ndarray
+            Mask array.
+        arr_bin: numpy.ndarray
+            Shared binary mask array, None if not shared yet.
+        fingerprint: str
+            See :func:`pywatemsedem.geo.factory.get_mask_fingerprint`.
+        """
+        if self.create_rasterproperties:
+            self.rp = define_extent_from_vct(
+                mask,
+                self._resolution,
+                self._nodata,
+                self._epsg_code,
+                self._bounds,
+            )
 
+        self._vct_mask = VectorFile(mask)
+        fingerprint = get_mask_fingerprint(mask, self.rp)
+        arr, arr_bin = _get_mask_arrays(fingerprint)
+        if self._valid_mask_cache(fingerprint, self.rasterfile_mask):
+            if arr is None:
+                arr, _ = load_raster(self.rasterfile_mask)
+            return arr, arr_bin, fingerprint
+
+        self.fingerprintfile_mask.unlink(missing_ok=True)
+        if mask != self.vectorfile_mask:
+            self._vct_mask._geodata.to_file(self.vectorfile_mask, spatial_index="YES")
+
+        if arr is None:
             vct_to_rst_value(
                 mask,
                 self.rasterfile_mask,
@@ -199,36 +320,81 @@ class Factory:
                 dtype="integer",
                 gdal=False,
             )
-
             arr, profile = load_raster(self.rasterfile_mask)
             arr = arr.astype("int16")
             # correct no data value if necessary
             if profile["nodata"] != self.rp.nodata:
                 arr[arr == profile["nodata"]] = self.rp.nodata
-            write_arr_as_rst(
-                arr, self.rasterfile_mask, np.int16, self.rp.rasterio_profile
-            )
+        write_arr_as_rst(arr, self.rasterfile_mask, np.int16, self.rp.rasterio_profile)
+        self.fingerprintfile_mask.write_text(fingerprint)
 
-        if create_mask_vector:
-            arr, rp = load_raster(mask)
-            if self.create_rasterproperties:
-                self.rp = RasterProperties.from_rasterio(rp, epsg=self._epsg_code)
+        return arr, arr_bin, fingerprint
+
+    def _create_mask_from_raster(self, mask):
+        """Create the mask vector from a raster mask template.
+
+        Parameters
+        ----------
+        mask: pathlib.Path | str
+            File path to mask raster file
+
+        Returns
+        -------
+        arr: numpy.ndarray
+            Mask array.
+        arr_bin: numpy.ndarray
+            Shared binary mask array, None if not shared yet.
+        fingerprint: str
+            See :func:`pywatemsedem.geo.factory.get_mask_fingerprint`.
+        """
+        with rasterio.open(mask) as src:
+            profile = src.profile
+        if self.create_rasterproperties:
+            self.rp = RasterProperties.from_rasterio(profile, epsg=self._epsg_code)
+        fingerprint = get_mask_fingerprint(mask, self.rp)
+        if not self._valid_mask_cache(fingerprint, self.vectorfile_mask):
+            self.fingerprintfile_mask.unlink(missing_ok=True)
             generate_vct_mask_from_raster_mask(
                 mask, self.vectorfile_mask, self._resolution
             )
-            self._vct_mask = VectorFile(self.vectorfile_mask)
-            self._vct_mask._geodata = self._vct_mask._geodata.set_crs(self.rp.epsg)
+            self.fingerprintfile_mask.write_text(fingerprint)
+        self._vct_mask = VectorFile(self.vectorfile_mask)
+        self._vct_mask._geodata = self._vct_mask._geodata.set_crs(self.rp.epsg)
 
-        self._mask = RasterMemory(arr, self.rp)
-        self._mask.arr_bin = np.where(
-            self._mask.arr == self.rp.nodata, 0, self._mask.arr
-        )
+        arr, arr_bin = _get_mask_arrays(fingerprint)
+        if arr is None:
+            arr, _ = load_raster(mask)
 
-        return True
+        return arr, arr_bin, fingerprint
+
+    def _valid_mask_cache(self, fingerprint, file_path):
+        """Check if the mask file in the factory folder is created with fingerprint.
+
+        Parameters
+        ----------
+        fingerprint: str
+            See :func:`pywatemsedem.geo.factory.get_mask_fingerprint`.
+        file_path: pathlib.Path
+            File path of the mask file created from the template.
+
+        Returns
+        -------
+        bool
+        """
+        return (
+            file_path.exists()
+            and self.fingerprintfile_mask.exists()
+            and self.fingerprintfile_mask.read_text() == fingerprint
+        )
 
     @valid_mask_factory
     def raster_factory(
-        self, raster_input, flag_clip=True, flag_mask=True, allow_nodata_array=False
+        self,
+        raster_input,
+        flag_clip=True,
+        flag_mask=True,
+        allow_nodata_array=False,
+        dtype=None,
     ):
         """Raster factory to load rasters in memory
 
@@ -243,6 +409,9 @@ class Factory:
         allow_nodata_array: default False
             Allow the returned array to only contain nodata-values,
             see :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
+        dtype: numpy.dtype or str, default None
+            Data type of the raster array (not used for 3-D arrays), see
+            :func:`pywatemsedem.geo.rasters.AbstractRaster.initialize`.
 
         Returns
         -------
@@ -264,7 +433,11 @@ class Factory:
                 raise IOError(msg)
             rp = self.rp if flag_clip else None
             raster = RasterFile(
-                raster_input, rp, arr_mask, allow_nodata_array=allow_nodata_array
+                raster_input,
+                rp,
+                arr_mask,
+                allow_nodata_array=allow_nodata_array,
+                dtype=dtype,
             )
         elif isinstance(raster_input, np.ndarray):
             if raster_input.ndim == 2:
@@ -273,6 +446,7 @@ class Factory:
                     self.rp,
                     arr_mask,
                     allow_nodata_array=allow_nodata_array,
+                    dtype=dtype,
                 )
             else:
                 raster = TemporalRaster(raster_input, self.rp, arr_mask)
@@ -341,7 +515,8 @@ class Factory:
             vector_input = Path(vector_input)
         if isinstance(vector_input, Path):
             try:
-                pyogrio.read_info(vector_input)
+                if not is_geoparquet(vector_input):
+                    pyogrio.read_info(vector_input)
             except pyogrio.errors.DataSourceError:
                 msg = (
                     f"Input vector file '{vector_input}' should be a valid "
@@ -350,7 +525,7 @@ class Factory:
                 raise IOError(msg)
 
             if flag_clip:
-                clip_mask = self.vct_mask.file_path
+                clip_mask = self.clip_mask
             else:
                 clip_mask = None
 
@@ -363,7 +538,7 @@ class Factory:
             )
         elif isinstance(vector_input, gpd.GeoDataFrame):
             if flag_clip:
-                clip_mask = self.vct_mask.geodata
+                clip_mask = self.clip_mask
             else:
                 clip_mask = None
 
@@ -1,7 +1,9 @@
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
 
-import matplotlib.pyplot as plt
 import numpy as np
 import rasterio
 
@@ -18,6 +20,8 @@ from pywatemsedem.geo.utils import (
     write_arr_as_rst,
 )
 
+logger = logging.getLogger(__name__)
+
 
 class AbstractRaster:
     """Abstract raster class based on numpy arrays and raster properties.
@@ -28,19 +32,27 @@ class AbstractRaster:
         Raster array.
     rp : pywatemsedem.geo.rasterproperties.RasterProperties
         Raster properties instance.
+    dtype : numpy.dtype
+        Data type of the raster array, None if the data type of the input array is
+        kept.
 
     Notes
     -----
-    If an array mask is provided to the initialize method, the array is
-    automatically masked.
+    1. If an array mask is provided to the initialize method, the array is
+       automatically masked.
+    2. If a dtype is provided to the initialize method, the array is cast to the
+       dtype after masking, and every array assigned to the raster is cast to the
+       dtype (see :data:`pywatemsedem.defaults.RASTER_DTYPES` for the data types of
+       the scenario rasters).
     """
 
     def __init__(self):
 
         self._arr = None
         self._rp = None
+        self._dtype = None
 
-    def initialize(self, arr, rp, arr_mask=None, allow_nodata_array=False):
+    def initialize(self, arr, rp, arr_mask=None, allow_nodata_array=False, dtype=None):
         """Initialize array and raster properties.
 
         Parameters
@@ -53,14 +65,19 @@ class AbstractRaster:
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
         allow_nodata_array : bool, default False
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
+        dtype : numpy.dtype or str, default None
+            Data type of the raster array. If None, the data type of the input
+            array is kept.
         """
         if len(arr.shape) < 2:
             msg = "Dimensionality of input raster array should be larger than 1."
             raise ValueError(msg)
+        self._dtype = None if dtype is None else np.dtype(dtype)
         self._arr = arr
         self._rp = rp
         if arr_mask is not None:
             self.mask(arr_mask, allow_nodata_array)
+        self._arr = self._cast(self._arr)
 
     @property
     def arr(self):
@@ -82,7 +99,24 @@ class AbstractRaster:
         input : numpy.ndarray
             Raster array.
         """
-        self._arr = input
+        self._arr = self._cast(input)
+
+    @property
+    def dtype(self):
+        """Return data type of the raster array.
+
+        Returns
+        -------
+        numpy.dtype
+            None if the data type of the input array is kept.
+        """
+        return self._dtype
+
+    def _cast(self, arr):
+        """Cast an array to the data type of the raster (no copy if equal)."""
+        if self._dtype is None or arr is None:
+            return arr
+        return arr.astype(self._dtype, copy=False)
 
     @property
     def rp(self):
@@ -131,7 +165,9 @@ class AbstractRaster:
             self._arr = set_no_data_arr(self._arr, arr_mask, self.rp.nodata)
         except ValueError:
             if allow_nodata_array:
-                self._arr = self.rp.nodata * np.ones(self._arr.shape)
+                self._arr = np.full(
+                    self._arr.shape, self.rp.nodata, dtype=self._arr.dtype
+                )
             else:
                 self._arr = set_no_data_arr(self._arr, arr_mask, self.rp.nodata)
 
@@ -203,7 +239,7 @@ class AbstractRaster:
                 profile,
             )
         elif format == "idrisi":
-            tiff_temp = create_filename(".tif")
+            tiff_temp = create_filename(".tif", consumer="gdal")
             write_arr_as_rst(self._arr, tiff_temp, dtype, profile)
             tiff_to_idrisi(tiff_temp, outfile_path, dtype=dtype)
             clean_up_tempfiles(tiff_temp, "tiff")
@@ -234,6 +270,7 @@ class AbstractRaster:
         ax : matplotlib.axes.Axes
             Axes object.
         """
+        import matplotlib.pyplot as plt
 
         if not ax:
             fig, ax = plt.subplots(figsize=[10, 10])
@@ -272,6 +309,8 @@ class AbstractRaster:
         ax : matplotlib.axes.Axes
             Axes object.
         """
+        import matplotlib.pyplot as plt
+
         if not ax:
             fig, ax = plt.subplots(figsize=[10, 10])
         arr = self.arr.copy()
@@ -322,7 +361,7 @@ class RasterMemory(AbstractRaster):
     Inherits from :class:`pywatemsedem.geo.rasters.AbstractRaster`.
     """
 
-    def __init__(self, arr, rp, arr_mask=None, allow_nodata_array=False):
+    def __init__(self, arr, rp, arr_mask=None, allow_nodata_array=False, dtype=None):
         """Initialize RasterMemory.
 
         Parameters
@@ -335,9 +374,15 @@ class RasterMemory(AbstractRaster):
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
         allow_nodata_array : bool, default False
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
+        dtype : numpy.dtype or str, default None
+            See :func:`pywatemsedem.geo.rasters.AbstractRaster.initialize`.
         """
         super().initialize(
-            arr, rp, arr_mask=arr_mask, allow_nodata_array=allow_nodata_array
+            arr,
+            rp,
+            arr_mask=arr_mask,
+            allow_nodata_array=allow_nodata_array,
+            dtype=dtype,
         )
 
     def clip(self):
@@ -369,7 +414,9 @@ class RasterFile(AbstractRaster):
     Inherits from :class:`pywatemsedem.geo.rasters.AbstractRaster`.
     """
 
-    def __init__(self, file_path, rp=None, arr_mask=None, allow_nodata_array=False):
+    def __init__(
+        self, file_path, rp=None, arr_mask=None, allow_nodata_array=False, dtype=None
+    ):
         """Initialize RasterFile.
 
         Parameters
@@ -383,6 +430,8 @@ class RasterFile(AbstractRaster):
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
         allow_nodata_array : bool, default False
             See :func:`pywatemsedem.geo.rasters.AbstractRaster.mask`.
+        dtype : numpy.dtype or str, default None
+            See :func:`pywatemsedem.geo.rasters.AbstractRaster.initialize`.
         """
 
         self.file_path = Path(file_path)
@@ -406,7 +455,7 @@ class RasterFile(AbstractRaster):
             arr, profile = load_raster(file_path)
             rp = RasterProperties.from_rasterio(profile)
 
-        super().initialize(arr, rp, arr_mask, allow_nodata_array)
+        super().initialize(arr, rp, arr_mask, allow_nodata_array, dtype=dtype)
 
     @staticmethod
     def clip(file_path, rp, resample="mode"):
@@ -507,9 +556,13 @@ class TemporalRaster:
         """
         return self._arr
 
-    def write(self, outfiles, format="idrisi", dtype=None):
+    def write(self, outfiles, format="idrisi", dtype=None, max_workers=None):
         """Write temporal raster data to disk.
 
+        Every temporal slice is written to its own file. Slices are written
+        concurrently with a thread pool, as the bulk of the work (GeoTIFF encoding
+        and the gdal_translate conversion to IDRISI) is done outside of Python.
+
         Parameters
         ----------
         outfiles : list or tuple of pathlib.Path or str
@@ -519,6 +572,10 @@ class TemporalRaster:
         dtype : numpy.dtype, default None
             Output raster type. See
             :func:`pywatemsedem.geo.rasters.AbstractRaster.write`.
+        max_workers : int, default None
+            Maximum number of slices written at the same time. If None, the
+            default of :class:`concurrent.futures.ThreadPoolExecutor` is used. Use
+            1 to write the slices sequentially.
 
         Returns
         -------
@@ -529,6 +586,12 @@ class TemporalRaster:
         ------
         ValueError
             If number of output files does not match temporal dimension.
+
+        Notes
+        -----
+        The write time of every slice is stored in
+        :attr:`pywatemsedem.geo.rasters.TemporalRaster.timings`, a dictionary with
+        the output file as key and the write time (s) as value.
         """
         if len(outfiles) != self._arr.shape[-1]:
             msg = (
@@ -537,9 +600,80 @@ class TemporalRaster:
             )
             raise ValueError(msg)
 
-        for i in range(self._arr.shape[-1]):
+        def write_slice(i):
+            """Write one temporal slice and return the write time."""
+            start = time.perf_counter()
             rm = RasterMemory(self._arr[:, :, i], self._rp, arr_mask=self._arr_mask)
             rm.write(outfiles[i], format, dtype)
+            return time.perf_counter() - start
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            timings = list(executor.map(write_slice, range(self._arr.shape[-1])))
+
+        self.timings = {}
+        for outfile, timing in zip(outfiles, timings):
+            logger.debug(f"Written '{outfile}' in {timing:.3f} s.")
+            self.timings[Path(outfile)] = timing
+
+        return True
+
+    def write_multiband(self, outfile_path, dtype=None, nodata=None):
+        """Write temporal raster data to one multi-band GeoTIFF.
+
+        Every temporal slice is written as a band (band i + 1 holds slice i). This
+        is only possible for formats that support multiple bands, so IDRISI
+        rasters (WaTEM/SEDEM input) should be written with
+        :func:`pywatemsedem.geo.rasters.TemporalRaster.write`.
+
+        Parameters
+        ----------
+        outfile_path : pathlib.Path or str
+            File path output, should have a '.tif' extension.
+        dtype : numpy.dtype, default None
+            Output raster type. If None, dtype of array is used.
+        nodata : float, default None
+            Nodata value for output raster. If None, nodata of rasterproperties
+            is used.
+
+        Returns
+        -------
+        bool
+            True if write was successful.
+
+        Raises
+        ------
+        TypeError
+            If file extension is not '.tif'.
+        """
+        outfile_path = Path(outfile_path)
+        if outfile_path.suffix != ".tif":
+            msg = (
+                f"Can not write file ('{outfile_path}') as multi-band raster with "
+                f"'{outfile_path.suffix}' extension, use '.tif'."
+            )
+            raise TypeError(msg)
+
+        if dtype is None:
+            dtype = self._arr.dtype
+
+        arr = self._arr
+        if self._arr_mask is not None:
+            arr = np.dstack(
+                [
+                    set_no_data_arr(arr[:, :, i], self._arr_mask, self._rp.nodata)
+                    for i in range(arr.shape[-1])
+                ]
+            )
+
+        profile = self._rp.rasterio_profile.copy()
+        profile["driver"] = "GTiff"
+        profile["count"] = arr.shape[-1]
+        profile["compress"] = "deflate"
+        if nodata is not None:
+            profile["nodata"] = nodata
+
+        with rasterio.open(outfile_path, "w", dtype=dtype, **profile) as dst:
+            dst.write(np.moveaxis(arr, -1, 0).astype(dtype))
 
         return True
 
@@ -555,6 +689,8 @@ class TemporalRaster:
         **kwargs
             Additional keyword arguments passed to plot.
         """
+        import matplotlib.pyplot as plt
+
         shape = self._arr.shape[-1]
         fig, ax = plt.subplots(ncols=shape, figsize=[10, 5 * shape])
         for i in range(shape):
@@ -10,21 +10,28 @@ validation and type checking to ensure that the functions are used correctly.
 """
 
 # Standard libraries
+import hashlib
 import logging
+import os
 import random
 import string
 import subprocess
 import tempfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from copy import deepcopy
 from functools import wraps
-from pathlib import Path
+from pathlib import Path, PurePosixPath
 
 import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pyogrio
 import rasterio
+import rasterio.shutil
+import rasterio.windows
 from rasterio.features import shapes
 
 from pywatemsedem.defaults import (
@@ -46,9 +53,43 @@ from pywatemsedem.geo.valid import (
     valid_vector,
 )
 from pywatemsedem.io.ini import get_item_from_ini
+from pywatemsedem.profiling import count_tool_call
+from pywatemsedem.registry import TOOLS, get_tool
 
 logger = logging.getLogger(__name__)
 
+#: Raster output policies of :func:`write_arr_as_rst`. The "model_input" policy
+#: keeps the IDRISI format read by WaTEM/SEDEM, the "intermediate" policy writes a
+#: tiled, compressed cloud-optimized GeoTIFF (COG) for rasters only read by
+#: pywatemsedem, SAGA or GDAL (e.g. id, target and rank rasters).
+RASTER_OUTPUT_POLICIES = {
+    "model_input": {"driver": "RST"},
+    "intermediate": {
+        "driver": "COG",
+        "compress": "ZSTD",
+        "level": 1,
+        "blocksize": 256,
+        "overviews": "NONE",
+    },
+}
+
+#: Compressors supported by the GeoTIFF drivers for the "intermediate" policy
+RASTER_COMPRESSORS = ["NONE", "DEFLATE", "LZW", "ZSTD", "LERC_ZSTD"]
+
+#: Profile keys of the source raster layout, not copied to an output policy
+_LAYOUT_KEYS = [
+    "compress",
+    "tiled",
+    "blockxsize",
+    "blockysize",
+    "blocksize",
+    "predictor",
+    "interleave",
+    "level",
+    "zlevel",
+    "zstd_level",
+]
+
 
 @valid_input(dict={"rst_in": valid_raster})
 def read_rst_params(rst_in):
@@ -102,7 +143,80 @@ def read_rasterio_profile(rst_in):
     return profile
 
 
-def write_arr_as_rst(arr, rst_out, dtype, profile):
+def get_raster_output_profile(
+    profile, dtype, policy="intermediate", compress=None, level=None, predictor=None
+):
+    """Get the rasterio profile of a raster output policy.
+
+    The layout (compression, tiling) of the input profile is replaced by the
+    layout of the policy, the spatial properties are kept.
+
+    Parameters
+    ----------
+    profile : dict
+        Rasterio profile. See :class:`rasterio.profiles.Profile`.
+    dtype : numpy.dtype
+        Data type for the output raster, used to select the predictor.
+    policy : str, default "intermediate"
+        Output policy, one of :data:`RASTER_OUTPUT_POLICIES`.
+    compress : str, default None
+        Compressor of the GeoTIFF, one of :data:`RASTER_COMPRESSORS`. If None, the
+        compressor of the policy is used.
+    level : int, default None
+        Compression level (DEFLATE: 1-12, ZSTD: 1-22). If None, the level of the
+        policy is used for ZSTD and the GDAL default otherwise.
+    predictor : int, default None
+        Predictor of the GeoTIFF: 1 (none), 2 (horizontal differencing) or 3
+        (floating point). If None, 2 is used for integer and 3 for float rasters.
+
+    Returns
+    -------
+    dict
+        Rasterio profile.
+
+    Raises
+    ------
+    ValueError
+        If the policy or compressor is not supported.
+    """
+    if policy not in RASTER_OUTPUT_POLICIES:
+        msg = (
+            f"Raster output policy '{policy}' not supported, choose one of "
+            f"{list(RASTER_OUTPUT_POLICIES)}."
+        )
+        raise ValueError(msg)
+    profile = {
+        key: value
+        for key, value in profile.items()
+        if key.lower() not in _LAYOUT_KEYS and key != "dtype"
+    }
+    profile.update(RASTER_OUTPUT_POLICIES[policy])
+    if profile["driver"] != "COG":
+        return profile
+
+    if compress is not None:
+        compress = compress.upper()
+        if compress not in RASTER_COMPRESSORS:
+            msg = (
+                f"Compressor '{compress}' not supported by GeoTIFF, choose one of "
+                f"{RASTER_COMPRESSORS}."
+            )
+            raise ValueError(msg)
+        if compress != profile["compress"]:
+            profile.pop("level", None)
+        profile["compress"] = compress
+    if level is not None:
+        profile["level"] = level
+    if profile["compress"] in ["NONE", "LERC_ZSTD"]:
+        profile.pop("level", None)
+    elif predictor is None:
+        predictor = 3 if np.issubdtype(np.dtype(dtype), np.floating) else 2
+    if predictor is not None:
+        profile["predictor"] = predictor
+    return profile
+
+
+def write_arr_as_rst(arr, rst_out, dtype, profile, policy=None, **kwargs):
     """Write numpy.ndarray as a raster file.
 
     Parameters
@@ -115,6 +229,13 @@ def write_arr_as_rst(arr, rst_out, dtype, profile):
         Data type for the output raster.
     profile : dict
         Rasterio profile. See :class:`rasterio.profiles.Profile`.
+    policy : str, default None
+        Raster output policy, see
+        :func:`pywatemsedem.geo.utils.get_raster_output_profile`. If None, the
+        driver of the profile is used (DEFLATE compressed if not defined).
+    kwargs :
+        Options of the output policy (compress, level, predictor), see
+        :func:`pywatemsedem.geo.utils.get_raster_output_profile`.
 
     Raises
     ------
@@ -137,7 +258,9 @@ def write_arr_as_rst(arr, rst_out, dtype, profile):
             msg = "not all mandatory keys in the profile are given! "
             msg += key
             raise Exception(msg)
-    if "compress" not in profile:
+    if policy is not None:
+        profile = get_raster_output_profile(profile, dtype, policy=policy, **kwargs)
+    elif "compress" not in profile:
         profile["compress"] = "DEFLATE"
 
     if "dtype" in profile.keys():
@@ -345,8 +468,15 @@ def tiff_to_idrisi(tiff_in, rst_out, dtype):
 
     Notes
     -----
-    Uses and relies on gdal_translate CLI.
+    Uses and relies on gdal_translate CLI. A tiff file in GDAL virtual memory (see
+    :func:`pywatemsedem.geo.utils.create_filename`) is not accessible for the CLI,
+    and is converted within the Python process (the tiff file should already be of
+    type ``dtype``).
     """
+    if is_vsimem(tiff_in):
+        # same conversion as gdal_translate, which is not strict by default
+        rasterio.shutil.copy(str(tiff_in), str(rst_out), driver="RST", strict=False)
+        return
     cmd_args = [
         "gdal_translate",
         "-q",
@@ -835,6 +965,272 @@ def vct_to_rst_field(
     execute_subprocess(cmd_args)
 
 
+def get_auxiliary_files(file_path):
+    """Get the existing files of a file format (e.g. the .dbf of a .shp-file or the
+    .sdat of a .sgrd-file).
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path.
+
+    Returns
+    -------
+    list
+        File paths of all existing files of the file format (incl. file_path).
+    """
+    suffixes = {
+        ".tif": SUFFIXES_TIF,
+        ".shp": SUFFIXES_SHP,
+        ".sgrd": SUFFIXES_SAGA,
+        ".sdat": SUFFIXES_SAGA,
+        ".rst": SUFFIXES_RST,
+        ".txt": SUFFIXES_TXT,
+    }
+    file_path = Path(file_path)
+    files = [
+        file_path.with_suffix(suffix)
+        for suffix in suffixes.get(file_path.suffix, [file_path.suffix])
+    ]
+    return [file for file in files if file.is_file()]
+
+
+def compute_file_hash(file_path, chunk_size=2**20):
+    """Compute the hash of the content of a file and its auxiliary files.
+
+    See :func:`pywatemsedem.geo.utils.get_auxiliary_files`.
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path.
+    chunk_size: int, default 2**20
+        Number of bytes read at once.
+
+    Returns
+    -------
+    str
+        Hexadecimal SHA-1 hash.
+    """
+    sha1 = hashlib.sha1()
+    for file in sorted(get_auxiliary_files(file_path)):
+        sha1.update(file.suffix.encode())
+        with open(file, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                sha1.update(chunk)
+    return sha1.hexdigest()
+
+
+def _get_file_sizes(cmd_args):
+    """Get size and modification time of the files in a command.
+
+    Auxiliary files of a file format (e.g. the .dbf of a .shp-file or the .sdat of
+    a .sgrd-file) are included in the size.
+
+    Parameters
+    ----------
+    cmd_args: list
+        Command.
+
+    Returns
+    -------
+    dict
+        File path as key, tuple of size (bytes) and last modification time as
+        value.
+    """
+    files = {}
+    for arg in cmd_args[1:]:
+        arg = str(arg)
+        if arg.startswith("-") or Path(arg).suffix == "":
+            continue
+        file = Path(arg)
+        stats = [aux.stat() for aux in get_auxiliary_files(file)]
+        if stats:
+            files[file] = (
+                sum(stat.st_size for stat in stats),
+                max(stat.st_mtime for stat in stats),
+            )
+    return files
+
+
+class SubprocessManager:
+    """Execute command line tools and record every call.
+
+    The manager is the single entry point for all SAGA and GDAL command line calls
+    in pywatemsedem (see :func:`pywatemsedem.geo.utils.execute_saga` and
+    :func:`pywatemsedem.geo.utils.execute_subprocess`). For every call, the command,
+    the duration and the size of the input and output files are recorded.
+    Independent commands can be run concurrently with
+    :func:`pywatemsedem.geo.utils.SubprocessManager.execute_batch`.
+
+    Parameters
+    ----------
+    max_workers: int, default None
+        Default maximum number of commands run at the same time in a batch. If None,
+        the number of CPUs is used.
+
+    Attributes
+    ----------
+    records: list of dict
+        One record per call, see
+        :func:`pywatemsedem.geo.utils.SubprocessManager.to_dataframe`.
+    """
+
+    def __init__(self, max_workers=None):
+        self.max_workers = max_workers
+        self.records = []
+        self._lock = threading.Lock()
+
+    def execute(self, cmd_args, saga=False):
+        """Run and record a command line tool.
+
+        Parameters
+        ----------
+        cmd_args: list
+            Command.
+        saga: bool, default False
+            Run as saga command: errors are printed and not raised, see
+            :func:`pywatemsedem.geo.utils.execute_saga`.
+
+        Returns
+        -------
+        bool
+            True if the command ran without error.
+
+        Raises
+        ------
+        OSError
+            If the (non-saga) command returns an error, or if the command can not
+            be run (e.g. a missing binary). Every error is recorded as a failed
+            call.
+        """
+        tool = Path(str(cmd_args[0])).stem
+        if tool in TOOLS:
+            get_tool(tool, cmd_args[0])
+        count_tool_call(cmd_args)
+        files_before = _get_file_sizes(cmd_args)
+        logger.debug(cmd_args)
+        success = True
+        start = time.perf_counter()
+        try:
+            if saga:
+                subprocess.check_output(cmd_args, stderr=subprocess.STDOUT)
+            else:
+                subprocess.run(cmd_args, check=True, capture_output=True)
+        except subprocess.CalledProcessError as e:
+            success = False
+            if saga:
+                output = e.output.decode()
+                if not (
+                    ("corrupted size vs. prev_size in fastbins" in output)
+                    & ("okay" in output)
+                ):
+                    print(output)
+            else:
+                logger.error(e.stdout.decode())
+                logger.error(e.stderr.decode())
+                raise OSError(
+                    f"Could not run '{cmd_args}', returning '{e.stderr.decode()}'"
+                    f"-error"
+                )
+        except Exception:
+            # e.g. a missing or broken binary (FileNotFoundError, OSError)
+            success = False
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            files_after = _get_file_sizes(cmd_args)
+            output_size = sum(
+                size
+                for file, (size, mtime) in files_after.items()
+                if files_before.get(file, (None, None))[1] != mtime
+            )
+            input_size = sum(
+                size
+                for file, (size, _) in files_before.items()
+                if files_after.get(file) == files_before[file]
+            )
+            record = {
+                "command": " ".join(str(arg) for arg in cmd_args),
+                "tool": tool,
+                "duration": duration,
+                "input_size": input_size,
+                "output_size": output_size,
+                "success": success,
+            }
+            with self._lock:
+                self.records.append(record)
+
+        return success
+
+    def execute_batch(self, list_cmd_args, saga=False, max_workers=None):
+        """Run a batch of independent command line tools concurrently.
+
+        Parameters
+        ----------
+        list_cmd_args: list of list
+            Commands to run, the commands should not depend on each other's
+            output.
+        saga: bool, default False
+            Run the commands as saga commands.
+        max_workers: int, default None
+            Maximum number of commands run at the same time. If None,
+            :attr:`max_workers` of the manager is used.
+
+        Returns
+        -------
+        list
+            Return value of every command, in order of the commands.
+
+        Raises
+        ------
+        OSError
+            If a (non-saga) command returns an error. All commands are finished
+            before the error is raised.
+        """
+        if max_workers is None:
+            max_workers = self.max_workers
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self.execute, cmd_args, saga)
+                for cmd_args in list_cmd_args
+            ]
+        return [future.result() for future in futures]
+
+    def to_dataframe(self):
+        """Get the records as a dataframe.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per call (in order of finishing), with columns
+
+            - *command* (str): command.
+            - *tool* (str): name of the command line tool.
+            - *duration* (float): wall time (s).
+            - *input_size* (int): size of the input files of the command (bytes),
+              i.e. existing files that were not modified.
+            - *output_size* (int): size of the output files of the command
+              (bytes), i.e. files created or modified by the command.
+            - *success* (bool): command ran without error.
+        """
+        columns = ["command", "tool", "duration", "input_size", "output_size"]
+        columns += ["success"]
+        with self._lock:
+            return pd.DataFrame(self.records, columns=columns)
+
+    def clear(self):
+        """Remove all records."""
+        with self._lock:
+            self.records = []
+
+
+#: Subprocess manager used by :func:`pywatemsedem.geo.utils.execute_saga`,
+#: :func:`pywatemsedem.geo.utils.execute_subprocess` and
+#: :func:`pywatemsedem.geo.utils.execute_batch`
+subprocess_manager = SubprocessManager()
+
+
 def execute_saga(cmd_args):
     """Run saga executable and catch non-informative error.
 
@@ -854,15 +1250,7 @@ def execute_saga(cmd_args):
     if "saga_cmd" not in cmd_args:
         msg = f"{' '.join(cmd_args)} is not a saga command."
         raise IOError(msg)
-    try:
-        subprocess.check_output(cmd_args, stderr=subprocess.STDOUT)
-    except subprocess.CalledProcessError as e:
-        if ("corrupted size vs. prev_size in fastbins" in e.output.decode()) & (
-            "okay" in e.output.decode()
-        ):
-            pass
-        else:
-            print(e.output.decode())
+    subprocess_manager.execute(cmd_args, saga=True)
 
 
 @valid_input(dict={"vct_point": valid_pointvector, "rst_template": valid_raster})
@@ -1045,6 +1433,169 @@ def load_raster(rst, return_bounds=False):
         return arr, profile
 
 
+def load_raster_window(rst, bounds):
+    """Read the cells of a raster within bounds as a numpy array.
+
+    Only the blocks (tiles) of the raster intersecting the bounds are read, see
+    :data:`RASTER_OUTPUT_POLICIES`.
+
+    Parameters
+    ----------
+    rst: str or pathlib.Path
+        File path of the raster.
+    bounds: list
+        Bounds (xmin, ymin, xmax, ymax), the window is snapped outwards to the grid
+        of the raster (whole cells) and limited to the extent of the raster. If
+        None or not finite (e.g. the bounds of an empty vector), the full raster
+        is read.
+
+    Returns
+    -------
+    arr: numpy.ndarray
+        Array of the cells within the window.
+    profile: rasterio.profiles
+        See :class:`rasterio.profiles.Profile`, with the transform, width and
+        height of the window.
+    window: rasterio.windows.Window
+        Window of the array in the raster, use ``window.toslices()`` to select the
+        window in an array of the full raster.
+    """
+    try:
+        with rasterio.open(rst) as src:
+            if bounds is None or not np.all(np.isfinite(bounds)):
+                bounds = src.bounds
+            window = rasterio.windows.from_bounds(*bounds, transform=src.transform)
+            row_start = max(int(np.floor(round(window.row_off, 6))), 0)
+            col_start = max(int(np.floor(round(window.col_off, 6))), 0)
+            row_stop = min(
+                int(np.ceil(round(window.row_off + window.height, 6))), src.height
+            )
+            col_stop = min(
+                int(np.ceil(round(window.col_off + window.width, 6))), src.width
+            )
+            window = rasterio.windows.Window(
+                col_start,
+                row_start,
+                max(col_stop - col_start, 0),
+                max(row_stop - row_start, 0),
+            )
+            arr = src.read(1, window=window)
+            profile = src.profile
+    except rasterio.errors.RasterioIOError as e:
+        logger.error(e)
+        msg = f"could not open {rst}"
+        raise Exception(msg)
+    profile.update(
+        transform=rasterio.windows.transform(window, profile["transform"]),
+        width=window.width,
+        height=window.height,
+    )
+    return arr, profile, window
+
+
+class LabelIndex:
+    """Index of the cells per label of a label raster (e.g. subcatchment ids).
+
+    The labels are remapped to consecutive indices once, so the values of any raster
+    can be summed per label in one pass (:func:`numpy.bincount`), instead of
+    masking the raster for every label.
+
+    Parameters
+    ----------
+    arr_labels: numpy.ndarray
+        Label raster array.
+
+    Attributes
+    ----------
+    labels: numpy.ndarray
+        Unique (sorted) labels of the raster, including the nodata value.
+    inverse: numpy.ndarray
+        Index in ``labels`` of every cell of the (flattened) raster.
+    counts: numpy.ndarray
+        Number of cells per label.
+    shape: tuple
+        Shape of the label raster.
+    """
+
+    def __init__(self, arr_labels):
+        arr_labels = np.asarray(arr_labels)
+        self.shape = arr_labels.shape
+        flat = arr_labels.ravel()
+        lowest, highest = (flat.min(), flat.max()) if flat.size > 0 else (0, 0)
+        if (
+            flat.size > 0
+            and np.isfinite(lowest)
+            and np.isfinite(highest)
+            and np.array_equal(flat, np.round(flat))
+            and int(highest) - int(lowest) < 4 * flat.size
+        ):
+            # integer labels: remap with an offset instead of sorting the cells,
+            # in int64 so a nodata value of the dtype minimum does not overflow
+            offset = int(lowest)
+            shifted = flat.astype(np.int64) - offset
+            counts = np.bincount(shifted)
+            present = np.flatnonzero(counts)
+            lookup = np.zeros(counts.size, dtype=np.int64)
+            lookup[present] = np.arange(present.size)
+            self.labels = (present + offset).astype(flat.dtype)
+            self.inverse = lookup[shifted]
+            self.counts = counts[present]
+        else:
+            self.labels, self.inverse, self.counts = np.unique(
+                flat, return_inverse=True, return_counts=True
+            )
+            self.inverse = self.inverse.ravel()
+
+    def sum(self, arr, nodata=None):
+        """Sum the values of a raster per label.
+
+        Parameters
+        ----------
+        arr: numpy.ndarray
+            Raster array with the shape of the label raster.
+        nodata: float, default None
+            Nodata value of the raster, these cells are not summed. If None, all
+            cells are summed.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sum per label (order of ``labels``).
+        """
+        if arr.shape != self.shape:
+            msg = (
+                f"Shape of the raster {arr.shape} differs from the shape of the label "
+                f"raster {self.shape}."
+            )
+            raise ValueError(msg)
+        weights = arr.ravel().astype(np.float64)
+        if nodata is not None:
+            weights[weights == nodata] = 0
+        return np.bincount(self.inverse, weights=weights, minlength=self.labels.size)
+
+    def sums(self, arrays, nodata=None, id_column="ids"):
+        """Sum the values of multiple rasters per label.
+
+        Parameters
+        ----------
+        arrays: dict
+            Raster arrays (values) per output column (keys).
+        nodata: float, default None
+            See :func:`pywatemsedem.geo.utils.LabelIndex.sum`.
+        id_column: str, default "ids"
+            Name of the column holding the labels.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Labels and one column with the sums per raster.
+        """
+        df = pd.DataFrame({id_column: self.labels})
+        for column, arr in arrays.items():
+            df[column] = self.sum(arr, nodata=nodata)
+        return df
+
+
 def raster_array_to_pandas_dataframe(arr_raster, profile):
     """Convert a raster array to a pandas dataframe.
 
@@ -1623,17 +2174,33 @@ def execute_subprocess(cmd_args):
     -------
     Returns True if function call is successfull.
     """
-    try:
-        logger.debug(cmd_args)
-        subprocess.run(cmd_args, check=True, capture_output=True)
-    except subprocess.CalledProcessError as e:
-        logger.error(e.stdout.decode())
-        logger.error(e.stderr.decode())
-        raise OSError(
-            f"Could not run '{cmd_args}', returning '{e.stderr.decode()}'-error"
-        )
+    return subprocess_manager.execute(cmd_args)
+
 
-    return True
+def execute_batch(list_cmd_args, saga=False, max_workers=None):
+    """Run a batch of independent command line tools concurrently.
+
+    See :func:`pywatemsedem.geo.utils.SubprocessManager.execute_batch`.
+
+    Parameters
+    ----------
+    list_cmd_args: list of list
+        Commands to run, the commands should not depend on each other's output.
+    saga: bool, default False
+        Run the commands as saga commands, see
+        :func:`pywatemsedem.geo.utils.execute_saga`.
+    max_workers: int, default None
+        Maximum number of commands run at the same time. If None, the worker limit
+        of :data:`pywatemsedem.geo.utils.subprocess_manager` is used.
+
+    Returns
+    -------
+    list
+        Return value of every command, in order of the commands.
+    """
+    return subprocess_manager.execute_batch(
+        list_cmd_args, saga=saga, max_workers=max_workers
+    )
 
 
 @valid_input(dict={"valid_catchment": valid_polygonvector})
@@ -1686,7 +2253,146 @@ def define_extent_from_vct(
     return rp
 
 
-def create_filename(suffix, directory=Path("tempfiles_pywatemsedem")):
+#: Consumers of temporary files, see :class:`pywatemsedem.geo.utils.TempStorage`
+TEMP_CONSUMERS = ["tool", "gdal"]
+
+#: Folder of the temporary files in GDAL virtual memory
+VSIMEM_PREFIX = "/vsimem/pywatemsedem"
+
+
+class TempStorage:
+    """Storage backend of the temporary files of pywatemsedem.
+
+    Temporary files are either read and written by GDAL within the Python process
+    (rasterio, consumer "gdal") or by an external command line tool (SAGA,
+    gdalwarp, ..., consumer "tool"). Files of the consumer "gdal" can be kept in
+    GDAL virtual memory (/vsimem), files of the consumer "tool" are written to a
+    directory, e.g. a tmpfs directory as /dev/shm.
+
+    Parameters
+    ----------
+    directory: pathlib.Path | str, default 'tempfiles_pywatemsedem'
+        Directory of the temporary files of external tools (and of rasterio if
+        ``memory`` is False). The directory is created if it does not exist.
+    memory: bool, default True
+        Keep the temporary files of the consumer "gdal" in GDAL virtual memory.
+
+    Attributes
+    ----------
+    files: set
+        Temporary files created with the storage and not yet cleaned up.
+    """
+
+    def __init__(self, directory=Path("tempfiles_pywatemsedem"), memory=True):
+        self.directory = Path(directory)
+        self.memory = memory
+        self.files = set()
+        self._lock = threading.Lock()
+
+    def create_filename(self, suffix, consumer="tool"):
+        """Create a temporary filename, see
+        :func:`pywatemsedem.geo.utils.create_filename`."""
+        if consumer not in TEMP_CONSUMERS:
+            msg = f"Consumer '{consumer}' not known, choose one of {TEMP_CONSUMERS}."
+            raise ValueError(msg)
+        if consumer == "gdal" and self.memory:
+            directory = PurePosixPath(VSIMEM_PREFIX)
+        else:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            directory = self.directory
+        timestamp = int(time.time())
+        chars = string.ascii_letters + string.digits
+        random_part = "".join(random.choices(chars, k=6))
+        fname = directory / f"tempfile_{timestamp}_{random_part}_pywatemsedem{suffix}"
+        with self._lock:
+            self.files.add(fname)
+        return fname
+
+    def clean_up(self):
+        """Remove all temporary files (and their auxiliary files) which are not
+        yet cleaned up."""
+        with self._lock:
+            files, self.files = self.files, set()
+        for file in files:
+            if is_vsimem(file):
+                _delete_vsimem(file)
+            else:
+                for aux_file in get_auxiliary_files(file):
+                    aux_file.unlink()
+
+
+#: Temporary storage used by :func:`create_filename`, the directory can be set with
+#: the environment variable PYWATEMSEDEM_TEMPDIR
+_temp_storage = TempStorage(
+    os.environ.get("PYWATEMSEDEM_TEMPDIR", "tempfiles_pywatemsedem")
+)
+
+
+def get_temp_storage():
+    """Get the active temporary storage.
+
+    Returns
+    -------
+    pywatemsedem.geo.utils.TempStorage
+    """
+    return _temp_storage
+
+
+@contextmanager
+def temp_storage(directory=None, memory=True):
+    """Use a temporary storage within a context.
+
+    All temporary files created within the context are removed when the context is
+    left, also when an error is raised.
+
+    Parameters
+    ----------
+    directory: pathlib.Path | str, default None
+        See :class:`pywatemsedem.geo.utils.TempStorage`. If None, the directory of
+        the active storage is used.
+    memory: bool, default True
+        See :class:`pywatemsedem.geo.utils.TempStorage`.
+
+    Examples
+    --------
+    >>> from pywatemsedem.geo.utils import temp_storage
+    >>> with temp_storage("/dev/shm/pywatemsedem"):
+    ...     scenario.prepare_input_files()
+    """
+    global _temp_storage
+    previous = _temp_storage
+    storage = TempStorage(
+        previous.directory if directory is None else directory, memory=memory
+    )
+    _temp_storage = storage
+    try:
+        yield storage
+    finally:
+        _temp_storage = previous
+        storage.clean_up()
+
+
+def is_vsimem(file_path):
+    """Check if a file path is located in GDAL virtual memory.
+
+    Parameters
+    ----------
+    file_path: pathlib.PurePath | str
+
+    Returns
+    -------
+    bool
+    """
+    return str(file_path).startswith("/vsimem/")
+
+
+def _delete_vsimem(file_path):
+    """Delete a raster dataset in GDAL virtual memory if it exists."""
+    if rasterio.shutil.exists(str(file_path)):
+        rasterio.shutil.delete(str(file_path))
+
+
+def create_filename(suffix, directory=None, consumer="tool"):
     """Create temporary filename in a dedicated directory
 
     Create directory if it does not exist
@@ -1696,19 +2402,20 @@ def create_filename(suffix, directory=Path("tempfiles_pywatemsedem")):
     Parameters
     ----------
     suffix: str
-    directory: pathlib.Path, default 'tempfiles_pywatemsedem'
+    directory: pathlib.Path, default None
+        If None, the filename is created with the active temporary storage, see
+        :func:`pywatemsedem.geo.utils.temp_storage`.
+    consumer: {"tool", "gdal"}
+        Use "gdal" if the file is only read and written with rasterio, the file can
+        then be kept in GDAL virtual memory (a pathlib.PurePosixPath is returned).
 
     Returns
     -------
     pathlib.Path
     """
-    directory.mkdir(exist_ok=True)
-    timestamp = int(time.time())
-    chars = string.ascii_letters + string.digits
-    random_part = "".join(random.choices(chars, k=6))
-    fname = Path(directory) / f"tempfile_{timestamp}_{random_part}_pywatemsedem{suffix}"
-
-    return fname
+    if directory is not None:
+        return TempStorage(directory, memory=False).create_filename(suffix, consumer)
+    return _temp_storage.create_filename(suffix, consumer)
 
 
 def clean_up_tempfiles(temporary_file, file_format):
@@ -1742,6 +2449,11 @@ def clean_up_tempfiles(temporary_file, file_format):
     else:
         msg = f"File format '{file_format}' not implemented, cannot execute."
         raise NotImplementedError(msg)
+    with _temp_storage._lock:
+        _temp_storage.files.discard(temporary_file)
+    if is_vsimem(temporary_file):
+        _delete_vsimem(temporary_file)
+        return
     for suffix in check_suffix:
         filename = temporary_file.with_suffix(suffix)
         if filename.exists():
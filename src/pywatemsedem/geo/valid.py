@@ -5,6 +5,7 @@ from pathlib import Path
 import numpy as np
 import pyogrio
 import rasterio
+import rasterio.shutil
 from rasterio.errors import RasterioIOError
 
 from pywatemsedem.geo.rasterproperties import RasterProperties
@@ -205,8 +206,11 @@ def valid_exists(rst, fun):
     fun: callable
         See :func:`pywatemsedem.geo.valid.valid_input`.
     """
-
-    if not Path(rst).exists():
+    if str(rst).startswith("/vsimem/"):  # file in GDAL virtual memory
+        exists = rasterio.shutil.exists(str(rst))
+    else:
+        exists = Path(rst).exists()
+    if not exists:
         if fun is not None:
             msg = (
                 f"Input file '{rst}' does not exist, cannot execute "
@@ -1,12 +1,17 @@
+import json
+from importlib.util import find_spec
 from pathlib import Path
 
 import geopandas as gpd
 import numpy as np
+import pandas as pd
+import shapely
 
 from pywatemsedem.geo.rasterproperties import RasterProperties
 from pywatemsedem.geo.utils import (
     clean_up_tempfiles,
     create_filename,
+    get_auxiliary_files,
     get_geometry_type,
     lines_to_direction,
     lines_to_raster,
@@ -17,6 +22,285 @@ from pywatemsedem.geo.utils import (
     vct_to_rst_field,
 )
 
+#: Read vector files with pyogrio in Arrow mode (requires pyarrow), which is
+#: considerably faster for large layers
+USE_ARROW = find_spec("pyarrow") is not None
+
+#: Vector output formats: GDAL driver (None for GeoParquet, which is written with
+#: geopandas and requires pyarrow), file suffix and layer creation options. The
+#: spatial index of a FlatGeobuf file sorts the features, so it is not created to
+#: keep the order of the features (e.g. sinks sorted by sediment load)
+VECTOR_FORMATS = {
+    "shapefile": {
+        "driver": "ESRI Shapefile",
+        "suffix": ".shp",
+        "options": {"spatial_index": "YES"},
+    },
+    "gpkg": {"driver": "GPKG", "suffix": ".gpkg", "options": {"spatial_index": "YES"}},
+    "flatgeobuf": {
+        "driver": "FlatGeobuf",
+        "suffix": ".fgb",
+        "options": {"spatial_index": "NO"},
+    },
+    "geoparquet": {"driver": None, "suffix": ".parquet", "options": {}},
+}
+
+
+def get_vector_format(vector_format):
+    """Get the driver, suffix and options of a vector output format.
+
+    Parameters
+    ----------
+    vector_format: str
+        One of the keys of :data:`VECTOR_FORMATS`.
+
+    Returns
+    -------
+    dict
+        See :data:`VECTOR_FORMATS`.
+
+    Raises
+    ------
+    ValueError
+        If the vector format is not supported.
+    ImportError
+        If the vector format is 'geoparquet' and pyarrow is not installed.
+    """
+    if vector_format not in VECTOR_FORMATS:
+        msg = (
+            f"Vector format '{vector_format}' not supported, choose one of "
+            f"{list(VECTOR_FORMATS)}."
+        )
+        raise ValueError(msg)
+    if vector_format == "geoparquet" and not USE_ARROW:
+        msg = (
+            "Writing vectors as GeoParquet requires pyarrow, install with "
+            "'pip install pywatemsedem[arrow]'."
+        )
+        raise ImportError(msg)
+    return VECTOR_FORMATS[vector_format]
+
+
+def get_vector_format_of_file(file_path):
+    """Get the vector format of a vector file (based on the suffix).
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file.
+
+    Returns
+    -------
+    str
+        Key of :data:`VECTOR_FORMATS`, None if the suffix is not of a vector format.
+    """
+    for vector_format, properties in VECTOR_FORMATS.items():
+        if Path(file_path).suffix == properties["suffix"]:
+            return vector_format
+    return None
+
+
+def get_vector_file_path(file_path, vector_format):
+    """Get the file path of a vector in a vector format (i.e. set the suffix).
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file, with or without suffix.
+    vector_format: str
+        See :func:`pywatemsedem.geo.vectors.get_vector_format`.
+
+    Returns
+    -------
+    pathlib.Path
+    """
+    return Path(file_path).with_suffix(get_vector_format(vector_format)["suffix"])
+
+
+def remove_vector(file_path):
+    """Remove a vector file and its auxiliary files (e.g. the .dbf of a .shp-file).
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file.
+    """
+    file_path = Path(file_path)
+    files = get_auxiliary_files(file_path)
+    if file_path.suffix == ".gpkg":
+        files += [
+            file_path.with_name(file_path.name + suffix)
+            for suffix in ["-wal", "-shm"]
+            if file_path.with_name(file_path.name + suffix).is_file()
+        ]
+    for file in files:
+        file.unlink()
+
+
+def is_geoparquet(file_path):
+    """Check if a vector file is a GeoParquet file (based on the suffix).
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file.
+
+    Returns
+    -------
+    bool
+    """
+    return get_vector_format_of_file(file_path) == "geoparquet"
+
+
+def get_vector_geometry_type(file_path):
+    """Get the geometry type of a vector file.
+
+    See :func:`pywatemsedem.geo.utils.get_geometry_type`. The geometry type of a
+    GeoParquet file is read from the file metadata, as GDAL is not always built with
+    the (Geo)Parquet driver.
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file.
+
+    Returns
+    -------
+    str
+        Geometry type, 'Unknown' for a GeoParquet file with mixed geometry types.
+    """
+    if not is_geoparquet(file_path):
+        return get_geometry_type(file_path)
+    import pyarrow.parquet
+
+    metadata = json.loads(pyarrow.parquet.read_metadata(file_path).metadata[b"geo"])
+    column = metadata["columns"][metadata["primary_column"]]
+    geometry_types = column.get("geometry_types", [])
+    return geometry_types[0] if len(geometry_types) == 1 else "Unknown"
+
+
+def read_vector(file_path, **kwargs):
+    """Read a vector file, in Arrow mode if pyarrow is installed.
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+        File path to vector file.
+    **kwargs
+        Keyword arguments passed to :func:`geopandas.read_file` (or
+        :func:`geopandas.read_parquet` for a GeoParquet file).
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
+    """
+    if is_geoparquet(file_path):
+        return gpd.read_parquet(file_path, **kwargs)
+    return gpd.read_file(file_path, engine="pyogrio", use_arrow=USE_ARROW, **kwargs)
+
+
+def write_vector(geodata, file_path, vector_format="shapefile"):
+    """Write a geodataframe in a vector format.
+
+    An existing vector (incl. its auxiliary files) is removed before writing. Note
+    that the field names of a shapefile are limited to 10 characters.
+
+    Parameters
+    ----------
+    geodata: geopandas.GeoDataFrame
+        Geodataframe to write.
+    file_path: pathlib.Path | str
+        File path output, the suffix is set to the suffix of the vector format.
+    vector_format: str, default "shapefile"
+        See :func:`pywatemsedem.geo.vectors.get_vector_format`.
+
+    Returns
+    -------
+    pathlib.Path
+        File path of the written vector.
+    """
+    properties = get_vector_format(vector_format)
+    file_path = get_vector_file_path(file_path, vector_format)
+    remove_vector(file_path)
+    if properties["driver"] is None:
+        geodata.to_parquet(file_path)
+    else:
+        geodata.to_file(
+            file_path,
+            driver=properties["driver"],
+            engine="pyogrio",
+            **properties["options"],
+        )
+    return file_path
+
+
+class ClipMask:
+    """Dissolved and prepared mask geometry to clip vectors.
+
+    Features fully within the mask are not clipped (prepared ``contains`` test),
+    only the features crossing the mask boundary are clipped with
+    :func:`geopandas.clip`.
+
+    Parameters
+    ----------
+    geodata : geopandas.GeoDataFrame
+        Mask vector.
+
+    Attributes
+    ----------
+    geometry : shapely.Geometry
+        Dissolved (prepared) mask geometry.
+    """
+
+    def __init__(self, geodata):
+        self.geometry = shapely.union_all(geodata.geometry.values)
+        shapely.prepare(self.geometry)
+
+    @classmethod
+    def from_file(cls, file_path):
+        """Create the clip mask from a mask vector file.
+
+        Parameters
+        ----------
+        file_path : pathlib.Path | str
+            File path to mask vector.
+
+        Returns
+        -------
+        pywatemsedem.geo.vectors.ClipMask
+        """
+        return cls(read_vector(file_path))
+
+    @property
+    def bounds(self):
+        """Bounds (xmin, ymin, xmax, ymax) of the mask geometry."""
+        return tuple(shapely.bounds(self.geometry))
+
+    def clip(self, geodata):
+        """Clip a geodataframe with the mask.
+
+        Parameters
+        ----------
+        geodata : geopandas.GeoDataFrame
+            Geodataframe of input data.
+
+        Returns
+        -------
+        geopandas.GeoDataFrame
+            Clipped geodataframe, the order of the features is kept.
+        """
+        if geodata.empty:
+            return geodata
+        gdf = geodata.reset_index(drop=True)
+        inside = shapely.contains(self.geometry, gdf.geometry.values)
+        if inside.all():
+            return geodata
+        gdf = pd.concat(
+            [gdf[inside], gpd.clip(gdf[~inside], self.geometry, keep_geom_type=True)]
+        ).sort_index()
+        gdf.index = geodata.index[gdf.index]
+        return gdf
+
 
 class AbstractVector:
     """Abstract vector class based on geopandas GeoDataFrame.
@@ -186,7 +470,8 @@ class AbstractVector:
         Parameters
         ----------
         outfile_path : pathlib.Path or str
-            File path output.
+            File path output, the vector format is derived from the suffix, see
+            :data:`pywatemsedem.geo.vectors.VECTOR_FORMATS`.
 
         Returns
         -------
@@ -200,10 +485,9 @@ class AbstractVector:
         """
         if outfile_path is not None:
             outfile_path = Path(outfile_path)
-        if outfile_path.suffix == ".shp":
-            self._geodata.to_file(
-                outfile_path, driver="ESRI Shapefile", spatial_index="YES"
-            )
+        vector_format = get_vector_format_of_file(outfile_path)
+        if vector_format is not None:
+            write_vector(self._geodata, outfile_path, vector_format)
         elif outfile_path.suffix == "":
             self._geodata.to_file(
                 outfile_path, driver="ESRI Shapefile", spatial_index="YES"
@@ -353,8 +637,8 @@ class VectorMemory(AbstractVector):
             Geometry type of input dataset.
         req_geometry_type : str, default None
             Required geometry type.
-        clip_mask : geopandas.GeoDataFrame, default None
-            Mask vector for clipping.
+        clip_mask : geopandas.GeoDataFrame or ClipMask, default None
+            Mask vector for clipping, see :class:`pywatemsedem.geo.vectors.ClipMask`.
         allow_empty : bool, default False
             Allow an empty geodataframe.
         epsg : int, default None
@@ -378,7 +662,7 @@ class VectorMemory(AbstractVector):
         ----------
         geodata : geopandas.GeoDataFrame
             Geodataframe of input data.
-        clip_mask : geopandas.GeoDataFrame
+        clip_mask : geopandas.GeoDataFrame or pywatemsedem.geo.vectors.ClipMask
             Mask vector.
 
         Returns
@@ -386,8 +670,9 @@ class VectorMemory(AbstractVector):
         geopandas.GeoDataFrame
             Clipped geodataframe.
         """
-        gdf = gpd.clip(geodata, clip_mask, keep_geom_type=True)
-        return gdf
+        if not isinstance(clip_mask, ClipMask):
+            clip_mask = ClipMask(clip_mask)
+        return clip_mask.clip(geodata)
 
 
 class VectorFile(AbstractVector):
@@ -422,7 +707,7 @@ class VectorFile(AbstractVector):
         req_geometry_type : str, default None
             Required type of geometry, see implemented geometries in
             :func:`pywatemsedem.geo.vectors.AbstractVector.check_type`.
-        vct_clip : pathlib.Path, default None
+        vct_clip : pathlib.Path or pywatemsedem.geo.vectors.ClipMask, default None
             Mask vector for clipping.
         allow_empty : bool, default False
             Allow an empty geodataframe.
@@ -431,12 +716,12 @@ class VectorFile(AbstractVector):
         """
         self.file_path = file_path
 
-        geometry_type = get_geometry_type(file_path)
+        geometry_type = get_vector_geometry_type(file_path)
 
         if vct_clip is not None:
             geodata = self.clip(vct_clip)
         else:
-            geodata = gpd.read_file(file_path)
+            geodata = read_vector(file_path)
 
         super().initialize(
             geodata,
@@ -451,7 +736,7 @@ class VectorFile(AbstractVector):
 
         Parameters
         ----------
-        vct_clip : pathlib.Path
+        vct_clip : pathlib.Path or pywatemsedem.geo.vectors.ClipMask
             Mask vector.
 
         Returns
@@ -459,9 +744,7 @@ class VectorFile(AbstractVector):
         geopandas.GeoDataFrame
             Clipped geodataframe.
         """
-        gdf_mask = gpd.read_file(vct_clip)
-        gdf_mask = gdf_mask.dissolve()
-        mask = gdf_mask.geometry[0]
-        geodata = gpd.read_file(self.file_path, bbox=mask)
-        geodata = gpd.clip(geodata, mask, keep_geom_type=True)
-        return geodata
+        if not isinstance(vct_clip, ClipMask):
+            vct_clip = ClipMask.from_file(vct_clip)
+        geodata = read_vector(self.file_path, bbox=vct_clip.bounds)
+        return vct_clip.clip(geodata)
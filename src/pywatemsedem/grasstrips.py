@@ -6,7 +6,6 @@ from typing import Callable
 
 import geopandas as gpd
 import numpy as np
-from scipy import signal
 
 from pywatemsedem.geo.utils import (
     clean_up_tempfiles,
@@ -554,6 +553,8 @@ def compute_number_of_non_zero_neighbours(arr, nodata=None, mode=1):
     2. Boundaries are set to zero.
     3. Grass strips within trigger pixels are not considered.
     """
+    from scipy import signal
+
     arr_out = arr.copy()
     if nodata is not None:
         arr_out[arr_out == nodata] = 0
@@ -597,10 +598,10 @@ def add_boundary_rows_cols_to_arr(arr):
     -------
     numpy.ndarray
         With two rows added to the top and bottom, and two columns added to the left
-        and right
+        and right (same dtype as input array)
     """
     shape = arr.shape
-    _arr = np.zeros((shape[0] + 2, shape[1] + 2))
+    _arr = np.zeros((shape[0] + 2, shape[1] + 2), dtype=arr.dtype)
     _arr[1:-1, 1:-1] = arr
 
     return _arr
@@ -9,11 +9,15 @@ import datetime
 import logging
 import re
 import warnings
+from collections import defaultdict
+from pathlib import Path
 
 from pywatemsedem.templates import InputFileName
 
 logger = logging.getLogger(__name__)
 
+SECTION_PATTERN = re.compile(r"^\[(.+)\]$")
+
 inputfilename = InputFileName()
 
 
@@ -364,19 +368,17 @@ class IniFile:
                 "Parameters Extensions", "Number of buffers", str(len(buffers))
             )
             if len(buffers) != 0:
-                for row in buffers.iterrows():
-                    section = f"Buffer {row[1]['buf_id']}"
+                for row in buffers.to_dict("records"):
+                    section = f"Buffer {row['buf_id']}"
                     self.cfg.add_section(section)
-                    self.cfg.set(section, "Volume", f"{row[1]['buffercap']}")
-                    self.cfg.set(section, "Height dam", f"{row[1]['hdam']}")
-                    self.cfg.set(section, "Height opening", f"{row[1]['hknijp']}")
-                    self.cfg.set(section, "Opening area", f"{row[1]['dknijp']}")
-                    self.cfg.set(
-                        section, "Discharge coefficient", f" {row[1]['qcoef']}"
-                    )
-                    self.cfg.set(section, "Width dam", f"{row[1]['boverl']}")
-                    self.cfg.set(section, "Trapping efficiency", f"{row[1]['eff']}")
-                    self.cfg.set(section, "Extension ID", f"{row[1]['buf_exid']}")
+                    self.cfg.set(section, "Volume", f"{row['buffercap']}")
+                    self.cfg.set(section, "Height dam", f"{row['hdam']}")
+                    self.cfg.set(section, "Height opening", f"{row['hknijp']}")
+                    self.cfg.set(section, "Opening area", f"{row['dknijp']}")
+                    self.cfg.set(section, "Discharge coefficient", f" {row['qcoef']}")
+                    self.cfg.set(section, "Width dam", f"{row['boverl']}")
+                    self.cfg.set(section, "Trapping efficiency", f"{row['eff']}")
+                    self.cfg.set(section, "Extension ID", f"{row['buf_exid']}")
 
     def add_force_routing_extension(self, forced_routing, river_underground):
         """Add force routing extension and force routing parameters to config file
@@ -423,21 +425,9 @@ class IniFile:
                     str(n),
                 )
             if n_fr > 0:
-                for nr, row in enumerate(forced_routing.itertuples()):
-                    section = f"Forced Routing {nr + 1}"
-                    self.cfg.add_section(section)
-                    self.cfg.set(section, "from col", f"{int(row.fromcol)}")
-                    self.cfg.set(section, "from row", f"{int(row.fromrow)}")
-                    self.cfg.set(section, "target col", f"{int(row.tocol)}")
-                    self.cfg.set(section, "target row", f"{int(row.torow)}")
+                self._add_forced_routing_sections(forced_routing)
             elif n_ru > 0:
-                for nr, row in enumerate(river_underground.itertuples()):
-                    section = f"Forced Routing {nr + 1}"
-                    self.cfg.add_section(section)
-                    self.cfg.set(section, "from col", f"{int(row.fromcol)}")
-                    self.cfg.set(section, "from row", f"{int(row.fromrow)}")
-                    self.cfg.set(section, "target col", f"{int(row.tocol)}")
-                    self.cfg.set(section, "target row", f"{int(row.torow)}")
+                self._add_forced_routing_sections(river_underground)
             else:
                 msg = (
                     "'Force Routing' in 'dict_model_options' is equal to 1, but no "
@@ -445,6 +435,34 @@ class IniFile:
                 )
                 warnings.warn(msg)
 
+    def _add_forced_routing_sections(self, forced_routing):
+        """Add a 'Forced Routing $nr' section for every forced routing row.
+
+        The sections are added in one call (see
+        :func:`configparser.ConfigParser.read_dict`) from the integer columns.
+
+        Parameters
+        ----------
+        forced_routing: pandas.DataFrame
+            See :func:`pywatemsedem.io.ini.IniFile.add_force_routing_extension`.
+        """
+        columns = {
+            "from col": "fromcol",
+            "from row": "fromrow",
+            "target col": "tocol",
+            "target row": "torow",
+        }
+        values = {
+            key: forced_routing[column].to_numpy().astype(int).astype(str)
+            for key, column in columns.items()
+        }
+        self.cfg.read_dict(
+            {
+                f"Forced Routing {nr + 1}": {key: values[key][nr] for key in columns}
+                for nr in range(len(forced_routing))
+            }
+        )
+
     def add_river_routing_extension(self):
         """Add river routing extension to config file and
         the needed files for this extension"""
@@ -656,42 +674,181 @@ def modify_field(ini, section, key, value):
         New value
     ini_updated: pathlib.Path, default None
         New file to write to
+
+    Notes
+    -----
+    Use :func:`pywatemsedem.io.ini.modify_fields` to modify multiple keys in one
+    read and write of the ini-file.
     """
-    # Init
-    content = open_ini(ini)
-    section_pattern = re.compile(rf"^\[{re.escape(section)}\]\s*$")
-    key_pattern = re.compile(rf"^{re.escape(key)}\s*=")
-    in_section = False
-    in_key = False
+    modify_fields(ini, {(section, key): value})
 
-    # Modify
-    for i, line in enumerate(content):
-        if section_pattern.match(line):
-            in_section = True
-        elif in_section and key_pattern.match(line):
-            content[i] = f"{key} = {value}\n"
-            in_key = True
-            break
 
-    # Warning
-    if not in_section:
-        msg = (
-            f"Cannot modify '{value}' to '{key}'. Section '{section}' does not exist "
-            f"in '{ini}'."
-        )
-        raise KeyError(msg)
-    if not in_key:
-        msg = (
-            f"Cannot modify '{value}' to '{key}'. Key '{key}' does not exist in "
-            f"'{ini}'."
-        )
-        raise KeyError(msg)
+def modify_fields(ini, changes, ini_out=None, add_missing=False):
+    """Modify (or add) multiple keys in an ini-file in one read and write.
 
-    # Write the modified content back to the file
-    with open(ini, "w") as file:
-        msg = f"Modifying '{value}' to '{key}' in file '{ini}'"
-        logger.info(msg)
-        file.writelines(content)
+    Parameters
+    ----------
+    ini: pathlib.Path or str
+        File name
+    changes: dict
+        New value (values) for every (section, key) tuple (keys). Keys are matched
+        case-insensitive (as in :class:`configparser.ConfigParser`).
+    ini_out: pathlib.Path or str, default None
+        File to write the modified ini-file to. If None, ``ini`` is overwritten.
+    add_missing: bool, default False
+        Add keys (and sections) that do not exist in the ini-file. If False, a
+        KeyError is raised for a key or section that does not exist.
+
+    Examples
+    --------
+    >>> modify_fields(
+    ...     "scenario.ini",
+    ...     {("Parameters", "max kernel"): 50, ("Calibration", "ktclow"): 5},
+    ... )
+    """
+    ini_out = ini if ini_out is None else ini_out
+    IniTemplate(ini).write(ini_out, changes, add_missing=add_missing)
+    logger.info(f"Modifying {len(changes)} key(s) in file '{ini_out}'")
+
+
+class IniTemplate:
+    """Base ini-file to write ini-file variants with modified values.
+
+    The base ini-file is parsed once to the line of every section and key. A variant
+    is created by only replacing (or inserting) the lines of the modified keys, so
+    many variants (e.g. for a calibration or sensitivity analysis) can be written
+    without parsing the ini-file with configparser for every variant.
+
+    Parameters
+    ----------
+    ini: pathlib.Path or str
+        File path of the base ini-file.
+
+    Examples
+    --------
+    >>> template = IniTemplate("scenario.ini")
+    >>> template.write_variants(
+    ...     [{("Calibration", "ktclow"): ktc_low} for ktc_low in [5, 10, 15]],
+    ...     ["ktc_5.ini", "ktc_10.ini", "ktc_15.ini"],
+    ... )
+    """
+
+    def __init__(self, ini):
+        self.ini = Path(ini)
+        self.lines = open_ini(ini)
+        if self.lines and not self.lines[-1].endswith("\n"):
+            self.lines[-1] += "\n"
+        # insertion line (after last key) of every section
+        self._sections = {}
+        # line number and key (as in file) for every (section, lower case key)
+        self._keys = {}
+        self._parse()
+
+    def _parse(self):
+        """Get the line numbers of the sections and keys of the base ini-file."""
+        section = None
+        for i, line in enumerate(self.lines):
+            stripped = line.strip()
+            match = SECTION_PATTERN.match(stripped)
+            if match:
+                section = match.group(1)
+                self._sections[section] = i + 1
+            elif section is not None and stripped and stripped[0] not in "#;":
+                key, sep, _ = stripped.partition("=")
+                if sep:
+                    self._keys[(section, key.strip().lower())] = (i, key.strip())
+                    self._sections[section] = i + 1
+
+    def render(self, changes=None, add_missing=False):
+        """Get the content of an ini-file variant.
+
+        Parameters
+        ----------
+        changes: dict, default None
+            See :func:`pywatemsedem.io.ini.modify_fields`.
+        add_missing: bool, default False
+            See :func:`pywatemsedem.io.ini.modify_fields`.
+
+        Returns
+        -------
+        str
+            Content of the ini-file.
+        """
+        lines = list(self.lines)
+        insertions = defaultdict(list)
+        new_sections = defaultdict(list)
+        for (section, key), value in ({} if changes is None else changes).items():
+            item = self._keys.get((section, str(key).lower()))
+            if item is not None:
+                i, file_key = item
+                lines[i] = f"{file_key} = {value}\n"
+            elif not add_missing:
+                if section not in self._sections:
+                    msg = (
+                        f"Cannot modify '{value}' to '{key}'. Section '{section}' does "
+                        f"not exist in '{self.ini}'."
+                    )
+                else:
+                    msg = (
+                        f"Cannot modify '{value}' to '{key}'. Key '{key}' does not "
+                        f"exist in '{self.ini}'."
+                    )
+                raise KeyError(msg)
+            elif section in self._sections:
+                insertions[self._sections[section]].append(f"{key} = {value}\n")
+            else:
+                new_sections[section].append(f"{key} = {value}\n")
+
+        # insert from the bottom, so the line numbers of the sections stay valid
+        for i in sorted(insertions, reverse=True):
+            lines[i:i] = insertions[i]
+        for section, items in new_sections.items():
+            lines += ["\n", f"[{section}]\n"] + items
+
+        return "".join(lines)
+
+    def write(self, ini_out, changes=None, add_missing=False):
+        """Write an ini-file variant.
+
+        Parameters
+        ----------
+        ini_out: pathlib.Path or str
+            File path of the ini-file variant.
+        changes: dict, default None
+            See :func:`pywatemsedem.io.ini.modify_fields`.
+        add_missing: bool, default False
+            See :func:`pywatemsedem.io.ini.modify_fields`.
+        """
+        content = self.render(changes, add_missing=add_missing)
+        with open(ini_out, "w") as file:
+            file.write(content)
+
+    def write_variants(self, variants, inis_out, add_missing=False):
+        """Write multiple ini-file variants.
+
+        Parameters
+        ----------
+        variants: list of dict
+            Changes of every variant, see :func:`pywatemsedem.io.ini.modify_fields`.
+        inis_out: list of pathlib.Path or str
+            File path of every ini-file variant.
+        add_missing: bool, default False
+            See :func:`pywatemsedem.io.ini.modify_fields`.
+
+        Returns
+        -------
+        list of pathlib.Path
+            File paths of the written ini-files.
+        """
+        if len(variants) != len(inis_out):
+            msg = (
+                f"Number of ini-files ({len(inis_out)}) should be equal to number of "
+                f"variants ({len(variants)})."
+            )
+            raise ValueError(msg)
+        for changes, ini_out in zip(variants, inis_out):
+            self.write(ini_out, changes, add_missing=add_missing)
+        return [Path(ini_out) for ini_out in inis_out]
 
 
 def add_field(ini, section, key, value):
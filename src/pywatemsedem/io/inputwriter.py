@@ -0,0 +1,267 @@
+"""inputwriter.py
+
+This module holds the incremental writer of the WaTEM/SEDEM model input rasters. The
+fingerprint of every written raster (array and
+:class:`pywatemsedem.geo.rasterproperties.RasterProperties`) is stored in the model
+input folder. A raster is only (re)written if its fingerprint differs from the
+fingerprint of the file on disk. Identical inputs of other scenarios of the same
+catchment can be hard-linked instead of written.
+
+Examples
+--------
+>>> from pywatemsedem.io.inputwriter import InputWriter
+>>> writer = InputWriter(scenario.sfolder.wsinput_folder)
+>>> writer.write_raster(scenario.cfactor, "C_factor.rst")
+>>> writer.to_dataframe()
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from pywatemsedem.geo.utils import get_auxiliary_files
+
+logger = logging.getLogger(__name__)
+
+#: Name of the file holding the fingerprints of the rasters in a model input folder
+FINGERPRINT_FILE = "inputfiles.fingerprint"
+
+#: Actions recorded in the report of :class:`InputWriter`
+WRITE_ACTIONS = ["written", "reused", "linked"]
+
+
+def get_raster_fingerprint(arr, rp, format="idrisi", dtype=None, nodata=None):
+    """Get the fingerprint of a raster written to disk.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray
+        Raster array.
+    rp: pywatemsedem.geo.rasterproperties.RasterProperties
+        See :class:`pywatemsedem.geo.rasterproperties.RasterProperties`.
+    format: str, default "idrisi"
+        See :func:`pywatemsedem.geo.rasters.AbstractRaster.write`.
+    dtype: numpy.dtype, default None
+        Output raster type. If None, dtype of array is used.
+    nodata: float, default None
+        Nodata value for output raster. If None, nodata of rasterproperties is used.
+
+    Returns
+    -------
+    str
+        Hash of the array and the properties of the output raster.
+    """
+    dtype = arr.dtype if dtype is None else np.dtype(dtype)
+    nodata = rp.nodata if nodata is None else nodata
+    properties = (
+        format,
+        dtype.str,
+        arr.dtype.str,
+        arr.shape,
+        rp.bounds,
+        rp.resolution,
+        nodata,
+        rp.epsg,
+    )
+    sha1 = hashlib.sha1(repr(properties).encode())
+    sha1.update(np.ascontiguousarray(arr).data)
+    return sha1.hexdigest()
+
+
+def _get_file_stats(file_path):
+    """Get size and modification time (ns) of a file and its auxiliary files."""
+    stats = {}
+    for file in get_auxiliary_files(file_path):
+        stat = file.stat()
+        stats[file.name] = [stat.st_size, stat.st_mtime_ns]
+    return stats
+
+
+def _read_fingerprints(folder):
+    """Read the fingerprints of a model input folder, empty if not available."""
+    fingerprint_file = Path(folder) / FINGERPRINT_FILE
+    if not fingerprint_file.exists():
+        return {}
+    try:
+        with open(fingerprint_file) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        logger.warning(f"Could not read fingerprint file '{fingerprint_file}'.")
+        return {}
+
+
+def _is_current(folder, name, fingerprints, fingerprint):
+    """Check if a raster file in a folder matches a fingerprint.
+
+    The file matches if the stored fingerprint is equal and the file (and its
+    auxiliary files) are not modified after they were fingerprinted.
+    """
+    entry = fingerprints.get(name)
+    if entry is None or entry["fingerprint"] != fingerprint:
+        return False
+    stats = _get_file_stats(Path(folder) / name)
+    return len(stats) > 0 and stats == entry["files"]
+
+
+class InputWriter:
+    """Incremental writer of model input rasters.
+
+    Parameters
+    ----------
+    folder: pathlib.Path | str
+        Model input folder.
+    incremental: bool, default True
+        Skip writing a raster if the file on disk matches the fingerprint of the
+        raster. If False, all rasters are written (and fingerprinted).
+    link_folders: list of pathlib.Path, default None
+        Model input folders of other scenarios of the same catchment. A raster with
+        the same file name and fingerprint in one of these folders is hard-linked
+        (copied if the file system does not support hard links) instead of written.
+
+    Attributes
+    ----------
+    records: list of dict
+        One record per raster, see
+        :func:`pywatemsedem.io.inputwriter.InputWriter.to_dataframe`.
+    """
+
+    def __init__(self, folder, incremental=True, link_folders=None):
+        self.folder = Path(folder)
+        self.incremental = incremental
+        self.link_folders = [
+            Path(link_folder)
+            for link_folder in (link_folders or [])
+            if Path(link_folder).resolve() != self.folder.resolve()
+        ]
+        self.records = []
+        self._fingerprints = _read_fingerprints(self.folder)
+
+    def write_raster(
+        self, raster, outfile_path, format="idrisi", dtype=None, nodata=None
+    ):
+        """Write a raster to the model input folder if it is not up-to-date.
+
+        Parameters
+        ----------
+        raster: pywatemsedem.geo.rasters.AbstractRaster
+            Raster to write.
+        outfile_path: pathlib.Path | str
+            File path output, the file must be located in the model input folder.
+            A file name is interpreted relative to the model input folder.
+        format, dtype, nodata
+            See :func:`pywatemsedem.geo.rasters.AbstractRaster.write`.
+
+        Returns
+        -------
+        str
+            Action taken, one of :data:`WRITE_ACTIONS`.
+
+        Raises
+        ------
+        ValueError
+            If the output file is not located in the model input folder.
+        """
+        outfile_path = self.folder / outfile_path
+        if outfile_path.parent.resolve() != self.folder.resolve():
+            msg = (
+                f"Output file '{outfile_path}' is not located in the model input "
+                f"folder '{self.folder}'."
+            )
+            raise ValueError(msg)
+        name = outfile_path.name
+        fingerprint = get_raster_fingerprint(
+            raster.arr, raster.rp, format=format, dtype=dtype, nodata=nodata
+        )
+
+        source = None
+        if self.incremental and _is_current(
+            self.folder, name, self._fingerprints, fingerprint
+        ):
+            action = "reused"
+        else:
+            # remove the old files: a hard-linked file should not be overwritten
+            # in place, as this modifies the file of the other scenario(s)
+            for file in get_auxiliary_files(outfile_path):
+                file.unlink()
+            source = self._find_identical(name, fingerprint)
+            if source is not None:
+                _link_files(source, outfile_path)
+                action = "linked"
+            else:
+                raster.write(outfile_path, format=format, dtype=dtype, nodata=nodata)
+                action = "written"
+            self._fingerprints[name] = {
+                "fingerprint": fingerprint,
+                "files": _get_file_stats(outfile_path),
+            }
+            self._write_fingerprints()
+
+        self.records.append(
+            {
+                "file": name,
+                "action": action,
+                "source": None if source is None else str(source),
+            }
+        )
+        logger.debug(f"Model input '{name}' {action}.")
+        return action
+
+    def _find_identical(self, name, fingerprint):
+        """Find an up-to-date raster with the same fingerprint in the link
+        folders, None if not available."""
+        for link_folder in self.link_folders:
+            if _is_current(
+                link_folder, name, _read_fingerprints(link_folder), fingerprint
+            ):
+                return link_folder / name
+        return None
+
+    def _write_fingerprints(self):
+        """Write the fingerprints to the model input folder."""
+        with open(self.folder / FINGERPRINT_FILE, "w") as f:
+            json.dump(self._fingerprints, f, indent=2)
+
+    def to_dataframe(self):
+        """Get the report of the written rasters as a dataframe.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per raster (in order of writing), with columns
+
+            - *file* (str): file name of the raster.
+            - *action* (str): 'written', 'reused' (the file on disk was up-to-date)
+              or 'linked' (hard-linked from another scenario).
+            - *source* (str): file path of the linked raster, None if not linked.
+        """
+        return pd.DataFrame(self.records, columns=["file", "action", "source"])
+
+    def summary(self):
+        """Get the number of rasters per action.
+
+        Returns
+        -------
+        dict
+            Number of rasters (values) per action (keys), see
+            :data:`WRITE_ACTIONS`.
+        """
+        counts = {action: 0 for action in WRITE_ACTIONS}
+        for record in self.records:
+            counts[record["action"]] += 1
+        return counts
+
+
+def _link_files(source, target):
+    """Hard-link a file and its auxiliary files, copy if linking fails."""
+    for file in get_auxiliary_files(source):
+        target_file = Path(target).parent / file.name
+        try:
+            os.link(file, target_file)
+        except OSError:
+            shutil.copy2(file, target_file)
@@ -1,17 +1,11 @@
 from dataclasses import dataclass
 from pathlib import Path
 
-import matplotlib as mpl
 import numpy as np
 import pandas as pd
-from matplotlib import colors
 
 from pywatemsedem.geo.factory import Factory
-from pywatemsedem.geo.utils import (
-    check_raster_properties_raster_with_template,
-    get_rstparams,
-    mask_array_with_val,
-)
+from pywatemsedem.geo.utils import mask_array_with_val
 from pywatemsedem.io.ini import get_item_from_ini
 from pywatemsedem.io.plots import (
     axes_creator,
@@ -19,6 +13,7 @@ from pywatemsedem.io.plots import (
     plot_discrete_raster,
     plot_landuse,
 )
+from pywatemsedem.io.spatialcontext import get_spatial_context
 from pywatemsedem.io.valid import (
     valid_array_type,
     valid_boundaries,
@@ -106,15 +101,16 @@ class Modelinput(Factory):
             get_item_from_ini(ini, "Working directories", "input directory", str)
         )
 
-        rstparams, _ = get_rstparams(ini, epsg=epsg)
-        resolution = int(abs(rstparams["transform"][0]))
-        nodata = rstparams["nodata"]
-
-        # apply factory and set mask
-        super().__init__(resolution, epsg, nodata, self.modelinputfolder)
-        self.mask = self.modelinputfolder / get_item_from_ini(
-            ini, "Files", "shapefile catchment", str
+        # apply factory and set mask of the (shared) spatial context
+        self.context = get_spatial_context(ini, epsg)
+        super().__init__(
+            self.context.resolution,
+            epsg,
+            self.context.nodata,
+            self.modelinputfolder,
         )
+        self.context.share_mask(self)
+        self._set_mask_plot(self.context.mask_file)
 
         # DATA
         self._rivermask = None
@@ -148,6 +144,16 @@ class Modelinput(Factory):
             Raster or polygon mask file used to create the model mask.
         """
         Factory.mask.fset(self, mask)
+        self._set_mask_plot(mask)
+
+    def _set_mask_plot(self, mask):
+        """Define a dedicated plotting function and file path for the mask raster.
+
+        Parameters
+        ----------
+        mask: pathlib.Path | str
+            Raster or polygon mask file used to create the model mask.
+        """
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the mask raster.
@@ -208,13 +214,11 @@ class Modelinput(Factory):
         self._rivermask.arr[self._rivermask.arr != 1] = self._nodata
 
         # checks
-        valid_non_nan(self.rivermask.arr)
+        stats = self.context.get_statistics("rivermask", raster, self.rivermask.arr)
+        valid_non_nan(stats)
         valid_array_type(self.rivermask.arr, required_type=np.int16)
-        valid_values(
-            self.rivermask.arr[self.rivermask.arr != self._nodata],
-            unique_values=[1],
-        )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_values(stats.without(self._nodata), unique_values=[1])
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the rivermask raster.
@@ -276,7 +280,7 @@ class Modelinput(Factory):
         self._cfactor = self.raster_factory(raster, flag_mask=False)
 
         # checks on raw raster data
-        valid_non_nan(self.cfactor.arr)
+        valid_non_nan(self.context.get_statistics("cfactor", raster, self.cfactor.arr))
         valid_array_type(self.cfactor.arr, required_type=np.float32)
         lower, upper = 0, 1
         valid_boundaries(
@@ -284,7 +288,7 @@ class Modelinput(Factory):
             lower=lower,
             upper=upper,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the cfactor raster.
@@ -337,10 +341,11 @@ class Modelinput(Factory):
         """
         self._buffers = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self.buffers.arr)
+        stats = self.context.get_statistics("buffers", raster, self.buffers.arr)
+        valid_non_nan(stats)
         valid_array_type(self.buffers.arr, required_type=np.int16)
-        valid_boundaries(self.buffers.arr, lower=0, upper=None)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         labels = ["No buffer", "Buffer"]
 
@@ -397,14 +402,14 @@ class Modelinput(Factory):
         """
         self._dtm = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self.dtm.arr)
+        stats = self.context.get_statistics("dtm", raster, self.dtm.arr)
+        valid_non_nan(stats)
         valid_array_type(self.dtm.arr, required_type=np.float32)
         # crucial that code does NOT run when nodata values detected!
         valid_nodata(self.dtm.arr, nodata_value=self._nodata)
-        valid_nodata(self.dtm.arr, nodata_value=self._nodata)
-        valid_boundaries(self.dtm.arr, lower=-431, upper=9000)
+        valid_boundaries(stats, lower=-431, upper=9000)
         # +- lowest and highest points on earth
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the dtm raster.
@@ -457,13 +462,14 @@ class Modelinput(Factory):
         """
         self._kfactor = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self._kfactor.arr)
+        stats = self.context.get_statistics("kfactor", raster, self._kfactor.arr)
+        valid_non_nan(stats)
         # NO need for checking no data, deal with this in plotting!
         valid_array_type(self._kfactor.arr, required_type=np.int16)
         valid_boundaries(
-            self._kfactor.arr[self._kfactor.arr != self._nodata], lower=0, upper=None
+            stats.without(self._nodata), lower=0, upper=None
         )  # No data value excluded from check
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the kfactor raster.
@@ -516,7 +522,7 @@ class Modelinput(Factory):
         """
         self._ktc = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self.ktc.arr)
+        valid_non_nan(self.context.get_statistics("ktc", raster, self.ktc.arr))
         valid_array_type(self.ktc.arr, required_type=np.float32)
         valid_boundaries(
             self.ktc.arr[(self.ktc.arr != 9999) & (self.ktc.arr != self._nodata)],
@@ -524,7 +530,7 @@ class Modelinput(Factory):
             upper=20,
         )  # 0 to 20 if not nodata
         valid_values(self.ktc.arr[self._ktc.arr > 20], [9999])
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         label = ["9999"]
 
@@ -593,11 +599,12 @@ class Modelinput(Factory):
         """
         self._outlet = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self.outlet.arr)
+        stats = self.context.get_statistics("outlet", raster, self.outlet.arr)
+        valid_non_nan(stats)
         valid_nodata(self.outlet.arr)
         valid_array_type(self.outlet.arr, required_type=np.int16)
-        valid_values(self.outlet.arr, unique_values=[0, 1])
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_values(stats, unique_values=[0, 1])
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the outlet raster.
@@ -657,7 +664,7 @@ class Modelinput(Factory):
         lower, upper = 0, 1
         valid_boundaries(self.pfactor.arr[self.mask.arr == 1], lower=lower, upper=upper)
         valid_array_type(self.pfactor.arr[self.mask.arr == 1], required_type=np.float32)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the pfactor raster.
@@ -711,10 +718,13 @@ class Modelinput(Factory):
         self._compositelanduse = self.raster_factory(raster, flag_mask=False)
 
         # checks
-        valid_non_nan(self.compositelanduse.arr)
+        stats = self.context.get_statistics(
+            "compositelanduse", raster, self.compositelanduse.arr
+        )
+        valid_non_nan(stats)
         valid_array_type(self.compositelanduse.arr, required_type=np.int16)
-        valid_boundaries(self.compositelanduse.arr, lower=-32757, upper=32757)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=-32757, upper=32757)
+        self.context.check_template(raster)
 
         def plot(nodata=None, *args, **kwargs):
             """Plot the compositelanduse raster."""
@@ -746,12 +756,13 @@ class Modelinput(Factory):
         """
         self._ptef = self.raster_factory(raster, flag_mask=False)
         # checks on raster data
-        valid_non_nan(self.ptef.arr)
+        stats = self.context.get_statistics("ptef", raster, self.ptef.arr)
+        valid_non_nan(stats)
         valid_array_type(self.ptef.arr, required_type=np.int16)
         # int16, maar waarom niet float32?
         lower, upper = 0, 100
-        valid_boundaries(self.ptef.arr, lower=lower, upper=upper)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=lower, upper=upper)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the ptef raster.
@@ -806,10 +817,13 @@ class Modelinput(Factory):
         self._riversegments = self.raster_factory(raster, flag_mask=False)
 
         # checks
-        valid_non_nan(self.riversegments.arr)
+        stats = self.context.get_statistics(
+            "riversegments", raster, self.riversegments.arr
+        )
+        valid_non_nan(stats)
         valid_array_type(self.riversegments.arr, required_type=np.int16)
-        valid_boundaries(self.riversegments.arr, lower=0, upper=None)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the riversegments raster.
@@ -874,16 +888,21 @@ class Modelinput(Factory):
         ----------
         raster: pathlib.Path | str
         """
+        import matplotlib as mpl
+        from matplotlib import colors
+
         self._riverrouting = self.raster_factory(raster, flag_mask=False)
 
         # checks
-        valid_non_nan(self.riverrouting.arr)
+        stats = self.context.get_statistics(
+            "riverrouting", raster, self.riverrouting.arr
+        )
+        valid_non_nan(stats)
         valid_array_type(self.riverrouting.arr, required_type=np.int16)
         valid_values(
-            self.riverrouting.arr[self.riverrouting.arr != self._nodata],
-            unique_values=np.arange(0, 9).tolist(),
+            stats.without(self._nodata), unique_values=np.arange(0, 9).tolist()
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         colormap_start = mpl.colormaps["tab10"]
         colorlist = []
         for i in range(0, 9):
@@ -957,11 +976,12 @@ class Modelinput(Factory):
         self._sewers = self.raster_factory(raster, flag_mask=False)
 
         # checks
-        valid_non_nan(self.sewers.arr)
+        stats = self.context.get_statistics("sewers", raster, self.sewers.arr)
+        valid_non_nan(stats)
         valid_array_type(self.sewers.arr, required_type=np.float32)
         lower, upper = 0, 1
-        valid_boundaries(self.sewers.arr, lower=lower, upper=upper)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=lower, upper=upper)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the sewers raster.
@@ -1082,9 +1102,9 @@ class Modelinput(Factory):
         """
         self._ktil = self.raster_factory(raster, flag_mask=False)
         # checks
-        valid_non_nan(self._ktil.arr)
+        valid_non_nan(self.context.get_statistics("ktil", raster, self._ktil.arr))
         valid_array_type(self._ktil.arr, required_type=np.int16)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         self._ktil.file_path = raster
 
     @property
@@ -1109,11 +1129,14 @@ class Modelinput(Factory):
         """
         self._tillagedirection = self.raster_factory(raster, flag_mask=False)
 
-        valid_non_nan(self.tillagedirection.arr)
+        stats = self.context.get_statistics(
+            "tillagedirection", raster, self.tillagedirection.arr
+        )
+        valid_non_nan(stats)
         valid_nodata(self.tillagedirection.arr)
         valid_array_type(self.tillagedirection.arr, required_type=np.float32)
-        valid_boundaries(self.tillagedirection.arr, lower=0, upper=360)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=360)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the tillagedirection raster."""
@@ -1154,11 +1177,14 @@ class Modelinput(Factory):
         """
         self._orientedroughness = self.raster_factory(raster, flag_mask=False)
 
-        valid_non_nan(self.orientedroughness.arr)
+        stats = self.context.get_statistics(
+            "orientedroughness", raster, self.orientedroughness.arr
+        )
+        valid_non_nan(stats)
         valid_nodata(self.orientedroughness.arr)
         valid_array_type(self.orientedroughness.arr, required_type=np.float32)
-        valid_boundaries(self.orientedroughness.arr, lower=0, upper=None)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the orientedroughness raster."""
@@ -1197,15 +1223,20 @@ class Modelinput(Factory):
         ----------
         raster: pathlib.Path | str
         """
+        import matplotlib as mpl
+        from matplotlib import colors
+
         self._ditches = self.raster_factory(raster, flag_mask=False)
 
-        valid_non_nan(self.ditches.arr)
+        stats = self.context.get_statistics(
+            "ditches", raster, self.ditches.arr, values=True
+        )
+        valid_non_nan(stats)
         valid_nodata(self.ditches.arr)
         valid_values(
-            self.ditches.arr[self.ditches.arr != self._nodata],
-            unique_values=np.arange(0, 9).tolist(),
+            stats.without(self._nodata), unique_values=np.arange(0, 9).tolist()
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         colormap_start = mpl.colormaps["tab10"]
         colorlist = []
         for i in range(0, 9):
@@ -1274,15 +1305,18 @@ class Modelinput(Factory):
         ----------
         raster: pathlib.Path | str
         """
+        import matplotlib as mpl
+        from matplotlib import colors
+
         self._dams = self.raster_factory(raster, flag_mask=False)
 
-        valid_non_nan(self.dams.arr)
+        stats = self.context.get_statistics("dams", raster, self.dams.arr, values=True)
+        valid_non_nan(stats)
         valid_nodata(self.dams.arr)
         valid_values(
-            self.dams.arr[self.dams.arr != self._nodata],
-            unique_values=np.arange(0, 9).tolist(),
+            stats.without(self._nodata), unique_values=np.arange(0, 9).tolist()
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         colormap_start = mpl.colormaps["tab10"]
         colorlist = []
         for i in range(0, 9):
@@ -1353,11 +1387,11 @@ class Modelinput(Factory):
         """
         self._cn = self.raster_factory(raster, flag_mask=False)
 
-        valid_non_nan(self.cn.arr)
+        valid_non_nan(self.context.get_statistics("cn", raster, self.cn.arr))
         valid_nodata(self.cn.arr)
         valid_array_type(self.cn.arr, required_type=np.float32)
         valid_boundaries(self.orientedroughness.arr, lower=0, upper=100)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         def plot(fig=None, ax=None, *args, **kwargs):
             """Plot the CN raster."""
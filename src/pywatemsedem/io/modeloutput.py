@@ -2,6 +2,7 @@
 import logging
 import warnings
 from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 import geopandas as gpd
@@ -9,17 +10,15 @@ import numpy as np
 import pandas as pd
 
 # hvplot functionalities
-from matplotlib import colors
 from shapely.geometry import LineString
 
 from pywatemsedem.geo.factory import Factory
 from pywatemsedem.geo.utils import (
-    check_raster_properties_raster_with_template,
     clean_up_tempfiles,
     create_filename,
     create_spatial_index,
+    execute_batch,
     execute_saga,
-    get_rstparams,
     load_raster,
     mask_array_with_val,
     raster_array_to_pandas_dataframe,
@@ -28,6 +27,7 @@ from pywatemsedem.geo.utils import (
     rst_to_vct_points,
     write_arr_as_rst,
 )
+from pywatemsedem.geo.vectors import read_vector, write_vector
 from pywatemsedem.io.ini import get_item_from_ini
 from pywatemsedem.io.plots import (
     axes_creator,
@@ -36,16 +36,50 @@ from pywatemsedem.io.plots import (
     plot_cumulative_sedimentload,
     plot_output_raster,
 )
+from pywatemsedem.io.routinggraph import load_routing_index
+from pywatemsedem.io.spatialcontext import get_spatial_context
 from pywatemsedem.io.valid import valid_array_type, valid_boundaries, valid_non_nan
 
 IMPLEMENTED_RASTER_TYPES = [np.int16, np.int32, np.int64, np.float32, np.float64]
 COLORMAP = "cividis"
-COLORMAP_SEDI_OUT = colors.LinearSegmentedColormap.from_list(
-    "sedi_outcmap", ["#ffffff", "#fecc5c", "#ff8c00", "#d7191c", "#bd0026"]
-)
-COLORMAP_WATEREROS = colors.LinearSegmentedColormap.from_list(
-    "watereroscmap", ["#bd0026", "#ff8c00", "#ffffff", "#4292c6", "#08306b"]
-)
+#: Name and colors of the custom colormaps, the colormaps are only created on first
+#: use (see :func:`get_colormap`) so matplotlib is not imported with this module
+CUSTOM_COLORMAPS = {
+    "COLORMAP_SEDI_OUT": (
+        "sedi_outcmap",
+        ["#ffffff", "#fecc5c", "#ff8c00", "#d7191c", "#bd0026"],
+    ),
+    "COLORMAP_WATEREROS": (
+        "watereroscmap",
+        ["#bd0026", "#ff8c00", "#ffffff", "#4292c6", "#08306b"],
+    ),
+}
+
+
+@lru_cache
+def get_colormap(name):
+    """Get a custom colormap.
+
+    Parameters
+    ----------
+    name: str
+        Name of the colormap, see :data:`CUSTOM_COLORMAPS`.
+
+    Returns
+    -------
+    matplotlib.colors.LinearSegmentedColormap
+    """
+    from matplotlib import colors
+
+    cmap_name, cmap_colors = CUSTOM_COLORMAPS[name]
+    return colors.LinearSegmentedColormap.from_list(cmap_name, cmap_colors)
+
+
+def __getattr__(name):
+    """Create the custom colormaps (e.g. COLORMAP_SEDI_OUT) on first access."""
+    if name in CUSTOM_COLORMAPS:
+        return get_colormap(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 warnings.filterwarnings(
@@ -125,8 +159,9 @@ class Modeloutput(Factory):
 
         # inifile and modeloutput folder
         self.ini = ini
-        self.rstparams, self.rp = get_rstparams(self.ini, epsg=epsg)
-        resolution = int(abs(self.rstparams["transform"][0]))
+        self.context = get_spatial_context(ini, epsg)
+        self.rstparams = self.context.rstparams
+        resolution = self.context.resolution
         self.epsg = epsg
         self.nodata = self.rstparams["nodata"]
         self.modelinputfolder = Path(
@@ -138,13 +173,12 @@ class Modeloutput(Factory):
 
         # apply factory and set mask
         super().__init__(resolution, epsg, self.nodata, self.modeloutputfolder)
-        self.mask = self.modelinputfolder / get_item_from_ini(
-            ini, "Files", "shapefile catchment", str
-        )
+        self.context.share_mask(self)
 
         # DATA
         self._aspect = None
         self._routing = None
+        self._routing_graph = None
         self._routing_missing = None
         self._ls = None
         self._slope = None
@@ -188,8 +222,9 @@ class Modeloutput(Factory):
         self._aspect = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.aspect.arr, required_type=np.float32)
-        valid_boundaries(self.aspect.arr, lower=0, upper=2 * np.pi)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        stats = self.context.get_statistics("aspect", raster, self.aspect.arr)
+        valid_boundaries(stats, lower=0, upper=2 * np.pi)
+        self.context.check_template(raster)
 
         title = "Aspect [rad]"
 
@@ -228,6 +263,25 @@ class Modeloutput(Factory):
         self._aspect.plot = plot
         self._aspect.file_path = raster
 
+    @property
+    def txt_routing(self):
+        """Return the file path of the routing table."""
+        if self._routing is None:
+            return self.modeloutputfolder / "routing.txt"
+        return Path(self._txt_routing)
+
+    @property
+    def routing_graph(self):
+        """Return the flow graph of the routing table, loaded (memory-mapped) from
+        the index folder of the routing table, see
+        :func:`pywatemsedem.io.routinggraph.load_routing_index`."""
+        if self._routing_graph is None:
+            self._routing_graph = load_routing_index(
+                self.txt_routing,
+                (self.rstparams["height"], self.rstparams["width"]),
+            )
+        return self._routing_graph
+
     @property
     def routing(self):
         """Return the routing table.
@@ -249,6 +303,7 @@ class Modeloutput(Factory):
 
         self._routing = pd.read_table(text)
         self._txt_routing = text
+        self._routing_graph = None
         self.gdf_routing = None
         # checks
         valid_boundaries(self.routing["col"].values, lower=0, upper=self.rp.ncols)
@@ -405,7 +460,7 @@ class Modeloutput(Factory):
             lower=0,
             upper=None,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
 
         title = "LS [-]"
 
@@ -468,10 +523,11 @@ class Modeloutput(Factory):
         self._slope = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.slope.arr, required_type=np.float32)
-        valid_boundaries(
-            self.slope.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "slope", raster, self.slope.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         title = "Slope [rad]"
 
@@ -534,10 +590,11 @@ class Modeloutput(Factory):
         self._uparea = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.uparea.arr, required_type=np.float32)
-        valid_boundaries(
-            self.uparea.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "uparea", raster, self.uparea.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         title = "uparea [m²]"
 
@@ -699,13 +756,16 @@ class Modeloutput(Factory):
         self._sewer_in = self.raster_factory(raster, flag_mask=True)
 
         valid_array_type(self.sewer_in.arr, required_type=np.float32)
+        stats = self.context.get_statistics(
+            "sewer_in", raster, self.sewer_in.arr, inside_mask=True
+        )
         valid_boundaries(
-            self.sewer_in.arr[self.mask.arr != self.nodata],
+            stats,
             lower=0,
             upper=None,
             tolerance=0.001,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "sewer in [kg/year]"
 
         def plot(fig=None, ax=None, ticks=None, *args, **kwargs):
@@ -740,7 +800,7 @@ class Modeloutput(Factory):
                 self.rp.bounds,
                 title,
                 ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -771,13 +831,16 @@ class Modeloutput(Factory):
         self._sedi_export = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_export.arr, required_type=np.float32)
+        stats = self.context.get_statistics(
+            "sedi_export", raster, self.sedi_export.arr, inside_mask=True
+        )
         valid_boundaries(
-            self.sedi_export.arr[self.mask.arr != self.nodata],
+            stats,
             lower=0,
             upper=None,
             tolerance=0.001,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "sedi_export [kg/year]"
 
         def plot(fig=None, ax=None, ticks=None, *args, **kwargs):
@@ -828,7 +891,7 @@ class Modeloutput(Factory):
                 self.rp.bounds,
                 title,
                 ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -884,15 +947,16 @@ class Modeloutput(Factory):
             raster_used = raster
 
         valid_array_type(self.sinks.arr, required_type=np.float32)
+        stats = self.context.get_statistics(
+            "sinks", raster_used, self.sinks.arr, inside_mask=True
+        )
         valid_boundaries(
-            self.sinks.arr[self.mask.arr != self.nodata],
+            stats,
             lower=0,
             upper=None,
             tolerance=0.001,
         )
-        check_raster_properties_raster_with_template(
-            self.rp, raster_used, epsg=self.rp.epsg
-        )
+        self.context.check_template(raster_used)
 
         title = "sinks [kg/year]"
 
@@ -931,7 +995,7 @@ class Modeloutput(Factory):
                 self.rp.bounds,
                 title,
                 ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -962,13 +1026,16 @@ class Modeloutput(Factory):
         self._sedi_in = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_in.arr, required_type=np.float32)
+        stats = self.context.get_statistics(
+            "sedi_in", raster, self.sedi_in.arr, inside_mask=True
+        )
         valid_boundaries(
-            self.sedi_in.arr[self.mask.arr != self.nodata],
+            stats,
             lower=0,
             upper=None,
             tolerance=1e-3,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "sedi_in [kg/year]"
 
         def plot(
@@ -1001,7 +1068,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -1031,13 +1098,16 @@ class Modeloutput(Factory):
         self._sedi_out = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
+        stats = self.context.get_statistics(
+            "sedi_out", raster, self.sedi_out.arr, inside_mask=True
+        )
         valid_boundaries(
-            self.sedi_out.arr[self.mask.arr != self.nodata],
+            stats,
             lower=0,
             upper=None,
             tolerance=1e-3,
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "sedi_out [kg/year]"
 
         def plot(
@@ -1070,7 +1140,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -1100,10 +1170,11 @@ class Modeloutput(Factory):
         self._sedtil_in = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedtil_in.arr, required_type=np.float32)
-        valid_boundaries(
-            self.sedtil_in.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "sedtil_in", raster, self.sedtil_in.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
         title = "sedtil_in [kg/year]"
 
         def plot(
@@ -1136,7 +1207,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -1166,10 +1237,11 @@ class Modeloutput(Factory):
         self._sedtil_out = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedtil_out.arr, required_type=np.float32)
-        valid_boundaries(
-            self.sedtil_out.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "sedtil_out", raster, self.sedtil_out.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
         title = "sedtil_out [kg/year]"
 
         def plot(
@@ -1202,7 +1274,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_SEDI_OUT,
+                cmap=get_colormap("COLORMAP_SEDI_OUT"),
                 *args,
                 **kwargs,
             )
@@ -1232,10 +1304,11 @@ class Modeloutput(Factory):
         self._cumulative = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
-        valid_boundaries(
-            self.cumulative.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "cumulative", raster, self.cumulative.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
         title = "cumulative [kg/year]"
 
         def plot(fig=None, ax=None, ticks=None, *args, **kwargs):
@@ -1257,6 +1330,8 @@ class Modeloutput(Factory):
 
             ax: matplotlib.axes.Axes
             """
+            from matplotlib import colors
+
             fig, ax = axes_creator(fig, ax)
             arr = mask_array_with_val(self.cumulative.arr, self.mask.arr, self.nodata)
             lower = log_scale_enabler(arr, cnorm="log")
@@ -1302,7 +1377,7 @@ class Modeloutput(Factory):
         self._watereros_kg = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "watereros_kg [kg per year per gridcell]"
 
         def plot(
@@ -1335,7 +1410,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_WATEREROS,
+                cmap=get_colormap("COLORMAP_WATEREROS"),
                 *args,
                 **kwargs,
             )
@@ -1367,7 +1442,7 @@ class Modeloutput(Factory):
         self._watereros_mm = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "watereros_mm [mm per year per gridcell]"
 
         def plot(fig=None, ax=None, ticks=[-2, -1, 0, 1, 2], *args, **kwargs):
@@ -1398,7 +1473,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_WATEREROS,
+                cmap=get_colormap("COLORMAP_WATEREROS"),
                 *args,
                 **kwargs,
             )
@@ -1428,7 +1503,7 @@ class Modeloutput(Factory):
         self._tileros_kg = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "tileros_kg [kg per year per gridcell]"
 
         def plot(
@@ -1461,7 +1536,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_WATEREROS,
+                cmap=get_colormap("COLORMAP_WATEREROS"),
                 *args,
                 **kwargs,
             )
@@ -1491,7 +1566,7 @@ class Modeloutput(Factory):
         self._tileros_mm = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.sedi_out.arr, required_type=np.float32)
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        self.context.check_template(raster)
         title = "tileros_mm [mm per year per gridcell]"
 
         def plot(fig=None, ax=None, ticks=[-2, -1, 0, 1, 2], *args, **kwargs):
@@ -1522,7 +1597,7 @@ class Modeloutput(Factory):
                 title=title,
                 bounds=self.rp.bounds,
                 ticks=ticks,
-                cmap=COLORMAP_WATEREROS,
+                cmap=get_colormap("COLORMAP_WATEREROS"),
                 *args,
                 **kwargs,
             )
@@ -1553,10 +1628,11 @@ class Modeloutput(Factory):
         self._capacity = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.capacity.arr, required_type=np.float32)
-        valid_boundaries(
-            self.capacity.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "capacity", raster, self.capacity.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         title = "Capacity [kg/year]"
 
@@ -1579,6 +1655,8 @@ class Modeloutput(Factory):
 
             ax: matplotlib.axes.Axes
             """
+            from matplotlib import colors
+
             fig, ax = axes_creator(fig, ax)
             arr = mask_array_with_val(self.capacity.arr, self.mask.arr, self.nodata)
             lower = log_scale_enabler(arr, cnorm="log")
@@ -1623,10 +1701,11 @@ class Modeloutput(Factory):
         self._rusle = self.raster_factory(raster, flag_mask=False)
 
         valid_array_type(self.capacity.arr, required_type=np.float32)
-        valid_boundaries(
-            self.rusle.arr[self.mask.arr != self.nodata], lower=0, upper=None
+        stats = self.context.get_statistics(
+            "rusle", raster, self.rusle.arr, inside_mask=True
         )
-        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.rp.epsg)
+        valid_boundaries(stats, lower=0, upper=None)
+        self.context.check_template(raster)
 
         title = "RUSLE [kg/(year.m²)]"
 
@@ -1879,7 +1958,7 @@ def make_routing_vct_saga(
             first_line = f.readline()
         seperator = ";" if "\t" not in first_line else "\t"
         # prepare the txt_file for conversion to routing shape
-        vct_temp, condition = prepare_make_routing_vct_saga(
+        txt_temp, vct_temp, condition = prepare_make_routing_vct_saga(
             txt_routing, vct_out, seperator, rstparams, extent, tile_number
         )
 
@@ -1887,7 +1966,7 @@ def make_routing_vct_saga(
         # routing table) don't run
         if condition:
             run_saga_make_routing_shp_cmd(
-                txt_routing,
+                txt_temp,
                 rst_prckrt,
                 vct_temp,
                 rstparams=rstparams,
@@ -1926,6 +2005,8 @@ def prepare_make_routing_vct_saga(
 
     Returns
     -------
+    txt_temp: pathlib.Path
+        File path of the (clipped) tab separated routing table.
     vct_temp: str
         The resulting vector file will contain following features:
 
@@ -1957,22 +2038,23 @@ def prepare_make_routing_vct_saga(
         )
         # rename files
         tag = f"_selected_{(0 if tile_number is None else tile_number)}"
-        txt_routing = txt_routing.parent / txt_routing.stem + tag + ".txt"
-        vct_temp = vct_out.parent / vct_out.stem + tag + ".shp"
-        if separator != "\t":
-            df_routing.to_csv(txt_routing, sep="\t", index=False)
+        txt_temp = txt_routing.parent / (txt_routing.stem + tag + ".txt")
+        vct_temp = vct_out.parent / (vct_out.stem + tag + ".shp")
+        df_routing = df_routing.drop(columns=["x", "y"])
+        df_routing.to_csv(txt_temp, sep="\t", index=False)
         # condition true if routing directions are found within extent
         condition = False if len(df_routing) == 0 else True
 
     else:
         # condition = True if no extent given
+        txt_temp = txt_routing
         vct_temp = vct_out
         condition = True
-        df_routing = open_txt_routing_file(txt_routing)
         if separator != "\t":
+            df_routing = open_txt_routing_file(txt_routing)
             df_routing.to_csv(txt_routing, sep="\t", index=False)
 
-    return vct_temp, condition
+    return txt_temp, vct_temp, condition
 
 
 def condition_routing_dataframe_on_extent(df_routing, rstparams, extent):
@@ -2112,6 +2194,17 @@ def run_saga_make_routing_shp_cmd(txt_routing, rst_prckrt, vct_out, rstparams=No
 
 
     """
+    execute_saga(_get_saga_make_routing_shp_cmd(txt_routing, rst_prckrt, vct_out))
+
+    epsg = _get_epsg_for_routing_vector(rstparams=rstparams, rst_prckrt=rst_prckrt)
+    _set_vector_epsg(vct_out, epsg)
+
+    create_spatial_index(vct_out)
+
+
+def _get_saga_make_routing_shp_cmd(txt_routing, rst_prckrt, vct_out):
+    """Get the saga make routing shape command, see
+    :func:`pywatemsedem.io.modeloutput.run_saga_make_routing_shp_cmd`."""
     cmd_args = ["saga_cmd", "-f=s", "topology", "2"]
     cmd_args += ["-ROUTING", str(txt_routing)]
     cmd_args += [
@@ -2119,12 +2212,87 @@ def run_saga_make_routing_shp_cmd(txt_routing, rst_prckrt, vct_out, rstparams=No
         str(rst_prckrt),
     ]
     cmd_args += ["-OUTPUTLINES", str(vct_out)]
-    execute_saga(cmd_args)
+    return cmd_args
+
+
+def make_routing_vct_saga_tiles(
+    txt_routing, rst_prckrt, vct_out, rstparams, extents, max_workers=None
+):
+    """Generate routing vector files for a list of tiles in one batch.
+
+    The routing table is clipped to every tile extent (see
+    :func:`pywatemsedem.io.modeloutput.prepare_make_routing_vct_saga`), after which
+    the saga commands of all tiles are run concurrently (see
+    :func:`pywatemsedem.geo.utils.execute_batch`). Tiles without routing segments
+    are skipped.
+
+    Parameters
+    ----------
+    txt_routing: pathlib.Path
+        File path of the WaTEM/SEDEM routing table
+    rst_prckrt: pathlib.Path | str
+        File path of the WaTEM/SEDEM 'perceelskaart' raster
+    vct_out: pathlib.Path
+        File path of the shape outputfile, the tile number is added to the file
+        name of every tile.
+    rstparams: dict
+        Raster properties with keys *minmax*, *res*, *nrows* and *epsg*, see
+        :func:`pywatemsedem.geo.utils.get_rstparams`.
+    extents: list of list
+        Extent of every tile [xmin, xmax, ymin, ymax], the position in the list is
+        used as tile number.
+    max_workers: int, default None
+        Maximum number of saga commands run at the same time, see
+        :func:`pywatemsedem.geo.utils.execute_batch`.
+
+    Returns
+    -------
+    dict
+        File path of the routing vector file (values) per tile number (keys), see
+        :func:`pywatemsedem.io.modeloutput.make_routing_vct_saga` for the features.
+
+    Raises
+    ------
+    IOError
+        If the saga command of a tile fails, before the vectors of the tiles are
+        post-processed.
+    """
+    if not txt_routing.exists():
+        msg = f"'{txt_routing}' does not exist!"
+        raise IOError(msg)
+
+    with open(txt_routing) as f:
+        first_line = f.readline()
+    separator = ";" if "\t" not in first_line else "\t"
+
+    tiles = {}
+    list_cmd_args = []
+    for tile_number, extent in enumerate(extents):
+        txt_temp, vct_temp, condition = prepare_make_routing_vct_saga(
+            txt_routing, vct_out, separator, rstparams, extent, tile_number
+        )
+        if condition:
+            tiles[tile_number] = vct_temp
+            list_cmd_args.append(
+                _get_saga_make_routing_shp_cmd(txt_temp, rst_prckrt, vct_temp)
+            )
+        else:
+            logger.warning(f"No routing segments within extent of tile {tile_number}.")
+    results = execute_batch(list_cmd_args, saga=True, max_workers=max_workers)
+    for tile_number, cmd_args, success in zip(tiles, list_cmd_args, results):
+        if not success:
+            msg = (
+                f"Could not create the routing vector of tile {tile_number}, "
+                f"command '{' '.join(str(arg) for arg in cmd_args)}' failed."
+            )
+            raise IOError(msg)
 
     epsg = _get_epsg_for_routing_vector(rstparams=rstparams, rst_prckrt=rst_prckrt)
-    _set_vector_epsg(vct_out, epsg)
+    for vct_temp in tiles.values():
+        _set_vector_epsg(vct_temp, epsg)
+        create_spatial_index(vct_temp)
 
-    create_spatial_index(vct_out)
+    return tiles
 
 
 def define_subcatchments_saga(
@@ -2133,6 +2301,8 @@ def define_subcatchments_saga(
     resmap,
     rasterprop,
     tag="",
+    vector_format="shapefile",
+    id_column="VALUE",
 ):
     """
     Define subcatchment for several points defined with a unique id in the
@@ -2156,6 +2326,11 @@ def define_subcatchments_saga(
         Name of catchment, default ""
     scenario_label: str, default ""
         Scenario number or letter.
+    vector_format: str, default "shapefile"
+        Format of the subcatchments vector, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
+    id_column: str, default "VALUE"
+        Name of the column of the subcatchments vector holding the id of the sink.
 
     Returns
     -------
@@ -2163,12 +2338,17 @@ def define_subcatchments_saga(
         File path of raster with pixels beloging to a subcatchment having id
         equal to id sink in rst_in
     vct_subcatchments: str or pathlib.Path | str:
-        File path of shapefile with polygon being the subcatchment having an
-        id equal         to id sink in rst_in
+        File path of vector with polygon being the subcatchment having an
+        id equal to id sink in rst_in
+
+    Note
+    ----
+    The polygons are written by saga to a temporary shapefile, the subcatchments
+    vector is written once.
     """
     # txt = os.path.join(self.scenario.outfolder, 'routing.txt')
     rst_subcatchments = resmap / f"subcatchments_{tag}.sdat"
-    vct_subcatchments = rst_subcatchments.with_suffix(".shp")
+    vct_subcatchments = rst_subcatchments.with_suffix("")
 
     startvals = np.unique(load_raster(rst_in)[0])
     if len(startvals) <= 1:
@@ -2180,14 +2360,18 @@ def define_subcatchments_saga(
     cmd_args += ["-CATCH", str(rst_subcatchments)]
 
     execute_saga(cmd_args)
-    raster_to_polygon(rst_subcatchments, vct_subcatchments)
-    create_spatial_index(vct_subcatchments)
-    gdf_subcatchments = gpd.read_file(vct_subcatchments)
+    vct_polygons = Path(create_filename(".shp"))
+    raster_to_polygon(rst_subcatchments, vct_polygons)
+    gdf_subcatchments = read_vector(vct_polygons)
+    clean_up_tempfiles(vct_polygons, "shp")
     gdf_subcatchments.drop(columns=["ID", "NAME"], inplace=True)
     gdf_subcatchments["VALUE"] = gdf_subcatchments["VALUE"].astype("int32")
     gdf_subcatchments["AREA_HA"] = gdf_subcatchments.area / 10000.0
     gdf_subcatchments = gdf_subcatchments.set_crs(rasterprop["epsg"])
-    gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
+    gdf_subcatchments = gdf_subcatchments.rename(columns={"VALUE": id_column})
+    vct_subcatchments = write_vector(
+        gdf_subcatchments, vct_subcatchments, vector_format
+    )
 
     return (
         (rst_subcatchments.parent / (rst_subcatchments.stem + ".sdat")),
@@ -2424,7 +2608,7 @@ def map_rank_sediment_loads(
     if unit not in ["kg", "ton"]:
         f"Unit '{unit}' should be either 'kg' op 'ton'."
 
-    rst_out = create_filename(".rst")
+    rst_out = create_filename(".tif")
     df_sedi_export, threshold = identify_rank_sediment_loads(
         rst_sedi_export, threshold, rst_out, rst_endpoints
     )
@@ -2438,7 +2622,7 @@ def map_rank_sediment_loads(
     gdf_out = gdf_out.dropna()
     gdf_out = gdf_out.set_crs(epsg=epsg)
     gdf_out.to_file(vct_out)
-    clean_up_tempfiles(Path(rst_out), "rst")
+    clean_up_tempfiles(Path(rst_out), "tiff")
 
 
 def identify_rank_sediment_loads(
@@ -2499,6 +2683,7 @@ def identify_rank_sediment_loads(
         rst_out,
         "float32",
         profile,
+        policy="intermediate",
     )
 
     return df_sedi_export, threshold
@@ -1,9 +1,6 @@
 import functools
 import logging
 
-import matplotlib.colors as mplcolors
-import matplotlib.patches as mpatches
-import matplotlib.pyplot as plt
 import numpy as np
 
 from ..geo.utils import mask_array_with_val
@@ -96,6 +93,8 @@ def plot_discrete_raster(
     ax: matplotlib.pyplot.axis
 
     """
+    import matplotlib.patches as mpatches
+
     im = ax.imshow(
         arr,
         cmap=cmap,
@@ -215,6 +214,8 @@ def axes_creator(fig, ax):
     ax: matplotlib.pyplot.axis
 
     """
+    import matplotlib.pyplot as plt
+
     if not ax:
         fig, ax = plt.subplots(figsize=[10, 10])
     return fig, ax
@@ -242,6 +243,8 @@ def normalising_function(mini, Q25, Q50, Q75, maxi):
 
 
     """
+    import matplotlib.colors as mplcolors
+
     _forward_custom = functools.partial(
         _forward, mini=mini, Q25=Q25, Q50=Q50, Q75=Q75, maxi=maxi
     )
@@ -339,6 +342,7 @@ def plot_cumulative_sedimentload(df, fname):
     fname: str or pathlib Path
         File path of output figure
     """
+    import matplotlib.pyplot as plt
 
     fig, ax = plt.subplots(2, 1, figsize=[10, 7.5])
 
@@ -373,6 +377,9 @@ def plot_landuse(arr, nodata, *args, **kwargs):
     nodata: int
         the nodata value
     """
+    import matplotlib.colors as mplcolors
+    import matplotlib.pyplot as plt
+
     plt.subplots(figsize=[10, 10])
 
     cmap = mplcolors.ListedColormap(
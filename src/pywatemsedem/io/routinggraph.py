@@ -0,0 +1,744 @@
+"""routinggraph.py
+
+This module holds the flow graph of the WaTEM/SEDEM routing table (see
+:ref:`here <watemsedem:routingtxt>`). Every cell of the model domain routes to at most
+two target cells, with the part of the flow to each target. The cells are the nodes
+of the graph (flat index of the raster, row-major), the routing vectors are the
+edges. The graph is stored as compressed sparse row (CSR) arrays of the downstream
+(forward) and upstream (reverse) edges, and is traversed per topological level, so
+the upstream areas of all targets are identified in one traversal and values (e.g.
+sediment loads) are summed per upstream area. The graph can be saved as an
+index folder of numpy arrays, which is loaded by memory-map. The arrays are written
+to a new version folder of the index, so a loaded graph is never overwritten. The
+index of the routing
+table of a model run is built once, in the model output folder (see
+:func:`build_routing_index`), and is rebuilt if the routing table is modified. A
+failed build is stored in the index, so it is not retried for the same routing table.
+
+Examples
+--------
+>>> from pywatemsedem.io.routinggraph import RoutingGraph
+>>> graph = RoutingGraph.from_routing(df_routing, (nrows, ncols))
+>>> incidence = graph.upstream_incidence(graph.to_flat(rows, cols))
+>>> arr_load = graph.upstream_sum(graph.to_flat(rows, cols), arr_sedi_out)
+>>> graph = load_routing_index(modeloutputfolder / "routing.txt", (nrows, ncols))
+"""
+
+import json
+import logging
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+import numpy as np
+
+from pywatemsedem.errors import PywatemsedemRoutingIndexError
+
+logger = logging.getLogger(__name__)
+
+#: Arrays of the graph stored in an index folder, see :func:`RoutingGraph.save`
+INDEX_ARRAYS = [
+    "indptr",
+    "indices",
+    "parts",
+    "distances",
+    "rev_indptr",
+    "rev_indices",
+    "rev_edges",
+    "order",
+    "level_ptr",
+]
+
+#: Name of the metadata file of an index folder
+INDEX_METADATA = "graph.json"
+
+#: Name of the index folder of a routing table, next to the routing table
+ROUTING_INDEX_FOLDER = "routing_graph"
+
+#: Name of the index folder of a routing table without river routing
+ROUTING_NONRIVER_INDEX_FOLDER = "routing_graph_nonriver"
+
+
+def _gather(indptr, indices, nodes):
+    """Get the neighbours of nodes in a CSR graph.
+
+    Parameters
+    ----------
+    indptr: numpy.ndarray
+        Index pointers of the CSR graph.
+    indices: numpy.ndarray
+        Neighbours of the CSR graph.
+    nodes: numpy.ndarray
+        Nodes to get the neighbours of.
+
+    Returns
+    -------
+    neighbours: numpy.ndarray
+        Neighbours of all nodes.
+    position: numpy.ndarray
+        Position in ``indices`` of every neighbour.
+    """
+    starts = indptr[nodes]
+    lengths = indptr[nodes + 1] - starts
+    position = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(
+        lengths.sum()
+    )
+    return indices[position], position
+
+
+def _to_csr(origin, destination, n_nodes):
+    """Sort edges by origin into CSR arrays.
+
+    Returns
+    -------
+    indptr: numpy.ndarray
+    indices: numpy.ndarray
+        Destination of every edge, sorted by origin.
+    order: numpy.ndarray
+        Index of every sorted edge in the input edges.
+    """
+    order = np.argsort(origin, kind="stable")
+    indptr = np.zeros(n_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(origin, minlength=n_nodes), out=indptr[1:])
+    return indptr, destination[order], order
+
+
+class RoutingGraph:
+    """Flow graph of a WaTEM/SEDEM routing table.
+
+    Parameters
+    ----------
+    shape: tuple
+        Shape (rows, columns) of the model rasters.
+    sources: numpy.ndarray
+        Flat index of the source cell of every edge.
+    targets: numpy.ndarray
+        Flat index of the target cell of every edge.
+    parts: numpy.ndarray
+        Part of the flow of the source cell routed to the target cell.
+    distances: numpy.ndarray
+        Length (m) of every edge.
+
+    Attributes
+    ----------
+    indptr, indices: numpy.ndarray
+        CSR arrays of the downstream edges: the targets of cell ``i`` are
+        ``indices[indptr[i]:indptr[i + 1]]``.
+    parts, distances: numpy.ndarray
+        Part and distance of the downstream edges (order of ``indices``).
+    rev_indptr, rev_indices: numpy.ndarray
+        CSR arrays of the upstream edges: the sources of cell ``i`` are
+        ``rev_indices[rev_indptr[i]:rev_indptr[i + 1]]``.
+    rev_edges: numpy.ndarray
+        Index of every upstream edge in the downstream edges.
+    cells: numpy.ndarray
+        Flat index of the source cell of every row of the routing table the graph
+        is created from (-1 if outside the model rasters), None if the graph is not
+        created from a routing table.
+    """
+
+    def __init__(self, shape, sources, targets, parts, distances):
+        self.shape = tuple(int(n) for n in shape)
+        self.n_cells = self.shape[0] * self.shape[1]
+        sources = np.asarray(sources, dtype=np.int64)
+        targets = np.asarray(targets, dtype=np.int64)
+
+        self.indptr, self.indices, order = _to_csr(sources, targets, self.n_cells)
+        self.parts = np.asarray(parts, dtype=np.float64)[order]
+        self.distances = np.asarray(distances, dtype=np.float64)[order]
+        sources = sources[order]
+        self.rev_indptr, self.rev_indices, self.rev_edges = _to_csr(
+            self.indices, sources, self.n_cells
+        )
+        self.cells = None
+        self._order = None
+        self._level_ptr = None
+
+    @classmethod
+    def from_routing(cls, df_routing, shape):
+        """Create the graph of a routing table.
+
+        Routing vectors without target (-99) or with a part of zero are not added.
+
+        Parameters
+        ----------
+        df_routing: pandas.DataFrame
+            Routing table, see
+            :func:`pywatemsedem.io.modeloutput.open_txt_routing_file`.
+        shape: tuple
+            Shape (rows, columns) of the model rasters.
+
+        Returns
+        -------
+        pywatemsedem.io.routinggraph.RoutingGraph
+        """
+        nrows, ncols = shape
+        rows = df_routing["row"].to_numpy(dtype=np.int64) - 1
+        cols = df_routing["col"].to_numpy(dtype=np.int64) - 1
+        sources, targets, parts, distances = [], [], [], []
+        for i in [1, 2]:
+            target_rows = df_routing[f"target{i}row"].to_numpy(dtype=np.int64) - 1
+            target_cols = df_routing[f"target{i}col"].to_numpy(dtype=np.int64) - 1
+            part = df_routing[f"part{i}"].to_numpy(dtype=np.float64)
+            cond = (
+                (part > 0)
+                & (target_rows >= 0)
+                & (target_rows < nrows)
+                & (target_cols >= 0)
+                & (target_cols < ncols)
+                & (rows >= 0)
+                & (rows < nrows)
+                & (cols >= 0)
+                & (cols < ncols)
+            )
+            sources.append(rows[cond] * ncols + cols[cond])
+            targets.append(target_rows[cond] * ncols + target_cols[cond])
+            parts.append(part[cond])
+            distances.append(
+                df_routing[f"distance{i}"].to_numpy(dtype=np.float64)[cond]
+            )
+        graph = cls(
+            shape,
+            np.concatenate(sources),
+            np.concatenate(targets),
+            np.concatenate(parts),
+            np.concatenate(distances),
+        )
+        inside = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+        graph.cells = np.where(inside, rows * ncols + cols, -1)
+        return graph
+
+    def save(self, folder, source=None):
+        """Save the graph as an index folder, see
+        :func:`pywatemsedem.io.routinggraph.RoutingGraph.load`.
+
+        The arrays are written to a new version folder in the index folder, after
+        which the metadata file is replaced by the metadata of the new version and
+        the previous versions are removed.
+
+        Parameters
+        ----------
+        folder: pathlib.Path | str
+            Folder path of the index, created if it does not exist.
+        source: dict, default None
+            Fingerprint of the routing table the graph is created from, see
+            :func:`pywatemsedem.io.routinggraph.build_routing_index`.
+        """
+        folder = Path(folder)
+        version = uuid.uuid4().hex
+        (folder / version).mkdir(parents=True)
+        arrays = {
+            "order": self.order,
+            "level_ptr": self.level_ptr,
+            **{name: getattr(self, name) for name in INDEX_ARRAYS[:7]},
+        }
+        if self.cells is not None:
+            arrays["cells"] = self.cells
+        for name, arr in arrays.items():
+            np.save(folder / version / f"{name}.npy", arr)
+        metadata = {
+            "shape": list(self.shape),
+            "n_edges": int(self.n_edges),
+            "source": source,
+            "version": version,
+        }
+        _write_metadata(folder, metadata)
+        # loaded graphs keep the memory-map of a removed version (files are only
+        # unlinked, never truncated)
+        for path in folder.iterdir():
+            if path.is_dir() and path.name != version:
+                shutil.rmtree(path, ignore_errors=True)
+
+    @classmethod
+    def load(cls, folder, mmap_mode="r"):
+        """Load a graph from an index folder.
+
+        Parameters
+        ----------
+        folder: pathlib.Path | str
+            Folder path of the index, see
+            :func:`pywatemsedem.io.routinggraph.RoutingGraph.save`.
+        mmap_mode: str, default "r"
+            Memory-map the arrays of the index, see :func:`numpy.load`. If None, the
+            arrays are read into memory.
+
+        Returns
+        -------
+        pywatemsedem.io.routinggraph.RoutingGraph
+        """
+        folder = Path(folder)
+        with open(folder / INDEX_METADATA) as f:
+            metadata = json.load(f)
+        folder = folder / metadata.get("version", "")
+        graph = cls.__new__(cls)
+        graph.shape = tuple(metadata["shape"])
+        graph.n_cells = graph.shape[0] * graph.shape[1]
+        for name in INDEX_ARRAYS[:7]:
+            setattr(graph, name, np.load(folder / f"{name}.npy", mmap_mode=mmap_mode))
+        graph._order = np.load(folder / "order.npy", mmap_mode=mmap_mode)
+        graph._level_ptr = np.load(folder / "level_ptr.npy", mmap_mode=mmap_mode)
+        cells = folder / "cells.npy"
+        graph.cells = np.load(cells, mmap_mode=mmap_mode) if cells.exists() else None
+        return graph
+
+    def drop_sources(self, cells):
+        """Get the graph without the edges of source cells.
+
+        E.g. the graph without river routing is the graph without the edges of the
+        river cells.
+
+        Parameters
+        ----------
+        cells: numpy.ndarray
+            Flat index of the source cells.
+
+        Returns
+        -------
+        pywatemsedem.io.routinggraph.RoutingGraph
+        """
+        drop = np.zeros(self.n_cells, dtype=bool)
+        drop[np.asarray(cells, dtype=np.int64)] = True
+        sources = np.repeat(np.arange(self.n_cells), np.diff(self.indptr))
+        keep = ~drop[sources]
+        graph = RoutingGraph(
+            self.shape,
+            sources[keep],
+            self.indices[keep],
+            self.parts[keep],
+            self.distances[keep],
+        )
+        if self.cells is not None:
+            cells = np.asarray(self.cells)
+            graph.cells = cells[(cells < 0) | ~drop[cells]]
+        return graph
+
+    @property
+    def n_edges(self):
+        """Number of edges (routing vectors) of the graph."""
+        return self.indices.size
+
+    def to_flat(self, rows, cols):
+        """Get the flat index of cells.
+
+        Parameters
+        ----------
+        rows, cols: numpy.ndarray
+            Row and column (zero-based) of the cells.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return np.ravel_multi_index(
+            (np.asarray(rows, dtype=np.int64), np.asarray(cols, dtype=np.int64)),
+            self.shape,
+        )
+
+    def to_rowcol(self, cells):
+        """Get the row and column (zero-based) of cells.
+
+        Parameters
+        ----------
+        cells: numpy.ndarray
+            Flat index of the cells.
+
+        Returns
+        -------
+        tuple of numpy.ndarray
+        """
+        return np.unravel_index(np.asarray(cells, dtype=np.int64), self.shape)
+
+    def _compute_levels(self):
+        """Compute the topological levels, from downstream to upstream.
+
+        A cell is in the level after the last level of its targets, so all targets
+        of a cell are in an earlier level (Kahn's algorithm).
+        """
+        outdegree = np.diff(self.indptr)
+        frontier = np.flatnonzero(outdegree == 0)
+        levels = []
+        while frontier.size > 0:
+            levels.append(frontier)
+            upstream, _ = _gather(self.rev_indptr, self.rev_indices, frontier)
+            upstream, counts = np.unique(upstream, return_counts=True)
+            outdegree[upstream] -= counts
+            frontier = upstream[outdegree[upstream] == 0]
+
+        order = np.concatenate(levels) if levels else np.array([], dtype=np.int64)
+        if order.size != self.n_cells:
+            msg = (
+                f"The routing contains a cycle: {self.n_cells - order.size} cells "
+                f"could not be ordered."
+            )
+            raise ValueError(msg)
+        self._order = order
+        self._level_ptr = np.cumsum([0] + [level.size for level in levels])
+
+    @property
+    def order(self):
+        """Flat index of all cells in topological order, from downstream to
+        upstream (every cell is ordered after its targets)."""
+        if self._order is None:
+            self._compute_levels()
+        return self._order
+
+    @property
+    def level_ptr(self):
+        """Index pointers of the topological levels in :attr:`order`."""
+        if self._level_ptr is None:
+            self._compute_levels()
+        return self._level_ptr
+
+    def levels(self):
+        """Iterate over the topological levels, from downstream to upstream.
+
+        Yields
+        ------
+        numpy.ndarray
+            Flat index of the cells of the level.
+        """
+        order, level_ptr = self.order, self.level_ptr
+        for start, stop in zip(level_ptr[:-1], level_ptr[1:]):
+            yield order[start:stop]
+
+    def upstream_incidence(self, cells):
+        """Get the upstream cells of every target cell.
+
+        The upstream area of a target holds the target cell and all cells routing
+        (a part of) their flow to the target. Upstream areas of nested targets
+        overlap. All targets are handled in one traversal: the set of targets
+        downstream of a cell is the union of the sets of its target cells, cells
+        with equal sets share the set.
+
+        Parameters
+        ----------
+        cells: numpy.ndarray
+            Flat index of the target cells, a cell can hold multiple targets.
+
+        Returns
+        -------
+        scipy.sparse.csr_array
+            Boolean incidence (targets x cells), True if the cell is upstream of
+            the target.
+        """
+        from scipy import sparse
+
+        cells = np.asarray(cells, dtype=np.int64)
+        if np.any((cells < 0) | (cells >= self.n_cells)):
+            msg = "Target cells are not located in the routing graph."
+            raise ValueError(msg)
+
+        # target sets, set 0 is the empty set
+        sets = [()]
+        memo = {(): 0}
+
+        def get_set_id(targets):
+            key = tuple(sorted(set(targets)))
+            if key not in memo:
+                memo[key] = len(sets)
+                sets.append(key)
+            return memo[key]
+
+        own = np.zeros(self.n_cells, dtype=np.int64)
+        order = np.argsort(cells, kind="stable")
+        target_cells, starts = np.unique(cells[order], return_index=True)
+        for cell, group in zip(target_cells, np.split(order, starts[1:])):
+            own[cell] = get_set_id(group.tolist())
+
+        set_ids = np.zeros(self.n_cells, dtype=np.int64)
+        combinations = {}
+        for level in self.levels():
+            start = self.indptr[level]
+            degree = self.indptr[level + 1] - start
+            if np.any(degree > 2):
+                msg = "Cells of the routing graph have more than two targets."
+                raise ValueError(msg)
+            first = np.zeros(level.size, dtype=np.int64)
+            first[degree > 0] = set_ids[self.indices[start[degree > 0]]]
+            second = np.zeros(level.size, dtype=np.int64)
+            second[degree > 1] = set_ids[self.indices[start[degree > 1] + 1]]
+            own_level = own[level]
+
+            # the set of a cell equals the set of its target(s)
+            copy = (own_level == 0) & ((first == 0) | (second == 0) | (first == second))
+            set_ids[level[copy]] = np.where(first[copy] == 0, second[copy], first[copy])
+
+            # target cells and cells routing to two different sets: union of sets
+            merge = ~copy
+            if np.any(merge):
+                keys = np.stack([own_level[merge], first[merge], second[merge]], axis=1)
+                keys, inverse = np.unique(keys, axis=0, return_inverse=True)
+                merged = np.empty(len(keys), dtype=np.int64)
+                for i, key in enumerate(map(tuple, keys.tolist())):
+                    if key not in combinations:
+                        combinations[key] = get_set_id(
+                            sets[key[0]] + sets[key[1]] + sets[key[2]]
+                        )
+                    merged[i] = combinations[key]
+                set_ids[level[merge]] = merged[inverse.ravel()]
+
+        set_lengths = np.array([len(targets) for targets in sets], dtype=np.int64)
+        set_ptr = np.zeros(len(sets) + 1, dtype=np.int64)
+        np.cumsum(set_lengths, out=set_ptr[1:])
+        set_targets = np.array(
+            [target for targets in sets for target in targets], dtype=np.int64
+        )
+        upstream = np.flatnonzero(set_ids)
+        rows, position = _gather(set_ptr, set_targets, set_ids[upstream])
+        cols = np.repeat(upstream, set_lengths[set_ids[upstream]])
+        logger.debug(
+            f"Upstream incidence of {cells.size} targets: {len(sets)} target sets, "
+            f"{rows.size} cells."
+        )
+        return sparse.csr_array(
+            (np.ones(rows.size, dtype=bool), (rows, cols)),
+            shape=(cells.size, self.n_cells),
+        )
+
+    def upstream_sum(self, cells, values, exclusive=False):
+        """Sum values over the upstream area of target cells.
+
+        Every upstream cell is counted once per target, regardless of the part of
+        its flow reaching the target, see
+        :func:`pywatemsedem.io.routinggraph.RoutingGraph.upstream_incidence`.
+
+        Parameters
+        ----------
+        cells: numpy.ndarray
+            Flat index of the target cells.
+        values: numpy.ndarray
+            Value of every cell (flattened or with the shape of the graph).
+        exclusive: bool, default False
+            Count a cell only for the first target (in order of ``cells``) it is
+            upstream of, so the sums of overlapping upstream areas add up.
+
+        Returns
+        -------
+        numpy.ndarray
+            Sum per target.
+        """
+        values = np.asarray(values, dtype=np.float64).ravel()
+        incidence = self.upstream_incidence(cells)
+        if not exclusive:
+            return incidence.astype(np.float64) @ values
+        covered = np.zeros(self.n_cells, dtype=bool)
+        sums = np.zeros(incidence.shape[0], dtype=np.float64)
+        for i in range(incidence.shape[0]):
+            upstream = incidence.indices[incidence.indptr[i] : incidence.indptr[i + 1]]
+            upstream = upstream[~covered[upstream]]
+            sums[i] = values[upstream].sum()
+            covered[upstream] = True
+        return sums
+
+
+def incidence_to_polygons(incidence, shape, transform):
+    """Polygonize the upstream areas of an incidence matrix.
+
+    Only the window of the cells of every upstream area is polygonized.
+
+    Parameters
+    ----------
+    incidence: scipy.sparse.csr_array
+        Incidence (targets x cells), see
+        :func:`pywatemsedem.io.routinggraph.RoutingGraph.upstream_incidence`.
+    shape: tuple
+        Shape (rows, columns) of the model rasters.
+    transform: affine.Affine
+        Transform of the model rasters.
+
+    Returns
+    -------
+    list of shapely.geometry.base.BaseGeometry
+        (Multi)polygon of every target, None if the target has no cells.
+    """
+    import rasterio.features
+    import rasterio.windows
+    import shapely
+    from shapely.geometry import shape as to_shape
+
+    incidence = incidence.tocsr()
+    polygons = []
+    for i in range(incidence.shape[0]):
+        cells = incidence.indices[incidence.indptr[i] : incidence.indptr[i + 1]]
+        if cells.size == 0:
+            polygons.append(None)
+            continue
+        rows, cols = np.unravel_index(cells, shape)
+        row_start, col_start = rows.min(), cols.min()
+        arr = np.zeros(
+            (rows.max() - row_start + 1, cols.max() - col_start + 1), dtype=np.uint8
+        )
+        arr[rows - row_start, cols - col_start] = 1
+        window = rasterio.windows.Window(
+            col_start, row_start, arr.shape[1], arr.shape[0]
+        )
+        window_transform = rasterio.windows.transform(window, transform)
+        geoms = [
+            to_shape(geom)
+            for geom, _ in rasterio.features.shapes(
+                arr, mask=arr == 1, transform=window_transform
+            )
+        ]
+        polygons.append(shapely.union_all(geoms))
+    return polygons
+
+
+def get_routing_fingerprint(txt_routing):
+    """Get the fingerprint (name, size and modification time) of a routing table.
+
+    Parameters
+    ----------
+    txt_routing: pathlib.Path | str
+        File path of the WaTEM/SEDEM routing table.
+
+    Returns
+    -------
+    dict
+    """
+    stat = Path(txt_routing).stat()
+    return {
+        "name": Path(txt_routing).name,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+    }
+
+
+def _write_metadata(folder, metadata):
+    """Write the metadata file of an index folder, replacing the existing file in
+    one step."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp = folder / f"{INDEX_METADATA}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(metadata, f)
+    os.replace(tmp, folder / INDEX_METADATA)
+
+
+def _get_index_source(txt_routing, key=None):
+    """Get the source of an index: the fingerprint of the routing table and the
+    key of the dropped source cells (as stored in the json metadata)."""
+    source = get_routing_fingerprint(txt_routing)
+    if key is not None:
+        source["key"] = json.loads(json.dumps(key))
+    return source
+
+
+def build_routing_index(txt_routing, shape, folder=None, drop_sources=None, key=None):
+    """Build the index folder of the graph of a routing table.
+
+    Parameters
+    ----------
+    txt_routing: pathlib.Path | str
+        File path of the WaTEM/SEDEM routing table, see
+        :func:`pywatemsedem.io.modeloutput.open_txt_routing_file`.
+    shape: tuple
+        Shape (rows, columns) of the model rasters.
+    folder: pathlib.Path | str, default None
+        Folder path of the index, defaults to :data:`ROUTING_INDEX_FOLDER` next to
+        the routing table.
+    drop_sources: callable, default None
+        Function returning the flat index of the source cells of which the routing
+        is not added to the graph (e.g. the river cells), see
+        :func:`pywatemsedem.io.routinggraph.RoutingGraph.drop_sources`. The graph
+        is derived from the (full) index of the routing table.
+    key: object, default None
+        JSON serializable key of the cells of ``drop_sources`` (e.g. the file
+        fingerprint of the land use raster), stored in the index.
+
+    Returns
+    -------
+    folder: pathlib.Path
+        Folder path of the index.
+
+    Raises
+    ------
+    pywatemsedem.errors.PywatemsedemRoutingIndexError
+        If the graph can not be built (e.g. the routing table holds a cycle). The
+        error is stored in the index, see
+        :func:`pywatemsedem.io.routinggraph.load_routing_index`.
+    """
+    from pywatemsedem.io.modeloutput import open_txt_routing_file
+
+    txt_routing = Path(txt_routing)
+    folder = Path(
+        txt_routing.parent / ROUTING_INDEX_FOLDER if folder is None else folder
+    )
+    source = None
+    try:
+        source = _get_index_source(txt_routing, key)
+        if drop_sources is None:
+            df_routing = open_txt_routing_file(txt_routing)
+            graph = RoutingGraph.from_routing(df_routing, shape)
+        else:
+            graph = load_routing_index(txt_routing, shape).drop_sources(drop_sources())
+        graph.save(folder, source=source)
+    except Exception as e:
+        if source is not None:
+            metadata = {"shape": list(shape), "source": source, "error": str(e)}
+            try:
+                _write_metadata(folder, metadata)
+            except OSError:
+                pass
+        msg = f"Routing graph index '{folder}' could not be built ({e})."
+        raise PywatemsedemRoutingIndexError(msg) from e
+    logger.info(f"Built routing graph index '{folder}' ({graph.n_edges} edges).")
+    return folder
+
+
+def load_routing_index(
+    txt_routing, shape, folder=None, mmap_mode="r", drop_sources=None, key=None
+):
+    """Load the graph of a routing table from its index folder.
+
+    The index is (re)built if it does not exist, or if the routing table, the
+    shape of the model rasters or the key differ from the index, see
+    :func:`pywatemsedem.io.routinggraph.build_routing_index`. A failed build of
+    the same routing table, shape and key is not retried.
+
+    Parameters
+    ----------
+    txt_routing: pathlib.Path | str
+        File path of the WaTEM/SEDEM routing table.
+    shape: tuple
+        Shape (rows, columns) of the model rasters.
+    folder: pathlib.Path | str, default None
+        See :func:`pywatemsedem.io.routinggraph.build_routing_index`.
+    mmap_mode: str, default "r"
+        See :func:`pywatemsedem.io.routinggraph.RoutingGraph.load`.
+    drop_sources: callable, default None
+        See :func:`pywatemsedem.io.routinggraph.build_routing_index`.
+    key: object, default None
+        See :func:`pywatemsedem.io.routinggraph.build_routing_index`.
+
+    Returns
+    -------
+    pywatemsedem.io.routinggraph.RoutingGraph
+
+    Raises
+    ------
+    pywatemsedem.errors.PywatemsedemRoutingIndexError
+        If the graph can not be built, or a failed build is stored in the index.
+    """
+    txt_routing = Path(txt_routing)
+    folder = Path(
+        txt_routing.parent / ROUTING_INDEX_FOLDER if folder is None else folder
+    )
+    metadata = None
+    if (folder / INDEX_METADATA).exists():
+        with open(folder / INDEX_METADATA) as f:
+            metadata = json.load(f)
+    if (
+        metadata is None
+        or not txt_routing.exists()
+        or metadata.get("source") != _get_index_source(txt_routing, key)
+        or tuple(metadata["shape"]) != tuple(shape)
+    ):
+        build_routing_index(txt_routing, shape, folder, drop_sources, key)
+    elif "error" in metadata:
+        msg = (
+            f"Routing graph index '{folder}' could not be built "
+            f"({metadata['error']})."
+        )
+        raise PywatemsedemRoutingIndexError(msg)
+    return RoutingGraph.load(folder, mmap_mode=mmap_mode)
@@ -0,0 +1,285 @@
+"""spatialcontext.py
+
+This module holds the spatial context of a WaTEM/SEDEM model run: the raster
+metadata (rstparams), the raster properties and the mask (raster and vector) of the
+model input folder. The context is shared (memoized) between all
+:class:`pywatemsedem.io.modelinput.Modelinput`,
+:class:`pywatemsedem.io.modeloutput.Modeloutput` and
+:class:`pywatemsedem.postprocess.PostProcess` instances of the same model input
+folder, so the template raster is only opened and the mask is only created once.
+The context also caches the validation of the rasters of the folder (statistics and
+template check) per file fingerprint, so a raster loaded again is not revalidated.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from copy import copy
+from pathlib import Path
+
+from pywatemsedem.geo.factory import Factory
+from pywatemsedem.geo.utils import (
+    check_raster_properties_raster_with_template,
+    get_auxiliary_files,
+    get_rstparams,
+)
+from pywatemsedem.io.ini import get_item_from_ini
+from pywatemsedem.io.valid import compute_array_statistics
+
+logger = logging.getLogger(__name__)
+
+#: Maximum number of spatial contexts kept in memory
+MAX_SPATIAL_CONTEXTS = 32
+
+#: Maximum number of array statistics cached per spatial context
+MAX_CACHED_STATISTICS = 128
+
+_spatial_contexts = OrderedDict()
+_lock = threading.Lock()
+
+
+class SpatialContext:
+    """Spatial properties of the model input folder of a WaTEM/SEDEM ini-file.
+
+    All properties are computed on first access. Use
+    :func:`pywatemsedem.io.spatialcontext.get_spatial_context` to get a shared
+    instance.
+
+    Parameters
+    ----------
+    ini: pathlib.Path
+        File path of the WaTEM/SEDEM ini-file.
+    epsg: int
+        See :class:`pywatemsedem.geo.rasterproperties.RasterProperties`.
+    """
+
+    def __init__(self, ini, epsg):
+        self.ini = Path(ini)
+        self.epsg = epsg
+        self.modelinputfolder = Path(
+            get_item_from_ini(ini, "Working directories", "input directory", str)
+        )
+        self.mask_file = self.modelinputfolder / get_item_from_ini(
+            ini, "Files", "shapefile catchment", str
+        )
+        self._rstparams = None
+        self._profile = None
+        self._factory = None
+        self._statistics = OrderedDict()
+        self._valid_templates = set()
+        self._lock = threading.Lock()
+
+    @property
+    def rstparams(self):
+        """rasterio profile of the template (P-factor) raster, see
+        :func:`pywatemsedem.geo.utils.get_rstparams`."""
+        if self._rstparams is None:
+            self._rstparams, self._profile = get_rstparams(self.ini, epsg=self.epsg)
+        return self._rstparams
+
+    @property
+    def profile(self):
+        """Raster profile of the template (P-factor) raster, see
+        :func:`pywatemsedem.geo.utils.get_rstparams`."""
+        if self._profile is None:
+            self._rstparams, self._profile = get_rstparams(self.ini, epsg=self.epsg)
+        return self._profile
+
+    @property
+    def resolution(self):
+        """Resolution (m) of the model rasters."""
+        return int(abs(self.rstparams["transform"][0]))
+
+    @property
+    def nodata(self):
+        """Nodata value of the model rasters."""
+        return self.rstparams["nodata"]
+
+    @property
+    def factory(self):
+        """Factory holding the mask, the mask files are written to the ``factory``
+        folder of the model input folder."""
+        with self._lock:
+            if self._factory is None:
+                factory = Factory(
+                    self.resolution, self.epsg, self.nodata, self.modelinputfolder
+                )
+                factory.mask = self.mask_file
+                self._factory = factory
+        return self._factory
+
+    @property
+    def rp(self):
+        """RasterProperties, see
+        :class:`pywatemsedem.geo.rasterproperties.RasterProperties`."""
+        return self.factory.rp
+
+    @property
+    def mask(self):
+        """Mask raster, see :class:`pywatemsedem.geo.rasters.RasterMemory`."""
+        return self.factory.mask
+
+    @property
+    def vct_mask(self):
+        """Mask vector, see :class:`pywatemsedem.geo.vectors.VectorFile`."""
+        return self.factory.vct_mask
+
+    def get_statistics(self, name, raster, arr, inside_mask=False, values=False):
+        """Get the statistics of a raster array, cached per file fingerprint.
+
+        Parameters
+        ----------
+        name: str
+            Name of the raster (e.g. the property of
+            :class:`pywatemsedem.io.modeloutput.Modeloutput`), the statistics are
+            cached per name, as the loaded array depends on the load options.
+        raster: pathlib.Path | str
+            File path of the raster the array is loaded from. If not a file path,
+            the statistics are not cached.
+        arr: numpy.ndarray
+            Raster array loaded from ``raster``.
+        inside_mask: bool, default False
+            Only compute the statistics of the cells within the mask.
+        values: bool, default False
+            See :func:`pywatemsedem.io.valid.compute_array_statistics`.
+
+        Returns
+        -------
+        pywatemsedem.io.valid.ArrayStatistics
+        """
+        key = None
+        if isinstance(raster, (str, Path)):
+            key = (
+                name,
+                get_file_fingerprint(raster),
+                arr.dtype.str,
+                arr.shape,
+                inside_mask,
+                values,
+            )
+            with self._lock:
+                if key in self._statistics:
+                    self._statistics.move_to_end(key)
+                    return self._statistics[key]
+
+        if inside_mask:
+            arr = arr[self.mask.arr != self.nodata]
+        stats = compute_array_statistics(arr, values=values)
+
+        if key is not None:
+            with self._lock:
+                self._statistics[key] = stats
+                if len(self._statistics) > MAX_CACHED_STATISTICS:
+                    self._statistics.popitem(last=False)
+        return stats
+
+    def check_template(self, raster):
+        """Check if extent and resolution of a raster align with the template.
+
+        See :func:`pywatemsedem.geo.utils.check_raster_properties_raster_with_template`.
+        A raster is only checked once per file fingerprint.
+
+        Parameters
+        ----------
+        raster: pathlib.Path | str
+            File path of the raster.
+        """
+        key = get_file_fingerprint(raster)
+        if key in self._valid_templates:
+            return
+        check_raster_properties_raster_with_template(self.rp, raster, epsg=self.epsg)
+        with self._lock:
+            self._valid_templates.add(key)
+
+    def share_mask(self, factory):
+        """Set the raster properties and mask of the context to a factory.
+
+        The mask objects are (shallow) copies, so attributes set on the mask of
+        the factory (e.g. a plot function) are not shared, the arrays are.
+
+        Parameters
+        ----------
+        factory: pywatemsedem.geo.factory.Factory
+        """
+        factory.rp = self.rp
+        factory._mask = copy(self.mask)
+        factory._vct_mask = copy(self.vct_mask)
+
+
+def _get_mtime(file_path):
+    """Get modification time of a file, None if the file does not exist."""
+    file_path = Path(file_path)
+    return file_path.stat().st_mtime if file_path.exists() else None
+
+
+def get_file_fingerprint(file_path):
+    """Get the fingerprint of a file: its (resolved) path and the size and
+    modification time of the file and its auxiliary files.
+
+    Parameters
+    ----------
+    file_path: pathlib.Path | str
+
+    Returns
+    -------
+    tuple
+    """
+    file_path = Path(file_path).resolve()
+    stats = []
+    for file in get_auxiliary_files(file_path):
+        stat = file.stat()
+        stats.append((file.name, stat.st_size, stat.st_mtime_ns))
+    return (str(file_path), tuple(stats))
+
+
+def get_spatial_context(ini, epsg):
+    """Get the (shared) spatial context of a WaTEM/SEDEM ini-file.
+
+    The context is shared between all ini-files with the same model input folder,
+    template (P-factor) raster, mask file and EPSG code. A new context is created if
+    the template raster or mask file is modified.
+
+    Parameters
+    ----------
+    ini: pathlib.Path | str
+        File path of the WaTEM/SEDEM ini-file.
+    epsg: int
+        See :class:`pywatemsedem.geo.rasterproperties.RasterProperties`.
+
+    Returns
+    -------
+    pywatemsedem.io.spatialcontext.SpatialContext
+    """
+    modelinputfolder = Path(
+        get_item_from_ini(ini, "Working directories", "input directory", str)
+    ).resolve()
+    template = modelinputfolder / get_item_from_ini(
+        ini, "Files", "p factor map filename", str
+    )
+    mask_file = modelinputfolder / get_item_from_ini(
+        ini, "Files", "shapefile catchment", str
+    )
+    key = (
+        modelinputfolder,
+        template.name,
+        _get_mtime(template),
+        mask_file.name,
+        _get_mtime(mask_file),
+        epsg,
+    )
+    with _lock:
+        if key in _spatial_contexts:
+            _spatial_contexts.move_to_end(key)
+            return _spatial_contexts[key]
+        context = SpatialContext(ini, epsg)
+        _spatial_contexts[key] = context
+        if len(_spatial_contexts) > MAX_SPATIAL_CONTEXTS:
+            _spatial_contexts.popitem(last=False)
+        logger.debug(f"Created spatial context for '{modelinputfolder}'.")
+    return context
+
+
+def clear_spatial_contexts():
+    """Remove all shared spatial contexts."""
+    with _lock:
+        _spatial_contexts.clear()
@@ -1,15 +1,174 @@
 import warnings
+from dataclasses import dataclass
 
 import numpy as np
 
+#: Number of array elements processed at once by :func:`compute_array_statistics`
+STATISTICS_CHUNK_SIZE = 2**18
+
+#: Integer types for which :func:`compute_array_statistics` counts all values
+HISTOGRAM_DTYPES = [np.bool_, np.int8, np.uint8, np.int16, np.uint16]
+
+
+@dataclass(frozen=True)
+class ArrayStatistics:
+    """Statistics of an array, see
+    :func:`pywatemsedem.io.valid.compute_array_statistics`.
+
+    Attributes
+    ----------
+    dtype: numpy.dtype
+        Data type of the array.
+    size: int
+        Number of elements.
+    nan_count: int
+        Number of NaN values.
+    min: numpy.number
+        Minimum value (NaN values excluded), None if there are no values.
+    max: numpy.number
+        Maximum value (NaN values excluded), None if there are no values.
+    values: numpy.ndarray
+        Unique values, None if not computed.
+    counts: numpy.ndarray
+        Number of elements of every unique value, None if not computed.
+    """
+
+    dtype: np.dtype
+    size: int
+    nan_count: int
+    min: object
+    max: object
+    values: np.ndarray = None
+    counts: np.ndarray = None
+
+    def without(self, *values):
+        """Get the statistics of the array without the elements of one or more
+        values (e.g. the nodata value).
+
+        Parameters
+        ----------
+        *values
+            Values to exclude.
+
+        Returns
+        -------
+        pywatemsedem.io.valid.ArrayStatistics
+
+        Raises
+        ------
+        ValueError
+            If the statistics hold no values.
+        """
+        if self.values is None:
+            msg = "Statistics of the array hold no values, compute with values."
+            raise ValueError(msg)
+        keep = ~np.isin(self.values, values)
+        unique, counts = self.values[keep], self.counts[keep]
+        finite = unique[~np.isnan(unique)] if unique.dtype.kind == "f" else unique
+        return ArrayStatistics(
+            self.dtype,
+            int(counts.sum()),
+            self.nan_count,
+            finite[0] if finite.size else None,
+            finite[-1] if finite.size else None,
+            unique,
+            counts,
+        )
+
+
+def compute_array_statistics(arr, values=False, chunk_size=STATISTICS_CHUNK_SIZE):
+    """Compute minimum, maximum, NaN count and value counts of an array in one pass.
+
+    The array is processed in chunks, so every element is only read once from
+    memory. For small integer types (see :data:`HISTOGRAM_DTYPES`) all values are
+    counted with a histogram, minimum and maximum are derived from the histogram.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray
+        Input array.
+    values: bool, default False
+        Compute the unique values and their counts for types that are not in
+        :data:`HISTOGRAM_DTYPES` (requires an additional sort of the array).
+    chunk_size: int, default STATISTICS_CHUNK_SIZE
+        Number of elements processed at once.
+
+    Returns
+    -------
+    pywatemsedem.io.valid.ArrayStatistics
+    """
+    arr = np.ravel(np.asarray(arr))
+    dtype = arr.dtype
+    if not np.issubdtype(dtype, np.number) and dtype != np.bool_:
+        msg = f"Cannot compute statistics of an array of type '{dtype}'."
+        raise TypeError(msg)
+
+    if any(dtype == histogram_dtype for histogram_dtype in HISTOGRAM_DTYPES):
+        if dtype == np.bool_:
+            arr = arr.view(np.uint8)
+        offset = -int(np.iinfo(arr.dtype).min)
+        histogram = np.zeros(2 ** (8 * arr.dtype.itemsize), dtype=np.int64)
+        for start in range(0, arr.size, chunk_size):
+            chunk = arr[start : start + chunk_size].astype(np.int32) + offset
+            histogram += np.bincount(chunk, minlength=histogram.size)
+        present = np.flatnonzero(histogram)
+        unique = (present - offset).astype(dtype)
+        return ArrayStatistics(
+            dtype,
+            arr.size,
+            0,
+            unique[0] if unique.size else None,
+            unique[-1] if unique.size else None,
+            unique,
+            histogram[present],
+        )
+
+    is_float = np.issubdtype(dtype, np.floating)
+    arr_min, arr_max, nan_count = None, None, 0
+    for start in range(0, arr.size, chunk_size):
+        chunk = arr[start : start + chunk_size]
+        if is_float:
+            # fmin/fmax ignore NaN values (NaN only if all values are NaN)
+            chunk_min, chunk_max = np.fmin.reduce(chunk), np.fmax.reduce(chunk)
+            nan_count += int(np.count_nonzero(chunk != chunk))
+        else:
+            chunk_min, chunk_max = chunk.min(), chunk.max()
+        arr_min = chunk_min if arr_min is None else np.fmin(arr_min, chunk_min)
+        arr_max = chunk_max if arr_max is None else np.fmax(arr_max, chunk_max)
+    if nan_count == arr.size:
+        arr_min, arr_max = None, None
+
+    unique, counts = None, None
+    if values:
+        unique, counts = np.unique(arr, return_counts=True)
+    return ArrayStatistics(dtype, arr.size, nan_count, arr_min, arr_max, unique, counts)
+
+
+def get_array_statistics(arr):
+    """Get the statistics of an array.
+
+    Parameters
+    ----------
+    arr: numpy.ndarray or pywatemsedem.io.valid.ArrayStatistics
+        Input array or its precomputed statistics.
+
+    Returns
+    -------
+    pywatemsedem.io.valid.ArrayStatistics
+    """
+    if isinstance(arr, ArrayStatistics):
+        return arr
+    return compute_array_statistics(arr)
+
 
 def valid_boundaries(arr, lower=None, upper=None, tolerance=None):
     """Checks if values are within specified boundaries.
 
     Parameters
     ----------
-    arr : numpy.ndarray
-        Input array.
+    arr : numpy.ndarray or pywatemsedem.io.valid.ArrayStatistics
+        Input array or its statistics, see
+        :func:`pywatemsedem.io.valid.compute_array_statistics`.
     lower : int or float, default None
         Lower boundary.
     upper : int or float, default None
@@ -40,13 +199,16 @@ def valid_boundaries(arr, lower=None, upper=None, tolerance=None):
     if tolerance < 0:
         raise ValueError("Tolerance should be >= 0.")
 
+    if (lower is not None) or (upper is not None):
+        stats = get_array_statistics(arr)
+
     if upper is not None:
         if not isinstance(upper, (int, float)):
             raise TypeError("Upper boundary should be numeric.")
 
         effective_upper = upper + tolerance
 
-        if np.any(arr > effective_upper):
+        if (stats.max is not None) and (stats.max > effective_upper):
             raise ValueError(
                 f"Values are higher than upper bound "
                 f"('{upper}') with tolerance ('{tolerance}')"
@@ -58,7 +220,7 @@ def valid_boundaries(arr, lower=None, upper=None, tolerance=None):
 
         effective_lower = lower - tolerance
 
-        if np.any(arr < effective_lower):
+        if (stats.min is not None) and (stats.min < effective_lower):
             raise ValueError(
                 f"Values are lower than lower bound "
                 f"('{lower}') with tolerance ('{tolerance}')"
@@ -74,8 +236,9 @@ def valid_values(arr, unique_values):
 
     Parameters
     ----------
-    arr: numpy.ndarray
-        Input array
+    arr: numpy.ndarray or pywatemsedem.io.valid.ArrayStatistics
+        Input array or its statistics (with values), see
+        :func:`pywatemsedem.io.valid.compute_array_statistics`.
     unique_values: list
         Unique values that the raster can have
 
@@ -83,8 +246,15 @@ def valid_values(arr, unique_values):
     -------
     True
     """
-
-    if not (set(np.unique(arr)).issubset(set(unique_values))):
+    if isinstance(arr, ArrayStatistics):
+        if arr.values is None:
+            msg = "Statistics of the array hold no values, compute with values."
+            raise ValueError(msg)
+        values = arr.values
+    else:
+        values = compute_array_statistics(arr, values=True).values
+
+    if not (set(values.tolist()).issubset(set(unique_values))):
         msg = "The array contains values that are not present in unique_values"
         raise ValueError(msg)
 
@@ -96,15 +266,16 @@ def valid_non_nan(arr):
 
     Parameters
     ----------
-    arr: numpy.ndarray
-        Input array
+    arr: numpy.ndarray or pywatemsedem.io.valid.ArrayStatistics
+        Input array or its statistics, see
+        :func:`pywatemsedem.io.valid.compute_array_statistics`.
 
     Returns
     -------
     True
     """
 
-    if np.any(np.isnan(arr)):
+    if get_array_statistics(arr).nan_count > 0:
         msg = "Input array can not contain nan values"
         raise ValueError(msg)
 
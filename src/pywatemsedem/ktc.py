@@ -3,9 +3,13 @@
 This module contains functions for creating the ktc raster.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 
-from pywatemsedem.geo.utils import clean_up_tempfiles, create_filename
+from pywatemsedem.cfactor import CfactorEngine
+from pywatemsedem.defaults import RASTER_DTYPES
+from pywatemsedem.geo.rasters import RasterMemory
 from pywatemsedem.grasstrips import scale_ktc_with_grass_strip_width, scale_ktc_zhang
 
 
@@ -18,6 +22,7 @@ def create_ktc(
     ktc_limit,
     grass=None,
     correction_width=True,
+    engine=None,
 ):
     """Create ktc raster based on C-factor raster
 
@@ -49,51 +54,178 @@ def create_ktc(
     grass: pywatemsedem.geo.vectors.AbstractVector
     correction_width: bool, default True
         Scale kTC according to width of grass strip.
+    engine: pywatemsedem.cfactor.CfactorEngine, default None
+        See :class:`pywatemsedem.ktc.KtcBuilder`.
 
     Returns
     -------
     arr_ktc: numpy.ndarray
-        kTC values.
+        kTC values (float 32, see :data:`pywatemsedem.defaults.RASTER_DTYPES`).
     grass: pywatemsedem.geo.vectors.AbstractVector
         Updated grass strips
     """
 
-    tiff_temp = create_filename(".tif")
-    mask.write(tiff_temp, format="tiff")
+    builder = KtcBuilder(
+        composite_landuse,
+        cfactor,
+        mask,
+        grass=grass,
+        correction_width=correction_width,
+        engine=engine,
+    )
+    arr_ktc = builder.create(ktc_low, ktc_high, ktc_limit)
 
-    # reclass based on C-factor
-    arr_ktc = np.where(cfactor <= ktc_limit, ktc_low, ktc_high)
+    return arr_ktc, grass
 
-    # give certain landuse classes an extremely high ktc-value
-    arr_ktc = np.where(np.isin(composite_landuse, [-2, -1, -5]), 9999, arr_ktc)
 
-    # set KTC outside modeldomain to zero
-    # KTC_arr = np.where(self.catchm.binarr == 1, KTC_arr, 0)
+class KtcBuilder:
+    """Create ktc rasters for many (ktc_low, ktc_high, ktc_limit) combinations.
 
-    if correction_width is not None and not grass.is_empty():
+    The composite landuse, C-factor and grass strips are classified once in a class
+    raster:
 
-        grass._geodata = scale_ktc_gdf_grass_strips(
-            grass.geodata,
-            ktc_low,
-            ktc_high,
-        )
-        arr_grass = grass.rasterize(tiff_temp, mask.rp.epsg, col="KTC", gdal=False)
-        arr_ktc = np.where(
-            np.logical_and(composite_landuse == -6, arr_grass != mask.rp.nodata),
-            arr_grass,
-            arr_ktc,
-        )
-        arr_ktc = np.where(
-            np.logical_and(composite_landuse == -6, arr_grass == mask.rp.nodata),
-            ktc_low,
-            arr_ktc,
+    - the rank of the C-factor value in the (sorted) unique C-factor values,
+    - rivers, infrastructure and ponds (ktc 9999),
+    - grass strips without grass strip polygon (ktc_low),
+    - grass strips with the index of the grass strip polygon (scaled ktc).
+
+    A ktc raster for a (ktc_low, ktc_high, ktc_limit) combination is created by
+    mapping the ktc value of every class on the class raster with a lookup table,
+    so no rasterization or full-array conditional passes are needed. Use this class
+    to create the ktc rasters of a calibration grid, see
+    :func:`pywatemsedem.ktc.create_ktc` for the ktc rules.
+
+    Parameters
+    ----------
+    composite_landuse: numpy.ndarray
+        WaTEM/SEDEM composite landuse. (see :ref:`here <watemsedem:prcmap>`).
+    cfactor: numpy.ndarray
+        C-factor.
+    mask: pywatemsedem.geo.rasters.AbstractRaster
+        Mask
+    grass: pywatemsedem.geo.vectors.AbstractVector, default None
+        Grass strips, 'width' and 'scale_ktc' should be present as columns.
+    correction_width: bool, default True
+        Scale kTC according to width of grass strip.
+    engine: pywatemsedem.cfactor.CfactorEngine, default None
+        Engine holding the (cached) index raster of the grass strips. If None, the
+        grass strips are rasterized with a new engine.
+    """
+
+    def __init__(
+        self,
+        composite_landuse,
+        cfactor,
+        mask,
+        grass=None,
+        correction_width=True,
+        engine=None,
+    ):
+        self.mask = mask
+        self.grass = grass
+        self.scale_grass_strips = (
+            correction_width is not None and grass is not None and not grass.is_empty()
         )
-    else:
-        arr_ktc = np.where(composite_landuse == -6, ktc_low, arr_ktc)
 
-    clean_up_tempfiles(tiff_temp, "tiff")
+        self.cfactor_values, arr_class = np.unique(cfactor, return_inverse=True)
+        arr_class = arr_class.reshape(cfactor.shape).astype(np.int32)
+        n_cfactor = len(self.cfactor_values)
 
-    return arr_ktc, grass
+        # give certain landuse classes an extremely high ktc-value
+        arr_class[np.isin(composite_landuse, [-2, -1, -5])] = n_cfactor
+
+        cond = composite_landuse == -6
+        arr_class[cond] = n_cfactor + 1
+        if self.scale_grass_strips:
+            engine = CfactorEngine(mask) if engine is None else engine
+            index = engine.get_index(grass)
+            cond &= index != -1
+            arr_class[cond] = n_cfactor + 2 + index[cond]
+        self.arr_class = arr_class
+
+    def create(self, ktc_low, ktc_high, ktc_limit):
+        """Create the ktc raster for a combination of ktc values.
+
+        Parameters
+        ----------
+        ktc_low: float
+            Transport coefficient for land covers with low erosion potential
+        ktc_high: float
+            Transport coefficient for land covers with high erosion potential
+        ktc_limit: float
+            C-factor to make distinction between ktc_low and ktc_high
+
+        Returns
+        -------
+        arr_ktc: numpy.ndarray
+            kTC values (float 32, see :data:`pywatemsedem.defaults.RASTER_DTYPES`).
+        """
+        n_cfactor = len(self.cfactor_values)
+        n_grass = len(self.grass.geodata) if self.scale_grass_strips else 0
+        # number of C-factor values lower or equal than limit (NaN are sorted last),
+        # compared in the precision of the C-factor
+        ktc_limit = np.asarray(ktc_limit, dtype=self.cfactor_values.dtype)
+        n_low = np.searchsorted(self.cfactor_values, ktc_limit, side="right")
+
+        lut = np.empty(n_cfactor + 2 + n_grass, dtype=RASTER_DTYPES["ktc"])
+        lut[:n_low] = ktc_low
+        lut[n_low:n_cfactor] = ktc_high
+        lut[n_cfactor] = 9999
+        lut[n_cfactor + 1] = ktc_low
+        if self.scale_grass_strips:
+            self.grass._geodata = scale_ktc_gdf_grass_strips(
+                self.grass.geodata, ktc_low, ktc_high
+            )
+            lut[n_cfactor + 2 :] = self.grass.geodata["KTC"].values
+
+        return lut[self.arr_class]
+
+    def write(self, parameters, outfiles, format="idrisi", max_workers=None):
+        """Write the ktc rasters for a list of ktc value combinations.
+
+        The rasters are written concurrently with a thread pool (see
+        :func:`pywatemsedem.geo.rasters.TemporalRaster.write`).
+
+        Parameters
+        ----------
+        parameters: list of tuple
+            List of (ktc_low, ktc_high, ktc_limit) combinations.
+        outfiles: list of pathlib.Path or str
+            Output file for every combination.
+        format: str, default "idrisi"
+            Output format. See :func:`pywatemsedem.geo.rasters.AbstractRaster.write`.
+        max_workers: int, default None
+            Maximum number of rasters written at the same time. If None, the default
+            of :class:`concurrent.futures.ThreadPoolExecutor` is used.
+
+        Returns
+        -------
+        bool
+            True if write was successful.
+
+        Raises
+        ------
+        ValueError
+            If number of output files does not match number of combinations.
+        """
+        if len(parameters) != len(outfiles):
+            msg = (
+                f"Number of output files ({len(outfiles)}) should be equal to number "
+                f"of ktc value combinations ({len(parameters)})."
+            )
+            raise ValueError(msg)
+
+        # the lookup tables update the grass strips vector, create them in order
+        arrays = [self.create(*combination) for combination in parameters]
+
+        def write_ktc(i):
+            """Write the ktc raster of one combination."""
+            RasterMemory(arrays[i], self.mask.rp).write(outfiles[i], format)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            list(executor.map(write_ktc, range(len(outfiles))))
+
+        return True
 
 
 def scale_ktc_gdf_grass_strips(gdf_grass_strips, ktc_low, ktc_high):
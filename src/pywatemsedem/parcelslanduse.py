@@ -89,6 +89,11 @@ def create_parcels_landuse_degerick2015(
     (see also :func:`pywatemsedem.scenario.map_input_array_on_array`). The pywatemsedem
     landuse raster is used to fill gaps.
 
+    The rasters are merged in one pass with
+    :func:`pywatemsedem.parcelslanduse.merge_arrays_on_priority`, in the smallest
+    integer data type holding the landuse classes and nodata value (int16, or int32
+    if the nodata value does not fit int16).
+
     Parameters
     ----------
     landuse_core: numpy.ndarray
@@ -111,35 +116,91 @@ def create_parcels_landuse_degerick2015(
     Returns
     -------
     arr: numpy.ndarray
-        Parcels landuse raster
+        Parcels landuse raster (int16 or int32)
 
     References
     ----------
     [1] Degerickx, J., Van Den Broeck, M., 2015. Handleiding CN_WS.KU Leuven, Leuven,
         Belgium.
     """
-
-    arr = river.copy()
-    if water is not None:
-        arr = map_input_array_on_array(arr, water, nodata)
-    if infrastructure is not None:
-        arr = map_input_array_on_array(arr, infrastructure, nodata)
-    if grass_strips is not None:
-        arr = map_input_array_on_array(arr, grass_strips, nodata)
-    if landuse_parcels is not None:
-        arr = map_input_array_on_array(arr, landuse_parcels, nodata)
     if parcels is not None:
         # avoid too many parcel ids in integer 16 raster
-        parcels = np.where(parcels != nodata, (parcels % 32757), nodata)
-        arr = map_input_array_on_array(arr, parcels, nodata)
-    if landuse_core is not None:
-        arr = map_input_array_on_array(arr, landuse_core, nodata)
+        parcels = np.remainder(
+            parcels,
+            32757,
+            out=np.full_like(parcels, nodata),
+            where=parcels != nodata,
+        )
 
-    arr = np.where(mask == 1, arr, 0).astype("float64")
+    dtype = np.int16 if _fits_dtype(nodata, np.int16) else np.int32
+    arr = merge_arrays_on_priority(
+        [
+            river,
+            water,
+            infrastructure,
+            grass_strips,
+            landuse_parcels,
+            parcels,
+            landuse_core,
+        ],
+        nodata,
+        dtype=dtype,
+    )
+    arr[mask != 1] = 0
 
     return arr
 
 
+def _fits_dtype(value, dtype):
+    """Check if a value can be represented by an integer data type."""
+    info = np.iinfo(dtype)
+    return float(value).is_integer() and info.min <= value <= info.max
+
+
+def merge_arrays_on_priority(arrays, nodata, dtype=None):
+    """Merge arrays in order of priority in one pass.
+
+    Every item gets the value of the first array (in order of the list) for which
+    the item is not nodata, or nodata if the item is nodata in all arrays. This
+    equals chaining :func:`pywatemsedem.parcelslanduse.map_input_array_on_array`
+    from the first to the last array, but only allocates the output array and two
+    boolean arrays.
+
+    Parameters
+    ----------
+    arrays: list of numpy.ndarray
+        Arrays in order of priority (highest first), None-items are skipped.
+    nodata: float
+        No data value in arrays.
+    dtype: numpy.dtype, default None
+        Data type of the merged array. If None, the data type of the arrays is
+        used (see :func:`numpy.result_type`).
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    arrays = [arr for arr in arrays if arr is not None]
+    if any(arr.shape != arrays[0].shape for arr in arrays):
+        msg = "Dimension to map array for are different from to map to array."
+        raise ValueError(msg)
+    if dtype is None:
+        dtype = np.result_type(*arrays)
+
+    out = np.full(arrays[0].shape, nodata, dtype=dtype)
+    empty = np.ones(arrays[0].shape, dtype=bool)
+    filled = np.empty(arrays[0].shape, dtype=bool)
+    for arr in arrays:
+        np.not_equal(arr, nodata, out=filled)
+        filled &= empty
+        np.copyto(out, arr, casting="unsafe", where=filled)
+        empty ^= filled
+        if not empty.any():
+            break
+
+    return out
+
+
 def map_input_array_on_array(arr, arr_input, nodata, method="only_empty"):
     """Map an input array on an other array with a method
 
@@ -1,25 +1,40 @@
 import logging
 import os
+from contextlib import contextmanager
 from pathlib import Path
 
 import geopandas as gpd
 import numpy as np
 import pandas as pd
+import rasterio
 import shapely
 
 from pywatemsedem.defaults import SAGA_FLAGS
+from pywatemsedem.errors import PywatemsedemRoutingIndexError, WSException
 from pywatemsedem.geo.factory import Factory
 from pywatemsedem.geo.utils import (
+    LabelIndex,
+    clean_up_tempfiles,
     compute_statistics_rasters_per_polygon_vector,
+    create_filename,
     execute_saga,
-    get_rstparams,
     load_raster,
+    load_raster_window,
     raster_array_to_pandas_dataframe,
     raster_dataframe_to_arr,
     rasterprofile_to_rstparams,
     set_no_data_rst,
     write_arr_as_rst,
 )
+from pywatemsedem.geo.vectors import (
+    VECTOR_FORMATS,
+    get_vector_file_path,
+    get_vector_format,
+    get_vector_format_of_file,
+    read_vector,
+    remove_vector,
+    write_vector,
+)
 from pywatemsedem.grasstrips import estimate_ste
 from pywatemsedem.io.modelinput import Modelinput
 from pywatemsedem.io.modeloutput import (
@@ -30,10 +45,17 @@ from pywatemsedem.io.modeloutput import (
     define_subcatchments_saga,
     load_total_sediment_file,
     make_routing_vct_saga,
+    make_routing_vct_saga_tiles,
     open_txt_routing_file,
 )
 from pywatemsedem.io.plots import plot_cumulative_sedimentload
-from pywatemsedem.scenario import WSException
+from pywatemsedem.io.routinggraph import (
+    ROUTING_NONRIVER_INDEX_FOLDER,
+    incidence_to_polygons,
+    load_routing_index,
+)
+from pywatemsedem.io.spatialcontext import get_file_fingerprint, get_spatial_context
+from pywatemsedem.profiling import timed
 from pywatemsedem.tools import package_resource
 from pywatemsedem.valid import (
     valid_routing_sedi_out_vector,
@@ -57,6 +79,9 @@ class PostProcess(Factory):
         Folder to which postprocessing results are written.
     epsg: int, default 31370
         EPSG code.
+    vector_format: str, default "shapefile"
+        Format of the vector outputs: "shapefile", "gpkg", "flatgeobuf" or
+        "geoparquet", see :data:`pywatemsedem.geo.vectors.VECTOR_FORMATS`.
     year: int, optional
         Simulation year, used only by legacy filename methods.
 
@@ -70,7 +95,8 @@ class PostProcess(Factory):
 
     """
 
-    def __init__(self, ini, postprocessing_folder, epsg):
+    @timed()
+    def __init__(self, ini, postprocessing_folder, epsg, vector_format="shapefile"):
         """Initialise the PostProcess instance.
 
         Parameters
@@ -81,10 +107,14 @@ class PostProcess(Factory):
             Folder to which postprocessing results are written.
         epsg : int
             EPSG code for the coordinate reference system.
+        vector_format : str, default "shapefile"
+            Format of the vector outputs, see
+            :func:`pywatemsedem.geo.vectors.get_vector_format`.
         """
 
         # DATA
         self._routing_non_river = None
+        self._routing_graph = None
         self._vct_routing = None
         self._vct_routing_missing = None
         self._vct_sedi_export = None
@@ -102,12 +132,18 @@ class PostProcess(Factory):
         # general
         self.ini = Path(ini)
         self.epsg = epsg
+        self.vector_suffix = get_vector_format(vector_format)["suffix"]
+        self.vector_format = vector_format
+        self._deferred_vectors = None
+        self._written_vectors = {}
+        self._label_indexes = {}
 
         self.postprocessing_folder = Path(postprocessing_folder)
         self.postprocessing_folder.mkdir(parents=True, exist_ok=True)
 
-        self.rstparams, self.rp = get_rstparams(self.ini, epsg=self.epsg)
-        self.resolution = int(abs(self.rstparams["transform"][0]))
+        self.context = get_spatial_context(self.ini, self.epsg)
+        self.rstparams, self.rp = self.context.rstparams, self.context.profile
+        self.resolution = self.context.resolution
         self.nodata = self.rp["nodata"]
 
         super().__init__(
@@ -117,12 +153,137 @@ class PostProcess(Factory):
             self.postprocessing_folder,
         )
 
-        self.modelinput = Modelinput(self.ini, self.epsg)
-        self.modeloutput = Modeloutput(self.ini, self.epsg)
+        # model input and output are created on first use
+        self._modelinput = None
+        self._modeloutput = None
 
         # Enable automatic cleanup of stale postprocessing shapefiles.
         self.auto_cleanup_postprocessing_shapefiles = True
 
+    @property
+    def modelinput(self):
+        """Return the model input, see :class:`pywatemsedem.io.modelinput.Modelinput`.
+
+        The model input is created on first access.
+        """
+        if self._modelinput is None:
+            self._modelinput = Modelinput(self.ini, self.epsg)
+        return self._modelinput
+
+    @modelinput.setter
+    def modelinput(self, modelinput):
+        """Set the model input.
+
+        Parameters
+        ----------
+        modelinput: pywatemsedem.io.modelinput.Modelinput
+        """
+        self._modelinput = modelinput
+
+    @property
+    def modeloutput(self):
+        """Return the model output, see
+        :class:`pywatemsedem.io.modeloutput.Modeloutput`.
+
+        The model output is created on first access.
+        """
+        if self._modeloutput is None:
+            self._modeloutput = Modeloutput(self.ini, self.epsg)
+        return self._modeloutput
+
+    @modeloutput.setter
+    def modeloutput(self, modeloutput):
+        """Set the model output.
+
+        Parameters
+        ----------
+        modeloutput: pywatemsedem.io.modeloutput.Modeloutput
+        """
+        self._modeloutput = modeloutput
+
+    def _vector_path(self, folder, filename):
+        """Return the file path of a vector output in the vector format of the
+        instance (the suffix of ``filename`` is replaced)."""
+        return Path(folder) / (Path(filename).stem + self.vector_suffix)
+
+    def _write_vector(self, gdf, vector_path):
+        """Write a vector output in the vector format of the instance.
+
+        Within :meth:`write_once`, the vector is kept in memory and written at the
+        end of the block.
+
+        Parameters
+        ----------
+        gdf : geopandas.GeoDataFrame
+            Vector data.
+        vector_path : str or pathlib.Path
+            File path of the vector output, the suffix is set to the suffix of the
+            vector format.
+
+        Returns
+        -------
+        pathlib.Path
+            File path of the vector output.
+        """
+        requested_path = Path(vector_path)
+        vector_path = self._vector_path(requested_path.parent, requested_path)
+        self._written_vectors[requested_path] = vector_path
+        if self._deferred_vectors is not None:
+            self._deferred_vectors[vector_path] = gdf
+            return vector_path
+        return write_vector(gdf, vector_path, self.vector_format)
+
+    def _read_vector(self, vector_path):
+        """Read a vector output, see :meth:`_write_vector`.
+
+        Within :meth:`write_once`, a vector modified in the block is read from
+        memory. Outside the block, a vector written by :meth:`_write_vector` of the
+        instance is read from the written file (in the vector format of the
+        instance).
+
+        Parameters
+        ----------
+        vector_path : str or pathlib.Path
+            File path of the vector.
+
+        Returns
+        -------
+        geopandas.GeoDataFrame
+        """
+        vector_path = Path(vector_path)
+        written_path = self._written_vectors.get(vector_path, vector_path)
+        if (
+            self._deferred_vectors is not None
+            and written_path in self._deferred_vectors
+        ):
+            return self._deferred_vectors[written_path].copy()
+        return read_vector(written_path)
+
+    @contextmanager
+    def write_once(self):
+        """Write every vector output modified in a block only once, at the end of
+        the block.
+
+        Use this to chain methods adding attributes to the same vector, e.g.
+
+        >>> with pp.write_once():
+        ...     pp.add_sediment_to_subcatchments(vct_subcatchments)
+        ...     pp.compute_sewer_in_per_catchment(vct_subcatchments)
+
+        The vectors are not written if an error is raised in the block.
+        """
+        if self._deferred_vectors is not None:
+            yield
+            return
+        self._deferred_vectors = {}
+        try:
+            yield
+            deferred_vectors = self._deferred_vectors
+        finally:
+            self._deferred_vectors = None
+        for vector_path, gdf in deferred_vectors.items():
+            write_vector(gdf, vector_path, self.vector_format)
+
     def _workflow_subdir(self, workflow):
         """Return (and create) a dedicated workflow folder in postprocessing."""
         workflow_map = {
@@ -259,8 +420,12 @@ class PostProcess(Factory):
 
         if changed and persist and hasattr(vector_obj, "file_path") and not gdf.empty:
             vector_path = Path(vector_obj.file_path)
-            self._unlink_vector_dataset(vector_path)
-            gdf.to_file(vector_path, spatial_index="YES")
+            vector_format = get_vector_format_of_file(vector_path)
+            if vector_format is None:
+                self._unlink_vector_dataset(vector_path)
+                gdf.to_file(vector_path)
+            else:
+                write_vector(gdf, vector_path, vector_format)
 
     @property
     def routing_non_river(self):
@@ -269,22 +434,55 @@ class PostProcess(Factory):
             self.remove_river_routing()
         return self._routing_non_river
 
+    @property
+    def routing_graph(self):
+        """Return the flow graph of the routing table without river routing, see
+        :class:`pywatemsedem.io.routinggraph.RoutingGraph`.
+
+        The graph is loaded (memory-mapped) from its own index folder in the model
+        output folder, built once from the routing graph index of the model run by
+        removing the routing of the river cells, and rebuilt if the routing table
+        or the composite land use raster is modified, see
+        :func:`pywatemsedem.io.routinggraph.load_routing_index`. If the graph can
+        not be built, a :class:`pywatemsedem.errors.PywatemsedemRoutingIndexError`
+        is raised.
+        """
+        if self._routing_graph is None:
+            compositelanduse = self.modelinput.compositelanduse
+            txt_routing = self.modeloutput.txt_routing
+            self._routing_graph = load_routing_index(
+                txt_routing,
+                (self.rstparams["height"], self.rstparams["width"]),
+                folder=txt_routing.parent / ROUTING_NONRIVER_INDEX_FOLDER,
+                drop_sources=lambda: np.flatnonzero(compositelanduse.arr == -1),
+                key=get_file_fingerprint(compositelanduse.file_path),
+            )
+        return self._routing_graph
+
+    @timed()
     def remove_river_routing(self):
         """Remove river routing from routing file."""
 
-        # Identify the rows and columns of the routing file
-        # that are river routing (lnduSource == -1)
-        rows, cols = np.where(self.modelinput.compositelanduse.arr == -1)
-        river_coords = list(
-            zip(rows + 1, cols + 1)
-        )  # +1 as routing file is 1-based and not 0-based
+        # Identify the rows of the routing file that are river routing
+        # (lnduSource == -1), -1 as routing file is 1-based and not 0-based
+        arr_river = self.modelinput.compositelanduse.arr == -1
+        df = self.modeloutput.routing
+        rows = df["row"].to_numpy(dtype=np.int64) - 1
+        cols = df["col"].to_numpy(dtype=np.int64) - 1
+        inside = (
+            (rows >= 0)
+            & (rows < arr_river.shape[0])
+            & (cols >= 0)
+            & (cols < arr_river.shape[1])
+        )
+        is_river = np.zeros(len(df), dtype=bool)
+        is_river[inside] = arr_river[rows[inside], cols[inside]]
 
-        # Remove these rows and columns from the routing file
-        df = self.modeloutput.routing.copy()
-        to_remove = set(river_coords)
-        df_filtered = df[~df[["row", "col"]].apply(tuple, axis=1).isin(to_remove)]
+        # Remove these rows from the routing file
+        df_filtered = df.loc[~is_river]
 
         self._routing_non_river = df_filtered.copy()
+        self._routing_graph = None
 
         # Save the filtered routing file
         self._routing_non_river.file_path = (
@@ -327,6 +525,7 @@ class PostProcess(Factory):
             plot_title="Catchment mask + rivers + routing",
         )
 
+    @timed()
     def make_routing_vct(self, extent=None, tile_number=None, tag=""):
         """Make a routing vector file based on routingfile
 
@@ -344,25 +543,68 @@ class PostProcess(Factory):
         file_path: pathlib.Path
             Path to the created routing vector shapefile.
         """
-        file_path = self.postprocessing_folder / (
-            self.modeloutput.routing.file_path.stem + tag + ".shp"
+        return self._make_routing_vector(
+            self.modeloutput.routing.file_path, extent, tile_number, tag
         )
 
-        make_routing_vct_saga(
-            self.modeloutput.routing.file_path,
+    def _make_routing_vector(self, txt_routing, extent, tile_number, tag):
+        """Make a routing vector file in the vector format of the instance.
+
+        The routing vector is created with saga as a temporary shapefile, see
+        :func:`pywatemsedem.io.modeloutput.make_routing_vct_saga`, and written once
+        with the EPSG code of the instance.
+        """
+        # saga writes a temporary (with an extent: a selection of it) shapefile
+        vct_saga = make_routing_vct_saga(
+            txt_routing,
             self.modelinput.compositelanduse.file_path,
-            file_path,
+            Path(create_filename(".shp")),
             self.rstparams,
             extent=extent,
             tile_number=tile_number,
         )
+        gdf = read_vector(vct_saga).set_crs(self.epsg, allow_override=True)
+        clean_up_tempfiles(vct_saga, "shp")
+
+        return self._write_vector(
+            gdf, self.postprocessing_folder / (Path(txt_routing).stem + tag)
+        )
+
+    @timed()
+    def make_routing_vct_tiles(self, extents, tag="", max_workers=None):
+        """Make routing vector files for a list of tiles.
+
+        The saga commands of the tiles are run concurrently, see
+        :func:`pywatemsedem.io.modeloutput.make_routing_vct_saga_tiles`.
+
+        Parameters
+        ----------
+        extents: list of list
+            Extent of every tile [xmin, xmax, ymin, ymax], the position in the list
+            is used as tile number.
+        tag: str
+            tag to add to filename
+        max_workers: int, default None
+            Maximum number of tiles processed at the same time.
 
-        # Set EPSG code to the shapefile
-        gdf = gpd.read_file(file_path)
-        gdf = gdf.set_crs(self.epsg)
-        gdf.to_file(file_path)
+        Returns
+        -------
+        dict
+            Path to the created routing vector shapefile (values) per tile number
+            (keys). Tiles without routing are not included.
+        """
+        file_path = self.postprocessing_folder / (
+            self.modeloutput.routing.file_path.stem + tag + ".shp"
+        )
 
-        return file_path
+        return make_routing_vct_saga_tiles(
+            Path(self.modeloutput.routing.file_path),
+            self.modelinput.compositelanduse.file_path,
+            file_path,
+            self.rp,
+            extents,
+            max_workers=max_workers,
+        )
 
     @property
     def vct_routing_missing(self):
@@ -395,6 +637,7 @@ class PostProcess(Factory):
             plot_title="Catchment mask + rivers + missing routing",
         )
 
+    @timed()
     def make_routing_missing_vct(self, extent=None, tile_number=None, tag=""):
         """Make a routing missing vector file based on routing missing file
 
@@ -412,26 +655,10 @@ class PostProcess(Factory):
         file_path: pathlib.Path
             Path to the created routing missing vector shapefile.
         """
-        file_path = self.postprocessing_folder / (
-            self.modeloutput.routing_missing.file_path.stem + tag + ".shp"
-        )
-
-        make_routing_vct_saga(
-            self.modeloutput.routing_missing.file_path,
-            self.modelinput.compositelanduse.file_path,
-            file_path,
-            self.rstparams,
-            extent=extent,
-            tile_number=tile_number,
+        return self._make_routing_vector(
+            self.modeloutput.routing_missing.file_path, extent, tile_number, tag
         )
 
-        # Set EPSG code to the shapefile
-        gdf = gpd.read_file(file_path)
-        gdf = gdf.set_crs(self.epsg)
-        gdf.to_file(file_path)
-
-        return file_path
-
     @property
     def vct_sedi_export(self):
         """Return the sedi_export vector file path.
@@ -462,6 +689,7 @@ class PostProcess(Factory):
             plot_title="Catchment mask + rivers + sediment export",
         )
 
+    @timed()
     def make_sedi_export_vct(self):
         """Make a sedi_export vector file from the raster.
 
@@ -470,14 +698,16 @@ class PostProcess(Factory):
         file_path: pathlib.Path
             Path to the created sedi_export vector shapefile.
         """
-        vct_out = (
-            self.postprocessing_folder
-            / f"{self.modeloutput.sedi_export.file_path.stem}.shp"
+        vct_out = self._vector_path(
+            self.postprocessing_folder, self.modeloutput.sedi_export.file_path.stem
         )
-        convert_rst_sinks_to_vct(
-            self.modeloutput.sedi_export.file_path, vct_out, "river", self.epsg
+        return convert_rst_sinks_to_vct(
+            self.modeloutput.sedi_export.file_path,
+            vct_out,
+            "river",
+            self.epsg,
+            vector_format=self.vector_format,
         )
-        return vct_out
 
     @property
     def vct_sewer_in(self):
@@ -509,6 +739,7 @@ class PostProcess(Factory):
             plot_title="Catchment mask + rivers + sewer inflow",
         )
 
+    @timed()
     def make_sewer_in_vct(self):
         """Make a sewer_in vector file from the raster.
 
@@ -517,14 +748,16 @@ class PostProcess(Factory):
         file_path: pathlib.Path
             Path to the created sewer_in vector shapefile.
         """
-        vct_out = (
-            self.postprocessing_folder
-            / f"{self.modeloutput.sewer_in.file_path.stem}.shp"
+        vct_out = self._vector_path(
+            self.postprocessing_folder, self.modeloutput.sewer_in.file_path.stem
         )
-        convert_rst_sinks_to_vct(
-            self.modeloutput.sewer_in.file_path, vct_out, "sewer", self.epsg
+        return convert_rst_sinks_to_vct(
+            self.modeloutput.sewer_in.file_path,
+            vct_out,
+            "sewer",
+            self.epsg,
+            vector_format=self.vector_format,
         )
-        return vct_out
 
     @property
     def vct_sinks(self):
@@ -556,6 +789,7 @@ class PostProcess(Factory):
             plot_title="Catchment mask + rivers + sinks",
         )
 
+    @timed()
     def merge_vct_sinks(self):
         """
         Merge sewer and river sink shapefiles into a single output shapefile.
@@ -570,7 +804,7 @@ class PostProcess(Factory):
 
         The output file is named:
 
-        ``sinks.shp``
+        ``sinks.shp`` (suffix depending on the vector format)
 
         Notes
         -----
@@ -610,9 +844,7 @@ class PostProcess(Factory):
 
         gdf_sinks = gdf_sinks.reset_index(drop=True)
 
-        vct_out = self.postprocessing_folder / "sinks.shp"
-
-        gdf_sinks.to_file(vct_out, spatial_index="YES")
+        vct_out = self._write_vector(gdf_sinks, self.postprocessing_folder / "sinks")
 
         self.vct_sinks = vct_out
         self._auto_cleanup_postprocessing_shapefiles()
@@ -648,6 +880,7 @@ class PostProcess(Factory):
             gdf_grass = gdf_grass.rename(columns={"NR": "id"})
             self._vct_grass_strips.geodata = gdf_grass
 
+    @timed()
     def process_grass_strips(self, compute_priority=True):
         """Compute grass strips efficiency and compute priority
 
@@ -752,6 +985,7 @@ class PostProcess(Factory):
         # calls can directly use ``pp.vct_grass_strips.geodata``.
         self._vct_grass_strips.geodata = gdf_grass_strips
 
+    @timed()
     def add_poi(
         self,
         x_coord,
@@ -785,6 +1019,8 @@ class PostProcess(Factory):
                         - If multiple POIs are given and ``id`` is a single integer,
               sequential ids are generated starting from that value.
         filename: str, default "poi.shp"
+            Name of the output POI vector, the suffix is set to the suffix of the
+            vector format.
             Name of the POI vector written in the postprocessing folder.
         lonlat: bool, default False
             If ``True``, interpret coordinates as decimal longitude/latitude
@@ -859,16 +1095,7 @@ class PostProcess(Factory):
             raise ValueError(msg)
 
         poi_dir = self._workflow_subdir("poi")
-        vct_poi = poi_dir / Path(filename).name
-        if vct_poi.suffix.lower() == ".shp":
-            for suffix in [".shp", ".shx", ".dbf", ".prj", ".cpg"]:
-                part = vct_poi.with_suffix(suffix)
-                if part.exists():
-                    part.unlink()
-        elif vct_poi.exists():
-            vct_poi.unlink()
-
-        gdf_poi.to_file(vct_poi)
+        vct_poi = self._write_vector(gdf_poi, self._vector_path(poi_dir, filename))
         self.vct_poi = vct_poi
         self._auto_cleanup_postprocessing_shapefiles()
 
@@ -1019,6 +1246,7 @@ class PostProcess(Factory):
             ensure_internal_id=False,
         )
 
+    @timed()
     def add_buffers(self, filename="buffers.shp"):
         """Create a buffers vector from ``modelinput.buffers``.
 
@@ -1030,7 +1258,8 @@ class PostProcess(Factory):
         Parameters
         ----------
         filename: str, default "buffers.shp"
-            Name of the output buffers vector in the postprocessing folder.
+            Name of the output buffers vector in the postprocessing folder, the
+            suffix is set to the suffix of the vector format.
 
         Returns
         -------
@@ -1092,14 +1321,15 @@ class PostProcess(Factory):
             gdf_buffers["id"] = np.arange(1, len(gdf_buffers) + 1)
 
         buffer_dir = self._workflow_subdir("buffers")
-        vct_buffers = buffer_dir / Path(filename).name
-        self._unlink_vector_dataset(vct_buffers)
-        gdf_buffers.to_file(vct_buffers, spatial_index="YES")
+        vct_buffers = self._write_vector(
+            gdf_buffers, self._vector_path(buffer_dir, filename)
+        )
 
         self.vct_buffers = vct_buffers
         self._auto_cleanup_postprocessing_shapefiles()
         return vct_buffers
 
+    @timed()
     def identify_subcatchments_to_buffers(self):
         """Define the separate subcatchments to the buffer outlets.
 
@@ -1134,12 +1364,13 @@ class PostProcess(Factory):
         ).astype(np.float32)
 
         buffer_dir = self._workflow_subdir("buffers")
-        rst_buffer_outlets = buffer_dir / "buffers_outlet_ids.rst"
+        rst_buffer_outlets = buffer_dir / "buffers_outlet_ids.tif"
         write_arr_as_rst(
             arr_buffer_outlets,
             rst_buffer_outlets,
             arr_buffer_outlets.dtype,
             self.rstparams,
+            policy="intermediate",
         )
 
         _, vct_subcatchments = identify_subcatchments_to_target_ids(
@@ -1148,26 +1379,10 @@ class PostProcess(Factory):
             buffer_dir,
             self.rp,
             tag="subcatchments_to_buffers",
+            vector_format=self.vector_format,
+            id_column="id",
         )
 
-        vct_buffers.vct_subcatchments = self.vector_factory(
-            Path(vct_subcatchments),
-            "Polygon",
-            flag_clip=False,
-        )
-        gdf_subcatchments = vct_buffers.vct_subcatchments.geodata.copy()
-        if "VALUE" in gdf_subcatchments.columns:
-            gdf_subcatchments["id"] = pd.to_numeric(
-                gdf_subcatchments["VALUE"],
-                errors="coerce",
-            ).astype("Int64")
-            gdf_subcatchments = gdf_subcatchments.drop(columns=["VALUE"])
-        elif "id" not in gdf_subcatchments.columns:
-            msg = "Buffer subcatchments output does not contain 'VALUE' or 'id'."
-            raise ValueError(msg)
-
-        self._unlink_vector_dataset(Path(vct_subcatchments))
-        gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
         vct_buffers.vct_subcatchments = self.vector_factory(
             Path(vct_subcatchments),
             "Polygon",
@@ -2202,8 +2417,7 @@ class PostProcess(Factory):
         )
 
         points_path = Path(points_obj.file_path)
-        self._unlink_vector_dataset(points_path)
-        gdf_points.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points, points_path)
 
         self.vct_priority_points = points_path
 
@@ -2288,9 +2502,9 @@ class PostProcess(Factory):
             )
 
         out_dir = output_dir or self.postprocessing_folder
-        vct_subcatchments = out_dir / f"{target_name}_{tag}.shp"
-        self._unlink_vector_dataset(vct_subcatchments)
-        gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
+        vct_subcatchments = self._write_vector(
+            gdf_subcatchments, self._vector_path(out_dir, f"{target_name}_{tag}")
+        )
 
         points_vector_obj.vct_subcatchments = self.vector_factory(
             Path(vct_subcatchments),
@@ -2382,17 +2596,10 @@ class PostProcess(Factory):
         vector_path : str or pathlib.Path
             Path to the vector file (shapefile or other format).
         """
-        vector_path = Path(vector_path)
-        if vector_path.suffix.lower() == ".shp":
-            for suffix in [".shp", ".shx", ".dbf", ".prj", ".cpg", ".qix"]:
-                part = vector_path.with_suffix(suffix)
-                if part.exists():
-                    part.unlink()
-        elif vector_path.exists():
-            vector_path.unlink()
+        remove_vector(vector_path)
 
     def _remove_individual_subcatchment_shapefiles(self, folder, keep_paths=None):
-        """Remove individual ``subcatchments_*.shp`` files in a folder.
+        """Remove individual ``subcatchments_*`` vector files in a folder.
 
         Parameters
         ----------
@@ -2415,11 +2622,10 @@ class PostProcess(Factory):
                 except Exception:
                     continue
 
-        for shp in folder.glob("subcatchments_*.shp"):
-            shp_resolved = shp.resolve()
-            if shp_resolved in keep_resolved:
+        for vct in folder.glob(f"subcatchments_*{self.vector_suffix}"):
+            if vct.resolve() in keep_resolved:
                 continue
-            self._unlink_vector_dataset(shp)
+            self._unlink_vector_dataset(vct)
 
     def _collect_notebook_vector_paths(self):
         """Collect active vector paths that are typically shown in notebooks."""
@@ -2434,6 +2640,7 @@ class PostProcess(Factory):
                 return None
             return p
 
+        suffixes = [properties["suffix"] for properties in VECTOR_FORMATS.values()]
         keep_paths = set()
         top_level_vectors = [
             self._vct_routing,
@@ -2452,7 +2659,7 @@ class PostProcess(Factory):
             p = _as_path(vector_obj)
             if (
                 p is not None
-                and p.suffix.lower() == ".shp"
+                and p.suffix.lower() in suffixes
                 and postproc_root in p.parents
             ):
                 keep_paths.add(p)
@@ -2461,7 +2668,7 @@ class PostProcess(Factory):
                 p_sub = _as_path(getattr(vector_obj, "vct_subcatchments", None))
                 if (
                     p_sub is not None
-                    and p_sub.suffix.lower() == ".shp"
+                    and p_sub.suffix.lower() in suffixes
                     and postproc_root in p_sub.parents
                 ):
                     keep_paths.add(p_sub)
@@ -2521,9 +2728,10 @@ class PostProcess(Factory):
         tempfolder.mkdir(parents=True, exist_ok=True)
 
         point_name = Path(points_vector_obj.file_path).stem
-        point_path = tempfolder / f"{point_name}_{tag}_point_{point_id}.shp"
-        self._unlink_vector_dataset(point_path)
-        gdf_point.to_file(point_path, spatial_index="YES")
+        point_path = self._write_vector(
+            gdf_point,
+            self._vector_path(tempfolder, f"{point_name}_{tag}_point_{point_id}"),
+        )
 
         vct_point = self.vector_factory(
             point_path,
@@ -2536,6 +2744,7 @@ class PostProcess(Factory):
 
         return vct_point
 
+    @timed()
     def identify_subcatchment(
         self,
         target_input,
@@ -2590,20 +2799,25 @@ class PostProcess(Factory):
             nodata=self.rstparams["nodata"],
             gdal=False,
         )
-        rst_target_ids = out_dir / f"{target_name}_{tag}_ids.rst"
+        rst_target_ids = out_dir / f"{target_name}_{tag}_ids.tif"
         write_arr_as_rst(
             arr_target_ids,
             rst_target_ids,
             np.int32,
             self.rstparams,
+            policy="intermediate",
         )
 
+        # the subcatchment id (the rasterized target id) is written to the 'id'
+        # column, so the subcatchments vector is written only once
         _, vct_subcatchments = identify_subcatchments_to_target_ids(
             rst_target_ids,
             routing_nonriver,
             out_dir,
             self.rp,
             tag=tag,
+            vector_format=self.vector_format,
+            id_column="id",
         )
 
         target_vector_obj.vct_subcatchments = self.vector_factory(
@@ -2611,31 +2825,137 @@ class PostProcess(Factory):
             "Polygon",
             flag_clip=False,
         )
-        point_id = int(target_vector_obj.geodata.iloc[0][target_id_column])
-        gdf_subcatchments = target_vector_obj.vct_subcatchments.geodata.copy()
-        gdf_subcatchments["id"] = point_id
-        gdf_subcatchments = gdf_subcatchments.drop(
-            columns=[
-                c for c in ["target_id", "VALUE"] if c in gdf_subcatchments.columns
-            ]
+        self._attach_subcatchments_plot(target_vector_obj)
+
+        return vct_subcatchments
+
+    def _points_to_cells(self, geometry, target_name):
+        """Get the flat index of the routing graph cells of point geometries.
+
+        Parameters
+        ----------
+        geometry : geopandas.GeoSeries
+            Point geometries.
+        target_name : str
+            Name of the points, used in the error message.
+
+        Returns
+        -------
+        numpy.ndarray
+            Flat index of the cells, see
+            :class:`pywatemsedem.io.routinggraph.RoutingGraph`.
+
+        Raises
+        ------
+        ValueError
+            If a point is located outside the model domain.
+        """
+        rows, cols = rasterio.transform.rowcol(
+            self.rstparams["transform"],
+            geometry.x.to_numpy(),
+            geometry.y.to_numpy(),
         )
-        self._unlink_vector_dataset(Path(vct_subcatchments))
-        gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
-        target_vector_obj.vct_subcatchments = self.vector_factory(
+        rows, cols = np.asarray(rows), np.asarray(cols)
+        nrows, ncols = self.routing_graph.shape
+        inside = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+        if not np.all(inside):
+            msg = (
+                f"{np.sum(~inside)} point(s) of '{target_name}' are located outside "
+                f"the model domain."
+            )
+            raise ValueError(msg)
+        return self.routing_graph.to_flat(rows, cols)
+
+    def _identify_subcatchments_routing_graph(
+        self,
+        points_vector_obj,
+        id_column,
+        target_name,
+        tag,
+        output_dir=None,
+    ):
+        """Identify the (possibly nested) subcatchments of point targets in one
+        traversal of the routing graph.
+
+        No files are written per point, see
+        :func:`pywatemsedem.io.routinggraph.RoutingGraph.upstream_incidence`.
+
+        Parameters
+        ----------
+        points_vector_obj : object
+            Point vector object.
+        id_column : str
+            Column name containing point ids.
+        target_name : str
+            Name of the target used for output file naming.
+        tag : str
+            Output tag for file naming.
+        output_dir : str or pathlib.Path, optional
+            Directory for output. If ``None``, uses ``postprocessing_folder``.
+
+        Returns
+        -------
+        pathlib.Path
+            Path to the subcatchments vector.
+        """
+        from scipy import sparse
+
+        graph = self.routing_graph
+        gdf_points = points_vector_obj.geodata.explode(index_parts=False)
+        gdf_points = gdf_points[gdf_points.geometry.notna()]
+        incidence = graph.upstream_incidence(
+            self._points_to_cells(gdf_points.geometry, target_name)
+        )
+
+        # the parts of a multipoint target share one subcatchment
+        ids, point_ids = np.unique(
+            gdf_points[id_column].astype(int).to_numpy(), return_inverse=True
+        )
+        if ids.size < len(gdf_points):
+            grouping = sparse.csr_array(
+                (
+                    np.ones(point_ids.size, dtype=np.int32),
+                    (point_ids.ravel(), np.arange(point_ids.size)),
+                ),
+                shape=(ids.size, point_ids.size),
+            )
+            incidence = (grouping @ incidence.astype(np.int32)) > 0
+        else:
+            ids = gdf_points[id_column].astype(int).to_numpy()
+
+        polygons = incidence_to_polygons(
+            incidence, graph.shape, self.rstparams["transform"]
+        )
+        gdf_subcatchments = gpd.GeoDataFrame(
+            {"id": ids, "geometry": polygons}, geometry="geometry", crs=self.epsg
+        )
+        gdf_subcatchments = gdf_subcatchments[
+            gdf_subcatchments.geometry.notna()
+        ].reset_index(drop=True)
+        gdf_subcatchments.insert(1, "AREA_HA", gdf_subcatchments.area / 10000.0)
+        # the engine is kept in the vector, see _get_subcatchment_engine
+        gdf_subcatchments.insert(2, "engine", "routing")
+
+        out_dir = output_dir or self.postprocessing_folder
+        vct_subcatchments = self._write_vector(
+            gdf_subcatchments, self._vector_path(out_dir, f"{target_name}_{tag}")
+        )
+        points_vector_obj.vct_subcatchments = self.vector_factory(
             Path(vct_subcatchments),
             "Polygon",
             flag_clip=False,
         )
-        self._attach_subcatchments_plot(target_vector_obj)
-
+        self._attach_subcatchments_plot(points_vector_obj)
         return vct_subcatchments
 
+    @timed()
     def identify_subcatchments(
         self,
         target_input,
         target_type="points",
         id_column=None,
         tag="subcatchments_to_targets",
+        engine="saga",
     ):
         """Identify subcatchments draining to point targets.
 
@@ -2651,6 +2971,18 @@ class PostProcess(Factory):
             Field name in point vector used as subcatchment id.
         tag: str, default "subcatchments_to_targets"
             Base output tag.
+        engine: str, default "saga"
+            Delineation of multi-point input:
+
+            - "saga": every point is delineated with SAGA, see notes.
+            - "routing" (opt-in): the (possibly nested) subcatchments of all points
+              are identified in one traversal of the routing graph without river
+              routing, see
+              :func:`pywatemsedem.io.routinggraph.RoutingGraph.upstream_incidence`.
+              The subcatchment vector holds the columns *id*, *AREA_HA* and
+              *engine*, and the delineation can differ from SAGA. If the routing
+              graph can not be built (e.g. the routing table holds a cycle), the
+              "saga" engine is used.
 
         Returns
         -------
@@ -2660,9 +2992,9 @@ class PostProcess(Factory):
 
         Notes
         -----
-        This method is the multi-point orchestrator and creates a one-point
-        dummy vector per input point. Each dummy point receives its own
-        ``vct_subcatchments`` attribute. All individual
+        With the "saga" engine, this method is the multi-point orchestrator and
+        creates a one-point dummy vector per input point. Each dummy point receives
+        its own ``vct_subcatchments`` attribute. All individual
         subcatchments are then aggregated and attached to the input points
         vector object as ``vct_subcatchments``.
         """
@@ -2673,6 +3005,9 @@ class PostProcess(Factory):
                 "Use 'identify_subcatchments_to_buffers' for buffer-based flow."
             )
             raise ValueError(msg)
+        if engine not in ["routing", "saga"]:
+            msg = f"Engine '{engine}' not supported, choose 'routing' or 'saga'."
+            raise ValueError(msg)
 
         points_vector_obj, target_name, parent_property_name = (
             self._resolve_point_vector_target(target_input)
@@ -2690,6 +3025,25 @@ class PostProcess(Factory):
                 output_dir=output_dir,
             )
 
+        if engine == "routing":
+            try:
+                self.routing_graph
+            except PywatemsedemRoutingIndexError as e:
+                msg = f"{e} Subcatchments are identified with SAGA."
+                logger.warning(msg)
+                engine = "saga"
+
+        if engine == "routing":
+            vct_subcatchments = self._identify_subcatchments_routing_graph(
+                points_vector_obj,
+                target_id_column,
+                target_name,
+                tag,
+                output_dir=output_dir,
+            )
+            self._auto_cleanup_postprocessing_shapefiles()
+            return vct_subcatchments
+
         point_vectors = []
         registered_dummy_attrs = []
 
@@ -2790,6 +3144,7 @@ class PostProcess(Factory):
         )
         raise ValueError(msg)
 
+    @timed()
     def identify_priority_subcatchments(
         self,
         nmax=10,
@@ -2913,6 +3268,7 @@ class PostProcess(Factory):
                         threshold_percentage=None,
                         resmap=tempfolder,
                         epsg=self.epsg,
+                        vector_format=self.vector_format,
                     )
                 )
 
@@ -2970,6 +3326,7 @@ class PostProcess(Factory):
                         threshold_percentage=search_threshold,
                         resmap=tempfolder,
                         epsg=self.epsg,
+                        vector_format=self.vector_format,
                     )
                 )
 
@@ -3055,6 +3412,7 @@ class PostProcess(Factory):
         point_id_column,
         sub_id_column,
         source,
+        engine="saga",
     ):
         """Compute overlap-safe cumulative contribution from source raster.
 
@@ -3063,7 +3421,8 @@ class PostProcess(Factory):
         gdf_points : geopandas.GeoDataFrame
             Points GeoDataFrame with source values.
         gdf_sub : geopandas.GeoDataFrame
-            Subcatchments GeoDataFrame with geometries.
+            Subcatchments GeoDataFrame with geometries, only points with a
+            subcatchment contribute.
         point_id_column : str
             Column name for point ids.
         sub_id_column : str
@@ -3071,6 +3430,15 @@ class PostProcess(Factory):
         source : str
             Source raster specification (``"sedi_out"``, ``"sedi_export"``
             or ``"sedi_export + sewer_in"``).
+        engine : str, default "saga"
+            Engine the subcatchments are delineated with, see
+            :func:`pywatemsedem.postprocess.PostProcess.identify_subcatchments`:
+
+            - "routing": the source load of the upstream area of every point is
+              summed over the routing graph, see
+              :func:`pywatemsedem.io.routinggraph.RoutingGraph.upstream_sum`.
+            - "saga": the source load is summed over the rasterized subcatchment
+              polygons.
 
         Returns
         -------
@@ -3110,43 +3478,46 @@ class PostProcess(Factory):
         gdf_sub_tmp = gdf_sub.copy()
         gdf_sub_tmp["_id"] = pd.to_numeric(gdf_sub_tmp[sub_id_column], errors="coerce")
         gdf_sub_tmp = gdf_sub_tmp.dropna(subset=["_id"]).copy()
+        gdf_sub_tmp = gdf_sub_tmp[
+            gdf_sub_tmp.geometry.notna() & ~gdf_sub_tmp.geometry.is_empty
+        ]
         if gdf_sub_tmp.empty:
             return pd.Series(dtype=np.float64)
 
+        # only points with a subcatchment contribute
         gdf_sub_tmp["_id"] = gdf_sub_tmp["_id"].astype(int)
-        gdf_sub_tmp = gdf_sub_tmp.drop_duplicates(subset=["_id"])
-        geom_by_id = gdf_sub_tmp.set_index("_id")["geometry"].to_dict()
-
-        from rasterio.features import rasterize as _rasterize
-
-        covered_mask = np.zeros(arr_priority.shape, dtype=bool)
-        cumulative_source_load = 0.0
-        contrib = {}
-
-        for _, row in gdf_rank.iterrows():
-            target_id = int(row["_id"])
-            geom = geom_by_id.get(target_id)
-            if geom is None or geom.is_empty:
-                continue
-
-            sub_mask = _rasterize(
-                [(geom, 1)],
-                out_shape=arr_priority.shape,
-                transform=self.rstparams["transform"],
-                fill=0,
-                dtype="uint8",
-            ).astype(bool)
-
-            new_cells = sub_mask & valid_mask & (~covered_mask)
-            selected_source_load = float(arr_priority[new_cells].sum())
-            cumulative_source_load += selected_source_load
-            contrib[target_id] = 100.0 * cumulative_source_load / total_source_load
-            covered_mask = covered_mask | sub_mask
-
-        if not contrib:
+        gdf_rank = gdf_rank[gdf_rank["_id"].isin(gdf_sub_tmp["_id"])]
+        gdf_rank = gdf_rank.drop_duplicates(subset=["_id"])
+        if gdf_rank.empty:
             return pd.Series(dtype=np.float64)
 
-        return pd.Series(contrib, dtype=np.float64)
+        if engine != "routing":
+            return _compute_cumulative_contrib_polygons(
+                arr_priority,
+                valid_mask,
+                gdf_rank["_id"].to_numpy(),
+                gdf_sub_tmp.drop_duplicates(subset=["_id"]).set_index("_id")[
+                    "geometry"
+                ],
+                self.rstparams["transform"],
+                total_source_load,
+            )
+
+        # the upstream area of every point is taken from the routing graph, a cell
+        # only contributes to the first (highest ranked) point it drains to
+        gdf_rank = gdf_rank.explode(index_parts=False)
+        selected_source_load = pd.Series(
+            self.routing_graph.upstream_sum(
+                self._points_to_cells(gdf_rank.geometry, "priority points"),
+                np.where(valid_mask, arr_priority, 0.0),
+                exclusive=True,
+            ),
+            index=gdf_rank["_id"].to_numpy(),
+        )
+        cumulative_source_load = (
+            selected_source_load.groupby(level=0, sort=False).sum().cumsum()
+        )
+        return (100.0 * cumulative_source_load / total_source_load).astype(np.float64)
 
     def _extract_priority_cumperc_from_subcatchments(self, gdf_subcatchmpriority):
         """Extract cumulative contribution from precomputed subcatchment metadata.
@@ -3255,11 +3626,9 @@ class PostProcess(Factory):
         points_path = Path(points_obj.file_path)
         subcatchments_path = Path(subcatchments_obj.file_path)
 
-        self._unlink_vector_dataset(points_path)
-        gdf_points.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points, points_path)
 
-        self._unlink_vector_dataset(subcatchments_path)
-        gdf_sub.to_file(subcatchments_path, spatial_index="YES")
+        subcatchments_path = self._write_vector(gdf_sub, subcatchments_path)
 
         self.vct_priority_points = points_path
         self.vct_priority_points.vct_subcatchments = self.vector_factory(
@@ -3313,6 +3682,7 @@ class PostProcess(Factory):
             point_id_column,
             sub_id_column,
             source,
+            engine=_get_subcatchment_engine(gdf_sub),
         )
 
         if contrib_by_id.empty:
@@ -3417,11 +3787,9 @@ class PostProcess(Factory):
         points_path = Path(points_obj.file_path)
         subcatchments_path = Path(subcatchments_obj.file_path)
 
-        self._unlink_vector_dataset(points_path)
-        gdf_points.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points, points_path)
 
-        self._unlink_vector_dataset(subcatchments_path)
-        gdf_sub.to_file(subcatchments_path, spatial_index="YES")
+        subcatchments_path = self._write_vector(gdf_sub, subcatchments_path)
 
         self.vct_priority_points = points_path
         self.vct_priority_points.vct_subcatchments = self.vector_factory(
@@ -3495,11 +3863,9 @@ class PostProcess(Factory):
         points_path = Path(points_obj.file_path)
         subcatchments_path = Path(subcatchments_obj.file_path)
 
-        self._unlink_vector_dataset(points_path)
-        gdf_points.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points, points_path)
 
-        self._unlink_vector_dataset(subcatchments_path)
-        gdf_sub.to_file(subcatchments_path, spatial_index="YES")
+        subcatchments_path = self._write_vector(gdf_sub, subcatchments_path)
 
         self.vct_priority_points = points_path
         self.vct_priority_points.vct_subcatchments = self.vector_factory(
@@ -3589,11 +3955,9 @@ class PostProcess(Factory):
         points_path = Path(points_obj.file_path)
         subcatchments_path = Path(subcatchments_obj.file_path)
 
-        self._unlink_vector_dataset(points_path)
-        gdf_points.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points, points_path)
 
-        self._unlink_vector_dataset(subcatchments_path)
-        gdf_sub.to_file(subcatchments_path, spatial_index="YES")
+        subcatchments_path = self._write_vector(gdf_sub, subcatchments_path)
 
         self.vct_priority_points = points_path
         self.vct_priority_points.vct_subcatchments = self.vector_factory(
@@ -3739,11 +4103,9 @@ class PostProcess(Factory):
         points_path = Path(points_obj.file_path)
         subcatchments_path = Path(subcatchments_obj.file_path)
 
-        self._unlink_vector_dataset(points_path)
-        gdf_points_kept.to_file(points_path, spatial_index="YES")
+        points_path = self._write_vector(gdf_points_kept, points_path)
 
-        self._unlink_vector_dataset(subcatchments_path)
-        gdf_sub_kept.to_file(subcatchments_path, spatial_index="YES")
+        subcatchments_path = self._write_vector(gdf_sub_kept, subcatchments_path)
 
         # Reload and re-couple vectors so in-memory objects reflect filtered files.
         self.vct_priority_points = points_path
@@ -3755,6 +4117,7 @@ class PostProcess(Factory):
         self._attach_subcatchments_plot(self.vct_priority_points)
         self._vct_priority_subcatchments = self.vct_priority_points.vct_subcatchments
 
+    @timed()
     def merge_overlapping_subcatchments(self, gdf_subcatchmpriority, merge=True):
         """Merge overlapping subcatchments and reassign priorities for
         overlapping subcatchments.
@@ -3821,8 +4184,10 @@ class PostProcess(Factory):
 
         gpd_priorities = gpd_priorities.to_crs(epsg=int(self.epsg))
 
-        vct_out = self.postprocessing_folder / "priority_subcatchments_merged.shp"
-        gpd_priorities.to_file(vct_out, spatial_index="YES")
+        self._write_vector(
+            gpd_priorities,
+            self.postprocessing_folder / "priority_subcatchments_merged",
+        )
 
     # ========================================================================
     # TODO: PostProcess CLASS METHODS NOT YET USED BY postprocess.ipynb
@@ -3847,6 +4212,8 @@ class PostProcess(Factory):
     # - convert_output_rsts_to_ton
     # - add_sediment_to_subcatchments
     # - add_segment_results_to_vct
+    # - get_subcatchment_label_index
+    # - sum_rasters_per_subcatchment
     # - compute_sewer_in_per_catchment
     # - identify_sinks_in_routing
     # - set_prckrt_nodata
@@ -3860,7 +4227,10 @@ class PostProcess(Factory):
     # - compute_statistics_rasters_per_polygon_vector
 
     def cleanup_postprocessing_shapefiles(self, dry_run=False, include_subfolders=True):
-        """Keep only active notebook shapefiles in postprocessing folder.
+        """Keep only active notebook vectors in postprocessing folder.
+
+        All vector files (see :data:`pywatemsedem.geo.vectors.VECTOR_FORMATS`) in
+        the postprocessing folder are considered.
 
         Parameters
         ----------
@@ -3877,10 +4247,13 @@ class PostProcess(Factory):
         root = self.postprocessing_folder
         keep_paths = self._collect_notebook_vector_paths()
 
-        if include_subfolders:
-            candidates = list(root.rglob("*.shp"))
-        else:
-            candidates = list(root.glob("*.shp"))
+        candidates = []
+        for properties in VECTOR_FORMATS.values():
+            pattern = f"*{properties['suffix']}"
+            if include_subfolders:
+                candidates += list(root.rglob(pattern))
+            else:
+                candidates += list(root.glob(pattern))
 
         removed = []
         kept = []
@@ -3899,6 +4272,7 @@ class PostProcess(Factory):
             "removed": sorted(removed),
         }
 
+    @timed()
     def aggregate_subcatchments_for_points(
         self, target_input, tag="subcatchments_to_targets"
     ):
@@ -3936,6 +4310,7 @@ class PostProcess(Factory):
             output_dir=output_dir,
         )
 
+    @timed()
     def identify_export_parcel(self):
         """Identify total sediment leaving a parcel.
 
@@ -3948,10 +4323,12 @@ class PostProcess(Factory):
         """
         # couple sediment out to routing file
         valid_routing_sedi_out_vector(self)
-        gdf_routing_sedi_out = gpd.read_file(self.vct_routing_sedi_out)
+        gdf_routing_sedi_out = self._read_vector(self.vct_routing_sedi_out)
         gdf_routing_out_of_parcel = select_routing_out_of_parcel(gdf_routing_sedi_out)
-        out_shp = self.postprocessing_folder / "routing_out_of_parcel.shp"
-        gdf_routing_out_of_parcel.to_file(out_shp, spatial_index="YES")
+        self._write_vector(
+            gdf_routing_out_of_parcel,
+            self.postprocessing_folder / "routing_out_of_parcel",
+        )
         df_prckrt = self.aggregate_sedout_parcel(gdf_routing_out_of_parcel)
 
         return df_prckrt
@@ -3997,6 +4374,7 @@ class PostProcess(Factory):
 
         return df_prckrt
 
+    @timed()
     def couple_sedi_out_routing(self, cols_out=None):
         """Couple sedi_out of raster map values to routing file.
 
@@ -4017,13 +4395,14 @@ class PostProcess(Factory):
         gdf_routing_sedi_out = couple_sedi_out_routing(
             self.vct_routing, self.files["rst_sedi_out"], self.epsg, cols_out
         )
-        self.vct_routing_sedi_out = self.vct_routing.parent / Path(
-            self.vct_routing.stem + "_sedi_out.shp"
+        self.vct_routing_sedi_out = self._write_vector(
+            gdf_routing_sedi_out,
+            self.vct_routing.parent / (self.vct_routing.stem + "_sedi_out"),
         )
-        gdf_routing_sedi_out.to_file(self.vct_routing_sedi_out, spatial_index="YES")
 
         return gdf_routing_sedi_out
 
+    @timed()
     def intersect_sedi_outparcels_with_subcatchments(
         self, rst_subcatchment_sinks, df_sedi_out_parcel
     ):
@@ -4092,15 +4471,15 @@ class PostProcess(Factory):
 
         logger.info("Determining routing out of the catchment...")
 
-        vct_out = (
-            self.postprocessing_folder / f"routing_to_outside_{catchment_name}.shp"
+        vct_out = self._vector_path(
+            self.postprocessing_folder, f"routing_to_outside_{catchment_name}"
         )
         if not vct_out.exists():
-            gdf_routingsedi_out = gpd.read_file(self.vct_routingsedi_out)
+            gdf_routingsedi_out = self._read_vector(self.vct_routingsedi_out)
             gdf_routingsedi_out = gdf_routingsedi_out[
                 gdf_routingsedi_out["lnduTarg"] == 0
             ]
-            gdf_routingsedi_out.to_file(vct_out, spatial_index="YES")
+            self._write_vector(gdf_routingsedi_out, vct_out)
 
     def get_total_sediment(self):
         """Make nice output table
@@ -4180,6 +4559,7 @@ class PostProcess(Factory):
 
         return df_summary
 
+    @timed()
     def process_buffers(self, **kwargs):
         """Compute the ingoing, outgoing and depositing sediment in buffers.
 
@@ -4217,7 +4597,7 @@ class PostProcess(Factory):
                 self.files["rst_sedi_out"],
             )
 
-            gdf_buffer = gpd.read_file(self.files["vct_buffers"])
+            gdf_buffer = self._read_vector(self.files["vct_buffers"])
             gdf_buffer = gdf_buffer.merge(
                 df_out, left_on="id", right_on="NR", how="left"
             )
@@ -4235,10 +4615,11 @@ class PostProcess(Factory):
 
             if cols:
                 gdf_buffer = gdf_buffer[cols]
-            gdf_buffer.to_file(vct_out, spatial_index="YES")
+            self._write_vector(gdf_buffer, vct_out)
 
             return gdf_buffer
 
+    @timed()
     def compute_netto_erosion_parcels(self, join=True):
         """Compute the netto erosion per parcel.
 
@@ -4260,8 +4641,10 @@ class PostProcess(Factory):
             fmap=self.postprocessing_folder,
             flag_write=True,
             flag_join_vct_parcels=join,
+            vector_format=self.vector_format,
         )
 
+    @timed()
     def merge_sedi_out_and_cumulative(self, catchment_name, segments_to_retain=None):
         """Merge SediOut.rst and Cumulative.rst rasters.
 
@@ -4304,6 +4687,7 @@ class PostProcess(Factory):
         rst_out = self.postprocessing_folder / f"SediOut_merged_{catchment_name}.tif"
         write_arr_as_rst(arr_sedi_out_total, rst_out, "float32", self.rstparams)
 
+    @timed()
     def convert_output_rsts_to_ton(self):
         """Convert the units for rasters sedi_out, sedi_in, sediexport and
         watereros from kg to ton.
@@ -4320,7 +4704,8 @@ class PostProcess(Factory):
             if rsts[i].exists():
                 convert_arr_from_kg_to_ton(rsts[i], new_rsts[i])
 
-    def add_sediment_to_subcatchments(self, vct_subcatchments):
+    @timed()
+    def add_sediment_to_subcatchments(self, vct_subcatchments, rasters=None):
         """Adds the sediment input of every river segment to the corresponding
         subcatchment.
 
@@ -4332,6 +4717,10 @@ class PostProcess(Factory):
         vct_subcatchments: str or pathlib.Path
             File path of vectorfile which holds the subcatchments subject to
             inspection.
+        rasters: dict, default None
+            File paths of rasters (values) summed per subcatchment and added as
+            columns (keys), see
+            :func:`pywatemsedem.postprocess.PostProcess.get_subcatchment_label_index`.
 
         """
         logger.info("Coupling results to subcatchments...")
@@ -4348,7 +4737,7 @@ class PostProcess(Factory):
         )  # kg to tonnes
 
         try:
-            gdf_subcatchments = gpd.read_file(vct_subcatchments)
+            gdf_subcatchments = self._read_vector(vct_subcatchments)
         except Exception:
             msg = f"could not open {vct_subcatchments}"
             logger.error(msg)
@@ -4363,8 +4752,14 @@ class PostProcess(Factory):
             )
             gdf_subcatchments["sedar_ha"] = gdf_subcatchments["sedar"] * 10000.0
             gdf_subcatchments.drop(columns=["VALUE"], inplace=True)
-            gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
-
+            if rasters:
+                df_sums = self.sum_rasters_per_subcatchment(vct_subcatchments, rasters)
+                gdf_subcatchments = gdf_subcatchments.merge(
+                    df_sums, left_on="NR", right_on="ids", how="left"
+                ).drop(columns=["ids"])
+            self._write_vector(gdf_subcatchments, vct_subcatchments)
+
+    @timed()
     def add_segment_results_to_vct(self, catchment_name, scenario_label):
         """Add sediment input to every river segment and calculate sedlen.
 
@@ -4399,13 +4794,11 @@ class PostProcess(Factory):
             )
             df_waterline["sedlen"] = df_waterline["Sediment"] / df_waterline.length
 
-            self.vct_riversegment = (
+            self.vct_riversegment = self._write_vector(
+                df_waterline,
                 self.postprocessing_folder
-                / f"Sedimentexport2Segments_{catchment_name}_"
-                f"s{scenario_label}.shp"
+                / f"Sedimentexport2Segments_{catchment_name}_s{scenario_label}",
             )
-
-            df_waterline.to_file(self.vct_riversegment, spatial_index="YES")
         else:
             msg = (
                 f"{self.files['txt_total_sediment_segments']} or "
@@ -4413,40 +4806,92 @@ class PostProcess(Factory):
             )
             raise IOError(msg)
 
-    def compute_sewer_in_per_catchment(self, vct_subcatchments):
-        """Compute sewer in per subcatchment
+    def get_subcatchment_label_index(self, vct_subcatchments):
+        """Get the label index of the subcatchment raster of a subcatchment vector.
+
+        The index is shared by all raster sums per subcatchment (see
+        :func:`pywatemsedem.postprocess.PostProcess.sum_rasters_per_subcatchment`)
+        and cached per file fingerprint of the subcatchment raster (only the index
+        of the last subcatchment raster is kept).
 
         Parameters
         ----------
         vct_subcatchments: str or pathlib.Path
-            File path of vectorfile which holds the subcatchments subject to
-            inspection
+            File path of vectorfile which holds the subcatchments, the subcatchment
+            raster (.sdat) has the same name.
 
+        Returns
+        -------
+        pywatemsedem.geo.utils.LabelIndex
         """
         vct_subcatchments = Path(vct_subcatchments)
         rst_subcatchment = vct_subcatchments.parent / Path(
             vct_subcatchments.stem + ".sdat"
         )
-        arr_sewerin, _ = load_raster(self.files["rst_sewerin"])
-        arr_subcatchment, _ = load_raster(rst_subcatchment)
-        sewer_in = []
-        catchids = np.unique(arr_subcatchment)
-        for catchid in catchids:
-            sewerinsum = np.where(arr_subcatchment == catchid, arr_sewerin, 0).sum()
-            sewer_in.append(sewerinsum)
-        data = {"ids": catchids, "sewer_in": sewer_in}
-        df_sewerin = pd.DataFrame.from_dict(data)
+        key = get_file_fingerprint(rst_subcatchment)
+        if key not in self._label_indexes:
+            arr_subcatchment, _ = load_raster(rst_subcatchment)
+            self._label_indexes = {key: LabelIndex(arr_subcatchment)}
+        return self._label_indexes[key]
+
+    def sum_rasters_per_subcatchment(self, vct_subcatchments, rasters):
+        """Sum the values of rasters per subcatchment.
+
+        Parameters
+        ----------
+        vct_subcatchments: str or pathlib.Path
+            See
+            :func:`pywatemsedem.postprocess.PostProcess.get_subcatchment_label_index`.
+        rasters: dict
+            File paths of the rasters (values) per output column (keys).
+
+        Returns
+        -------
+        pandas.DataFrame
+            Subcatchment ids (*ids*) and the sum per raster, see
+            :func:`pywatemsedem.geo.utils.LabelIndex.sums`.
+        """
+        label_index = self.get_subcatchment_label_index(vct_subcatchments)
+        arrays = {column: load_raster(rst)[0] for column, rst in rasters.items()}
+        return label_index.sums(arrays)
+
+    @timed()
+    def compute_sewer_in_per_catchment(self, vct_subcatchments, rasters=None):
+        """Compute sewer in per subcatchment
+
+        Parameters
+        ----------
+        vct_subcatchments: str or pathlib.Path
+            File path of vectorfile which holds the subcatchments subject to
+            inspection
+        rasters: dict, default None
+            File paths of other rasters (values) summed per subcatchment in the same
+            pass and added as columns (keys).
+
+        Returns
+        -------
+        pandas.DataFrame
+            Subcatchment ids (*ids*), sewer_in (tonnes) and the sums of ``rasters``
+            per subcatchment.
+        """
+        vct_subcatchments = Path(vct_subcatchments)
+        rasters = {"sewer_in": self.files["rst_sewerin"], **(rasters or {})}
+        df_sewerin = self.sum_rasters_per_subcatchment(vct_subcatchments, rasters)
         df_sewerin["sewer_in"] = np.round(
             df_sewerin["sewer_in"] / 1000, 3
         )  # kg to tonnes
-        gdf_subcatchments = gpd.read_file(vct_subcatchments)
+        gdf_subcatchments = self._read_vector(vct_subcatchments)
         gdf_subcatchments = gdf_subcatchments.merge(
             df_sewerin, left_on="NR", right_on="ids", how="left"
         )
         gdf_subcatchments.drop(columns=["ids"], inplace=True)
-        gdf_subcatchments.to_file(vct_subcatchments, spatial_index="YES")
+        self._write_vector(gdf_subcatchments, vct_subcatchments)
+        return df_sewerin
 
-    def identify_sinks_in_routing(self, catchment_name, scenario_label):
+    @timed()
+    def identify_sinks_in_routing(
+        self, catchment_name, scenario_label, return_sparse=False
+    ):
         """Identify sinks based on whether more than one routing vector goes to a pixel.
 
         Parameters
@@ -4455,75 +4900,72 @@ class PostProcess(Factory):
             Name of the catchment (used for output file naming).
         scenario_label : int or str
             Scenario label (used for output file naming).
+        return_sparse : bool, default False
+            Return the sinks as a sparse array.
+
+        Returns
+        -------
+        scipy.sparse.coo_array
+            Sparse array (shape of the P-factor raster) with value 1 for every sink,
+            only returned if ``return_sparse`` is True. See
+            :func:`pywatemsedem.postprocess.identify_sinks_arr`.
         """
 
         logger.info("Looking for sinks in routing...")
         txt = self.files["txt_routing"]
-        if txt.exists():
-            # check if file is tab separated
-            with open(txt) as f:
-                first_line = f.readline()
-            if "\t" not in first_line:
-                df_routing = pd.read_csv(
-                    txt, sep=";"
-                )  # old model runs used ; as separator in routing file
-            else:
-                df_routing = pd.read_csv(txt, sep="\t")
+        if not txt.exists():
+            msg = "routing.txt does not exist!"
+            logger.error(msg)
+            return None
+
+        # check if file is tab separated
+        with open(txt) as f:
+            first_line = f.readline()
+        # old model runs used ; as separator in routing file
+        sep = "\t" if "\t" in first_line else ";"
+        df_routing = pd.read_csv(txt, sep=sep, usecols=["col", "row"])
+
+        arr_pfactor, _ = load_raster(self.files["rst_pkaart"])
+        arr_sinks = identify_sinks_arr(
+            arr_pfactor, df_routing["row"].to_numpy(), df_routing["col"].to_numpy()
+        )
+        rows, cols = np.nonzero(arr_sinks)
 
+        if rows.size > 0:
             Cnst = self.rp
-            # df_route = df_route.loc[(df_route.target1row != -99) & (
-            # df_route.target2row != -99)].copy()
-            # punten -99 zijn buiten modeldomein
-
-            arr_pfactor, profile = load_raster(self.files["rst_pkaart"])
-            df_pkaart = raster_array_to_pandas_dataframe(arr_pfactor, profile)
-            df_pkaart = df_pkaart[(df_pkaart["val"] == 1)]
-            df_routing = df_routing[["col", "row"]].copy()
-            df_routing.drop_duplicates(inplace=True)
-            df_routing["source"] = 1
-            df_pkaart = df_pkaart.merge(df_routing, on=["col", "row"], how="outer")
-            df_pkaart = df_pkaart.loc[df_pkaart["source"] != 1]
-
-            if not df_pkaart.empty:
-                df_pkaart["sourceX"] = (Cnst["minmax"][0] + (Cnst["res"] / 2)) + Cnst[
-                    "res"
-                ] * (df_pkaart["col"] - 1)
-                df_pkaart["sourceY"] = (Cnst["minmax"][1] + (Cnst["res"] / 2)) + Cnst[
-                    "res"
-                ] * (Cnst["nrows"] - df_pkaart["row"])
-                df_pkaart["geometry"] = df_pkaart.apply(
-                    lambda x: shapely.geometry.Point(
-                        float(x.sourceX), float(x.sourceY)
-                    ),
-                    axis=1,
-                )
-                CRS = {"init": Cnst["epsg"]}
-                gpd_bindomain = gpd.GeoDataFrame(
-                    df_pkaart, geometry="geometry", crs=CRS
-                )
-                vct_out = f"sinks_in_routing_{catchment_name}_s{scenario_label}.shp"
-
-                vct_out = self.postprocessing_folder / vct_out
-                gpd_bindomain.to_file(vct_out, spatial_index="YES")
-                msg = f"{gpd_bindomain.shape[0]} sinks in routing!"
-                logger.info(msg)
+            df_sinks = pd.DataFrame(
+                {
+                    "val": arr_pfactor[rows, cols].astype(np.float32),
+                    "row": rows + 1,
+                    "col": cols + 1,
+                }
+            )
+            df_sinks["sourceX"] = (Cnst["minmax"][0] + (Cnst["res"] / 2)) + Cnst[
+                "res"
+            ] * cols
+            df_sinks["sourceY"] = (Cnst["minmax"][1] + (Cnst["res"] / 2)) + Cnst[
+                "res"
+            ] * (Cnst["nrows"] - (rows + 1))
+            gpd_bindomain = gpd.GeoDataFrame(
+                df_sinks,
+                geometry=gpd.points_from_xy(df_sinks["sourceX"], df_sinks["sourceY"]),
+                crs=Cnst["epsg"],
+            )
+            vct_out = f"sinks_in_routing_{catchment_name}_s{scenario_label}"
+            self._write_vector(gpd_bindomain, self.postprocessing_folder / vct_out)
+            msg = f"{gpd_bindomain.shape[0]} sinks in routing!"
+            logger.info(msg)
+        else:
+            logger.info("No sinks in routing")
 
-                """
-                cmd_args = ['saga_cmd', 'shapes_grid', '0', '-SHAPES',
-                str(outshp)]
-                cmd_args += ['-GRIDS', str(self.perceelRST[
-                self.scenario.years[0]])]
-                cmd_args += ['-RESULT', str(outshp)]
-                cmd_args += ['-RESAMPLING', '0']
-                print(cmd_args)
-                execute_subprocess(cmd_args)
-                """
+        if return_sparse:
+            from scipy import sparse
 
-            else:
-                logger.info("No sinks in routing")
-        else:
-            msg = "routing.txt does not exist!"
-            logger.error(msg)
+            return sparse.coo_array(
+                (np.ones(rows.size, dtype=np.int8), (rows, cols)),
+                shape=arr_sinks.shape,
+            )
+        return None
 
     def set_prckrt_nodata(self):
         """Set nodata to 'WaTEM/SEDEM perceelskaart'"""
@@ -4539,6 +4981,7 @@ class PostProcess(Factory):
             logger.warning(msg)
             raise WSException(msg)
 
+    @timed()
     def calculate_areas_prckrt(self, year, catchment_name, scenario_label):
         """Calculate the areas and relative areas of all landuse classes
         in the parcelmap.
@@ -4577,6 +5020,7 @@ class PostProcess(Factory):
         )
         df.to_csv(f, sep=";")
 
+    @timed()
     def make_facts(self, year, catchment_name, scenario_label):
         """Make a textfile with a number of stats about the simulation.
 
@@ -4620,6 +5064,7 @@ class PostProcess(Factory):
             n_grass = df_grass.shape[0]
             f.write(f"Aantal grasstroken {year};{n_grass}\n")
 
+    @timed()
     def split_sewerin(self, scenario_label):
         """Split the sewerin raster with the sewer_id raster.
 
@@ -4833,6 +5278,7 @@ class PostProcess(Factory):
                 logger.info(msg)
                 raise IOError(msg)
 
+    @timed()
     def compute_statistics_rasters_per_polygon_vector(self, vct):
         """Compute statistics for raster for an input polygon vector
 
@@ -4886,14 +5332,7 @@ def _unlink_vector_dataset_local(vector_path):
     vector_path : str or pathlib.Path
         Path to the vector file (shapefile or other format).
     """
-    vector_path = Path(vector_path)
-    if vector_path.suffix.lower() == ".shp":
-        for suffix in [".shp", ".shx", ".dbf", ".prj", ".cpg", ".qix"]:
-            part = vector_path.with_suffix(suffix)
-            if part.exists():
-                part.unlink()
-    elif vector_path.exists():
-        vector_path.unlink()
+    remove_vector(vector_path)
 
 
 def identify_individual_priority_subcatchments(
@@ -4905,6 +5344,7 @@ def identify_individual_priority_subcatchments(
     threshold_percentage=None,
     resmap=Path.cwd(),
     epsg="",
+    vector_format="shapefile",
 ):
     """
     Identify the individual priority subcatchments and add them to rasters
@@ -4930,6 +5370,9 @@ def identify_individual_priority_subcatchments(
         Folder path to write results to.
     epsg: int or str, default ""
         EPSG code or ``"EPSG:XXXXX"`` format.
+    vector_format: str, default "shapefile"
+        Format of the vector outputs, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
 
     Returns
     -------
@@ -4954,6 +5397,7 @@ def identify_individual_priority_subcatchments(
     cumulative_source_load = 0.0
     poi_records = []
     individual_subcatchment_paths = []
+    lst_gdf = []
 
     priority_id = 1
     while True:
@@ -4982,23 +5426,29 @@ def identify_individual_priority_subcatchments(
             resmap,
             rst_profile,
             tag=priority_id,
-            max_sedi_out=max_sedi_out,
+            vector_format=vector_format,
         )
         individual_subcatchment_paths.append(Path(vct_subcatch))
 
-        arr_subcatch, _ = load_raster(rst_subcatch)
-        selected_source_load, subcatch_mask = _selected_source_load(
-            arr_sedi_out,
-            arr_subcatch,
-            nodata,
+        gdf_subcatch = read_vector(vct_subcatch)
+        # only the window of the subcatchment is read from the subcatchment raster
+        selected_source_load, subcatch_mask, subcatch_window = (
+            _selected_source_load_window(
+                arr_sedi_out, rst_subcatch, gdf_subcatch, nodata
+            )
         )
         cumulative_source_load += selected_source_load
 
-        _write_priority_load_attributes(
-            vct_subcatch,
-            selected_source_load,
-            total_source_load,
-            cumulative_source_load,
+        # the attributes are added in memory, the priority subcatchments are
+        # only written once (merged)
+        gdf_subcatch["sedi_out"] = max_sedi_out
+        lst_gdf.append(
+            _add_priority_load_attributes(
+                gdf_subcatch,
+                selected_source_load,
+                total_source_load,
+                cumulative_source_load,
+            )
         )
 
         if _stop_priority_selection(
@@ -5010,17 +5460,20 @@ def identify_individual_priority_subcatchments(
         ):
             break
 
-        arr_sedi_out[subcatch_mask] = nodata
+        arr_sedi_out[subcatch_window][subcatch_mask] = nodata
         if not np.any(_priority_valid_mask(arr_sedi_out, nodata)):
             break
 
         priority_id += 1
 
-    gdf_subcatchmpriority, dst = _merge_priority_subcatchments(resmap, epsg)
+    gdf_subcatchmpriority, dst = _merge_priority_subcatchments(
+        lst_gdf, resmap, epsg, vector_format=vector_format
+    )
 
     gdf_poi = gpd.GeoDataFrame(poi_records, geometry="geometry", crs=epsg)
-    vct_priority_points = resmap / "priority_points_of_interest.shp"
-    gdf_poi.to_file(vct_priority_points, spatial_index="YES")
+    vct_priority_points = write_vector(
+        gdf_poi, resmap / "priority_points_of_interest", vector_format
+    )
 
     _cleanup_priority_subcatchment_shapefiles(
         resmap,
@@ -5122,6 +5575,8 @@ def identify_subcatchments_to_target_ids(
     resmap,
     profile,
     tag="subcatchments_to_targets",
+    vector_format="shapefile",
+    id_column="VALUE",
 ):
     """Identify subcatchments draining to positive target ids.
 
@@ -5138,6 +5593,10 @@ def identify_subcatchments_to_target_ids(
         See :func:`rasterio.open`.
     tag: str, default "subcatchments_to_targets"
         Tag used by :func:`define_subcatchments_saga` for output naming.
+    vector_format: str, default "shapefile"
+        See :func:`pywatemsedem.io.modeloutput.define_subcatchments_saga`.
+    id_column: str, default "VALUE"
+        See :func:`pywatemsedem.io.modeloutput.define_subcatchments_saga`.
 
     Returns
     -------
@@ -5173,10 +5632,12 @@ def identify_subcatchments_to_target_ids(
     mask = np.isin(arr_target_ids, target_ids)
     arr_targets = np.where(mask, arr_target_ids, nodata).astype(np.float32)
 
-    rst_targets = resmap / (str(rst_target_ids.stem) + "_targets.rst")
+    rst_targets = resmap / (str(rst_target_ids.stem) + "_targets.tif")
     rstparams = rasterprofile_to_rstparams(gdal_profile)
 
-    write_arr_as_rst(arr_targets, rst_targets, arr_targets.dtype, rstparams)
+    write_arr_as_rst(
+        arr_targets, rst_targets, arr_targets.dtype, rstparams, policy="intermediate"
+    )
 
     return define_subcatchments_saga(
         rst_targets,
@@ -5184,6 +5645,8 @@ def identify_subcatchments_to_target_ids(
         resmap,
         gdal_profile,
         tag=tag,
+        vector_format=vector_format,
+        id_column=id_column,
     )
 
 
@@ -5264,7 +5727,9 @@ def compute_cdf_sediment_load(
     return df
 
 
-def convert_rst_sinks_to_vct(rst_in, vct_out, kind, epsg="EPSG:31370"):
+def convert_rst_sinks_to_vct(
+    rst_in, vct_out, kind, epsg="EPSG:31370", vector_format="shapefile"
+):
     """Convert a sinks raster to a vector file.
 
     A sinks raster is defined as a raster holding captured sediment loads
@@ -5280,6 +5745,14 @@ def convert_rst_sinks_to_vct(rst_in, vct_out, kind, epsg="EPSG:31370"):
         'sewer' or 'river'
     epsg: str, default "EPSG:31370"
         EPSG code for the output vector CRS.
+    vector_format: str, default "shapefile"
+        Format of the output vector, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
+
+    Returns
+    -------
+    pathlib.Path
+        File path of the output vector.
     """
     if kind not in ["river", "sewer"]:
         raise KeyError(f"{kind} of sink not in known.")
@@ -5289,12 +5762,15 @@ def convert_rst_sinks_to_vct(rst_in, vct_out, kind, epsg="EPSG:31370"):
     _, profile = load_raster(rst_in)
     nodata = profile["nodata"]
 
+    # saga writes a temporary shapefile, the output vector is written once
+    vct_saga = Path(create_filename(".shp"))
     cmd_args = ["saga_cmd", SAGA_FLAGS, "shapes_grid", "3"]
     cmd_args += ["-GRIDS", str(rst_in)]
-    cmd_args += ["-POINTS", str(vct_out)]
+    cmd_args += ["-POINTS", str(vct_saga)]
     execute_saga(cmd_args)
 
-    gdf_out = gpd.read_file(vct_out)
+    gdf_out = read_vector(vct_saga)
+    clean_up_tempfiles(vct_saga, "shp")
     value_col = basename[:11]
     if pd.isna(nodata):
         cond_valid = (~gdf_out[value_col].isna()) & (gdf_out[value_col] != 0)
@@ -5322,7 +5798,7 @@ def convert_rst_sinks_to_vct(rst_in, vct_out, kind, epsg="EPSG:31370"):
         gdf_out["cumperc"] = (gdf_out["cumsum"] / (gdf_out["sediment"].sum())) * 100
     gdf_out = gdf_out.reset_index()
     gdf_out.drop(columns=["index"], inplace=True)
-    gdf_out.to_file(vct_out, spatial_index="YES")
+    return write_vector(gdf_out, vct_out, vector_format)
 
 
 # ============================================================================
@@ -5337,13 +5813,14 @@ def convert_rst_sinks_to_vct(rst_in, vct_out, kind, epsg="EPSG:31370"):
 # - _create_poi_records
 # - _resolve_or_create_priority_subcatchment
 # - _selected_source_load
-# - _write_priority_load_attributes
+# - _add_priority_load_attributes
 # - _stop_priority_selection
 # - _merge_priority_subcatchments
 # - _cleanup_priority_subcatchment_shapefiles
 # - create_id_raster_for_highest_value_arr
 # - check_if_file_exists
 # - split_endpoints_in_raster
+# - identify_sinks_arr
 # - convert_arr_from_kg_to_ton
 # - process_filename
 # - read_filestructure
@@ -5475,9 +5952,9 @@ def _resolve_or_create_priority_subcatchment(
     resmap,
     rst_profile,
     tag,
-    max_sedi_out,
+    vector_format="shapefile",
 ):
-    """Return raster/vector paths for a priority subcatchment and annotate sedi_out.
+    """Return raster/vector paths for a priority subcatchment.
 
     Parameters
     ----------
@@ -5491,29 +5968,27 @@ def _resolve_or_create_priority_subcatchment(
         Raster profile.
     tag : int or str
         Tag for output file naming.
-    max_sedi_out : float
-        Maximum sediment output value to annotate.
+    vector_format : str, default "shapefile"
+        Format of the vector output, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
 
     Returns
     -------
     tuple
         ``(rst_subcatch, vct_subcatch)`` file paths.
     """
-    template_name = resmap / f"subcatchments_{tag}.shp"
+    template_name = get_vector_file_path(resmap / f"subcatchments_{tag}", vector_format)
     if template_name.exists():
         return template_name.with_suffix(".sdat"), template_name
 
-    rst_subcatch, vct_subcatch = identify_subcatchments_to_target_ids(
+    return identify_subcatchments_to_target_ids(
         rst_id,
         txt_routing_non_river,
         resmap,
         rst_profile,
         tag=tag,
+        vector_format=vector_format,
     )
-    gdf = gpd.read_file(vct_subcatch)
-    gdf["sedi_out"] = max_sedi_out
-    gdf.to_file(vct_subcatch, spatial_index="YES")
-    return rst_subcatch, vct_subcatch
 
 
 def _selected_source_load(arr_sedi_out, arr_subcatch, nodata):
@@ -5541,26 +6016,63 @@ def _selected_source_load(arr_sedi_out, arr_subcatch, nodata):
     return arr_sedi_out[valid_subcatch].sum(), subcatch_mask
 
 
-def _write_priority_load_attributes(
-    vct_subcatch,
+def _selected_source_load_window(arr_sedi_out, rst_subcatch, gdf_subcatch, nodata):
+    """Compute the selected source load of a subcatchment, only reading the window
+    of the subcatchment from the subcatchment raster.
+
+    Parameters
+    ----------
+    arr_sedi_out : numpy.ndarray
+        Sediment output array (full raster).
+    rst_subcatch : str or pathlib.Path
+        File path of the subcatchment raster, on the grid of ``arr_sedi_out``.
+    gdf_subcatch : geopandas.GeoDataFrame
+        Subcatchment vector, the window is the bounds of the vector snapped to the
+        raster grid (the full raster if the vector is empty), see
+        :func:`pywatemsedem.geo.utils.load_raster_window`.
+    nodata : float
+        Nodata value.
+
+    Returns
+    -------
+    tuple
+        ``(selected_source_load, subcatch_mask, subcatch_window)``, see
+        :func:`pywatemsedem.postprocess._selected_source_load`. The mask holds the
+        cells of the window, ``subcatch_window`` are the slices of the window in
+        ``arr_sedi_out``.
+    """
+    bounds = None if gdf_subcatch.empty else gdf_subcatch.total_bounds
+    arr_subcatch, _, window = load_raster_window(rst_subcatch, bounds)
+    subcatch_window = window.toslices()
+    selected_source_load, subcatch_mask = _selected_source_load(
+        arr_sedi_out[subcatch_window], arr_subcatch, nodata
+    )
+    return selected_source_load, subcatch_mask, subcatch_window
+
+
+def _add_priority_load_attributes(
+    gdf,
     selected_source_load,
     total_source_load,
     cumulative_source_load,
 ):
-    """Write source-load columns to a priority subcatchment vector.
+    """Add source-load columns to a priority subcatchment vector.
 
     Parameters
     ----------
-    vct_subcatch : str or pathlib.Path
-        Vector file path.
+    gdf : geopandas.GeoDataFrame
+        Priority subcatchment vector.
     selected_source_load : float
         Sediment load for this subcatchment.
     total_source_load : float
         Total sediment load across all valid source cells.
     cumulative_source_load : float
         Cumulative sediment load up to and including this subcatchment.
+
+    Returns
+    -------
+    geopandas.GeoDataFrame
     """
-    gdf = gpd.read_file(vct_subcatch)
     gdf["source_load"] = selected_source_load
     if total_source_load != 0:
         gdf["source_load_perc"] = 100 * selected_source_load / total_source_load
@@ -5568,7 +6080,7 @@ def _write_priority_load_attributes(
     else:
         gdf["source_load_perc"] = np.nan
         gdf["source_load_cumperc"] = np.nan
-    gdf.to_file(vct_subcatch, spatial_index="YES")
+    return gdf
 
 
 def _stop_priority_selection(
@@ -5605,15 +6117,21 @@ def _stop_priority_selection(
     )
 
 
-def _merge_priority_subcatchments(resmap, epsg):
-    """Merge all ``subcatchments_*.shp`` files into ``priority_subcatchments.shp``.
+def _merge_priority_subcatchments(lst_gdf, resmap, epsg, vector_format="shapefile"):
+    """Merge the individual priority subcatchments into
+    ``priority_subcatchments.shp``.
 
     Parameters
     ----------
+    lst_gdf : list of geopandas.GeoDataFrame
+        Individual priority subcatchments.
     resmap : str or pathlib.Path
-        Folder path containing individual subcatchment shapefiles.
+        Output folder.
     epsg : int or str
         EPSG code or ``"EPSG:XXXXX"`` format.
+    vector_format : str, default "shapefile"
+        Format of the vector output, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
 
     Returns
     -------
@@ -5621,17 +6139,11 @@ def _merge_priority_subcatchments(resmap, epsg):
         ``(gdf_subcatchmpriority, dst)`` where ``dst`` is the path to the
         merged output.
     """
-    lst_gdf = [
-        gpd.read_file(vector_path)
-        for vector_path in resmap.iterdir()
-        if vector_path.suffix == ".shp"
-        and vector_path.stem.startswith("subcatchments_")
-    ]
-
     gdf_subcatchmpriority = pd.concat(lst_gdf)
     gdf_subcatchmpriority.crs = epsg
-    dst = resmap / "priority_subcatchments.shp"
-    gdf_subcatchmpriority.to_file(dst, spatial_index="YES")
+    dst = write_vector(
+        gdf_subcatchmpriority, Path(resmap) / "priority_subcatchments", vector_format
+    )
     return gdf_subcatchmpriority, dst
 
 
@@ -5652,9 +6164,9 @@ def _cleanup_priority_subcatchment_shapefiles(resmap, dst, individual_paths):
         if vct_subcatch != dst:
             _unlink_vector_dataset_local(vct_subcatch)
 
-    for shp in Path(resmap).glob("subcatchments_*.shp"):
-        if shp.resolve() != dst.resolve():
-            _unlink_vector_dataset_local(shp)
+    for vct in Path(resmap).glob(f"subcatchments_*{Path(dst).suffix}"):
+        if vct.resolve() != dst.resolve():
+            _unlink_vector_dataset_local(vct)
 
 
 def create_id_raster_for_highest_value_arr(arr, id_, profile, resmap):
@@ -5704,8 +6216,8 @@ def create_id_raster_for_highest_value_arr(arr, id_, profile, resmap):
     rows, cols = np.where(cond)
 
     # write to disk
-    rst_id = resmap / f"id_{id_}.rst"
-    write_arr_as_rst(arr_id, rst_id, np.int32, profile)
+    rst_id = resmap / f"id_{id_}.tif"
+    write_arr_as_rst(arr_id, rst_id, np.int32, profile, policy="intermediate")
 
     return rst_id, max_val, rows, cols
 
@@ -5799,6 +6311,105 @@ def split_endpoints_in_raster(
     return sum_id1, sum_id2
 
 
+def _get_subcatchment_engine(gdf_subcatchments):
+    """Get the engine a subcatchment vector is delineated with, see
+    :func:`pywatemsedem.postprocess.PostProcess.identify_subcatchments`.
+
+    The routing engine writes the *engine* column in the subcatchment vector, a
+    vector without the column is delineated with SAGA.
+
+    Parameters
+    ----------
+    gdf_subcatchments: geopandas.GeoDataFrame
+        Subcatchment vector.
+
+    Returns
+    -------
+    str
+        "routing" or "saga".
+    """
+    if "engine" in gdf_subcatchments.columns and (
+        gdf_subcatchments["engine"].eq("routing").all()
+    ):
+        return "routing"
+    return "saga"
+
+
+def _compute_cumulative_contrib_polygons(
+    arr_source, valid_mask, ids, geometries, transform, total_source_load
+):
+    """Compute the cumulative contribution of ranked subcatchment polygons.
+
+    A cell only contributes to the first (highest ranked) subcatchment it is in.
+
+    Parameters
+    ----------
+    arr_source: numpy.ndarray
+        Source load raster.
+    valid_mask: numpy.ndarray
+        Valid (not nodata) cells of the source load raster.
+    ids: numpy.ndarray
+        Subcatchment ids, in order of rank.
+    geometries: geopandas.GeoSeries
+        Subcatchment polygons, indexed by subcatchment id.
+    transform: affine.Affine
+        Transform of the source load raster.
+    total_source_load: float
+        Total source load.
+
+    Returns
+    -------
+    pandas.Series
+        Cumulative contribution percentage by subcatchment id.
+    """
+    from rasterio.features import rasterize
+
+    covered_mask = np.zeros(arr_source.shape, dtype=bool)
+    cumulative_source_load = 0.0
+    contrib = {}
+    for target_id in ids:
+        sub_mask = rasterize(
+            [(geometries[target_id], 1)],
+            out_shape=arr_source.shape,
+            transform=transform,
+            fill=0,
+            dtype="uint8",
+        ).astype(bool)
+        new_cells = sub_mask & valid_mask & ~covered_mask
+        cumulative_source_load += float(arr_source[new_cells].sum())
+        contrib[int(target_id)] = 100.0 * cumulative_source_load / total_source_load
+        covered_mask |= sub_mask
+    return pd.Series(contrib, dtype=np.float64)
+
+
+def identify_sinks_arr(arr_pfactor, rows, cols):
+    """Identify the sinks in the routing: cells with a P-factor of 1 from which no
+    sediment is routed.
+
+    Parameters
+    ----------
+    arr_pfactor: numpy.ndarray
+        P-factor raster array.
+    rows: numpy.ndarray
+        Rows (one-based) of the source cells of the WaTEM/SEDEM routing table.
+    cols: numpy.ndarray
+        Columns (one-based) of the source cells of the WaTEM/SEDEM routing table.
+
+    Returns
+    -------
+    numpy.ndarray
+        Boolean array, True for the sinks.
+    """
+    nrows, ncols = arr_pfactor.shape
+    rows = np.asarray(rows, dtype=np.int64) - 1
+    cols = np.asarray(cols, dtype=np.int64) - 1
+    inside = (rows >= 0) & (rows < nrows) & (cols >= 0) & (cols < ncols)
+
+    arr_source = np.zeros(arr_pfactor.size, dtype=bool)
+    arr_source[rows[inside] * ncols + cols[inside]] = True
+    return (arr_pfactor == 1) & ~arr_source.reshape(arr_pfactor.shape)
+
+
 def aggregate_sedi_in_and_sedi_out_grass_strips(df_routing_grass):
     """
     Compute the load in and out of a grass strips, so efficiencies can be
@@ -6177,6 +6788,7 @@ def compute_netto_erosion_parcels(
     fmap="results",
     flag_write=False,
     flag_join_vct_parcels=True,
+    vector_format="shapefile",
 ):
     """Calculates the netto erosion for every parcel.
 
@@ -6204,6 +6816,9 @@ def compute_netto_erosion_parcels(
         Flag to indicate whether results should be written to disk
     flag_join_vct_parcels: bool, default True
         Join the results to the parcel shapefile.
+    vector_format: str, default "shapefile"
+        Format of the joined parcels vector, see
+        :func:`pywatemsedem.geo.vectors.get_vector_format`.
 
     Returns
     -------
@@ -6257,8 +6872,7 @@ def compute_netto_erosion_parcels(
         txt_out = fmap / ("netto_erosion.csv")
         df_netto_erosion.to_csv(txt_out)
         if flag_join_vct_parcels:
-            vct_out = fmap / "netto_erosion_parcels.shp"
-            gdf_prcln.to_file(vct_out, spatial_index="YES")
+            write_vector(gdf_prcln, fmap / "netto_erosion_parcels", vector_format)
 
     return df_netto_erosion, gdf_prcln
 
@@ -6475,7 +7089,7 @@ def couple_sedi_out_routing(vct_routing, rst_sedi_out, epsg, cols_out=None):
         - *cum_sum* (float): Cumulative sediment output based on sedi_out1
         - *cum_perc* (float): Cumulative percentage (%)
     """
-    gdf_routing = gpd.read_file(vct_routing)
+    gdf_routing = read_vector(vct_routing)
 
     # load sedOut
     arr_sedi_out, profile = load_raster(rst_sedi_out)
@@ -0,0 +1,286 @@
+"""profiling.py
+
+This module holds the instrumentation layer of pywatemsedem: stage timers (context
+manager and decorator) with optional tracemalloc memory peaks, and a counter of the
+invoked command line tools (saga_cmd, gdalwarp, gdal_translate, ...).
+
+Instrumentation is only recorded when a :class:`Profiler` is active, otherwise the
+timers are no-ops.
+
+Examples
+--------
+>>> from pywatemsedem.profiling import Profiler
+>>> with Profiler(trace_memory=True) as profiler:
+...     scenario.composite_landuse = scenario.create_composite_landuse()
+...     scenario.cfactor = scenario.create_cfactor()
+>>> profiler.to_json("profile.json")
+>>> profiler.to_csv("profile.csv")
+"""
+
+import json
+import logging
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+from pathlib import Path
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+#: Command line tools counted as separate columns in the profiling records
+TRACKED_TOOLS = ["saga_cmd", "gdalwarp", "gdal_translate", "watem_sedem"]
+
+_active_profiler = None
+
+
+class Profiler:
+    """Record the duration, memory peak and tool calls of pywatemsedem stages.
+
+    Use the profiler as context manager: all stages (see :func:`timer` and
+    :func:`timed`) run within the context are recorded.
+
+    Parameters
+    ----------
+    trace_memory: bool, default False
+        Trace the memory peak of every stage with :mod:`tracemalloc`. Note that
+        tracing slows down the execution and only traces memory allocated by Python
+        (incl. numpy arrays), not the memory of GDAL or command line tools.
+
+    Attributes
+    ----------
+    records: list of dict
+        One record per finished stage, see
+        :func:`pywatemsedem.profiling.Profiler.to_dataframe`.
+    tool_calls: collections.Counter
+        Number of calls per command line tool for the full run.
+    """
+
+    def __init__(self, trace_memory=False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self.tool_calls = Counter()
+        self._stack = []
+        self._lock = threading.Lock()
+        self._started_tracemalloc = False
+        self._previous = None
+
+    def __enter__(self):
+        """Activate the profiler."""
+        global _active_profiler
+        self._previous = _active_profiler
+        _active_profiler = self
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        return self
+
+    def __exit__(self, *args):
+        """Deactivate the profiler."""
+        global _active_profiler
+        _active_profiler = self._previous
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+    def start_stage(self, name):
+        """Start recording a stage.
+
+        Parameters
+        ----------
+        name: str
+            Name of the stage.
+
+        Returns
+        -------
+        dict
+            Stage record, to pass to
+            :func:`pywatemsedem.profiling.Profiler.stop_stage`.
+        """
+        stage = {
+            "stage": name,
+            "parent": self._stack[-1]["stage"] if self._stack else None,
+            "depth": len(self._stack),
+            "tool_calls": Counter(),
+            "memory_start": None,
+            "memory_peak": None,
+        }
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # keep the peak of the enclosing stages before resetting it
+            for parent in self._stack:
+                if parent["memory_peak"] is not None:
+                    parent["memory_peak"] = max(parent["memory_peak"], peak)
+            tracemalloc.reset_peak()
+            stage["memory_start"] = current
+            stage["memory_peak"] = current
+        self._stack.append(stage)
+        stage["start"] = time.perf_counter()
+        return stage
+
+    def stop_stage(self, stage):
+        """Stop recording a stage and add it to the records.
+
+        Parameters
+        ----------
+        stage: dict
+            Stage record, see
+            :func:`pywatemsedem.profiling.Profiler.start_stage`.
+        """
+        duration = time.perf_counter() - stage["start"]
+        self._stack = [running for running in self._stack if running is not stage]
+
+        peak_memory = None
+        if stage["memory_start"] is not None and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            stage["memory_peak"] = max(stage["memory_peak"], peak)
+            peak_memory = stage["memory_peak"] - stage["memory_start"]
+            for parent in self._stack:
+                if parent["memory_peak"] is not None:
+                    parent["memory_peak"] = max(parent["memory_peak"], peak)
+
+        record = {
+            "stage": stage["stage"],
+            "parent": stage["parent"],
+            "depth": stage["depth"],
+            "duration": duration,
+            "peak_memory": peak_memory,
+        }
+        for tool in TRACKED_TOOLS:
+            record[tool] = stage["tool_calls"][tool]
+        record["other_tools"] = sum(
+            count
+            for tool, count in stage["tool_calls"].items()
+            if tool not in TRACKED_TOOLS
+        )
+        self.records.append(record)
+        logger.debug(f"Stage '{stage['stage']}' finished in {duration:.3f} s.")
+
+    def count_tool_call(self, cmd_args):
+        """Count the call of a command line tool.
+
+        The call is counted for the full run and for all running stages.
+
+        Parameters
+        ----------
+        cmd_args: list
+            Command, the first element is the tool.
+        """
+        tool = Path(str(cmd_args[0])).stem
+        with self._lock:
+            self.tool_calls[tool] += 1
+            for stage in self._stack:
+                stage["tool_calls"][tool] += 1
+
+    def to_dataframe(self):
+        """Get the records as a dataframe.
+
+        Returns
+        -------
+        pandas.DataFrame
+            One row per finished stage (in order of finishing), with columns
+
+            - *stage* (str): name of the stage.
+            - *parent* (str): name of the enclosing stage (None for a top stage).
+            - *depth* (int): nesting level of the stage.
+            - *duration* (float): wall time (s).
+            - *peak_memory* (float): peak of traced memory above the memory at the
+              start of the stage (bytes), NaN if memory is not traced.
+            - *saga_cmd*, *gdalwarp*, *gdal_translate*, *watem_sedem* (int): number
+              of calls of the tool within the stage.
+            - *other_tools* (int): number of calls of other tools within the stage.
+        """
+        columns = ["stage", "parent", "depth", "duration", "peak_memory"]
+        columns += TRACKED_TOOLS + ["other_tools"]
+        return pd.DataFrame(self.records, columns=columns)
+
+    def to_csv(self, txt_out):
+        """Write the records to a csv-file.
+
+        Parameters
+        ----------
+        txt_out: pathlib.Path or str
+            File path of the output csv-file.
+        """
+        self.to_dataframe().to_csv(txt_out, index=False)
+
+    def to_json(self, txt_out):
+        """Write the records and the total tool calls to a json-file.
+
+        Parameters
+        ----------
+        txt_out: pathlib.Path or str
+            File path of the output json-file.
+        """
+        data = {"stages": self.records, "tool_calls": dict(self.tool_calls)}
+        with open(txt_out, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+def get_active_profiler():
+    """Get the active profiler.
+
+    Returns
+    -------
+    pywatemsedem.profiling.Profiler
+        None if no profiler is active.
+    """
+    return _active_profiler
+
+
+@contextmanager
+def timer(name):
+    """Record a stage with the active profiler.
+
+    Parameters
+    ----------
+    name: str
+        Name of the stage.
+    """
+    profiler = _active_profiler
+    if profiler is None:
+        yield
+        return
+    stage = profiler.start_stage(name)
+    try:
+        yield
+    finally:
+        profiler.stop_stage(stage)
+
+
+def timed(name=None):
+    """Decorator to record a function as stage with the active profiler.
+
+    Parameters
+    ----------
+    name: str, default None
+        Name of the stage. If None, the qualified name of the function is used.
+    """
+
+    def decorator(func):
+        stage_name = func.__qualname__ if name is None else name
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            """Execute the wrapped function as a profiling stage."""
+            with timer(stage_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def count_tool_call(cmd_args):
+    """Count the call of a command line tool with the active profiler.
+
+    Parameters
+    ----------
+    cmd_args: list
+        Command, the first element is the tool.
+    """
+    if _active_profiler is not None:
+        _active_profiler.count_tool_call(cmd_args)
@@ -0,0 +1,298 @@
+"""registry.py
+
+This module holds the registry of the external command line tools used by
+pywatemsedem (saga_cmd, gdalwarp, gdal_translate and watem_sedem). The tools are
+resolved lazily on first use, i.e. importing pywatemsedem does not require SAGA,
+GDAL or WaTEM/SEDEM to be installed.
+
+A tool is searched in the environment variable PATH. If it cannot be found, the
+folder defined in the environment variable of the tool (SAGA or WATEMSEDEM, see
+:data:`TOOLS`) is added to PATH. The result is cached per process and, if a cache
+file is defined (environment variable PYWATEMSEDEM_TOOL_CACHE), on disk. A cached
+result is reused as long as PATH (and the environment variable of the tool) and the
+modification time of the binary are unchanged.
+
+Examples
+--------
+>>> from pywatemsedem.registry import check_environment
+>>> check_environment()
+{'saga_cmd': '/usr/bin/saga_cmd', 'gdalwarp': '/usr/bin/gdalwarp', ...}
+"""
+
+import json
+import logging
+import os
+import shutil
+import subprocess
+import threading
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+#: External tools with the name used in messages (label) and the environment
+#: variable holding the folder of the tool (env_var)
+TOOLS = {
+    "saga_cmd": {"label": "SAGA", "env_var": "SAGA"},
+    "gdalwarp": {"label": "GDAL", "env_var": None},
+    "gdal_translate": {"label": "GDAL", "env_var": None},
+    "watem_sedem": {"label": "WaTEM/SEDEM", "env_var": "WATEMSEDEM"},
+}
+
+
+def check_saga_topology(saga_cmd):
+    """Check if the SAGA/WaTEM topology module is installed.
+
+    Parameters
+    ----------
+    saga_cmd: str
+        File path of the saga_cmd binary.
+
+    Raises
+    ------
+    OSError
+        If the topology library cannot be loaded by saga_cmd.
+    """
+    try:
+        subprocess.check_output([saga_cmd, "topology"], stderr=subprocess.STDOUT)
+    except subprocess.CalledProcessError as e:
+        if "Error: select a library" in e.output.decode():
+            msg = (
+                "SAGA/WaTEM is not properly installed, check the installation "
+                "instruction in the documentation."
+            )
+            raise OSError(msg)
+
+
+class ToolRegistry:
+    """Lazily resolve and cache the external command line tools.
+
+    Parameters
+    ----------
+    cache_file: pathlib.Path or str, default None
+        File path of the json-file used to cache the resolved tools across
+        processes. If None, tools are only cached within the process.
+    """
+
+    def __init__(self, cache_file=None):
+        self.cache_file = None if cache_file is None else Path(cache_file)
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def resolve(self, tool, binary=None):
+        """Get the file path of an external tool.
+
+        Parameters
+        ----------
+        tool: str
+            Name of the tool, one of :data:`TOOLS`.
+        binary: str, default None
+            Name or file path of the executable of the tool. If None, the name of
+            the tool is used.
+
+        Returns
+        -------
+        str
+            File path of the executable.
+
+        Raises
+        ------
+        ValueError
+            If the tool is not known.
+        OSError
+            If the tool cannot be found, or SAGA/WaTEM is not properly installed.
+        """
+        if tool not in TOOLS:
+            msg = f"Tool '{tool}' not known, choose one of {list(TOOLS)}."
+            raise ValueError(msg)
+        binary = tool if binary is None else str(binary)
+        key = self._get_key(tool, binary)
+
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]["path"]
+
+            entry = self._load_from_disk(key)
+            if entry is None:
+                entry = self._find(tool, binary)
+                if tool == "saga_cmd":
+                    check_saga_topology(entry["path"])
+                self._write_to_disk(key, entry)
+            elif entry["folder"] is not None:
+                _add_to_path(entry["folder"], tool)
+
+            # PATH might be changed by the tool folder, cache for both
+            self._cache[key] = entry
+            self._cache[self._get_key(tool, binary)] = entry
+            logger.debug(f"Using {tool} '{entry['path']}'.")
+            return entry["path"]
+
+    def check_environment(self, tools=None, raise_error=True):
+        """Resolve a list of external tools.
+
+        Parameters
+        ----------
+        tools: list, default None
+            Names of the tools to check. If None, all :data:`TOOLS` are checked.
+        raise_error: bool, default True
+            Raise an error if a tool cannot be resolved.
+
+        Returns
+        -------
+        dict
+            File path (values) of every tool (keys), None if the tool cannot be
+            resolved (and ``raise_error`` is False).
+
+        Raises
+        ------
+        OSError
+            If one or more tools cannot be resolved and ``raise_error`` is True.
+        """
+        tools = list(TOOLS) if tools is None else tools
+        paths = {}
+        errors = []
+        for tool in tools:
+            try:
+                paths[tool] = self.resolve(tool)
+            except OSError as e:
+                paths[tool] = None
+                errors.append(str(e))
+        if errors and raise_error:
+            msg = "\n".join(errors)
+            raise OSError(msg)
+        return paths
+
+    def clear(self):
+        """Clear the cache of the process and the cache file."""
+        with self._lock:
+            self._cache = {}
+            if self.cache_file is not None and self.cache_file.exists():
+                self.cache_file.unlink()
+
+    @staticmethod
+    def _get_key(tool, binary):
+        """Get the cache key of a tool for the current environment."""
+        env_var = TOOLS[tool]["env_var"]
+        env_value = "" if env_var is None else os.environ.get(env_var, "")
+        return f"{tool}|{binary}|{os.environ.get('PATH', '')}|{env_value}"
+
+    @staticmethod
+    def _find(tool, binary):
+        """Search a tool in PATH or in the folder of its environment variable."""
+        label = TOOLS[tool]["label"]
+        env_var = TOOLS[tool]["env_var"]
+        folder = None
+        path = shutil.which(binary)
+        if path is None:  # binary cannot be found in the PATH variable
+            if env_var is None:
+                msg = (
+                    f"{label} ({binary}) is not available in the environment "
+                    f"variable PATH"
+                )
+                raise OSError(msg)
+            # Check if there is an environment variable for the tool
+            if (
+                os.environ.get(env_var) is not None
+                and Path(os.environ[env_var]).exists()
+            ):
+                folder = os.environ[env_var]
+                _add_to_path(folder, tool)
+                path = shutil.which(binary)
+                if path is None:
+                    msg = (
+                        f"{label} is not properly installed, pywatemsedem cannot"
+                        f" access {binary} via PATH or {env_var}"
+                    )
+                    raise OSError(msg)
+            else:
+                msg = (
+                    f"{label} is not available in the environment variable PATH "
+                    f"and there is no environment variable {env_var}"
+                )
+                raise OSError(msg)
+        return {"path": path, "mtime": Path(path).stat().st_mtime, "folder": folder}
+
+    def _load_from_disk(self, key):
+        """Get a cached tool from the cache file, None if not (validly) cached."""
+        if self.cache_file is None or not self.cache_file.exists():
+            return None
+        try:
+            with open(self.cache_file) as f:
+                entry = json.load(f).get(key)
+        except (OSError, ValueError):
+            logger.warning(f"Could not read tool cache file '{self.cache_file}'.")
+            return None
+        if entry is None:
+            return None
+        path = Path(entry["path"])
+        if not path.exists() or path.stat().st_mtime != entry["mtime"]:
+            return None
+        return entry
+
+    def _write_to_disk(self, key, entry):
+        """Add a tool to the cache file."""
+        if self.cache_file is None:
+            return
+        data = {}
+        if self.cache_file.exists():
+            try:
+                with open(self.cache_file) as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                data = {}
+        data[key] = entry
+        self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.cache_file, "w") as f:
+            json.dump(data, f, indent=2)
+
+
+def _add_to_path(folder, tool):
+    """Add the folder of a tool to the environment variable PATH."""
+    if folder not in os.environ.get("PATH", "").split(os.pathsep):
+        os.environ["PATH"] = folder + os.pathsep + os.environ.get("PATH", "")
+    if tool == "saga_cmd":
+        os.environ["SAGA_TLB"] = folder
+
+
+#: Tool registry used by :func:`get_tool` and :func:`check_environment`
+registry = ToolRegistry(cache_file=os.environ.get("PYWATEMSEDEM_TOOL_CACHE"))
+
+
+def get_tool(tool, binary=None):
+    """Get the file path of an external tool.
+
+    See :func:`pywatemsedem.registry.ToolRegistry.resolve`.
+
+    Parameters
+    ----------
+    tool: str
+        Name of the tool, one of :data:`TOOLS`.
+    binary: str, default None
+        Name or file path of the executable of the tool. If None, the name of the
+        tool is used.
+
+    Returns
+    -------
+    str
+        File path of the executable.
+    """
+    return registry.resolve(tool, binary)
+
+
+def check_environment(tools=None, raise_error=True):
+    """Check if the external tools of pywatemsedem are available.
+
+    See :func:`pywatemsedem.registry.ToolRegistry.check_environment`.
+
+    Parameters
+    ----------
+    tools: list, default None
+        Names of the tools to check. If None, all :data:`TOOLS` are checked.
+    raise_error: bool, default True
+        Raise an error if a tool cannot be resolved.
+
+    Returns
+    -------
+    dict
+        File path (values) of every tool (keys).
+    """
+    return registry.check_environment(tools=tools, raise_error=raise_error)
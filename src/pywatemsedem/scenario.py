@@ -1,5 +1,4 @@
 import logging
-import os
 import shutil
 
 # Standard libraries
@@ -18,7 +17,9 @@ from pywatemsedem.buffers import (
     process_buffer_outlets,
     process_buffers_in_river,
 )
-from pywatemsedem.cfactor import create_cfactor_degerick2015
+from pywatemsedem.cfactor import CfactorEngine, create_cfactor_degerick2015
+from pywatemsedem.defaults import RASTER_DTYPES
+from pywatemsedem.errors import WSException  # backwards compatibility
 from pywatemsedem.errors import (
     attribute_continuous_value_error,
     attribute_discrete_value_error,
@@ -30,9 +31,13 @@ from pywatemsedem.geo.vectors import AbstractVector
 from pywatemsedem.grasstrips import process_grass_strips
 from pywatemsedem.io.folders import ScenarioFolders
 from pywatemsedem.io.ini import IniFile
+from pywatemsedem.io.inputwriter import InputWriter
 from pywatemsedem.io.plots import plot_landuse
+from pywatemsedem.io.routinggraph import build_routing_index
 from pywatemsedem.ktc import create_ktc
 from pywatemsedem.parcelslanduse import ParcelsLanduse, get_source_landuse
+from pywatemsedem.profiling import count_tool_call, timed
+from pywatemsedem.registry import get_tool
 from pywatemsedem.templates import InputFileName
 from pywatemsedem.tools import format_forced_routing, zip_folder
 
@@ -272,10 +277,6 @@ def valid_ini(func):
     return wrapper
 
 
-class WSException(Exception):
-    """Exception from WaTEM/SEDEM pre- and postprocessing scripts"""
-
-
 class Scenario:
     """Construct a new Scenario instance.
 
@@ -355,6 +356,8 @@ class Scenario:
         self._cn = AbstractRaster()
         self._rainfall = None
         self._cfactor = AbstractRaster()
+        self._cfactor_engine = None
+        self.input_report = None
         self._composite_landuse = AbstractRaster()
 
         # assign scenario number and user choices
@@ -1170,7 +1173,10 @@ class Scenario:
             See :func:`pywatemsedem.catchment.vector_factory`.
         """
         self._composite_landuse = self.raster_factory(
-            raster_input, flag_mask=False, flag_clip=False
+            raster_input,
+            flag_mask=False,
+            flag_clip=False,
+            dtype=RASTER_DTYPES["composite_landuse"],
         )
 
         def plot(nodata=None, *args, **kwargs):
@@ -1193,8 +1199,8 @@ class Scenario:
         raster_input:
             3-D raster: x,y raster for every season.
         """
-        raster = self.raster_factory(raster_input)
-        raster.arr = np.where(raster.arr == raster.rp.nodata, 0, raster.arr)
+        raster = self.raster_factory(raster_input, dtype=RASTER_DTYPES["cfactor"])
+        raster.arr[raster.arr == raster.rp.nodata] = 0
         self._cfactor = raster
 
     @property
@@ -1212,7 +1218,7 @@ class Scenario:
         raster_input:
             3-D raster: x,y raster for every season.
         """
-        self._ktc = self.raster_factory(raster_input)
+        self._ktc = self.raster_factory(raster_input, dtype=RASTER_DTYPES["ktc"])
 
     @property
     def cn(self):
@@ -1258,6 +1264,7 @@ class Scenario:
 
         self._rainfall = Path(rainfall_filename)
 
+    @timed()
     @valid_landuse
     @valid_river
     def create_composite_landuse(
@@ -1279,6 +1286,8 @@ class Scenario:
         Returns
         -------
         composite_landuse: numpy.ndarray
+            Composite landuse (integer 16, see
+            :data:`pywatemsedem.defaults.RASTER_DTYPES`).
 
         Notes
         -----
@@ -1331,15 +1340,14 @@ class Scenario:
             grass_strips=grass_strips,
         )
         arr = pl.create_parcels_landuse_raster()
-        arr = np.where(arr == -7, -2, arr)  # aardewegen infstructuur maken
-        # safety check, fill last empty gaps with 32767
-        arr[(self.catchm.mask.arr == 1) & (arr == 0)] = 32767
-        composite_landuse = np.where(self.catchm.mask.arr == 1, arr, 0).astype(
-            "float64"
-        )
+        arr[arr == -7] = -2  # aardewegen infstructuur maken
+        # safety check, fill last empty gaps with 32767 (outside mask is 0)
+        arr[(arr == 0) & (self.catchm.mask.arr == 1)] = 32767
+        composite_landuse = arr.astype(RASTER_DTYPES["composite_landuse"], copy=False)
 
         return composite_landuse
 
+    @timed()
     @valid_landuse
     @valid_infrastructure
     @valid_river
@@ -1362,6 +1370,9 @@ class Scenario:
 
         Left-over pixels are set to 0.37
 
+        The parcels and grass strips are only rasterized on the first call (and when
+        their geometries change), see :class:`pywatemsedem.cfactor.CfactorEngine`.
+
         Returns
         -------
         cfactor: numpy.ndarray
@@ -1379,9 +1390,18 @@ class Scenario:
                 vct_parcels=self.vct_parcels,
                 vct_grass_strips=self.vct_grass_strips,
                 use_source_oriented_measures=use_source_oriented_measures,
+                engine=self._get_cfactor_engine(),
             )
         return cfactor
 
+    def _get_cfactor_engine(self):
+        """Get the C-factor engine holding the index rasters of the parcels and
+        grass strips, see :class:`pywatemsedem.cfactor.CfactorEngine`."""
+        if self._cfactor_engine is None:
+            self._cfactor_engine = CfactorEngine(self.catchm.mask)
+        return self._cfactor_engine
+
+    @timed()
     @valid_composite_landuse
     @valid_cfactor
     def create_ktc(self, ktc_low, ktc_high, ktc_limit, user_provided_ktc=1):
@@ -1426,26 +1446,64 @@ class Scenario:
                 ktc_high,
                 ktc_limit,
                 grass=self.vct_grass_strips,
+                engine=self._get_cfactor_engine(),
             )
         else:
             ktc = np.ndarray()
         return ktc
 
+    @timed()
     @valid_kfactor
     @valid_dtm
     @valid_pfactor
     @valid_composite_landuse
     @valid_cfactor
-    def prepare_input_files(self):
-        """Prepare all files (write to disk)"""
-        self.catchm.kfactor.write(
-            self.sfolder.wsinput_folder / inputfilename.kfactor_file
+    def prepare_input_files(self, incremental=True, link_scenarios=False):
+        """Prepare all files (write to disk)
+
+        The input rasters are written with
+        :class:`pywatemsedem.io.inputwriter.InputWriter`: a raster is only written
+        if the file in the model input folder does not match the raster.
+
+        Parameters
+        ----------
+        incremental: bool, default True
+            Skip writing the input rasters which are up-to-date on disk.
+        link_scenarios: bool, default False
+            Hard-link identical input rasters from the other scenarios of the
+            catchment instead of writing them.
+
+        Returns
+        -------
+        pandas.DataFrame
+            Report of the written input rasters, see
+            :func:`pywatemsedem.io.inputwriter.InputWriter.to_dataframe`. The
+            report is also stored in :attr:`input_report`.
+        """
+        link_folders = None
+        if link_scenarios:
+            link_folders = sorted(
+                self.sfolder.cfolder.home_folder.glob("scenario_*/modelinput")
+            )
+        writer = InputWriter(
+            self.sfolder.wsinput_folder,
+            incremental=incremental,
+            link_folders=link_folders,
+        )
+
+        writer.write_raster(
+            self.catchm.kfactor,
+            self.sfolder.wsinput_folder / inputfilename.kfactor_file,
         )
-        self.catchm.dtm.write(
-            self.sfolder.wsinput_folder / inputfilename.dtm_file, nodata=-99999
+        writer.write_raster(
+            self.catchm.dtm,
+            self.sfolder.wsinput_folder / inputfilename.dtm_file,
+            nodata=-99999,
         )
-        self.catchm.pfactor.write(
-            self.sfolder.wsinput_folder / inputfilename.pfactor_file, dtype=np.float32
+        writer.write_raster(
+            self.catchm.pfactor,
+            self.sfolder.wsinput_folder / inputfilename.pfactor_file,
+            dtype=np.float32,
         )
         if self.choices.extensions.river_routing.value:
             self.catchm.adjacent_edges.to_csv(
@@ -1459,23 +1517,30 @@ class Scenario:
                 index=False,
             )
             self.choices.extensions.output_per_river_segment = True
-            self.catchm.routing.write(
-                self.sfolder.wsinput_folder / inputfilename.routing_file
+            writer.write_raster(
+                self.catchm.routing,
+                self.sfolder.wsinput_folder / inputfilename.routing_file,
             )
             # if self.choices.dict_output["Output per river segment"] == 1:
-            self.catchm.segments.write(
-                self.sfolder.wsinput_folder / inputfilename.segments_file
+            writer.write_raster(
+                self.catchm.segments,
+                self.sfolder.wsinput_folder / inputfilename.segments_file,
             )
 
-        self.catchm.mask.write(self.sfolder.wsinput_folder / inputfilename.mask_file)
+        writer.write_raster(
+            self.catchm.mask, self.sfolder.wsinput_folder / inputfilename.mask_file
+        )
 
-        self.composite_landuse.write(
+        writer.write_raster(
+            self.composite_landuse,
             self.sfolder.wsinput_folder / inputfilename.parcelmosaic_file,
             dtype=np.int32,
         )
         if self.choices.extensions.curve_number.value:
             if not self.cn.is_empty():
-                self.cn.write(self.sfolder.wsinput_folder / inputfilename.cn_file)
+                writer.write_raster(
+                    self.cn, self.sfolder.wsinput_folder / inputfilename.cn_file
+                )
             else:
                 msg = "CN extension is enabled, define a CN raster to run CN."
                 raise IOError(msg)
@@ -1491,15 +1556,21 @@ class Scenario:
 
         if not self.choices.extensions.create_ktc_map.value:
             if not self.ktc.is_empty():
-                self.ktc.write(self.sfolder.wsinput_folder / inputfilename.ktc_file)
+                writer.write_raster(
+                    self.ktc, self.sfolder.wsinput_folder / inputfilename.ktc_file
+                )
             else:
                 msg = "UserProvidedKTC is 1 (True), provide ktc-raster."
                 raise IOError(msg)
 
-        self.cfactor.write(self.sfolder.wsinput_folder / inputfilename.cfactor_file)
+        writer.write_raster(
+            self.cfactor, self.sfolder.wsinput_folder / inputfilename.cfactor_file
+        )
 
         if self.choices.extensions.manual_outlet_selection.value:
-            self.outlets.write(self.sfolder.wsinput_folder / inputfilename.outlet_file)
+            writer.write_raster(
+                self.outlets, self.sfolder.wsinput_folder / inputfilename.outlet_file
+            )
         if not self.choices.options.only_routing.value:
             if self.choices.extensions.calibrate.value:
                 self.choices.output.write_sediment_export = False
@@ -1508,14 +1579,19 @@ class Scenario:
         if self.choices.extensions.include_buffers.value & (
             not self.buffers.is_empty()
         ):
-            self.buffers.write(self.sfolder.wsinput_folder / inputfilename.buffers_file)
+            writer.write_raster(
+                self.buffers, self.sfolder.wsinput_folder / inputfilename.buffers_file
+            )
 
         if self.choices.extensions.include_ditches.value:
-            self.ditches.write(self.sfolder.wsinput_folder / inputfilename.ditches_file)
+            writer.write_raster(
+                self.ditches, self.sfolder.wsinput_folder / inputfilename.ditches_file
+            )
 
         if self.choices.extensions.include_dams.value:
-            self.conductive_dams.write(
-                self.sfolder.wsinput_folder / inputfilename.conductivedams_file
+            writer.write_raster(
+                self.conductive_dams,
+                self.sfolder.wsinput_folder / inputfilename.conductivedams_file,
             )
 
         # if self.choices.dict_model_options["FilterDTM"] == 1:
@@ -1528,17 +1604,27 @@ class Scenario:
 
         if self.choices.extensions.include_sewers.value:
             if not self.endpoints.is_empty():
-                self.endpoints.write(
+                writer.write_raster(
+                    self.endpoints,
                     self.sfolder.wsinput_folder / inputfilename.endpoints_file,
                     format="idrisi",
                     dtype=np.float64,
                 )
-                self.endpoints_id.write(
+                writer.write_raster(
+                    self.endpoints_id,
                     self.sfolder.wsinput_folder / inputfilename.endpoints_id_file,
                     format="idrisi",
                     dtype=np.float64,
                 )
 
+        self.input_report = writer.to_dataframe()
+        summary = ", ".join(
+            f"{count} {action}" for action, count in writer.summary().items()
+        )
+        logger.info(f"Model input rasters: {summary}.")
+        return self.input_report
+
+    @timed()
     def create_ini_file(self):
         """Creates an ini-file for the scenario"""
         logger.info("Creating ini-file...")
@@ -1562,6 +1648,7 @@ class Scenario:
         )
         ini.write(self.ini)
 
+    @timed()
     @valid_ini
     def run_model(self, ws_binary="watem_sedem"):
         """Run the WaTEM/SEDEM model
@@ -1575,32 +1662,11 @@ class Scenario:
         logger.info(f"Modeling scenario {self.scenario_nr}")
 
         # Check if watem_sedem executable can be found
-        if (
-            shutil.which(ws_binary) is None
-        ):  # watem_sedem cannot be found in the PATH variable
-            # Check if there is an environment variable "WATEMSEDEM"
-            if (
-                os.environ.get("WATEMSEDEM") is not None
-                and Path(os.environ.get("WATEMSEDEM")).exists()
-            ):
-                os.environ["PATH"] = (
-                    os.environ.get("WATEMSEDEM") + os.pathsep + os.environ["PATH"]
-                )  # Add watem sedem location to PATH
-                if shutil.which(ws_binary) is None:
-                    msg = (
-                        "WATEM-SEDEM is not properly installed, pywatemsedem cannot"
-                        " access watem_sedem via PATH or WATEMSEDEM"
-                    )
-                    raise OSError(msg)
-            else:
-                msg = (
-                    "Watem_sedem is not available in the environment variable PATH "
-                    "and there is no environment variable WATEMSEDEM"
-                )
-                raise OSError(msg)
+        ws_binary = get_tool("watem_sedem", ws_binary)
 
         try:
             cmd_args = [ws_binary, str(self.ini)]
+            count_tool_call(cmd_args)
             run = subprocess.run(cmd_args, capture_output=True)
             for line in run.stdout.splitlines():
                 logger.info(line.decode("utf-8"))
@@ -1611,6 +1677,18 @@ class Scenario:
             logger.exception(e.cmd)
             raise IOError(e)
 
+        # build the routing graph index once, for all postprocessing of the run
+        txt_routing = self.sfolder.wsoutput_folder / "routing.txt"
+        if txt_routing.exists():
+            try:
+                build_routing_index(txt_routing, (self.rp.nrows, self.rp.ncols))
+            except Exception as e:
+                msg = (
+                    f"Routing graph index of '{txt_routing}' not built ({e}), "
+                    f"postprocessing falls back to SAGA."
+                )
+                logger.warning(msg)
+
     def zip(self):
 
         zip_folder(self.sfolder.scenario_folder)
@@ -10,6 +10,7 @@ import sys
 
 import numpy as np
 import pandas as pd
+import shapely
 
 logger = logging.getLogger(__name__)
 
@@ -17,6 +18,11 @@ logger = logging.getLogger(__name__)
 def format_forced_routing(gdf, minmax, resolution, trajectory_routing=False):
     """Format forced routing LineString geometry in a dataframe writable to the ini-file
 
+    The coordinates of all LineStrings are extracted at once, after which the
+    source/target coordinates are derived for all LineStrings together (see
+    :func:`pywatemsedem.tools.reformat_LineString_to_source_targetf` for the
+    definition of the routing via trajectory or jump).
+
     Parameters
     ----------
     gdf: GeoPandas.GeoDataFrame
@@ -44,19 +50,33 @@ def format_forced_routing(gdf, minmax, resolution, trajectory_routing=False):
         - tocol (int): target column
         - torow (int): target row
     """
-
-    lst_df = []
-    for it in gdf.geometry:
-        lst_df.append(
-            reformat_LineString_to_source_targetf(
-                it.coords, trajectory_routing=trajectory_routing
-            )
-        )
-    df = pd.concat(lst_df, ignore_index=True)
+    coordinates, index = shapely.get_coordinates(
+        np.asarray(gdf.geometry.values), return_index=True
+    )
+    if trajectory_routing:
+        # every pair of sequential coordinates of the same LineString
+        cond = index[:-1] == index[1:]
+        arr_from = coordinates[:-1][cond]
+        arr_to = coordinates[1:][cond]
+    else:
+        # first and last coordinate of every LineString
+        first = np.flatnonzero(np.diff(index, prepend=-1) != 0)
+        last = np.flatnonzero(np.diff(index, append=-1) != 0)
+        arr_from = coordinates[first]
+        arr_to = coordinates[last]
+
+    df = pd.DataFrame(
+        {
+            "fromX": arr_from[:, 0],
+            "fromY": arr_from[:, 1],
+            "toX": arr_to[:, 0],
+            "toY": arr_to[:, 1],
+        }
+    )
     df["fromcol"] = (np.floor((df["fromX"] - minmax[0]) / resolution) + 1).astype(int)
     df["fromrow"] = (np.floor((minmax[3] - df["fromY"]) / resolution) + 1).astype(int)
     df["tocol"] = (np.floor((df["toX"] - minmax[0]) / resolution) + 1).astype(int)
-    df["torow"] = (np.floor(minmax[3] - df["toY"]) / resolution + 1).astype(int)
+    df["torow"] = (np.floor((minmax[3] - df["toY"]) / resolution) + 1).astype(int)
     cond = (df["fromcol"] == df["tocol"]) & (df["fromrow"] == df["torow"])
     df = df.loc[~cond]
     return df
@@ -4,8 +4,10 @@ import pytest
 from conftest import geodata
 from geopandas import GeoDataFrame
 from numpy import array
+from shapely.geometry import box
 
-from pywatemsedem.geo.factory import Factory
+from pywatemsedem.geo.factory import Factory, get_mask_fingerprint
+from pywatemsedem.geo.rasterproperties import RasterProperties
 from pywatemsedem.geo.valid import PywatemsedemInputError
 
 
@@ -37,6 +39,42 @@ class TestFactory:
         f = Factory(self.resolution, self.epsg_code, self.nodata, tmp_path)
         assert f.create_mask(geodata.catchment)
 
+    @pytest.mark.saga
+    def test_vector_mask_cache(self, tmp_path):
+        """Test mask files and arrays are reused for the same template."""
+        f = Factory(self.resolution, self.epsg_code, self.nodata, tmp_path)
+        f.create_mask(geodata.catchment)
+        mtime = f.rasterfile_mask.stat().st_mtime_ns
+        assert f.fingerprintfile_mask.exists()
+
+        f_cached = Factory(self.resolution, self.epsg_code, self.nodata, tmp_path)
+        f_cached.create_mask(geodata.catchment)
+        assert f_cached.rasterfile_mask.stat().st_mtime_ns == mtime
+        assert f_cached.mask.arr_bin is f.mask.arr_bin
+
+        # a mask in another factory folder shares the arrays
+        (tmp_path / "other").mkdir()
+        f_other = Factory(
+            self.resolution, self.epsg_code, self.nodata, tmp_path / "other"
+        )
+        f_other.create_mask(geodata.catchment)
+        assert f_other.rasterfile_mask.exists()
+        assert f_other.mask.arr_bin is f.mask.arr_bin
+
+    def test_mask_fingerprint(self, tmp_path):
+        """Test fingerprint depends on template content and RasterProperties."""
+        vct_mask = tmp_path / "mask.shp"
+        GeoDataFrame(geometry=[box(0, 0, 100, 100)], crs=31370).to_file(vct_mask)
+        rp = RasterProperties([0, 0, 100, 100], 20, self.nodata, self.epsg_code)
+        fingerprint = get_mask_fingerprint(vct_mask, rp)
+        assert get_mask_fingerprint(vct_mask, rp) == fingerprint
+
+        rp_other = RasterProperties([0, 0, 100, 100], 10, self.nodata, self.epsg_code)
+        assert get_mask_fingerprint(vct_mask, rp_other) != fingerprint
+
+        GeoDataFrame(geometry=[box(0, 0, 80, 100)], crs=31370).to_file(vct_mask)
+        assert get_mask_fingerprint(vct_mask, rp) != fingerprint
+
     @pytest.mark.saga
     def test_error_no_mask(self, tmp_path):
         """Test error when no mask is created."""
@@ -3,6 +3,7 @@ from pathlib import Path
 
 import numpy as np
 import pytest
+import rasterio
 from conftest import geodata
 
 from pywatemsedem.geo.rasterproperties import RasterProperties
@@ -81,6 +82,35 @@ def test_rastermemory():
         RasterMemory(arr, rp)
 
 
+def test_rastermemory_nodata_array_dtype():
+    """Test a nodata-array keeps the data type of the raster array."""
+    rp = RasterProperties([0, 0, 40, 60], 20, -9999, 31370)
+    arr = np.ones((3, 2), dtype=np.float32)
+    raster = RasterMemory(arr, rp, arr_mask=np.ones((2, 2)), allow_nodata_array=True)
+    assert raster.arr.dtype == np.float32
+    np.testing.assert_array_equal(raster.arr, np.full((3, 2), -9999.0))
+
+
+def test_rastermemory_dtype():
+    """Test the data type of the raster array is kept after masking and assigning."""
+    rp = RasterProperties([0, 0, 40, 60], 20, -9999, 31370)
+    arr = np.array([[1.0, 2.0], [-6.0, 32767.0], [-1.0, 5.0]])
+    arr_mask = np.array([[1, 1], [1, 1], [0, 1]])
+
+    raster = RasterMemory(arr, rp, arr_mask=arr_mask, dtype="int16")
+    assert raster.dtype == np.int16
+    assert raster.arr.dtype == np.int16
+    np.testing.assert_array_equal(raster.arr, [[1, 2], [-6, 32767], [-9999, 5]])
+
+    raster.arr = np.where(raster.arr == -6, 0.0, raster.arr)
+    assert raster.arr.dtype == np.int16
+
+    # no dtype: dtype of input array is kept
+    raster = RasterMemory(arr, rp)
+    assert raster.dtype is None
+    assert raster.arr.dtype == np.float64
+
+
 def test_rasterfile():
     """Test functionalities of RasterFile class."""
 
@@ -131,3 +161,32 @@ def test_temporalraster():
         ValueError, match=r"should be equal to number of arrays in the third dimension"
     ):
         tr.write([tiff_temp1])
+
+
+def test_temporalraster_write():
+    """Test (multi-band) writing of a TemporalRaster."""
+    rp = RasterProperties((0, 0, 50, 40), 10, -9999, 31370)
+    arr = np.dstack([np.full((4, 5), i, dtype=np.float32) for i in range(3)])
+    arr_mask = np.ones((4, 5))
+    arr_mask[0, 0] = 0
+    tr = TemporalRaster(arr, rp, arr_mask=arr_mask)
+
+    # write slices in parallel, check output order and timings
+    outfiles = [tempfile.NamedTemporaryFile(suffix=".tif").name for i in range(3)]
+    assert tr.write(outfiles, format="tiff", max_workers=2)
+    for i, outfile in enumerate(outfiles):
+        arr_out, _ = load_raster(outfile)
+        assert arr_out[0, 0] == -9999
+        assert arr_out[1, 1] == i
+    assert list(tr.timings) == [Path(outfile) for outfile in outfiles]
+
+    # write as one multi-band raster
+    tiff_temp = tempfile.NamedTemporaryFile(suffix=".tif").name
+    assert tr.write_multiband(tiff_temp)
+    with rasterio.open(tiff_temp) as src:
+        assert src.count == 3
+        arr_out = src.read()
+    np.testing.assert_array_equal(arr_out[:, 1, 1], [0, 1, 2])
+    np.testing.assert_array_equal(arr_out[:, 0, 0], [-9999] * 3)
+    with pytest.raises(TypeError, match=r"as multi-band raster with '.rst'"):
+        tr.write_multiband(tempfile.NamedTemporaryFile(suffix=".rst").name)
@@ -1,10 +1,30 @@
+import sys
+from pathlib import Path
+
 import geopandas as gpd
+import numpy as np
 import pytest
+import rasterio
 from conftest import geodata
 from shapely.geometry import Polygon
 
 from pywatemsedem.defaults import SAGA_FLAGS
-from pywatemsedem.geo.utils import any_equal_element_in_vector, execute_subprocess
+from pywatemsedem.geo.rasterproperties import RasterProperties
+from pywatemsedem.geo.rasters import RasterMemory
+from pywatemsedem.geo.utils import (
+    LabelIndex,
+    SubprocessManager,
+    any_equal_element_in_vector,
+    clean_up_tempfiles,
+    create_filename,
+    execute_subprocess,
+    get_raster_output_profile,
+    get_temp_storage,
+    is_vsimem,
+    load_raster_window,
+    temp_storage,
+    write_arr_as_rst,
+)
 
 
 @pytest.mark.skip(reason="Unvalidated")
@@ -58,6 +78,63 @@ class TestExecuteSubprocess:
             execute_subprocess(cmd_args)
 
 
+class TestSubprocessManager:
+    """Test recording and batch execution of command line tools"""
+
+    @staticmethod
+    def copy_cmd(txt_in, txt_out):
+        """Command copying a text file with python."""
+        code = "import shutil, sys; shutil.copy(sys.argv[1], sys.argv[2])"
+        return [sys.executable, "-c", code, str(txt_in), str(txt_out)]
+
+    def test_execute(self, tmp_path):
+        """Test command, duration and input/output sizes are recorded"""
+        txt_in = tmp_path / "in.txt"
+        txt_in.write_text("a" * 100)
+        manager = SubprocessManager()
+        assert manager.execute(self.copy_cmd(txt_in, tmp_path / "out.txt"))
+
+        df = manager.to_dataframe()
+        assert len(df) == 1
+        assert df["tool"].iloc[0] == Path(sys.executable).stem
+        assert df["duration"].iloc[0] > 0
+        assert df["input_size"].iloc[0] == 100
+        assert df["output_size"].iloc[0] == 100
+        assert bool(df["success"].iloc[0])
+
+        manager.clear()
+        assert len(manager.to_dataframe()) == 0
+
+    def test_execute_error(self):
+        """Test errors are raised and recorded"""
+        manager = SubprocessManager()
+        with pytest.raises(OSError, match="Could not run"):
+            manager.execute([sys.executable, "-c", "raise SystemExit(1)"])
+        assert not manager.to_dataframe()["success"].iloc[0]
+
+    def test_execute_missing_binary(self, tmp_path):
+        """Test a missing binary is raised and recorded as failure"""
+        manager = SubprocessManager()
+        with pytest.raises(OSError):
+            manager.execute([str(tmp_path / "missing_tool"), "--help"], saga=True)
+        assert not manager.to_dataframe()["success"].iloc[0]
+
+    def test_execute_batch(self, tmp_path):
+        """Test a batch of commands is run concurrently and in order"""
+        txt_in = tmp_path / "in.txt"
+        txt_in.write_text("abc")
+        list_cmd_args = [
+            self.copy_cmd(txt_in, tmp_path / f"out_{i}.txt") for i in range(8)
+        ]
+        manager = SubprocessManager(max_workers=4)
+        assert manager.execute_batch(list_cmd_args) == [True] * 8
+        for i in range(8):
+            assert (tmp_path / f"out_{i}.txt").read_text() == "abc"
+        df = manager.to_dataframe()
+        assert len(df) == 8
+        assert (df["output_size"] == 3).all()
+
+
 class TestAnyEqualVector:
     """Test if any element in vector is equal"""
 
@@ -77,3 +154,183 @@ class TestAnyEqualVector:
         """Check if any element in the left series is equal to the right element"""
         assert any_equal_element_in_vector(self.s1, self.s2) is True
         assert any_equal_element_in_vector(self.s1, self.s3) is False
+
+
+class TestTempStorage:
+    """Test the temporary storage backends"""
+
+    def test_create_filename(self, tmp_path):
+        """Temporary files of GDAL are kept in memory, files of tools on disk."""
+        with temp_storage(tmp_path / "tmp") as storage:
+            assert get_temp_storage() is storage
+            rst_tool = create_filename(".rst")
+            assert rst_tool.parent == tmp_path / "tmp"
+            tiff_gdal = create_filename(".tif", consumer="gdal")
+            assert is_vsimem(tiff_gdal)
+            with pytest.raises(ValueError):
+                create_filename(".tif", consumer="saga")
+        assert get_temp_storage() is not storage
+
+        with temp_storage(tmp_path / "tmp", memory=False):
+            tiff_gdal = create_filename(".tif", consumer="gdal")
+            assert tiff_gdal.parent == tmp_path / "tmp"
+
+    def test_clean_up(self, tmp_path):
+        """All temporary files are removed when the context is left."""
+        profile = {
+            "driver": "GTiff",
+            "height": 4,
+            "width": 5,
+            "count": 1,
+            "dtype": "float32",
+            "nodata": -9999,
+            "crs": "EPSG:31370",
+            "transform": rasterio.transform.from_origin(0, 80, 20, 20),
+        }
+        with pytest.raises(RuntimeError):
+            with temp_storage(tmp_path / "tmp") as storage:
+                txt_tool = create_filename(".txt")
+                txt_tool.write_text("abc")
+                txt_removed = create_filename(".txt")
+                txt_removed.write_text("abc")
+                clean_up_tempfiles(txt_removed, "txt")
+                assert txt_removed not in storage.files
+                tiff_gdal = create_filename(".tif", consumer="gdal")
+                with rasterio.open(tiff_gdal, "w", **profile) as dst:
+                    dst.write(np.ones((1, 4, 5), dtype="float32"))
+                assert rasterio.shutil.exists(str(tiff_gdal))
+                raise RuntimeError
+        assert not txt_tool.exists()
+        assert not rasterio.shutil.exists(str(tiff_gdal))
+        assert list((tmp_path / "tmp").iterdir()) == []
+
+    def test_write_idrisi_in_memory(self, tmp_path):
+        """IDRISI rasters are written without temporary files on disk."""
+        rp = RasterProperties([0, 0, 100, 80], 20, -9999, 31370)
+        raster = RasterMemory(np.arange(20, dtype=np.float32).reshape(4, 5), rp)
+        with temp_storage(tmp_path / "tmp"):
+            raster.write(tmp_path / "raster.rst", dtype="float32")
+        with rasterio.open(tmp_path / "raster.rst") as src:
+            np.testing.assert_array_equal(src.read(1), raster.arr)
+        assert not (tmp_path / "tmp").exists()
+
+
+class TestRasterOutputPolicy:
+    """Test the raster output policies"""
+
+    profile = {
+        "driver": "GTiff",
+        "height": 600,
+        "width": 500,
+        "count": 1,
+        "dtype": "float32",
+        "nodata": -9999,
+        "crs": "EPSG:31370",
+        "transform": rasterio.transform.from_origin(0, 6000, 10, 10),
+        "compress": "DEFLATE",
+    }
+
+    def test_intermediate(self, tmp_path):
+        """Intermediate rasters are tiled, compressed COG's with a predictor."""
+        arr = np.arange(600 * 500, dtype=np.int32).reshape(600, 500)
+        tiff = tmp_path / "id_1.tif"
+        write_arr_as_rst(arr, tiff, np.int32, self.profile, policy="intermediate")
+        with rasterio.open(tiff) as src:
+            structure = src.tags(ns="IMAGE_STRUCTURE")
+            assert structure["LAYOUT"] == "COG"
+            assert structure["COMPRESSION"] == "ZSTD"
+            assert structure["PREDICTOR"] == "2"
+            assert src.block_shapes == [(256, 256)]
+            np.testing.assert_array_equal(src.read(1), arr)
+        assert self.profile["compress"] == "DEFLATE"
+
+        write_arr_as_rst(
+            arr.astype("float32"),
+            tiff,
+            "float32",
+            self.profile,
+            policy="intermediate",
+            compress="deflate",
+            level=6,
+        )
+        with rasterio.open(tiff) as src:
+            structure = src.tags(ns="IMAGE_STRUCTURE")
+            assert structure["COMPRESSION"] == "DEFLATE"
+            assert structure["PREDICTOR"] == "3"
+
+    def test_model_input(self, tmp_path):
+        """Model input rasters are written in the IDRISI format."""
+        arr = np.ones((600, 500), dtype=np.float32)
+        rst = tmp_path / "cfactor.rst"
+        write_arr_as_rst(arr, rst, "float32", self.profile, policy="model_input")
+        with rasterio.open(rst) as src:
+            assert src.driver == "RST"
+
+    def test_get_raster_output_profile(self):
+        """Unknown policies and compressors not supported by GeoTIFF raise."""
+        profile = get_raster_output_profile(self.profile, "float32", compress="NONE")
+        assert "predictor" not in profile and "level" not in profile
+        with pytest.raises(ValueError):
+            get_raster_output_profile(self.profile, "float32", compress="LZ4")
+        with pytest.raises(ValueError):
+            get_raster_output_profile(self.profile, "float32", policy="cloud")
+
+    def test_load_raster_window(self, tmp_path):
+        """Only the cells within the bounds are read."""
+        arr = np.random.default_rng(0).uniform(0, 1, (600, 500)).astype("float32")
+        tiff = tmp_path / "rank.tif"
+        write_arr_as_rst(arr, tiff, "float32", self.profile, policy="intermediate")
+        arr_window, profile, window = load_raster_window(tiff, [105, 5000, 2003, 5555])
+        assert (window.row_off, window.col_off) == (44, 10)
+        assert arr_window.shape == (56, 191) == (profile["height"], profile["width"])
+        np.testing.assert_array_equal(arr_window, arr[window.toslices()])
+        assert profile["transform"].c == 100 and profile["transform"].f == 5560
+
+        # bounds are limited to the extent of the raster
+        arr_window, _, _ = load_raster_window(tiff, [-100, 5900, 200, 6100])
+        np.testing.assert_array_equal(arr_window, arr[:10, :20])
+
+
+@pytest.mark.parametrize(
+    "offset", [pytest.param(0, id="integer"), pytest.param(0.5, id="float")]
+)
+def test_label_index(offset):
+    """Test the sums per label equal the sums of the masked rasters."""
+    rng = np.random.default_rng(0)
+    arr_labels = rng.integers(1, 20, (50, 40)).astype(np.float32) + offset
+    arr_labels[:5, :] = -1
+    arr_values = rng.uniform(0, 10, (50, 40)).astype(np.float32)
+    arr_values[0, 0] = -9999
+
+    label_index = LabelIndex(arr_labels)
+    np.testing.assert_array_equal(label_index.labels, np.unique(arr_labels))
+    assert label_index.counts.sum() == arr_labels.size
+    df = label_index.sums({"a": arr_values, "b": np.ones((50, 40))})
+    for label, value_a, value_b in zip(df["ids"], df["a"], df["b"]):
+        mask = arr_labels == label
+        np.testing.assert_allclose(value_a, arr_values[mask].sum(dtype=np.float64))
+        assert value_b == mask.sum()
+    sums = label_index.sum(arr_values, nodata=-9999)
+    np.testing.assert_allclose(sums[0], arr_values[arr_labels == -1][1:].sum())
+
+    with pytest.raises(ValueError):
+        label_index.sum(np.ones((40, 50)))
+
+
+@pytest.mark.parametrize("dtype", [np.int16, np.int32])
+@pytest.mark.parametrize("tiles", [1, 2000])
+def test_label_index_nodata_dtype_min(dtype, tiles):
+    """Test integer labels with the dtype minimum as nodata do not overflow."""
+    nodata = np.iinfo(dtype).min
+    arr_labels = np.tile(
+        np.array([[nodata, 1, 2], [3, 3, nodata]], dtype=dtype), (tiles, 1)
+    )
+    label_index = LabelIndex(arr_labels)
+    np.testing.assert_array_equal(label_index.labels, [nodata, 1, 2, 3])
+    assert label_index.labels.dtype == dtype
+    np.testing.assert_array_equal(label_index.counts, np.array([2, 1, 1, 2]) * tiles)
+    arr_values = np.arange(arr_labels.size).reshape(arr_labels.shape)
+    np.testing.assert_array_equal(
+        label_index.sum(arr_values),
+        [arr_values[arr_labels == label].sum() for label in [nodata, 1, 2, 3]],
+    )
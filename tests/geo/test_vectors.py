@@ -1,9 +1,18 @@
 import geopandas as gpd
 import pytest
 from conftest import geodata
+from shapely.geometry import LineString, box
 
 from pywatemsedem.geo.utils import get_geometry_type
-from pywatemsedem.geo.vectors import VectorFile, VectorMemory
+from pywatemsedem.geo.vectors import (
+    USE_ARROW,
+    ClipMask,
+    VectorFile,
+    VectorMemory,
+    get_vector_format,
+    read_vector,
+    write_vector,
+)
 
 
 def test_vectorfile():
@@ -114,3 +123,94 @@ def test_vectormemory_correct_epsg():
 
     vector = VectorMemory(gdf, "LineString", "LineString", epsg=req_epsg)
     assert vector.geodata.crs.to_epsg() == req_epsg
+
+
+@pytest.fixture
+def gdf_lines():
+    """Synthetic lines: inside, crossing and outside the mask of ``gdf_mask``."""
+    lines = [
+        LineString([(10, 10), (20, 20)]),
+        LineString([(90, 50), (150, 50)]),
+        LineString([(200, 200), (300, 300)]),
+        LineString([(50, 50), (60, 80)]),
+    ]
+    return gpd.GeoDataFrame(
+        {"id": [1, 2, 3, 4]}, geometry=lines, crs=31370, index=[10, 11, 12, 13]
+    )
+
+
+@pytest.fixture
+def gdf_mask():
+    """Synthetic mask of two adjacent polygons."""
+    return gpd.GeoDataFrame(
+        geometry=[box(0, 0, 50, 100), box(50, 0, 100, 100)], crs=31370
+    )
+
+
+def test_clipmask(gdf_lines, gdf_mask):
+    """Test clipping with the dissolved and prepared mask geometry."""
+    clip_mask = ClipMask(gdf_mask)
+    assert clip_mask.bounds == (0, 0, 100, 100)
+
+    gdf = clip_mask.clip(gdf_lines)
+    assert gdf["id"].tolist() == [1, 2, 4]
+    assert gdf.index.tolist() == [10, 11, 13]
+    # features within the mask are not modified, crossing features are clipped
+    assert gdf.geometry[10].equals(gdf_lines.geometry[10])
+    assert gdf.geometry[13].equals(gdf_lines.geometry[13])
+    assert gdf.geometry[11].equals(LineString([(90, 50), (100, 50)]))
+
+    # identical to clipping with geopandas
+    gdf_clip = gpd.clip(gdf_lines, gdf_mask, keep_geom_type=True).sort_index()
+    assert gdf.geom_equals(gdf_clip).all()
+
+    # a geodataframe within the mask is returned as is
+    assert clip_mask.clip(gdf_lines.loc[[10, 13]]).index.tolist() == [10, 13]
+
+
+def test_vectorfile_clipmask(gdf_lines, gdf_mask, tmp_path):
+    """Test clipping a vector file with a mask file or a clip mask."""
+    vct_lines = tmp_path / "lines.shp"
+    vct_mask = tmp_path / "mask.shp"
+    gdf_lines.to_file(vct_lines)
+    gdf_mask.to_file(vct_mask)
+
+    vector = VectorFile(vct_lines, vct_clip=vct_mask)
+    assert vector.geodata["id"].tolist() == [1, 2, 4]
+    vector = VectorFile(vct_lines, vct_clip=ClipMask.from_file(vct_mask))
+    assert vector.geodata["id"].tolist() == [1, 2, 4]
+
+
+@pytest.mark.parametrize(
+    "vector_format,suffix",
+    [
+        ("shapefile", ".shp"),
+        ("gpkg", ".gpkg"),
+        ("flatgeobuf", ".fgb"),
+        pytest.param(
+            "geoparquet",
+            ".parquet",
+            marks=pytest.mark.skipif(not USE_ARROW, reason="requires pyarrow"),
+        ),
+    ],
+)
+def test_write_vector(gdf_lines, tmp_path, vector_format, suffix):
+    """Test writing (and overwriting) a vector in a vector format."""
+    gdf_lines["long_column_name"] = gdf_lines["id"]
+    vct = write_vector(gdf_lines, tmp_path / "lines.shp", vector_format)
+    assert vct == tmp_path / f"lines{suffix}"
+    vct = write_vector(gdf_lines.iloc[:2], vct, vector_format)
+
+    gdf = read_vector(vct)
+    assert gdf["id"].tolist() == [1, 2]
+    if vector_format != "shapefile":
+        assert "long_column_name" in gdf.columns
+    vector = VectorFile(vct, "LineString")
+    assert len(vector.geodata) == 2
+
+
+def test_get_vector_format():
+    """Test an unknown vector format raises an error."""
+    assert get_vector_format("gpkg")["driver"] == "GPKG"
+    with pytest.raises(ValueError):
+        get_vector_format("kml")
@@ -1,18 +1,39 @@
+import configparser
 import shutil
 from pathlib import Path
 
+import pandas as pd
 import pytest
 from conftest import ini_file
 
 from pywatemsedem.io.ini import (
+    IniFile,
+    IniTemplate,
     add_field,
     get_item_from_ini,
     get_options_from_ini,
     get_sections_from_ini,
     modify_field,
+    modify_fields,
 )
 
 
+@pytest.fixture
+def base_ini(tmp_path):
+    """Base ini-file written with configparser"""
+    cfg = configparser.ConfigParser()
+    cfg.read_dict(
+        {
+            "Parameters": {"Max kernel": "50", "R factor": "870"},
+            "Calibration": {"KTcLow": "5", "KTcHigh": "15"},
+        }
+    )
+    ini = tmp_path / "base.ini"
+    with open(ini, "w") as f:
+        cfg.write(f)
+    return ini
+
+
 class TestModifyField:
     """Class combining all tests for the modify_field function."""
 
@@ -31,6 +52,73 @@ class TestModifyField:
             modify_field(ini_file, "Parameters", "max kernelzz", 3)
 
 
+class TestModifyFields:
+    """Class combining all tests for the modify_fields function."""
+
+    def test_modify(self, base_ini):
+        """Test modifying multiple keys (case-insensitive) in one write."""
+        modify_fields(
+            base_ini, {("Parameters", "max kernel"): 3, ("Calibration", "KTCLOW"): 7}
+        )
+        assert get_item_from_ini(base_ini, "Parameters", "max kernel", int) == 3
+        assert get_item_from_ini(base_ini, "Parameters", "r factor", int) == 870
+        assert get_item_from_ini(base_ini, "Calibration", "ktclow", int) == 7
+
+    def test_add_missing(self, base_ini, tmp_path):
+        """Test adding keys and sections to a new ini-file."""
+        ini_out = tmp_path / "out.ini"
+        modify_fields(
+            base_ini,
+            {("Parameters", "p factor"): 1, ("Output", "write sediment export"): 1},
+            ini_out=ini_out,
+            add_missing=True,
+        )
+        assert get_item_from_ini(ini_out, "Parameters", "p factor", int) == 1
+        assert get_item_from_ini(ini_out, "Parameters", "max kernel", int) == 50
+        assert get_item_from_ini(ini_out, "Output", "write sediment export", int) == 1
+        assert get_sections_from_ini(base_ini) == ["Parameters", "Calibration"]
+
+    def test_missing(self, base_ini):
+        """Expect error for a non-existing section or key."""
+        with pytest.raises(KeyError, match="Section 'Parameter' does not exist"):
+            modify_fields(base_ini, {("Parameter", "max kernel"): 3})
+        with pytest.raises(KeyError, match="Key 'max kernelzz' does not exist"):
+            modify_fields(base_ini, {("Parameters", "max kernelzz"): 3})
+
+
+def test_ini_template_variants(base_ini, tmp_path):
+    """Test writing ini-file variants from a base ini-file."""
+    template = IniTemplate(base_ini)
+    ktc_lows = [1, 2, 3]
+    inis = template.write_variants(
+        [{("Calibration", "ktclow"): ktc_low} for ktc_low in ktc_lows],
+        [tmp_path / f"ktc_{ktc_low}.ini" for ktc_low in ktc_lows],
+    )
+    for ini, ktc_low in zip(inis, ktc_lows):
+        assert get_item_from_ini(ini, "Calibration", "ktclow", int) == ktc_low
+        assert get_item_from_ini(ini, "Calibration", "ktchigh", int) == 15
+    assert template.render() == base_ini.read_text()
+
+    with pytest.raises(ValueError, match="Number of ini-files"):
+        template.write_variants([{}], [])
+
+
+def test_forced_routing_sections():
+    """Test a section is added for every forced routing row."""
+    ini = IniFile(Path("input"), Path("output"), None)
+    forced_routing = pd.DataFrame(
+        {"fromcol": [1.0, 5], "fromrow": [2, 6], "tocol": [3, 7], "torow": [4, 8]}
+    )
+    ini._add_forced_routing_sections(forced_routing)
+    assert ini.cfg.sections() == ["Forced Routing 1", "Forced Routing 2"]
+    assert dict(ini.cfg["Forced Routing 1"]) == {
+        "from col": "1",
+        "from row": "2",
+        "target col": "3",
+        "target row": "4",
+    }
+
+
 class TestAddField:
     """Class combining all tests for the add field section."""
 
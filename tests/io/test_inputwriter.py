@@ -0,0 +1,91 @@
+import os
+
+import numpy as np
+import pytest
+
+from pywatemsedem.geo.rasterproperties import RasterProperties
+from pywatemsedem.geo.rasters import RasterMemory
+from pywatemsedem.io.inputwriter import InputWriter, get_raster_fingerprint
+
+
+@pytest.fixture
+def raster():
+    """Small synthetic raster."""
+    rp = RasterProperties([0, 0, 100, 80], 20, -9999, 31370)
+    arr = np.arange(20, dtype=np.float32).reshape(4, 5)
+    return RasterMemory(arr, rp)
+
+
+def test_raster_fingerprint(raster):
+    """Test the fingerprint depends on the array and the output properties."""
+    fingerprint = get_raster_fingerprint(raster.arr, raster.rp)
+    assert fingerprint == get_raster_fingerprint(raster.arr.copy(), raster.rp)
+    assert fingerprint != get_raster_fingerprint(raster.arr, raster.rp, nodata=0)
+    assert fingerprint != get_raster_fingerprint(
+        raster.arr, raster.rp, dtype=np.float64
+    )
+    assert fingerprint != get_raster_fingerprint(raster.arr + 1, raster.rp)
+    rp = RasterProperties([20, 0, 120, 80], 20, -9999, 31370)
+    assert fingerprint != get_raster_fingerprint(raster.arr, rp)
+
+
+def test_input_writer(raster, tmp_path):
+    """Test rasters are only written if the file on disk is not up-to-date."""
+    folder = tmp_path / "scenario_1" / "modelinput"
+    folder.mkdir(parents=True)
+    outfile = folder / "cfactor.tif"
+
+    writer = InputWriter(folder)
+    assert writer.write_raster(raster, outfile, format="tiff") == "written"
+    assert writer.write_raster(raster, outfile, format="tiff") == "reused"
+
+    # fingerprints are kept on disk
+    writer = InputWriter(folder)
+    assert writer.write_raster(raster, "cfactor.tif", format="tiff") == "reused"
+    assert writer.write_raster(raster, outfile, format="tiff", nodata=0) == "written"
+    raster.arr[0, 0] = 100
+    assert writer.write_raster(raster, outfile, format="tiff", nodata=0) == "written"
+
+    # a modified file on disk is rewritten
+    stat = outfile.stat()
+    os.utime(outfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert writer.write_raster(raster, outfile, format="tiff", nodata=0) == "written"
+
+    # non-incremental writer always writes
+    writer_all = InputWriter(folder, incremental=False)
+    assert writer_all.write_raster(raster, outfile, format="tiff", nodata=0) == (
+        "written"
+    )
+
+    df = writer.to_dataframe()
+    assert df["action"].tolist() == ["reused", "written", "written", "written"]
+    assert writer.summary() == {"written": 3, "reused": 1, "linked": 0}
+
+    with pytest.raises(ValueError):
+        writer.write_raster(raster, tmp_path / "cfactor.tif", format="tiff")
+
+
+def test_input_writer_link(raster, tmp_path):
+    """Test identical rasters are hard-linked across scenario folders."""
+    folders = [tmp_path / f"scenario_{i}" / "modelinput" for i in (1, 2)]
+    for folder in folders:
+        folder.mkdir(parents=True)
+
+    InputWriter(folders[0]).write_raster(raster, "cfactor.tif", format="tiff")
+    writer = InputWriter(folders[1], link_folders=folders)
+    assert writer.write_raster(raster, "cfactor.tif", format="tiff") == "linked"
+    assert writer.records[0]["source"] == str(folders[0] / "cfactor.tif")
+    source = folders[0] / "cfactor.tif"
+    target = folders[1] / "cfactor.tif"
+    assert os.path.samefile(source, target)
+    assert writer.write_raster(raster, "cfactor.tif", format="tiff") == "reused"
+
+    # rewriting a linked raster does not modify the raster of the other scenario
+    content = source.read_bytes()
+    raster.arr[0, 0] = 100
+    assert writer.write_raster(raster, "cfactor.tif", format="tiff") == "written"
+    assert not os.path.samefile(source, target)
+    assert source.read_bytes() == content
+    original = RasterMemory(np.arange(20, dtype=np.float32).reshape(4, 5), raster.rp)
+    writer = InputWriter(folders[0])
+    assert writer.write_raster(original, "cfactor.tif", format="tiff") == "reused"
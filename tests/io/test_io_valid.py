@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from pywatemsedem.io.valid import (
+    compute_array_statistics,
     valid_array_type,
     valid_boundaries,
     valid_nodata,
@@ -103,3 +104,41 @@ def test_valid_nodata():
     # nan as nodatavalue
     nodata_value = np.nan
     valid_nodata(arr, nodata_value=nodata_value)
+
+
+def test_compute_array_statistics():
+    """test for compute_array_statistics"""
+    # float: NaN values are counted and excluded from minimum and maximum
+    arr = np.array([[0, 1, 2, np.nan], [0, 1, 3, 4]], dtype=np.float32)
+    stats = compute_array_statistics(arr, chunk_size=3)
+    assert (stats.min, stats.max, stats.nan_count, stats.size) == (0, 4, 1, 8)
+    assert stats.values is None
+    assert valid_boundaries(stats, lower=0, upper=4)
+    with pytest.raises(ValueError, match="are higher than upper bound"):
+        valid_boundaries(stats, upper=3)
+    with pytest.raises(ValueError, match="can not contain nan values"):
+        valid_non_nan(stats)
+    with pytest.raises(ValueError, match="hold no values"):
+        valid_values(stats, [0, 1, 2, 3, 4])
+    stats = compute_array_statistics(np.full(3, np.nan))
+    assert stats.min is None and stats.max is None and stats.nan_count == 3
+
+    # small integers: all values are counted
+    arr = np.array([[-9999, 1, 2, 1], [0, 1, 3, -9999]], dtype=np.int16)
+    stats = compute_array_statistics(arr, chunk_size=3)
+    assert (stats.min, stats.max, stats.nan_count) == (-9999, 3, 0)
+    np.testing.assert_array_equal(stats.values, [-9999, 0, 1, 2, 3])
+    np.testing.assert_array_equal(stats.counts, [2, 1, 3, 1, 1])
+    assert valid_values(stats, [-9999, 0, 1, 2, 3])
+    stats_data = stats.without(-9999)
+    assert (stats_data.min, stats_data.max, stats_data.size) == (0, 3, 6)
+    assert valid_boundaries(stats_data, lower=0)
+    with pytest.raises(ValueError, match="are lower than lower bound"):
+        valid_boundaries(stats, lower=0)
+
+    # other types: values are only computed on request
+    arr = arr.astype(np.int32)
+    assert compute_array_statistics(arr).values is None
+    stats = compute_array_statistics(arr, values=True)
+    np.testing.assert_array_equal(stats.values, [-9999, 0, 1, 2, 3])
+    assert compute_array_statistics(np.array([True, False])).max
@@ -12,6 +12,7 @@ from pywatemsedem.io.modeloutput import (
     check_segment_edges,
     compute_efficiency_buffers,
     identify_rank_sediment_loads,
+    make_routing_vct_saga_tiles,
 )
 
 
@@ -341,3 +342,41 @@ def test_check_segment_edges():
     np.testing.assert_allclose(
         up_edges_adj["upstream_line"], up_edges_nan_exp["upstream_line"]
     )
+
+
+def test_make_routing_vct_saga_tiles_failed_tile(tmp_path, monkeypatch):
+    """Test a failed saga call of a tile is raised before post-processing."""
+    import pywatemsedem.io.modeloutput as modeloutput
+
+    txt_routing = tmp_path / "routing.txt"
+    pd.DataFrame(
+        {
+            "col": [1, 2],
+            "row": [1, 1],
+            "target1col": [2, -99],
+            "target1row": [1, -99],
+            "part1": [1.0, 0.0],
+            "distance1": [20.0, 0.0],
+            "target2col": [-99, -99],
+            "target2row": [-99, -99],
+            "part2": [0.0, 0.0],
+            "distance2": [0.0, 0.0],
+        }
+    ).to_csv(txt_routing, sep="\t", index=False)
+    postprocessed = []
+    monkeypatch.setattr(
+        modeloutput, "execute_batch", lambda cmds, **kwargs: [True, False]
+    )
+    monkeypatch.setattr(
+        modeloutput, "_set_vector_epsg", lambda *args: postprocessed.append(args)
+    )
+    rstparams = {"minmax": [0, 0, 60, 20], "res": 20, "nrows": 1, "epsg": 31370}
+    with pytest.raises(IOError, match="tile 1"):
+        make_routing_vct_saga_tiles(
+            txt_routing,
+            tmp_path / "prckrt.rst",
+            tmp_path / "routing.shp",
+            rstparams,
+            [[-1, 61, -1, 21], [-1, 61, -1, 21]],
+        )
+    assert not postprocessed
@@ -0,0 +1,260 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from rasterio.transform import from_origin
+
+from pywatemsedem.errors import PywatemsedemRoutingIndexError
+from pywatemsedem.io.routinggraph import (
+    ROUTING_INDEX_FOLDER,
+    ROUTING_NONRIVER_INDEX_FOLDER,
+    RoutingGraph,
+    build_routing_index,
+    incidence_to_polygons,
+    load_routing_index,
+)
+
+
+@pytest.fixture
+def df_routing():
+    """Routing table of a 3x3 raster draining to the bottom-right cell.
+
+    The top row drains to the middle row, the middle-left cell splits its flow over
+    the bottom-left and the middle-right cell.
+    """
+    records = [
+        # col, row, target1col, target1row, part1, target2col, target2row, part2
+        (1, 1, 1, 2, 1.0, -99, -99, 0.0),
+        (2, 1, 2, 2, 1.0, -99, -99, 0.0),
+        (3, 1, 3, 2, 1.0, -99, -99, 0.0),
+        (1, 2, 1, 3, 0.5, 2, 2, 0.5),
+        (2, 2, 3, 2, 1.0, -99, -99, 0.0),
+        (3, 2, 3, 3, 1.0, -99, -99, 0.0),
+        (1, 3, 2, 3, 1.0, -99, -99, 0.0),
+        (2, 3, 3, 3, 1.0, -99, -99, 0.0),
+        (3, 3, -99, -99, 0.0, -99, -99, 0.0),
+    ]
+    df = pd.DataFrame(
+        records,
+        columns=[
+            "col",
+            "row",
+            "target1col",
+            "target1row",
+            "part1",
+            "target2col",
+            "target2row",
+            "part2",
+        ],
+    )
+    df["distance1"] = 20.0
+    df["distance2"] = 20.0
+    return df
+
+
+def test_routing_graph(df_routing):
+    """Test the edges and the topological order of the routing graph."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    assert graph.n_edges == 9
+    assert graph.indices[graph.indptr[3] : graph.indptr[4]].tolist() == [6, 4]
+    assert sorted(graph.rev_indices[graph.rev_indptr[4] : graph.rev_indptr[5]]) == [
+        1,
+        3,
+    ]
+    position = np.empty(graph.n_cells, dtype=int)
+    position[graph.order] = np.arange(graph.n_cells)
+    sources = np.repeat(np.arange(graph.n_cells), np.diff(graph.indptr))
+    assert np.all(position[sources] > position[graph.indices])
+    assert graph.order[0] == 8
+    np.testing.assert_array_equal(graph.to_rowcol(graph.to_flat([1], [2])), [[1], [2]])
+
+
+def test_upstream_incidence(df_routing):
+    """Test nested targets share the upstream cells."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    # outlet, middle-right cell (nested), bottom-left cell twice
+    incidence = graph.upstream_incidence([8, 5, 6, 6]).toarray()
+    assert incidence[0].all()
+    assert np.flatnonzero(incidence[1]).tolist() == [0, 1, 2, 3, 4, 5]
+    assert np.flatnonzero(incidence[2]).tolist() == [0, 3, 6]
+    np.testing.assert_array_equal(incidence[2], incidence[3])
+
+    with pytest.raises(ValueError):
+        graph.upstream_incidence([9])
+
+
+def test_routing_graph_cycle(df_routing):
+    """Test a routing with a cycle cannot be ordered."""
+    df_routing.loc[8, ["target1col", "target1row", "part1"]] = [2, 3, 1.0]
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    with pytest.raises(ValueError, match="cycle"):
+        graph.order
+
+
+def test_incidence_to_polygons(df_routing):
+    """Test the polygons cover the upstream cells."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    incidence = graph.upstream_incidence([8, 6])
+    polygons = incidence_to_polygons(incidence, (3, 3), from_origin(0, 60, 20, 20))
+    assert [polygon.area for polygon in polygons] == [9 * 400, 3 * 400]
+    assert polygons[1].bounds == (0, 0, 20, 60)
+
+
+def test_upstream_sum(df_routing):
+    """Test the (exclusive) sums of the upstream cells."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    values = np.arange(9)
+    np.testing.assert_allclose(graph.upstream_sum([5, 8], values), [15, 36])
+    np.testing.assert_allclose(
+        graph.upstream_sum([5, 8], values, exclusive=True), [15, 21]
+    )
+
+
+def test_routing_graph_save_load(df_routing, tmp_path):
+    """Test the graph is restored from the (memory-mapped) index folder."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    graph.save(tmp_path / "routing_graph")
+    loaded = RoutingGraph.load(tmp_path / "routing_graph")
+    assert loaded.shape == (3, 3)
+    assert isinstance(loaded.indices, np.memmap)
+    np.testing.assert_array_equal(loaded.order, graph.order)
+    np.testing.assert_allclose(
+        loaded.upstream_sum([5, 8], np.ones(9)), graph.upstream_sum([5, 8], np.ones(9))
+    )
+    np.testing.assert_array_equal(
+        loaded.upstream_incidence([5]).toarray(),
+        graph.upstream_incidence([5]).toarray(),
+    )
+
+
+def test_drop_sources(df_routing):
+    """Test the graph without the routing of source cells."""
+    graph = RoutingGraph.from_routing(df_routing, (3, 3))
+    np.testing.assert_array_equal(graph.cells, np.arange(9))
+    graph_nonriver = graph.drop_sources([3, 5])
+    expected = RoutingGraph.from_routing(
+        df_routing.loc[~df_routing.index.isin([3, 5])], (3, 3)
+    )
+    assert graph_nonriver.n_edges == 6
+    np.testing.assert_array_equal(graph_nonriver.indptr, expected.indptr)
+    np.testing.assert_array_equal(graph_nonriver.indices, expected.indices)
+    np.testing.assert_array_equal(graph_nonriver.cells, expected.cells)
+
+
+def _get_index_version(folder):
+    """Get the version of an index folder."""
+    with open(folder / "graph.json") as f:
+        return json.load(f)["version"]
+
+
+def test_routing_index(df_routing, tmp_path):
+    """Test the index of a routing table is only rebuilt if the table changes."""
+    txt_routing = tmp_path / "routing.txt"
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    graph = load_routing_index(txt_routing, (3, 3))
+    assert (tmp_path / ROUTING_INDEX_FOLDER / "graph.json").exists()
+    assert isinstance(graph.indices, np.memmap)
+    assert graph.n_edges == 9
+    np.testing.assert_array_equal(graph.cells, np.arange(9))
+
+    version = _get_index_version(tmp_path / ROUTING_INDEX_FOLDER)
+    load_routing_index(txt_routing, (3, 3))
+    assert _get_index_version(tmp_path / ROUTING_INDEX_FOLDER) == version
+
+    df_routing.loc[3, ["target2col", "target2row", "part2"]] = [-99, -99, 0.0]
+    df_routing.loc[3, "part1"] = 1.0
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    graph = load_routing_index(txt_routing, (3, 3))
+    assert graph.n_edges == 8
+
+
+def test_routing_index_rebuild_loaded(df_routing, tmp_path):
+    """Test a loaded graph stays valid when its index is rebuilt."""
+    txt_routing = tmp_path / "routing.txt"
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    folder = tmp_path / ROUTING_INDEX_FOLDER
+    old = load_routing_index(txt_routing, (3, 3))
+    indices = np.array(old.indices)
+    loads = old.upstream_sum([5, 8], np.ones(9))
+    version = _get_index_version(folder)
+
+    df_routing = df_routing.iloc[:-2]
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    graph = load_routing_index(txt_routing, (3, 3))
+    assert graph.n_edges == 8
+    assert _get_index_version(folder) != version
+    assert [path.name for path in folder.iterdir() if path.is_dir()] == [
+        _get_index_version(folder)
+    ]
+    np.testing.assert_array_equal(old.indices, indices)
+    np.testing.assert_array_equal(old.upstream_sum([5, 8], np.ones(9)), loads)
+
+
+def test_routing_index_drop_sources(df_routing, tmp_path):
+    """Test the derived index is built once per key and rebuilt if it changes."""
+    txt_routing = tmp_path / "routing.txt"
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    folder = tmp_path / ROUTING_NONRIVER_INDEX_FOLDER
+    calls = []
+
+    def river_cells():
+        calls.append(1)
+        return np.array([3, 5])
+
+    graph = load_routing_index(
+        txt_routing, (3, 3), folder=folder, drop_sources=river_cells, key="a"
+    )
+    assert isinstance(graph.indices, np.memmap)
+    assert graph.n_edges == 6
+    load_routing_index(
+        txt_routing, (3, 3), folder=folder, drop_sources=river_cells, key="a"
+    )
+    assert len(calls) == 1
+    assert load_routing_index(txt_routing, (3, 3)).n_edges == 9
+
+    graph = load_routing_index(
+        txt_routing, (3, 3), folder=folder, drop_sources=lambda: [3], key="b"
+    )
+    assert graph.n_edges == 7
+
+
+def test_build_routing_index_cycle(df_routing, tmp_path, monkeypatch):
+    """Test a failed build is stored in the index and not retried."""
+    df_routing.loc[8, ["target1col", "target1row", "part1"]] = [2, 3, 1.0]
+    txt_routing = tmp_path / "routing.txt"
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    folder = tmp_path / ROUTING_INDEX_FOLDER
+    with pytest.raises(PywatemsedemRoutingIndexError, match="cycle"):
+        build_routing_index(txt_routing, (3, 3))
+    with open(folder / "graph.json") as f:
+        metadata = json.load(f)
+    assert "cycle" in metadata["error"]
+    assert "version" not in metadata
+
+    def from_routing(*args, **kwargs):
+        raise AssertionError("The failed index is rebuilt.")
+
+    with monkeypatch.context() as m:
+        m.setattr(RoutingGraph, "from_routing", from_routing)
+        with pytest.raises(PywatemsedemRoutingIndexError, match="cycle"):
+            load_routing_index(txt_routing, (3, 3))
+        with pytest.raises(PywatemsedemRoutingIndexError, match="cycle"):
+            load_routing_index(
+                txt_routing,
+                (3, 3),
+                folder=tmp_path / ROUTING_NONRIVER_INDEX_FOLDER,
+                drop_sources=lambda: [3, 5],
+            )
+
+    df_routing.loc[8, ["target1col", "target1row", "part1"]] = [-99, -99, 0.0]
+    df_routing.to_csv(txt_routing, sep="\t", index=False)
+    assert load_routing_index(txt_routing, (3, 3)).n_edges == 9
+
+
+def test_build_routing_index_missing(tmp_path):
+    """Test a missing routing table raises a routing index error."""
+    txt_routing = tmp_path / "routing.txt"
+    with pytest.raises(PywatemsedemRoutingIndexError):
+        load_routing_index(txt_routing, (3, 3))
+    assert not (tmp_path / ROUTING_INDEX_FOLDER / "graph.json").exists()
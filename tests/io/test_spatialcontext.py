@@ -0,0 +1,94 @@
+import configparser
+import os
+
+import numpy as np
+import rasterio
+from rasterio.transform import from_origin
+
+from pywatemsedem.io.spatialcontext import (
+    clear_spatial_contexts,
+    get_spatial_context,
+)
+
+
+def create_ini(folder, name="inifile.ini"):
+    """Create an ini-file and P-factor raster in folder."""
+    modelinputfolder = folder / "modelinput"
+    modelinputfolder.mkdir(exist_ok=True)
+    with rasterio.open(
+        modelinputfolder / "pfactor.tif",
+        "w",
+        driver="GTiff",
+        height=4,
+        width=5,
+        count=1,
+        dtype="float32",
+        nodata=-9999,
+        crs="EPSG:31370",
+        transform=from_origin(0, 80, 20, 20),
+    ) as dst:
+        dst.write(np.ones((1, 4, 5), dtype="float32"))
+    config = configparser.ConfigParser()
+    config["Working directories"] = {
+        "input directory": str(modelinputfolder),
+        "output directory": str(folder / "modeloutput"),
+    }
+    config["Files"] = {
+        "p factor map filename": "pfactor.tif",
+        "shapefile catchment": "mask.tif",
+    }
+    ini = folder / name
+    with open(ini, "w") as f:
+        config.write(f)
+    return ini
+
+
+def test_get_spatial_context(tmp_path):
+    """Test spatial context is shared per model input folder and updated on change"""
+    clear_spatial_contexts()
+    ini = create_ini(tmp_path)
+    context = get_spatial_context(ini, 31370)
+    assert context.resolution == 20
+    assert context.nodata == -9999
+    assert context.profile["ncols"] == 5
+    assert context.mask_file == tmp_path / "modelinput" / "mask.tif"
+
+    # shared for ini-files with the same model input folder
+    ini_copy = tmp_path / "inifile_copy.ini"
+    ini_copy.write_text(ini.read_text())
+    assert get_spatial_context(ini_copy, 31370) is context
+    assert get_spatial_context(ini, 31370) is context
+    assert get_spatial_context(ini, 4326) is not context
+
+    # new context if the template raster changes
+    pfactor = tmp_path / "modelinput" / "pfactor.tif"
+    stat = pfactor.stat()
+    os.utime(pfactor, (stat.st_atime, stat.st_mtime + 10))
+    assert get_spatial_context(ini, 31370) is not context
+
+    clear_spatial_contexts()
+
+
+def test_get_statistics(tmp_path):
+    """Test statistics of a raster are cached per file fingerprint"""
+    clear_spatial_contexts()
+    ini = create_ini(tmp_path)
+    context = get_spatial_context(ini, 31370)
+    pfactor = tmp_path / "modelinput" / "pfactor.tif"
+    arr = np.ones((4, 5), dtype="float32")
+
+    stats = context.get_statistics("pfactor", pfactor, arr)
+    assert stats.min == 1 and stats.max == 1 and stats.nan_count == 0
+    # not recomputed for the same file and name
+    assert context.get_statistics("pfactor", pfactor, arr) is stats
+    assert context.get_statistics("cfactor", pfactor, arr) is not stats
+    # recomputed if the file is modified
+    stat = pfactor.stat()
+    os.utime(pfactor, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    arr[0, 0] = np.nan
+    stats = context.get_statistics("pfactor", pfactor, arr)
+    assert stats.nan_count == 1
+    # arrays not loaded from a file are not cached
+    assert context.get_statistics("pfactor", arr, arr) is not stats
+
+    clear_spatial_contexts()
@@ -1,7 +1,17 @@
+import geopandas as gpd
 import numpy as np
 import pytest
+from shapely.geometry import box
 
-from pywatemsedem.cfactor import reduce_cfactor_with_source_oriented_measures
+from pywatemsedem.cfactor import (
+    CfactorEngine,
+    create_cfactor_degerick2015,
+    reclass_with_lookup_table,
+    reduce_cfactor_with_source_oriented_measures,
+)
+from pywatemsedem.geo.rasterproperties import RasterProperties
+from pywatemsedem.geo.rasters import RasterMemory
+from pywatemsedem.geo.vectors import VectorMemory
 
 
 class TestReduceCfactorWithSourceOrientedMeasures:
@@ -64,3 +74,83 @@ class TestReduceCfactorWithSourceOrientedMeasures:
             reduce_cfactor_with_source_oriented_measures(
                 self.c_factor, c_reduction, True
             )
+
+
+def test_reclass_with_lookup_table():
+    """Test reclassing integer (lookup table) and float arrays"""
+    reclass = {-3: 0.001, -4: 0.01, 10: 0.37}
+    arr = np.array([[-9999, -3, -4], [10, 5, -3]], dtype=np.int16)
+    expected = np.array([[-9999, 0.001, 0.01], [0.37, 5, 0.001]], dtype=np.float32)
+
+    arr_out = reclass_with_lookup_table(arr, reclass)
+    np.testing.assert_array_equal(arr_out, expected)
+    assert arr_out.dtype == np.float32
+
+    arr_out = reclass_with_lookup_table(arr.astype(np.float64), reclass)
+    np.testing.assert_array_equal(arr_out, expected)
+
+
+def test_create_cfactor_degerick2015():
+    """Test order of the C-factor rules without parcels and grass strips"""
+    nodata = -9999
+    rp = RasterProperties([0, 0, 80, 40], 20, nodata, 31370)
+
+    def raster(values):
+        """Create a raster holding values"""
+        return RasterMemory(np.array(values, dtype=np.int16), rp)
+
+    rivers = raster([[-1, nodata, nodata, nodata], [nodata] * 4])
+    infrastructure = raster([[-2, -7, nodata, nodata], [nodata] * 4])
+    landuse = raster([[-3, -3, -3, -4], [10, -6, nodata, -5]])
+    mask = raster([[1, 1, 1, 1], [1, 1, 1, 0]])
+
+    _, arr = create_cfactor_degerick2015(rivers, infrastructure, landuse, mask)
+    expected = np.array([[0, 0, 0.001, 0.01], [0.37, 0.01, 0.37, 0]], dtype=np.float32)
+    np.testing.assert_array_equal(arr, expected)
+    assert arr.dtype == np.float32
+
+
+class TestCfactorEngine:
+    """Class to test mapping C-factor values on the (cached) index rasters"""
+
+    rp = RasterProperties([0, 0, 60, 20], 20, -9999, 31370)
+    gdf = gpd.GeoDataFrame(
+        {"C_factor": [0.1, 0.2]},
+        geometry=[box(0, 0, 20, 20), box(20, 0, 40, 20)],
+        crs=31370,
+    )
+
+    def create_engine(self, monkeypatch):
+        """Create an engine with a stub rasterization counting the calls"""
+        engine = CfactorEngine(RasterMemory(np.ones((1, 3)), self.rp))
+        self.calls = 0
+
+        def rasterize_index(vct):
+            """Index raster of the two boxes"""
+            self.calls += 1
+            return np.array([[0, 1, -1]], dtype=np.int32)
+
+        monkeypatch.setattr(engine, "_rasterize_index", rasterize_index)
+        return engine
+
+    def test_map_values(self, monkeypatch):
+        """Test values are mapped with the index raster, nodata outside polygons"""
+        engine = self.create_engine(monkeypatch)
+        vct = VectorMemory(self.gdf.copy(), "Polygon")
+
+        arr = engine.map_values(vct, vct.geodata["C_factor"], -9999)
+        np.testing.assert_array_almost_equal(arr, [[0.1, 0.2, -9999]])
+
+        # new values for the same geometries: no new rasterization
+        arr = engine.map_values(vct, np.array([0.3, 0.4]), -9999)
+        np.testing.assert_array_almost_equal(arr, [[0.3, 0.4, -9999]])
+        assert self.calls == 1
+
+        # changed geometries are rasterized again
+        gdf = self.gdf.copy()
+        gdf.geometry = [box(0, 0, 20, 20), box(40, 0, 60, 20)]
+        engine.map_values(VectorMemory(gdf, "Polygon"), [0.1, 0.2], -9999)
+        assert self.calls == 2
+
+        with pytest.raises(ValueError, match="Number of values"):
+            engine.map_values(vct, [0.1], -9999)
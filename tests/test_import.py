@@ -0,0 +1,52 @@
+import subprocess
+import sys
+
+import pytest
+
+#: Upper bound of the import time of pywatemsedem.postprocess (s)
+MAX_IMPORT_TIME_POSTPROCESS = 5
+
+CODE = """
+import sys
+import time
+
+start = time.perf_counter()
+import pywatemsedem.postprocess
+print(time.perf_counter() - start)
+for module in ["matplotlib", "sklearn", "scipy.signal", "folium"]:
+    print(module in sys.modules)
+"""
+
+
+@pytest.fixture(scope="module")
+def import_postprocess():
+    """Import pywatemsedem.postprocess in a new interpreter.
+
+    Returns
+    -------
+    list
+        Import time (s) and a flag for every heavy dependency being imported.
+    """
+    out = subprocess.run(
+        [sys.executable, "-c", CODE], check=True, capture_output=True, text=True
+    )
+    return out.stdout.split()
+
+
+def test_import_time_postprocess(import_postprocess):
+    """Test the import time of pywatemsedem.postprocess"""
+    assert float(import_postprocess[0]) < MAX_IMPORT_TIME_POSTPROCESS
+
+
+def test_import_postprocess_lazy(import_postprocess):
+    """Test matplotlib, sklearn, scipy.signal and folium are imported on first use"""
+    assert import_postprocess[1:] == ["False"] * 4
+
+
+def test_lazy_submodules():
+    """Test submodules are imported on first access"""
+    code = "import pywatemsedem; print(pywatemsedem.tools.__name__)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], check=True, capture_output=True, text=True
+    )
+    assert out.stdout.strip() == "pywatemsedem.tools"
@@ -0,0 +1,76 @@
+import geopandas as gpd
+import numpy as np
+import pytest
+import rasterio
+from shapely.geometry import box
+
+from pywatemsedem.cfactor import CfactorEngine
+from pywatemsedem.geo.rasterproperties import RasterProperties
+from pywatemsedem.geo.rasters import RasterMemory
+from pywatemsedem.geo.vectors import VectorMemory
+from pywatemsedem.ktc import KtcBuilder, create_ktc
+
+
+class TestKtcBuilder:
+    """Class to test creating ktc rasters from the class raster"""
+
+    nodata = -9999
+    rp = RasterProperties([0, 0, 80, 40], 20, nodata, 31370)
+    composite_landuse = np.array([[10, 10, -1, -2], [-5, -6, -6, 10]], dtype=np.int16)
+    cfactor = np.array([[0.1, 0.3, 0, 0], [0, 0.01, 0.01, np.nan]], dtype=np.float32)
+    mask = RasterMemory(np.ones((2, 4)), rp)
+
+    def test_create(self):
+        """Test ktc values for ktc value combinations without grass strips"""
+        builder = KtcBuilder(self.composite_landuse, self.cfactor, self.mask)
+        for ktc_low, ktc_high, ktc_limit in [(1, 10, 0.1), (2, 20, 0.05), (3, 9, 1)]:
+            arr_ktc = builder.create(ktc_low, ktc_high, ktc_limit)
+            expected = np.where(self.cfactor <= ktc_limit, ktc_low, ktc_high)
+            expected[np.isin(self.composite_landuse, [-2, -1, -5])] = 9999
+            expected[self.composite_landuse == -6] = ktc_low
+            np.testing.assert_array_equal(arr_ktc, expected)
+            assert arr_ktc.dtype == np.float32
+
+        arr_ktc, _ = create_ktc(
+            self.composite_landuse, self.cfactor, self.mask, 1, 10, 0.1
+        )
+        np.testing.assert_array_equal(arr_ktc, builder.create(1, 10, 0.1))
+
+    def test_create_grass_strips(self, monkeypatch):
+        """Test ktc values of grass strips are scaled with the grass strip width"""
+        gdf = gpd.GeoDataFrame(
+            {"width": [5.0], "scale_ktc": [1]},
+            geometry=[box(20, 0, 40, 20)],
+            crs=31370,
+        )
+        grass = VectorMemory(gdf, "Polygon")
+        engine = CfactorEngine(self.mask)
+        monkeypatch.setattr(
+            engine,
+            "_rasterize_index",
+            lambda vct: np.array([[-1, -1, -1, -1], [-1, 0, -1, -1]], dtype=np.int32),
+        )
+        builder = KtcBuilder(
+            self.composite_landuse, self.cfactor, self.mask, grass, engine=engine
+        )
+        arr_ktc = builder.create(1, 10, 0.1)
+        ktc_grass = grass.geodata["KTC"].iloc[0]
+        assert 0 < ktc_grass < 10
+        np.testing.assert_array_almost_equal(
+            arr_ktc, [[1, 10, 9999, 9999], [9999, ktc_grass, 1, 10]]
+        )
+
+    def test_write(self, tmp_path):
+        """Test writing the ktc rasters of a calibration grid"""
+        builder = KtcBuilder(self.composite_landuse, self.cfactor, self.mask)
+        parameters = [(1, 10, 0.1), (2, 20, 0.1)]
+        outfiles = [tmp_path / f"ktc_{i}.tif" for i in range(len(parameters))]
+        assert builder.write(parameters, outfiles, format="tiff")
+        for (ktc_low, ktc_high, ktc_limit), outfile in zip(parameters, outfiles):
+            with rasterio.open(outfile) as src:
+                np.testing.assert_array_equal(
+                    src.read(1), builder.create(ktc_low, ktc_high, ktc_limit)
+                )
+
+        with pytest.raises(ValueError, match="Number of output files"):
+            builder.write(parameters, outfiles[:1], format="tiff")
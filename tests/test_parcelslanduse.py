@@ -0,0 +1,81 @@
+import numpy as np
+import pytest
+
+from pywatemsedem.parcelslanduse import (
+    create_parcels_landuse_degerick2015,
+    map_input_array_on_array,
+    merge_arrays_on_priority,
+)
+
+
+class TestMergeArraysOnPriority:
+    """Class to test merging arrays in order of priority"""
+
+    nodata = -9999
+
+    def test_merge_equals_chained_mapping(self):
+        """Test merging equals chaining map_input_array_on_array"""
+        rng = np.random.default_rng(0)
+        arrays = []
+        for value in [-1, -5, -2, -6, 0]:
+            arr = np.full((50, 40), value, dtype=np.int16)
+            arr[rng.random(arr.shape) < 0.7] = self.nodata
+            arrays.append(arr)
+
+        expected = arrays[0].copy()
+        for arr in arrays[1:]:
+            expected = map_input_array_on_array(expected, arr, self.nodata)
+
+        merged = merge_arrays_on_priority(arrays, self.nodata)
+        np.testing.assert_array_equal(merged, expected)
+        assert merged.dtype == np.int16
+
+    def test_merge_none_and_dtype(self):
+        """Test None-arrays are skipped and values are cast to dtype"""
+        arr1 = np.array([1.0, self.nodata, self.nodata])
+        arr2 = np.array([2.0, 3.0, self.nodata])
+        merged = merge_arrays_on_priority([arr1, None, arr2], self.nodata, np.int16)
+        np.testing.assert_array_equal(merged, [1, 3, self.nodata])
+        assert merged.dtype == np.int16
+
+    def test_different_shapes(self):
+        """Test an error is raised for arrays with different shapes"""
+        with pytest.raises(ValueError):
+            merge_arrays_on_priority([np.zeros((2, 2)), np.zeros((2, 3))], self.nodata)
+
+
+def test_create_parcels_landuse_degerick2015():
+    """Test priority of the rasters in the parcels landuse raster"""
+    nodata = -9999
+    shape = (1, 7)
+
+    def raster(values):
+        """Create a raster with values on the first positions"""
+        arr = np.full(shape, nodata, dtype=np.int32)
+        arr[0, : len(values)] = values
+        return arr
+
+    arr = create_parcels_landuse_degerick2015(
+        landuse_core=raster([-3, -3, -3, -3, -3, -3]),
+        river=raster([-1]),
+        water=raster([-5, -5]),
+        infrastructure=raster([-2, -2, -7]),
+        mask=np.array([[1, 1, 1, 1, 1, 1, 0]]),
+        nodata=nodata,
+        landuse_parcels=raster([-4, -4, -4, -4, -4]),
+        parcels=raster([10, 10, 10, 10, 40000]),
+        grass_strips=raster([-6, -6, -6, -6]),
+    )
+    np.testing.assert_array_equal(arr, [[-1, -5, -7, -6, -4, -3, 0]])
+    assert arr.dtype == np.int16
+
+    arr = create_parcels_landuse_degerick2015(
+        landuse_core=raster([-3, -3, -3]),
+        river=raster([-1]),
+        water=raster([]),
+        infrastructure=raster([]),
+        mask=np.ones(shape),
+        nodata=nodata,
+        parcels=raster([10, 40000]),
+    )
+    np.testing.assert_array_equal(arr, [[-1, 40000 % 32757, -3, *[nodata] * 4]])
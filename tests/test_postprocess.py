@@ -1,13 +1,25 @@
 """Test functions for postprocessing functions"""
 
+import geopandas as gpd
 import numpy as np
 import pandas as pd
 import pytest
+import rasterio
 from conftest import ini_file, postprocess, scenario_data
+from rasterio.transform import from_origin
+from shapely.geometry import box
 
+from pywatemsedem.errors import PywatemsedemRoutingIndexError
 from pywatemsedem.geo.utils import load_raster
+from pywatemsedem.io.routinggraph import RoutingGraph, incidence_to_polygons
 from pywatemsedem.postprocess import (
+    PostProcess,
+    _add_priority_load_attributes,
+    _get_subcatchment_engine,
+    _merge_priority_subcatchments,
+    _selected_source_load_window,
     compute_netto_erosion_parcels,
+    identify_sinks_arr,
     read_filestructure,
 )
 
@@ -216,6 +228,261 @@ def test_vct_sinks_property(postprocess_obj):
     np.testing.assert_allclose(gdf["cumperc"].iloc[-1], 100.0)
 
 
+@pytest.mark.parametrize(
+    "vector_format,suffix", [("gpkg", ".gpkg"), ("flatgeobuf", ".fgb")]
+)
+def test_vct_sinks_vector_format(tmp_path, vector_format, suffix):
+    """Test the sinks vector is written in the vector format of the instance."""
+    pp = PostProcess(
+        ini_file, tmp_path / "postprocess", 31370, vector_format=vector_format
+    )
+
+    sinks = pp.vct_sinks
+    assert sinks.file_path.suffix == suffix
+    assert pp.vct_sedi_export.file_path.suffix == suffix
+    assert not list((tmp_path / "postprocess").glob("*.shp"))
+    assert {"sediment", "cumsum", "cumperc"}.issubset(sinks.geodata.columns)
+
+
+def test_postprocess_write_once(postprocess_obj):
+    """Test vectors modified within write_once are only written at the end."""
+    gdf = gpd.GeoDataFrame({"NR": [1, 2]}, geometry=[box(0, 0, 1, 1)] * 2, crs=31370)
+    vct = postprocess_obj.postprocessing_folder / "subcatchments.shp"
+
+    with postprocess_obj.write_once():
+        postprocess_obj._write_vector(gdf, vct)
+        gdf_in = postprocess_obj._read_vector(vct)
+        gdf_in["sewer_in"] = [1.0, 2.0]
+        postprocess_obj._write_vector(gdf_in, vct)
+        assert not vct.exists()
+    assert postprocess_obj._read_vector(vct)["sewer_in"].tolist() == [1.0, 2.0]
+
+    with pytest.raises(ValueError):
+        PostProcess(ini_file, postprocess_obj.postprocessing_folder, 31370, "kml")
+
+
+def test_postprocess_chain_vector_format(tmp_path):
+    """Test chained methods outside write_once read the vector written in the
+    vector format of the instance."""
+    pp = PostProcess(ini_file, tmp_path / "postprocess", 31370, vector_format="gpkg")
+    folder = pp.postprocessing_folder
+    profile = {
+        "driver": "SAGA",
+        "height": 2,
+        "width": 2,
+        "count": 1,
+        "dtype": "int32",
+        "nodata": -9999,
+        "transform": from_origin(0, 40, 20, 20),
+        "crs": "EPSG:31370",
+    }
+    with rasterio.open(folder / "subc.sdat", "w", **profile) as dst:
+        dst.write(np.array([[1, 1], [2, -9999]], dtype=np.int32), 1)
+    profile.update(driver="GTiff", dtype="float32")
+    rst_sewerin = folder / "sewer_in.tif"
+    with rasterio.open(rst_sewerin, "w", **profile) as dst:
+        dst.write(np.array([[1000, 2000], [4000, 0]], dtype=np.float32), 1)
+    txt_segments = folder / "total_sediment_segments.txt"
+    txt_segments.write_text("header\nheader\n1\t5000\n2\t3000\n")
+    pp.files = {
+        "txt_total_sediment_segments": txt_segments,
+        "rst_sewerin": rst_sewerin,
+    }
+    vct = folder / "subc.shp"
+    gpd.GeoDataFrame(
+        {"VALUE": [1, 2]}, geometry=[box(0, 20, 40, 40), box(0, 0, 20, 20)], crs=31370
+    ).to_file(vct)
+
+    pp.add_sediment_to_subcatchments(vct)
+    pp.compute_sewer_in_per_catchment(vct)
+
+    gdf = gpd.read_file(folder / "subc.gpkg")
+    assert {"sediment", "sedar", "sewer_in"}.issubset(gdf.columns)
+    np.testing.assert_allclose(gdf["sediment"], [5.0, 3.0])
+    np.testing.assert_allclose(gdf["sewer_in"], [3.0, 4.0])
+
+
+def test_postprocess_read_vector_not_written(tmp_path):
+    """Test a vector not written by the instance is read from the given path, not
+    from a (stale) vector with the same name in the vector format."""
+    pp = PostProcess(ini_file, tmp_path / "postprocess", 31370, vector_format="gpkg")
+    folder = pp.postprocessing_folder
+    geometry = [box(0, 0, 1, 1)]
+    gpd.GeoDataFrame({"NR": [1]}, geometry=geometry, crs=31370).to_file(
+        folder / "subc.gpkg"
+    )
+    gpd.GeoDataFrame({"NR": [2]}, geometry=geometry, crs=31370).to_file(
+        folder / "subc.shp"
+    )
+    assert pp._read_vector(folder / "subc.shp")["NR"].tolist() == [2]
+
+
+def test_merge_priority_subcatchments(tmp_path):
+    """Test the individual priority subcatchments are merged and written once."""
+    lst_gdf = []
+    cumulative_source_load = 0
+    for i, load in enumerate([6.0, 3.0]):
+        cumulative_source_load += load
+        gdf = gpd.GeoDataFrame({"VALUE": [i + 1]}, geometry=[box(i, 0, i + 1, 1)])
+        lst_gdf.append(
+            _add_priority_load_attributes(gdf, load, 10.0, cumulative_source_load)
+        )
+
+    gdf, dst = _merge_priority_subcatchments(
+        lst_gdf, tmp_path, 31370, vector_format="gpkg"
+    )
+    assert dst == tmp_path / "priority_subcatchments.gpkg"
+    gdf_disk = gpd.read_file(dst)
+    assert gdf_disk["VALUE"].tolist() == [1, 2]
+    np.testing.assert_allclose(gdf_disk["source_load_perc"], [60.0, 30.0])
+    np.testing.assert_allclose(gdf_disk["source_load_cumperc"], [60.0, 90.0])
+
+
+@pytest.fixture
+def synthetic_priority():
+    """Routing graph of a 6x5 raster, source load raster and ranked points."""
+    nrows, ncols = 6, 5
+    records = []
+    for row in range(1, nrows + 1):
+        for col in range(1, ncols + 1):
+            if row < nrows and col < ncols:
+                records.append((col, row, col, row + 1, 0.7, col + 1, row + 1, 0.3))
+            elif row < nrows:
+                records.append((col, row, col, row + 1, 1.0, -99, -99, 0.0))
+            elif col < ncols:
+                records.append((col, row, col + 1, row, 1.0, -99, -99, 0.0))
+            else:
+                records.append((col, row, -99, -99, 0.0, -99, -99, 0.0))
+    df_routing = pd.DataFrame(
+        records,
+        columns=[
+            "col",
+            "row",
+            "target1col",
+            "target1row",
+            "part1",
+            "target2col",
+            "target2row",
+            "part2",
+        ],
+    )
+    df_routing["distance1"] = 20.0
+    df_routing["distance2"] = 20.0
+    graph = RoutingGraph.from_routing(df_routing, (nrows, ncols))
+    arr_source = np.random.default_rng(0).uniform(0, 10, (nrows, ncols))
+    arr_source[0, 0] = -9999
+    # nested points: (row, col) zero-based, ranked by source value
+    cells = [(3, 2), (5, 4), (2, 0), (4, 3)]
+    gdf_points = gpd.GeoDataFrame(
+        {"id": [1, 2, 3, 4], "source_value": [4.0, 1.0, 3.0, 2.0]},
+        geometry=gpd.points_from_xy(
+            [col * 20 + 10 for _, col in cells],
+            [(nrows - row) * 20 - 10 for row, _ in cells],
+        ),
+        crs=31370,
+    )
+    return graph, arr_source, gdf_points
+
+
+def test_priority_contrib_routing_matches_polygons(synthetic_priority, monkeypatch):
+    """Test the routing graph contribution equals the rasterized polygon one for
+    subcatchments delineated with the routing engine."""
+    graph, arr_source, gdf_points = synthetic_priority
+    pp = PostProcess.__new__(PostProcess)
+    pp._routing_graph = graph
+    pp.rstparams = {
+        "transform": from_origin(0, graph.shape[0] * 20, 20, 20),
+        "nodata": -9999,
+    }
+    monkeypatch.setattr(
+        pp, "_select_priority_subcatchment_raster", lambda source: arr_source
+    )
+    incidence = graph.upstream_incidence(
+        pp._points_to_cells(gdf_points.geometry, "priority points")
+    )
+    gdf_sub = gpd.GeoDataFrame(
+        {"id": gdf_points["id"]},
+        geometry=incidence_to_polygons(
+            incidence, graph.shape, pp.rstparams["transform"]
+        ),
+        crs=31370,
+    )
+
+    contrib = {
+        engine: pp._compute_overlap_safe_priority_contrib(
+            gdf_points, gdf_sub, "id", "id", "sedi_out", engine=engine
+        )
+        for engine in ["routing", "saga"]
+    }
+    assert contrib["routing"].index.tolist() == [1, 3, 4, 2]
+    assert _get_subcatchment_engine(gdf_sub) == "saga"
+    pd.testing.assert_series_equal(contrib["routing"], contrib["saga"])
+    np.testing.assert_allclose(contrib["routing"].iloc[-1], 100.0)
+    assert np.all(np.diff(contrib["routing"].to_numpy()) >= 0)
+
+
+@pytest.mark.parametrize(
+    "bounds",
+    [
+        pytest.param((63.0, 83.0, 137.0, 157.0), id="within_cells"),
+        pytest.param((58.5, 77.2, 141.9, 161.1), id="across_cells"),
+        pytest.param(None, id="empty"),
+    ],
+)
+def test_selected_source_load_window(tmp_path, bounds):
+    """Test the window of a subcatchment with bounds off the raster grid (or an
+    empty subcatchment vector) selects the load of all subcatchment cells."""
+    arr_sedi_out = np.random.default_rng(0).uniform(0, 10, (10, 10))
+    arr_subcatch = np.full((10, 10), -99999.0, dtype=np.float32)
+    arr_subcatch[2:6, 3:7] = 1
+    rst_subcatch = tmp_path / "subcatch.tif"
+    with rasterio.open(
+        rst_subcatch,
+        "w",
+        driver="GTiff",
+        height=10,
+        width=10,
+        count=1,
+        dtype="float32",
+        nodata=-99999.0,
+        transform=from_origin(0, 200, 20, 20),
+    ) as dst:
+        dst.write(arr_subcatch, 1)
+    geometry = [] if bounds is None else [box(*bounds)]
+    gdf_subcatch = gpd.GeoDataFrame(geometry=geometry, crs=31370)
+
+    load, mask, window = _selected_source_load_window(
+        arr_sedi_out, rst_subcatch, gdf_subcatch, -9999
+    )
+    np.testing.assert_allclose(load, arr_sedi_out[2:6, 3:7].sum())
+    arr_mask = np.zeros((10, 10), dtype=bool)
+    arr_mask[window][mask] = True
+    np.testing.assert_array_equal(arr_mask, arr_subcatch == 1)
+
+
+def test_get_subcatchment_engine(tmp_path):
+    """Test the engine of the subcatchments is kept when written to disk."""
+    gdf = gpd.GeoDataFrame(
+        {"id": [1, 2], "engine": "routing"}, geometry=[box(0, 0, 1, 1)] * 2, crs=31370
+    )
+    gdf.to_file(tmp_path / "subc.shp")
+    assert _get_subcatchment_engine(gpd.read_file(tmp_path / "subc.shp")) == "routing"
+    assert _get_subcatchment_engine(gdf.drop(columns="engine")) == "saga"
+
+
+def test_identify_sinks_arr():
+    """Test sinks are P-factor cells of 1 without outgoing routing."""
+    arr_pfactor = np.array([[1, 1, 0], [1, 1, 1]])
+    # one-based rows and columns of the routing sources, duplicates and sources
+    # outside the raster are allowed
+    rows = np.array([1, 1, 2, 2, -99])
+    cols = np.array([1, 1, 2, 3, -99])
+    arr_sinks = identify_sinks_arr(arr_pfactor, rows, cols)
+    np.testing.assert_array_equal(
+        arr_sinks, np.array([[False, True, False], [True, False, False]])
+    )
+
+
 @pytest.mark.parametrize(
     "compute_priority",
     [
@@ -442,6 +709,36 @@ def test_identify_subcatchments_multiple_poi(postprocess_obj):
     assert "VALUE" not in subcatchments.geodata.columns
 
 
+def test_identify_subcatchments_routing_fallback(postprocess_obj, monkeypatch):
+    """Test the routing engine falls back to SAGA if the routing graph index can
+    not be built."""
+
+    def load_routing_index(*args, **kwargs):
+        raise PywatemsedemRoutingIndexError("Routing graph index not built.")
+
+    monkeypatch.setattr(
+        "pywatemsedem.postprocess.load_routing_index", load_routing_index
+    )
+    postprocess_obj.add_poi(
+        [165570.4, 164464.4],
+        [168768, 166967.9],
+        id=[11, 12],
+        filename="poi_subcatchments_test.shp",
+    )
+
+    out = postprocess_obj.identify_subcatchments(
+        "vct_poi",
+        id_column="id",
+        tag="subcatchments",
+        engine="routing",
+    )
+
+    subcatchments = postprocess_obj.vct_poi.vct_subcatchments
+    assert subcatchments.file_path == out
+    assert sorted(subcatchments.geodata["id"].astype(int).tolist()) == [11, 12]
+    assert "engine" not in subcatchments.geodata.columns
+
+
 @pytest.mark.parametrize(
     "source, approach, nmax, threshold, flag_merge",
     [
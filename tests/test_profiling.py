@@ -0,0 +1,71 @@
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+
+from pywatemsedem.geo.utils import execute_subprocess
+from pywatemsedem.profiling import (
+    Profiler,
+    count_tool_call,
+    get_active_profiler,
+    timed,
+    timer,
+)
+
+
+@timed("allocate")
+def allocate(n):
+    """Allocate an array of n float64 values."""
+    arr = np.ones(n)
+    return arr.sum()
+
+
+def test_profiler(tmp_path):
+    """Test recording of (nested) stages, memory peaks and tool calls."""
+    # no active profiler: timers do not record
+    assert get_active_profiler() is None
+    with timer("inactive"):
+        count_tool_call(["saga_cmd"])
+    assert allocate(10) == 10
+
+    with Profiler(trace_memory=True) as profiler:
+        assert get_active_profiler() is profiler
+        with timer("outer"):
+            count_tool_call(["saga_cmd", "-f=q", "grid_tools", "0"])
+            allocate(1_000_000)
+            execute_subprocess([sys.executable, "-c", "pass"])
+        count_tool_call(["gdalwarp", "-q"])
+    assert get_active_profiler() is None
+
+    df = profiler.to_dataframe()
+    assert df["stage"].tolist() == ["allocate", "outer"]
+    assert df["parent"].iloc[0] == "outer"
+    assert pd.isna(df["parent"].iloc[1])
+    assert df["depth"].tolist() == [1, 0]
+    assert np.all(df["duration"] > 0)
+    # memory peak of nested stage propagates to enclosing stage
+    assert np.all(df["peak_memory"] >= 8_000_000)
+    assert df["saga_cmd"].tolist() == [0, 1]
+    assert df["other_tools"].tolist() == [0, 1]
+    assert df["gdalwarp"].tolist() == [0, 0]
+    assert profiler.tool_calls["saga_cmd"] == 1
+    assert profiler.tool_calls["gdalwarp"] == 1
+
+    # export
+    profiler.to_csv(tmp_path / "profile.csv")
+    df_csv = pd.read_csv(tmp_path / "profile.csv")
+    assert df_csv["stage"].tolist() == ["allocate", "outer"]
+    profiler.to_json(tmp_path / "profile.json")
+    with open(tmp_path / "profile.json") as f:
+        data = json.load(f)
+    assert [stage["stage"] for stage in data["stages"]] == ["allocate", "outer"]
+    assert data["tool_calls"]["gdalwarp"] == 1
+
+
+def test_profiler_no_memory():
+    """Test memory peaks are not recorded without memory tracing."""
+    with Profiler() as profiler:
+        allocate(10)
+    df = profiler.to_dataframe()
+    assert df["peak_memory"].isna().all()
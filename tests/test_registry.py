@@ -0,0 +1,72 @@
+import os
+import stat
+
+import pytest
+
+from pywatemsedem.registry import ToolRegistry
+
+
+def create_tool(folder, name):
+    """Create a dummy executable in a folder."""
+    folder.mkdir(parents=True, exist_ok=True)
+    tool = folder / name
+    tool.write_text("#!/bin/sh\nexit 0\n")
+    tool.chmod(tool.stat().st_mode | stat.S_IEXEC)
+    return tool
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Dummy executables are shell scripts")
+def test_resolve(tmp_path, monkeypatch):
+    """Test tools are resolved via PATH or the environment variable of the tool"""
+    gdalwarp = create_tool(tmp_path / "gdal", "gdalwarp")
+    watem_sedem = create_tool(tmp_path / "watem_sedem", "watem_sedem")
+    monkeypatch.setenv("PATH", str(tmp_path / "gdal"))
+    monkeypatch.delenv("WATEMSEDEM", raising=False)
+
+    registry = ToolRegistry()
+    assert registry.resolve("gdalwarp") == str(gdalwarp)
+
+    # via environment variable
+    with pytest.raises(OSError, match="there is no environment variable WATEMSEDEM"):
+        registry.resolve("watem_sedem")
+    monkeypatch.setenv("WATEMSEDEM", str(tmp_path / "watem_sedem"))
+    assert registry.resolve("watem_sedem") == str(watem_sedem)
+    assert os.environ["PATH"].startswith(str(tmp_path / "watem_sedem"))
+
+    # not found
+    with pytest.raises(OSError, match="gdal_translate"):
+        registry.resolve("gdal_translate")
+    paths = registry.check_environment(
+        ["gdalwarp", "gdal_translate"], raise_error=False
+    )
+    assert paths == {"gdalwarp": str(gdalwarp), "gdal_translate": None}
+    with pytest.raises(ValueError, match="not known"):
+        registry.resolve("saga_gui")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="Dummy executables are shell scripts")
+def test_resolve_cache(tmp_path, monkeypatch):
+    """Test tools are cached per process and on disk"""
+    gdalwarp = create_tool(tmp_path / "gdal", "gdalwarp")
+    monkeypatch.setenv("PATH", str(tmp_path / "gdal"))
+    cache_file = tmp_path / "cache" / "tools.json"
+
+    registry = ToolRegistry(cache_file=cache_file)
+    assert registry.resolve("gdalwarp") == str(gdalwarp)
+    assert cache_file.exists()
+
+    # cached per process
+    gdalwarp.unlink()
+    assert registry.resolve("gdalwarp") == str(gdalwarp)
+
+    # cache file is only used if binary is unchanged
+    create_tool(tmp_path / "gdal_other", "gdalwarp")
+    monkeypatch.setenv("PATH", str(tmp_path / "gdal_other"))
+    registry_other = ToolRegistry(cache_file=cache_file)
+    assert registry_other.resolve("gdalwarp") == str(tmp_path / "gdal_other/gdalwarp")
+    monkeypatch.setenv("PATH", str(tmp_path / "gdal"))
+    with pytest.raises(OSError, match="gdalwarp"):
+        registry_other.resolve("gdalwarp")
+
+    registry.clear()
+    assert not cache_file.exists()
@@ -1,6 +1,7 @@
 """Test functions for utils scripts"""
 
 import geopandas as gpd
+import numpy as np
 import pandas as pd
 from numpy.testing import assert_almost_equal
 from shapely import LineString
@@ -63,3 +64,46 @@ class TestReformatRouting:
         assert_almost_equal(out["fromrow"].values, 10)
         assert_almost_equal(out["tocol"].values, 6)
         assert_almost_equal(out["torow"].values, 5)
+
+    def test_format_forced_routing_multiple(self):
+        """Test reformat forced routing for multiple LineStrings
+
+        Both trajectory and jump routing are compared with the reformatting of the
+        individual LineStrings. Routing elements within one cell are removed.
+        """
+        lines = [
+            self.coor,
+            [(0.5, 9.5), (3.5, 3.5)],
+            [(7.2, 7.2), (7.8, 7.4), (9.5, 0.5)],
+        ]
+        gdf = gpd.GeoDataFrame(
+            {"id": [1, 2, 3]}, geometry=[LineString(line) for line in lines]
+        )
+        for trajectory_routing in [True, False]:
+            out = format_forced_routing(
+                gdf,
+                resolution=self.res,
+                minmax=self.minmax,
+                trajectory_routing=trajectory_routing,
+            )
+            exp = pd.concat(
+                [
+                    reformat_LineString_to_source_targetf(
+                        line, trajectory_routing=trajectory_routing
+                    )
+                    for line in lines
+                ],
+                ignore_index=True,
+            )
+            exp = exp.astype(float)
+            exp = exp.loc[
+                (np.floor(exp["fromX"]) != np.floor(exp["toX"]))
+                | (np.floor(exp["fromY"]) != np.floor(exp["toY"]))
+            ]
+            assert_almost_equal(out["fromX"].values, exp["fromX"].values)
+            assert_almost_equal(out["fromY"].values, exp["fromY"].values)
+            assert_almost_equal(out["toX"].values, exp["toX"].values)
+            assert_almost_equal(out["toY"].values, exp["toY"].values)
+            assert out.index.tolist() == exp.index.tolist()
+            assert_almost_equal(out["fromcol"].values, np.floor(exp["fromX"]) + 1)
+            assert_almost_equal(out["torow"].values, np.floor(10 - exp["toY"]) + 1)